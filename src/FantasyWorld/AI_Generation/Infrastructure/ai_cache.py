@@ -0,0 +1,195 @@
+"""
+Caché de respuestas del modelo de texto (Llama/Qwen) direccionada por contenido.
+
+Las llamadas deterministas se repetían en cada clic: la traducción del prompt de
+Stable Diffusion (temperatura 0.3) para el mismo mundo, o el análisis de metadata
+de una descripción que no ha cambiado. Cada una cuesta varios segundos de modelo local.
+
+La clave es el SHA-256 de (URL del servidor + payload completo: prompt/mensajes,
+temperatura, max_tokens, stop...), así que cualquier cambio de prompt o de parámetros
+produce otra entrada. Dos niveles:
+
+- Memoria (por proceso): LRU acotado por AI_CACHE_MAX_ENTRIES, con TTL.
+- Disco (compartido entre procesos y reinicios): un JSON por clave en AI_CACHE_DIR,
+  escrito de forma atómica, con el mismo TTL y poda de los más antiguos.
+
+Solo se cachean las llamadas de temperatura baja (<= AI_CACHE_MAX_TEMPERATURE) o las
+marcadas explícitamente con cache=True, y nunca las respuestas vacías.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Campos del payload que no afectan al resultado cacheable
+VOLATILE_FIELDS = ('seed', 'stream')
+
+
+def cache_key(url: str, payload: dict) -> str:
+    """Clave de contenido de una llamada: hash estable del servidor y los parámetros."""
+    material = {'url': url, 'payload': {k: v for k, v in payload.items() if k not in VOLATILE_FIELDS}}
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Caché de dos niveles (memoria LRU + disco) con TTL. Ver docstring del módulo."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 7 * 24 * 3600, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = 5000, max_temperature: float = 0.3, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_entries = max_disk_entries
+        self.max_temperature = max_temperature
+        self.clock = clock
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def is_cacheable(self, payload: dict, cache: Optional[bool] = None) -> bool:
+        """cache=True/False fuerza la decisión; por defecto solo temperaturas bajas."""
+        if cache is not None:
+            return cache
+        return payload.get('temperature', 1.0) <= self.max_temperature
+
+    def _expired(self, created_at: float) -> bool:
+        return self.clock() - created_at > self.ttl
+
+    # --- Nivel de disco ---
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(entry.get('created_at', 0)):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: dict) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la caché de IA en disco: {e}")
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 100 == 0:
+            self.prune_disk()
+
+    def prune_disk(self) -> int:
+        """Borra las entradas caducadas y, si sobran, las más antiguas. Retorna cuántas se borraron."""
+        if not self.disk_dir or not self.disk_dir.exists():
+            return 0
+        files = []
+        for path in self.disk_dir.glob('*/*.json'):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort()
+        now = self.clock()
+        expired = [p for mtime, p in files if now - mtime > self.ttl]
+        alive = [p for mtime, p in files if now - mtime <= self.ttl]
+        surplus = alive[:max(0, len(alive) - self.max_disk_entries)]
+        for path in expired + surplus:
+            path.unlink(missing_ok=True)
+        return len(expired) + len(surplus)
+
+    # --- API ---
+
+    def get(self, key: str):
+        """Valor cacheado o None (memoria primero; un acierto en disco se sube a memoria)."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry['created_at']):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry['value']
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+        return entry['value']
+
+    def set(self, key: str, value) -> None:
+        if value in (None, '', {}, []):
+            return
+        entry = {'created_at': self.clock(), 'value': value}
+        with self._lock:
+            self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir and self.disk_dir.exists():
+            for path in self.disk_dir.glob('*/*.json'):
+                path.unlink(missing_ok=True)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Caché compartida del proceso, o None si AI_CACHE_ENABLED es False."""
+    global _cache
+    if not getattr(settings, 'AI_CACHE_ENABLED', True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    max_entries=getattr(settings, 'AI_CACHE_MAX_ENTRIES', 256),
+                    ttl=getattr(settings, 'AI_CACHE_TTL', 7 * 24 * 3600),
+                    disk_dir=getattr(settings, 'AI_CACHE_DIR', None),
+                    max_temperature=getattr(settings, 'AI_CACHE_MAX_TEMPERATURE', 0.3),
+                )
+    return _cache
+
+
+def reset_llm_cache() -> None:
+    """Descarta la caché del proceso (se reconstruye con los settings vigentes)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,281 @@
+"""
+Capa de transporte compartida para los servidores de IA locales (Text-Gen-WebUI y Stable Diffusion).
+
+Antes cada llamada hacía `requests.post` con una conexión nueva, sin reintentos ni
+límite de concurrencia: una ráfaga de clics en "generar" dejaba todos los workers
+WSGI bloqueados esperando al mismo servidor. Aquí cada backend tiene:
+
+- Una sesión HTTP con keep-alive (pool de conexiones reutilizadas).
+- Un semáforo que limita las llamadas simultáneas; si no hay hueco en `queue_timeout`
+  segundos se lanza AIBackendBusy en lugar de encolar trabajo sin límite.
+- Reintentos con backoff exponencial y jitter para errores transitorios (conexión
+  rechazada, 429/502/503/504). Los timeouts de lectura no se reintentan: la
+  generación ya ha consumido su presupuesto.
+- Un circuit breaker: tras varios fallos seguidos el backend se da por caído durante
+  `breaker_cooldown` segundos y las llamadas fallan al instante (AIBackendUnavailable).
+- Una API asyncio (`apost_json`, `arun`) que ejecuta las llamadas en un pool de hilos
+  del tamaño del límite de concurrencia: se pueden lanzar muchas generaciones con
+  asyncio.gather sin ocupar un hilo por cada una.
+- Streaming (`stream_lines`) para respuestas largas: las líneas llegan según se
+  generan y el timeout se aplica entre fragmentos, no a la respuesta completa.
+
+Las excepciones heredan de las de `requests`, así que los `except` existentes de los
+servicios (ConnectionError / Timeout) siguen funcionando.
+"""
+import asyncio
+import functools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+CONNECT_TIMEOUT = 5
+
+
+class AIBackendUnavailable(requests.exceptions.ConnectionError):
+    """El circuit breaker está abierto: el backend ha fallado repetidamente."""
+
+
+class AIBackendBusy(requests.exceptions.Timeout):
+    """No hubo hueco libre en el límite de concurrencia del backend a tiempo."""
+
+
+class CircuitBreaker:
+    """
+    Breaker de tres estados: cerrado (normal), abierto (falla al instante) y
+    semiabierto (tras el enfriamiento deja pasar una única llamada de prueba).
+    """
+
+    def __init__(self, threshold: int, cooldown: float, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = self.clock()
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Libera la llamada de prueba sin contarla (error ajeno al backend): la siguiente vuelve a probar."""
+        with self._lock:
+            self._probing = False
+
+
+class AITransport:
+    """Cliente HTTP de un backend de IA (ver docstring del módulo)."""
+
+    def __init__(self, name: str, base_url: str, max_concurrency: int = 1, timeout: float = 120,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 queue_timeout: Optional[float] = 30, breaker_threshold: int = 3, breaker_cooldown: float = 30):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: espera aleatoria entre 0 y base·2^intento (acotada)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, path: str, payload: dict, timeout: Optional[float] = None):
+        """
+        POST JSON al backend. Devuelve la `requests.Response` (el llamador interpreta el
+        código de estado). Lanza AIBackendUnavailable, AIBackendBusy o las excepciones
+        de `requests` si se agotan los reintentos.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise AIBackendBusy(f"Servidor de IA '{self.name}' ocupado: {self.max_concurrency} llamadas en curso")
+        try:
+            if not self.breaker.allow():
+                raise AIBackendUnavailable(f"Servidor de IA '{self.name}' no disponible (circuit breaker abierto)")
+            return self._post_with_retries(self.url(path), payload, timeout or self.timeout)
+        finally:
+            self._slots.release()
+
+    def stream_lines(self, path: str, payload: dict, timeout: Optional[float] = None):
+        """
+        Generador: POST JSON con respuesta en streaming y devuelve sus líneas según llegan.
+        `timeout` es la espera máxima entre fragmentos, no la duración total, así que una
+        generación larga no agota el presupuesto mientras el servidor siga produciendo.
+        El hueco de concurrencia se mantiene hasta que se consume o se cierra el generador.
+        Si el servidor responde con error se lanza `requests.HTTPError`.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise AIBackendBusy(f"Servidor de IA '{self.name}' ocupado: {self.max_concurrency} llamadas en curso")
+        try:
+            if not self.breaker.allow():
+                raise AIBackendUnavailable(f"Servidor de IA '{self.name}' no disponible (circuit breaker abierto)")
+            response = self._post_with_retries(self.url(path), payload, timeout or self.timeout, stream=True)
+            with response:
+                response.raise_for_status()
+                response.encoding = 'utf-8'  # SSE es siempre UTF-8 (requests asumiría latin-1 sin charset)
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line:
+                            yield line
+                except requests.exceptions.RequestException:
+                    self.breaker.record_failure()
+                    raise
+        finally:
+            self._slots.release()
+
+    def _post_with_retries(self, url, payload, timeout, stream=False):
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, json=payload, timeout=(CONNECT_TIMEOUT, timeout), stream=stream)
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                logger.warning(f"[{self.name}] Conexión fallida ({e}); reintento {attempt + 1}/{self.max_retries}")
+            except requests.exceptions.Timeout:
+                self.breaker.record_failure()
+                raise
+            except requests.exceptions.RequestException:
+                # SSL, redirecciones, respuesta truncada, URL inválida...: fallo del backend, sin reintento
+                self.breaker.record_failure()
+                raise
+            except Exception:
+                # Error local (p. ej. payload no serializable): no dejar la prueba del breaker colgada
+                self.breaker.release_probe()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+                logger.warning(f"[{self.name}] HTTP {response.status_code}; reintento {attempt + 1}/{self.max_retries}")
+                response.close()
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    # --- API asyncio ---
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency, thread_name_prefix=f"ai-{self.name}"
+                    )
+        return self._executor
+
+    async def arun(self, func, *args, **kwargs):
+        """
+        Ejecuta una llamada bloqueante (p. ej. un método de un servicio) en el pool del
+        backend. Las corrutinas esperan sin ocupar hilos; como mucho hay
+        `max_concurrency` hilos trabajando contra el servidor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def apost_json(self, path: str, payload: dict, timeout: Optional[float] = None):
+        return await self.arun(self.post_json, path, payload, timeout)
+
+
+# --- Registro de transportes por backend (uno por proceso) ---
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def _build_transport(name: str) -> AITransport:
+    common = {
+        'timeout': getattr(settings, 'AI_TIMEOUT', 120),
+        'max_retries': getattr(settings, 'AI_MAX_RETRIES', 2),
+        'queue_timeout': getattr(settings, 'AI_QUEUE_TIMEOUT', 30),
+        'breaker_threshold': getattr(settings, 'AI_CIRCUIT_BREAKER_THRESHOLD', 3),
+        'breaker_cooldown': getattr(settings, 'AI_CIRCUIT_BREAKER_COOLDOWN', 30),
+    }
+    if name == 'text':
+        return AITransport(
+            'text', getattr(settings, 'AI_API_BASE_URL', "http://127.0.0.1:5000"),
+            max_concurrency=getattr(settings, 'AI_MAX_CONCURRENCY', 2), **common
+        )
+    if name == 'image':
+        return AITransport(
+            'image', getattr(settings, 'SD_API_URL', "http://127.0.0.1:7861"),
+            max_concurrency=getattr(settings, 'SD_MAX_CONCURRENCY', 1), **common
+        )
+    raise ValueError(f"Backend de IA desconocido: '{name}'")
+
+
+def get_transport(name: str) -> AITransport:
+    """Transporte compartido del backend 'text' (Llama/Qwen) o 'image' (Stable Diffusion)."""
+    transport = _transports.get(name)
+    if transport is None:
+        with _transports_lock:
+            transport = _transports.get(name)
+            if transport is None:
+                transport = _transports[name] = _build_transport(name)
+    return transport
+
+
+def reset_transports() -> None:
+    """Descarta los transportes (p. ej. tras cambiar settings en tests)."""
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.session.close()
+            if transport._executor is not None:
+                transport._executor.shutdown(wait=False)
+        _transports.clear()
@@ -4,6 +4,8 @@ import re
 from django.conf import settings
 from typing import Dict, Any
 from src.FantasyWorld.AI_Generation.Domain.interfaces import LoreGenerator
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_transport import get_transport
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_cache import cache_key, get_llm_cache
 
 class Llama3Service(LoreGenerator):
     def __init__(self):
@@ -14,19 +16,36 @@ class Llama3Service(LoreGenerator):
         self.timeout = getattr(settings, 'AI_TIMEOUT', 120)
         
         self.headers = {"Content-Type": "application/json"}
+        # Sesión keep-alive compartida, límite de concurrencia, reintentos y circuit breaker
+        self.transport = get_transport('text')
 
-    def _call_api(self, prompt, max_tokens=200, temperature=0.7, stop=None):
+    def _cached_call(self, url, payload, cache):
+        """(caché, clave) si la llamada es cacheable; (None, None) si no. Ver ai_cache."""
+        llm_cache = get_llm_cache()
+        if llm_cache is None or not llm_cache.is_cacheable(payload, cache):
+            return None, None
+        return llm_cache, cache_key(url, payload)
+
+    def _call_api(self, prompt, max_tokens=200, temperature=0.7, stop=None, cache=None):
         payload = {
             "prompt": prompt, "max_tokens": max_tokens, "temperature": temperature,
             "top_p": 0.9, "seed": -1, "stream": False, "stop": stop or ["###", "\n\n"]
         }
+        llm_cache, key = self._cached_call(self.api_url_completion, payload, cache)
+        if llm_cache is not None:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                print(f"♻️ [LlamaService] Respuesta en caché ({len(cached)} chars).")
+                return cached
         try:
             print(f"📡 [LlamaService] POST {self.api_url_completion}")
-            r = requests.post(self.api_url_completion, headers=self.headers, json=payload, timeout=self.timeout)
+            r = self.transport.post_json(self.api_url_completion, payload, timeout=self.timeout)
             
             if r.status_code == 200: 
                 text = r.json()['choices'][0]['text'].strip()
                 print(f"✅ [LlamaService] 200 OK. Recibido {len(text)} chars.")
+                if llm_cache is not None:
+                    llm_cache.set(key, text)
                 # print(f"🔍 RAW: {text[:100]}...") 
                 return text
             else:
@@ -106,7 +125,8 @@ class Llama3Service(LoreGenerator):
         # We reuse the Chat Completion method (generate_structure) 
         # which is much better for Llama 3 than the legacy completion endpoint.
         print(f"📡 [LlamaService] Analizando texto ({len(description)} chars) con Chat API...")
-        return self.generate_structure(system_instruction, f"TEXTO A ANALIZAR:\n{description}")
+        # Misma descripción -> mismas propiedades: se cachea aunque la temperatura no sea baja
+        return self.generate_structure(system_instruction, f"TEXTO A ANALIZAR:\n{description}", cache=True)
     
     def generate_description(self, prompt: str) -> str:
         full_prompt = f"### Instruction:\nDescribe visualmente en español (max 3 frases) el siguiente lugar o concepto: \"{prompt}\".\nNO uses Markdown. NO incluyas imágenes ni enlaces. Solo texto plano.\n### Response:\n"
@@ -152,7 +172,7 @@ Constraints:
 
     # --- GENERACIÓN DE ESTRUCTURAS JSON ---
     # Método versátil para generar JSON estructurado (criaturas, metadata, etc.)
-    def generate_structure(self, system_prompt: str, context_prompt: str, max_tokens=600, temperature=0.6) -> Dict[str, Any]:
+    def generate_structure(self, system_prompt: str, context_prompt: str, max_tokens=600, temperature=0.6, cache=None) -> Dict[str, Any]:
         print(f" 🧬 [Llama] Generando estructura JSON...")
         payload = {
             "mode": "instruct",
@@ -163,11 +183,21 @@ Constraints:
             "max_tokens": max_tokens,
             "temperature": temperature 
         }
+        llm_cache, key = self._cached_call(self.api_url_chat, payload, cache)
+        if llm_cache is not None:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                print(" ♻️ [Llama] Estructura en caché.")
+                return self._clean_json(cached)
         try:
-            r = requests.post(self.api_url_chat, headers=self.headers, json=payload, timeout=90)
+            r = self.transport.post_json(self.api_url_chat, payload, timeout=90)
             if r.status_code == 200:
                 content = r.json()['choices'][0]['message']['content']
-                return self._clean_json(content)
+                data = self._clean_json(content)
+                # Solo se guarda lo que se pudo interpretar: un JSON roto no debe quedarse fijado
+                if llm_cache is not None and data:
+                    llm_cache.set(key, content)
+                return data
         except requests.exceptions.ConnectionError:
             print(f"❌ NO SE PUDO CONECTAR al servidor de GENERACIÓN DE TEXTO (Qwen/Llama)")
             print(f"   URL esperada: {self.api_url_chat}")
@@ -178,25 +208,38 @@ Constraints:
             print(f"⚠️ Error IA Estructura: {e}")
         return {}
 
-    def edit_text(self, system_prompt: str, user_text: str) -> str:
-        """
-        Edits text based on a system instruction using Chat API.
-        """
-        print(f" ✍️ [Llama] Editando texto ({len(user_text)} chars)...")
-        payload = {
+    def _edit_payload(self, system_prompt: str, user_text: str, max_tokens=2000, temperature=0.7, stream=False):
+        return {
             "mode": "instruct",
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_text}
             ],
-            "max_tokens": 2000, # Allow generous output for editing
-            "temperature": 0.7 
+            "max_tokens": max_tokens, # Allow generous output for editing
+            "temperature": temperature,
+            "stream": stream
         }
+
+    def edit_text(self, system_prompt: str, user_text: str, max_tokens=2000, temperature=0.7, cache=None) -> str:
+        """
+        Edits text based on a system instruction using Chat API.
+        Low-temperature calls (e.g. classifiers) are served from the LLM cache (see ai_cache).
+        """
+        print(f" ✍️ [Llama] Editando texto ({len(user_text)} chars)...")
+        payload = self._edit_payload(system_prompt, user_text, max_tokens, temperature)
+        llm_cache, key = self._cached_call(self.api_url_chat, payload, cache)
+        if llm_cache is not None:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                print(" ♻️ [Llama] Texto en caché.")
+                return cached
         try:
-            r = requests.post(self.api_url_chat, headers=self.headers, json=payload, timeout=self.timeout)
+            r = self.transport.post_json(self.api_url_chat, payload, timeout=self.timeout)
             if r.status_code == 200:
-                content = r.json()['choices'][0]['message']['content']
-                return content.strip()
+                content = r.json()['choices'][0]['message']['content'].strip()
+                if llm_cache is not None:
+                    llm_cache.set(key, content)
+                return content
             else:
                 print(f"⚠️ [Llama] Error Status {r.status_code}")
         except requests.exceptions.ConnectionError:
@@ -211,3 +254,48 @@ Constraints:
             print(f"⚠️ Error IA Edit: {e}")
         return ""
 
+    def stream_edit_text(self, system_prompt: str, user_text: str, max_tokens=2000, temperature=0.7):
+        """
+        Igual que edit_text pero en streaming ("stream": true, eventos SSE del endpoint
+        compatible con OpenAI): generador de fragmentos de texto según se producen.
+        El timeout cuenta entre fragmentos, así que las ediciones largas no lo agotan.
+        """
+        print(f" ✍️ [Llama] Editando texto en streaming ({len(user_text)} chars)...")
+        payload = self._edit_payload(system_prompt, user_text, max_tokens, temperature, stream=True)
+        try:
+            for line in self.transport.stream_lines(self.api_url_chat, payload, timeout=self.timeout):
+                if not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                try:
+                    choice = json.loads(data)['choices'][0]
+                except (ValueError, KeyError, IndexError):
+                    continue
+                delta = (choice.get('delta') or {}).get('content') or choice.get('text') or ''
+                if delta:
+                    yield delta
+        except requests.exceptions.ConnectionError:
+            print("❌ NO SE PUDO CONECTAR al servidor de GENERACIÓN DE TEXTO (Qwen/Llama)")
+            print(f"   URL esperada: {self.api_url_chat}")
+            raise Exception("❌ No se pudo conectar al servidor de texto (Qwen/Llama). Verifica que esté corriendo en puerto 5000.")
+        except requests.exceptions.Timeout:
+            print(f"⏳ [Llama] Streaming sin datos durante {self.timeout}s.")
+            raise Exception(f"⏳ La IA dejó de responder (más de {self.timeout}s sin recibir texto).")
+        except requests.exceptions.HTTPError as e:
+            print(f"⚠️ [Llama] Error Status {e.response.status_code if e.response is not None else '?'}")
+            raise Exception("⚠️ El servidor de texto devolvió un error.")
+
+    # --- API ASYNCIO ---
+    # Permite lanzar varias generaciones en paralelo (asyncio.gather) desde vistas
+    # o workers: las corrutinas esperan en el pool del transporte, acotado por
+    # AI_MAX_CONCURRENCY, en lugar de ocupar un hilo cada una.
+    async def agenerate_raw(self, system, user, max_tokens=600, temperature=0.7):
+        return await self.transport.arun(self.generate_raw, system, user, max_tokens, temperature)
+
+    async def agenerate_structure(self, system_prompt: str, context_prompt: str, max_tokens=600, temperature=0.6, cache=None) -> Dict[str, Any]:
+        return await self.transport.arun(self.generate_structure, system_prompt, context_prompt, max_tokens, temperature, cache)
+
+    async def aedit_text(self, system_prompt: str, user_text: str) -> str:
+        return await self.transport.arun(self.edit_text, system_prompt, user_text)
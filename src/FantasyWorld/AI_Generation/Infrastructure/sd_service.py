@@ -6,12 +6,15 @@ from PIL import Image
 from django.conf import settings
 import os
 from src.FantasyWorld.AI_Generation.Domain.interfaces import ImageGenerator
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_transport import get_transport
 
 class StableDiffusionService(ImageGenerator):
     def __init__(self):
         # ✅ PUERTO 7861 (Stable Diffusion con --api)
         self.api_url = getattr(settings, 'SD_API_URL', "http://127.0.0.1:7861")
         self.headers = {"Content-Type": "application/json"}
+        # Sesión keep-alive compartida; SD_MAX_CONCURRENCY serializa la GPU (1 por defecto)
+        self.transport = get_transport('image')
 
     def generate_concept_art(self, prompt: str, category: str = "defecto") -> str:
         # Limpiamos el prompt por si acaso
@@ -32,7 +35,7 @@ class StableDiffusionService(ImageGenerator):
 
         try:
             start_time = time.time()
-            response = requests.post(f"{self.api_url}/sdapi/v1/txt2img", json=payload, timeout=120)
+            response = self.transport.post_json(f"{self.api_url}/sdapi/v1/txt2img", payload, timeout=120)
             elapsed = time.time() - start_time
             
             if response.status_code == 200:
@@ -55,6 +58,10 @@ class StableDiffusionService(ImageGenerator):
             print(f"⚠️ Error inesperado en SD: {e}")
             return None
             
+    async def agenerate_concept_art(self, prompt: str, category: str = "defecto") -> str:
+        """Versión asyncio: espera turno en el pool del transporte sin bloquear el event loop."""
+        return await self.transport.arun(self.generate_concept_art, prompt, category)
+
     # Alias para compatibilidad
     def generate_image(self, prompt, filename):
         return self.generate_concept_art(prompt)
\ No newline at end of file
@@ -20,6 +20,16 @@ class PerformanceLoggingMiddleware:
             
         return response
 
+class IdentityMapMiddleware:
+    """Abre un mapa de identidad por petición (persistence/identity_map.py)."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from src.Infrastructure.DjangoFramework.persistence.identity_map import identity_map_scope
+        with identity_map_scope():
+            return self.get_response(request)
+
 audit_logger = logging.getLogger('audit')
 
 class AuditLogMiddleware:
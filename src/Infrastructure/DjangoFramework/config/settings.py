@@ -53,6 +53,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'src.Infrastructure.DjangoFramework.config.middleware.IdentityMapMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -107,6 +108,27 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND: 'locmem' (por defecto, por proceso), 'file' (compartida entre workers)
+# o 'redis' (requiere redis-py y un servidor compatible en CACHE_LOCATION).
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'fantasyworld'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[env('CACHE_BACKEND', default='locmem')]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': env('CACHE_LOCATION', default=_cache_location),
+        'TIMEOUT': env.int('CACHE_TIMEOUT', default=300),
+        'KEY_PREFIX': 'fw',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -148,6 +170,9 @@ STATICFILES_DIRS = [
 ]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Procesamiento de imágenes fuera de la petición (image_jobs.py, manage.py run_image_worker)
+IMAGE_SPOOL_DIR = MEDIA_ROOT / 'image_spool' # Subidas recibidas pendientes de procesar
+IMAGE_WORKER_PROCESSES = int(os.getenv('IMAGE_WORKER_PROCESSES', 0)) # Procesos del pool (0 = uno por núcleo)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -218,6 +243,19 @@ import os
 AI_API_BASE_URL = os.getenv('AI_API_URL', 'http://127.0.0.1:5000') # Base de Text-Gen-WebUI
 SD_API_URL = os.getenv('SD_API_URL', 'http://127.0.0.1:7860') # Base de Stable Diffusion (Puerto por defecto)
 AI_TIMEOUT = 120 # Segundos ("Pollo a 120s")
+# Transporte compartido (ai_transport.py): llamadas simultáneas por backend, reintentos y circuit breaker
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 2)) # Text-Gen-WebUI
+SD_MAX_CONCURRENCY = int(os.getenv('SD_MAX_CONCURRENCY', 1)) # Stable Diffusion (una GPU: serializado)
+AI_QUEUE_TIMEOUT = 30 # Segundos esperando hueco antes de responder "ocupado"
+AI_MAX_RETRIES = 2 # Solo errores transitorios (conexión, 429/502/503/504)
+AI_CIRCUIT_BREAKER_THRESHOLD = 3 # Fallos seguidos para dar el backend por caído
+AI_CIRCUIT_BREAKER_COOLDOWN = 30 # Segundos fallando al instante antes de volver a probar
+# Caché de respuestas deterministas del modelo de texto (ai_cache.py): memoria LRU + disco
+AI_CACHE_ENABLED = os.getenv('AI_CACHE_ENABLED', 'True') == 'True'
+AI_CACHE_MAX_ENTRIES = 256 # Entradas en memoria por proceso
+AI_CACHE_TTL = 7 * 24 * 3600 # Segundos
+AI_CACHE_MAX_TEMPERATURE = 0.3 # Por encima solo se cachean las llamadas marcadas con cache=True
+AI_CACHE_DIR = BASE_DIR / '.ai_cache'
 
 def custom_show_toolbar(request):
     # Solo mostrar si el usuario está autenticado y es Superusuario
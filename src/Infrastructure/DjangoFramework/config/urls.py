@@ -16,7 +16,7 @@ from src.Infrastructure.DjangoFramework.persistence.views.social_views import (
 from src.Infrastructure.DjangoFramework.persistence.views.social.social_hub import (
     social_hub_view, archive_comment, delete_comment as hub_delete_comment
 )
-from src.Infrastructure.DjangoFramework.persistence.views.ai_views import analyze_metadata_api, edit_narrative_api, api_generate_title, api_generate_lore
+from src.Infrastructure.DjangoFramework.persistence.views.ai_views import analyze_metadata_api, edit_narrative_api, edit_narrative_stream_api, api_generate_title, api_generate_lore, api_ai_job_status
 
 from src.Infrastructure.DjangoFramework.persistence.views.dashboard.assets.image_workflow import (
     aprobar_imagen, rechazar_imagen, archivar_imagen, restaurar_imagen, borrar_imagen_definitivo, 
@@ -54,7 +54,7 @@ from src.Infrastructure.DjangoFramework.persistence.views.messaging_views import
     inbox, send_message, mark_as_read, unread_count
 )
 
-from src.Infrastructure.DjangoFramework.persistence.views.search_views import global_search
+from src.Infrastructure.DjangoFramework.persistence.views.search_views import global_search, entity_picker
 from src.Infrastructure.DjangoFramework.persistence.views import period_api
 from src.Infrastructure.DjangoFramework.persistence.views.metadata_views import propose_metadata_update
 from src.Infrastructure.DjangoFramework.persistence.views.api_notifications import mark_notification_read, mark_all_notifications_read
@@ -108,6 +108,7 @@ urlpatterns = [
     # BÚSQUEDA
     # ==========================================
     path('buscar/', global_search, name='global_search'),
+    path('api/entidades/buscar/', entity_picker, name='entity_picker'),
 
     # ==========================================
     # MENSAJERÍA
@@ -267,7 +268,9 @@ urlpatterns = [
     path('api/save_foto/<str:jid>/', api_save_foto, name='api_save_foto'),
     path('api/update_meta/<str:jid>/', api_update_image_metadata, name='api_update_image_metadata'),
     path('api/ai/analyze-metadata/', analyze_metadata_api, name='analyze_metadata_api'),
+    path('api/ai/jobs/<uuid:job_id>/', api_ai_job_status, name='ai_job_status'),
     path('api/ai/edit-narrative/', edit_narrative_api, name='edit_narrative_api'),
+    path('api/ai/edit-narrative/stream/', edit_narrative_stream_api, name='edit_narrative_stream_api'),
     path('api/ai/generate-title/', api_generate_title, name='api_generate_title'),
     path('api/narrative/import-file/', import_narrative_file, name='import_narrative_file'),
     
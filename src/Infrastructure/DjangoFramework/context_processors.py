@@ -16,17 +16,13 @@ def admin_bar_context(request):
     
     if is_global_admin:
         from django.contrib.auth.models import User
-        from src.Infrastructure.DjangoFramework.persistence.models import CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM
+        from src.Infrastructure.DjangoFramework.persistence.proposal_counts import annotate_pending_counts
         
         # Get all active users
         authors = list(User.objects.filter(is_active=True).exclude(username__in=['Xico', 'Alone', 'System']).order_by('username'))
         
-        # Add counts
-        for author in authors:
-            w_p = CaosVersionORM.objects.filter(author_id=author.id, status='PENDING').count()
-            n_p = CaosNarrativeVersionORM.objects.filter(author_id=author.id, status='PENDING').count()
-            i_p = CaosImageProposalORM.objects.filter(author_id=author.id, status='PENDING').count()
-            author.pending_count = w_p + n_p + i_p
+        # Add counts (una agregación agrupada y cacheada para todos los autores)
+        annotate_pending_counts(authors)
         
         context['global_buzones'] = authors
 
@@ -75,9 +71,8 @@ def admin_bar_context(request):
         
     # --- MESSAGING NOTIFICATIONS ---
     try:
-        from src.Infrastructure.DjangoFramework.persistence.models import Message
-        unread_count = Message.objects.filter(recipient=request.user, read_at__isnull=True).count()
-        context['unread_messages_count'] = unread_count
+        from src.Infrastructure.DjangoFramework.persistence.badges import get_badge_summary
+        context['unread_messages_count'] = get_badge_summary(request.user)['unread_messages']
     except Exception:
         context['unread_messages_count'] = 0
             
@@ -86,45 +81,29 @@ def admin_bar_context(request):
 def notifications_context(request):
     """
     Inyecta notificaciones no leídas en el contexto global.
+    Los contadores salen del resumen de badges cacheado por usuario (una consulta en frío).
     """
     if not request.user.is_authenticated:
         return {}
     
     from src.Infrastructure.DjangoFramework.persistence.models import CaosNotification
+    from src.Infrastructure.DjangoFramework.persistence.badges import get_badge_summary
     
-    # Solo las 5 más recientes no leídas
-    unread = CaosNotification.objects.filter(user=request.user, read_at__isnull=True).order_by('-created_at')
+    badges = get_badge_summary(request.user)
+    
+    # Solo las 5 más recientes no leídas (y solo se consultan si las hay)
+    unread = []
+    if badges['unread_notifications']:
+        unread = CaosNotification.objects.filter(user=request.user, read_at__isnull=True).order_by('-created_at')[:5]
     
     return {
-        'unread_notifications': unread[:5],
-        'unread_notifications': unread[:5],
-        'unread_notifications_count': unread.count(),
+        'unread_notifications': unread,
+        'unread_notifications_count': badges['unread_notifications'],
         # Add Pending Proposals Count for Persistent Badge
-        'pending_proposals_count': get_pending_proposals_count(request.user)
+        'pending_proposals_count': badges['pending_proposals']
     }
 
 def get_pending_proposals_count(user):
     """Calculates total pending items for the user's dashboard."""
-    from django.db.models import Q
-    from src.Infrastructure.DjangoFramework.persistence.models import CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM, TimelinePeriodVersion
-    
-    if not user.is_authenticated: return 0
-    
-    # Logic similar to Workflow.py
-    # 1. World Versions
-    w_filter = Q(status='PENDING') & (Q(world__author=user) | Q(author=user))
-    w_count = CaosVersionORM.objects.filter(w_filter).count()
-    
-    # 2. Narrative Versions
-    n_filter = Q(status='PENDING') & (Q(narrative__world__author=user) | Q(author=user))
-    n_count = CaosNarrativeVersionORM.objects.filter(n_filter).count()
-    
-    # 3. Image Proposals
-    i_filter = Q(status='PENDING') & (Q(world__author=user) | Q(author=user))
-    i_count = CaosImageProposalORM.objects.filter(i_filter).count()
-    
-    # 4. Period Versions
-    p_filter = Q(status='PENDING') & (Q(period__world__author=user) | Q(author=user))
-    p_count = TimelinePeriodVersion.objects.filter(p_filter).count()
-    
-    return w_count + n_count + i_count + p_count
+    from src.Infrastructure.DjangoFramework.persistence.badges import get_badge_summary
+    return get_badge_summary(user)['pending_proposals']
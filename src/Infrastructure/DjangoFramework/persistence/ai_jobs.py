@@ -0,0 +1,208 @@
+"""
+Cola de trabajos de IA en base de datos (CaosAIJobORM), sin broker externo.
+
+Las vistas de IA ejecutaban la generación dentro de la petición HTTP: traducción del
+prompt con Llama + hasta 120 s de Stable Diffusion ocupando un worker WSGI cada una.
+Ahora la vista encola un trabajo y responde al instante con su ID; el worker
+(`python manage.py run_ai_worker --backend image|text`) lo reclama, lo ejecuta y
+guarda el resultado, y el cliente consulta `/api/ai/jobs/<id>/` hasta que termina.
+
+Un worker por backend serializa el uso de cada servidor de IA (la GPU de Stable
+Diffusion no atiende bien peticiones simultáneas). La reclamación es un UPDATE
+condicional sobre el estado, así que varios workers pueden convivir sin duplicar
+trabajos. Los trabajos de un worker caído se reencolan con `requeue_stale_jobs`.
+"""
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('text', 'image')
+MAX_ATTEMPTS = 3
+CLAIM_BATCH = 5
+
+JOB_HANDLERS = {}
+
+
+class JobError(Exception):
+    """Fallo esperado de un trabajo; su mensaje se muestra al usuario."""
+
+
+def job_handler(kind: str, backend: str):
+    """Registra la función que ejecuta un tipo de trabajo: handler(params, report) -> dict."""
+    def register(func):
+        JOB_HANDLERS[kind] = (backend, func)
+        return func
+    return register
+
+
+def _job_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosAIJobORM
+    return CaosAIJobORM
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# --- Encolado y consulta ---
+
+def enqueue_job(kind: str, params: dict, user=None):
+    """Crea un trabajo pendiente. Lanza ValueError si el tipo no está registrado."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Tipo de trabajo de IA desconocido: '{kind}'")
+    backend, _ = JOB_HANDLERS[kind]
+    owner = user if user is not None and user.is_authenticated else None
+    return _job_model().objects.create(kind=kind, backend=backend, params=params, user=owner)
+
+
+def job_payload(job) -> dict:
+    """Representación JSON del estado de un trabajo para el endpoint de consulta."""
+    payload = {
+        'success': job.status != 'FAILED',
+        'job_id': str(job.id),
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.progress_message,
+    }
+    if job.status == 'PENDING':
+        payload['queue_position'] = _job_model().objects.filter(
+            backend=job.backend, status='PENDING', created_at__lt=job.created_at
+        ).count() + 1
+    elif job.status == 'DONE':
+        payload['result'] = job.result
+    elif job.status == 'FAILED':
+        payload['error'] = job.error
+    return payload
+
+
+def user_can_see_job(user, job) -> bool:
+    """Los trabajos con dueño solo los consulta su dueño (o un superusuario); el UUID hace de token en los anónimos."""
+    if job.user_id is None:
+        return True
+    return user.is_authenticated and (user.is_superuser or user.pk == job.user_id)
+
+
+# --- Ejecución (worker) ---
+
+def claim_next_job(backends=BACKENDS, worker: str = ''):
+    """
+    Reclama el trabajo pendiente más antiguo de los backends indicados.
+    El UPDATE condicional (status='PENDING') garantiza que solo un worker lo obtiene.
+    """
+    Job = _job_model()
+    candidates = Job.objects.filter(status='PENDING', backend__in=backends).order_by('created_at')
+    for job_id in candidates.values_list('id', flat=True)[:CLAIM_BATCH]:
+        claimed = Job.objects.filter(id=job_id, status='PENDING').update(
+            status='RUNNING', worker=worker or worker_name(), started_at=timezone.now(),
+            attempts=F('attempts') + 1, progress=0, progress_message='',
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def report_progress(job, progress: int, message: str = '') -> None:
+    _job_model().objects.filter(id=job.id).update(progress=max(0, min(100, progress)), progress_message=message[:255])
+
+
+def run_job(job) -> None:
+    """Ejecuta un trabajo ya reclamado y guarda su resultado o su error."""
+    Job = _job_model()
+    _, handler = JOB_HANDLERS.get(job.kind, (None, None))
+    try:
+        if handler is None:
+            raise JobError(f"Tipo de trabajo desconocido: '{job.kind}'")
+        result = handler(job.params, lambda progress, message='': report_progress(job, progress, message))
+        Job.objects.filter(id=job.id).update(
+            status='DONE', result=result, progress=100, progress_message='', finished_at=timezone.now()
+        )
+    except JobError as e:
+        Job.objects.filter(id=job.id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+    except Exception as e:
+        logger.error(f"❌ Trabajo de IA {job.kind} ({job.id}) falló: {e}", exc_info=True)
+        Job.objects.filter(id=job.id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+
+
+def run_next_job(backends=BACKENDS, worker: str = ''):
+    """Reclama y ejecuta un trabajo. Retorna el trabajo procesado o None si la cola está vacía."""
+    job = claim_next_job(backends, worker)
+    if job is not None:
+        run_job(job)
+        job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs(stale_after: int, backends=BACKENDS) -> int:
+    """
+    Devuelve a la cola los trabajos en curso desde hace más de `stale_after` segundos
+    (worker caído). Los que agotaron MAX_ATTEMPTS se marcan como fallidos.
+    """
+    Job = _job_model()
+    stale = Job.objects.filter(
+        status='RUNNING', backend__in=backends, started_at__lt=timezone.now() - timedelta(seconds=stale_after)
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='FAILED', error='El trabajo se interrumpió demasiadas veces.', finished_at=timezone.now()
+    )
+    return stale.filter(attempts__lt=MAX_ATTEMPTS).update(status='PENDING', worker='', started_at=None)
+
+
+def purge_finished_jobs(days: int) -> int:
+    """Borra los trabajos terminados hace más de `days` días (sus resultados pueden ser imágenes grandes)."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = _job_model().objects.filter(status__in=('DONE', 'FAILED'), finished_at__lt=cutoff).delete()
+    return deleted
+
+
+# --- Trabajos registrados ---
+
+@job_handler('preview_image', backend='image')
+def _preview_image(params, report):
+    from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+    from src.WorldManagement.Caos.Application.generate_map import GenerateWorldMapUseCase
+    from src.FantasyWorld.AI_Generation.Infrastructure.sd_service import StableDiffusionService
+
+    report(10, 'Preparando el prompt e invocando Stable Diffusion...')
+    b64 = GenerateWorldMapUseCase(DjangoCaosRepository(), StableDiffusionService()).generate_preview(params['world_id'])
+    if b64 is None:
+        raise JobError(
+            'Error al generar la imagen. Verifica que los servidores de IA estén corriendo correctamente '
+            '(Qwen en puerto 5000 y Stable Diffusion en puerto 7861).'
+        )
+    return {'image': b64}
+
+
+@job_handler('world_metadata', backend='text')
+def _world_metadata(params, report):
+    from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+    from src.WorldManagement.Caos.Application.generate_contextual_metadata import GenerateContextualMetadataUseCase
+    from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
+
+    report(10, 'Analizando el lore...')
+    metadata = GenerateContextualMetadataUseCase(DjangoCaosRepository(), Llama3Service()).execute(
+        params['world_id'], external_context=params.get('context')
+    )
+    if metadata is None:
+        raise JobError('AI returned empty data. Check server console for "LlamaService" logs.')
+    return {'metadata': metadata}
+
+
+@job_handler('world_lore', backend='text')
+def _world_lore(params, report):
+    from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+    from src.WorldManagement.Caos.Application.generate_lore import GenerateWorldLoreUseCase
+    from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
+
+    report(10, 'Generando lore...')
+    lore = GenerateWorldLoreUseCase(DjangoCaosRepository(), Llama3Service()).execute(
+        params['world_id'], current_context=params.get('current_description', ''), preview_mode=True
+    )
+    if not lore:
+        raise JobError('La IA no pudo generar el lore.')
+    return {'lore': lore}
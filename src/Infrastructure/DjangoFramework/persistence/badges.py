@@ -0,0 +1,76 @@
+"""
+Resumen de badges por usuario: propuestas pendientes, notificaciones y mensajes sin leer.
+
+Una única consulta con subconsultas escalares sustituye los COUNT que los context
+processors lanzaban en cada render HTML. El resultado se cachea por usuario:
+- Los cambios de propuestas invalidan por generación (PROPOSALS_NAMESPACE).
+- Las notificaciones y mensajes borran la entrada de su destinatario (ver signals.py).
+"""
+from django.db.models import IntegerField, Q, Subquery
+
+from src.Infrastructure.DjangoFramework.persistence.caching import GenerationalCache, PROPOSALS_NAMESPACE
+
+BADGES_TIMEOUT = 60
+
+_badges_cache = GenerationalCache(PROPOSALS_NAMESPACE, timeout=BADGES_TIMEOUT)
+
+EMPTY_BADGES = {'pending_proposals': 0, 'unread_notifications': 0, 'unread_messages': 0}
+
+
+class SubqueryCount(Subquery):
+    """COUNT(*) escalar de un queryset, embebible en otra consulta."""
+    template = "(SELECT COUNT(*) FROM (%(subquery)s) _count)"
+    output_field = IntegerField()
+
+
+def _badges_key(user_id):
+    return f"badges:{user_id}"
+
+
+def _compute_badges(user):
+    from django.contrib.auth.models import User
+    from src.Infrastructure.DjangoFramework.persistence.models import (
+        CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM, TimelinePeriodVersion,
+        CaosNotification, Message
+    )
+
+    # Propuestas que el usuario debe revisar (sus mundos) o que ha enviado (lógica de Workflow.py)
+    pending = {
+        'w': CaosVersionORM.objects.filter(Q(status='PENDING') & (Q(world__author=user) | Q(author=user))),
+        'n': CaosNarrativeVersionORM.objects.filter(Q(status='PENDING') & (Q(narrative__world__author=user) | Q(author=user))),
+        'i': CaosImageProposalORM.objects.filter(Q(status='PENDING') & (Q(world__author=user) | Q(author=user))),
+        'p': TimelinePeriodVersion.objects.filter(Q(status='PENDING') & (Q(period__world__author=user) | Q(author=user))),
+    }
+    row = User.objects.filter(pk=user.pk).annotate(
+        **{f'pending_{k}': SubqueryCount(qs.values('pk')) for k, qs in pending.items()},
+        unread_notifications=SubqueryCount(CaosNotification.objects.filter(user=user, read_at__isnull=True).values('pk')),
+        unread_messages=SubqueryCount(Message.objects.filter(recipient=user, read_at__isnull=True).values('pk')),
+    ).values(*[f'pending_{k}' for k in pending], 'unread_notifications', 'unread_messages').first()
+
+    if not row:
+        return dict(EMPTY_BADGES)
+    return {
+        'pending_proposals': sum(row[f'pending_{k}'] for k in pending),
+        'unread_notifications': row['unread_notifications'],
+        'unread_messages': row['unread_messages'],
+    }
+
+
+def get_badge_summary(user):
+    """
+    Retorna {'pending_proposals', 'unread_notifications', 'unread_messages'} del usuario.
+    """
+    if not user.is_authenticated:
+        return dict(EMPTY_BADGES)
+
+    badges = _badges_cache.get(_badges_key(user.pk))
+    if badges is None:
+        badges = _compute_badges(user)
+        _badges_cache.set(_badges_key(user.pk), badges)
+    return badges
+
+
+def invalidate_user_badges(user_id):
+    """Invalida el resumen cacheado de un usuario (notificaciones o mensajes nuevos/leídos)."""
+    if user_id:
+        _badges_cache.delete(_badges_key(user_id))
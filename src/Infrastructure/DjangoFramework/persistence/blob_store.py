@@ -0,0 +1,312 @@
+"""
+Almacén de imágenes direccionado por contenido (CaosImageBlobORM + CaosImageRefORM).
+
+Cada contenido se guarda una sola vez en 'img/.blobs/<aa>/<bb>/<sha256>.<ext>'. Las
+galerías no guardan copias: el nombre visible ('img/<carpeta>/<nombre>') es un enlace
+duro al blob (o una copia si el sistema de archivos no admite enlaces), así que las
+URLs estáticas de siempre siguen funcionando y la misma imagen subida a varias
+entidades, o propuesta de nuevo, no ocupa más disco.
+
+La tabla de referencias relaciona (entidad, nombre) con su blob y su estado:
+- Elegir un nombre libre es una consulta al índice, no un bucle de os.path.exists.
+- Papelera y restauración cambian el estado de la referencia y quitan o vuelven a
+  enlazar el nombre; el contenido no se mueve.
+- Cada referencia (viva o en papelera) cuenta en `ref_count`; al purgar la última, el
+  blob se borra.
+
+Las imágenes anteriores al almacén se adoptan al tocarlas (papelera) o en bloque con
+`python manage.py build_image_blobs`.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from src.Infrastructure.DjangoFramework.persistence import gallery_index
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = '.blobs'  # Con punto: fuera de los recorridos de galerías y de collectstatic
+STAGING_DIR = 'staging'
+NAME_ATTEMPTS = 5
+
+
+def _models():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosImageBlobORM, CaosImageRefORM
+    return CaosImageBlobORM, CaosImageRefORM
+
+
+def blob_root() -> Path:
+    return gallery_index.get_img_root() / BLOB_DIR
+
+
+def blob_path(digest: str, extension: str) -> Path:
+    return blob_root() / digest[:2] / digest[2:4] / f"{digest}.{extension}"
+
+
+def staging_path(extension: str = 'webp') -> Path:
+    """Ruta temporal (mismo sistema de archivos que los blobs) donde escribir una imagen antes de ingerirla."""
+    directory = blob_root() / STAGING_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{uuid.uuid4().hex}.{extension}"
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(source: Path, target: Path) -> None:
+    """Hace que `target` apunte al contenido de `source` (enlace duro, o copia), sustituyéndolo de forma atómica."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.part")
+    try:
+        os.link(source, partial)
+    except OSError:
+        shutil.copyfile(source, partial)
+    os.replace(partial, target)
+
+
+def _named_path(folder: str, filename: str) -> Path:
+    return gallery_index.get_img_root() / folder / filename
+
+
+def _extension(filename: str) -> str:
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'bin'
+
+
+# --- Blobs y contadores ---
+
+def _acquire_blob(source: Path, extension: str):
+    """Blob del contenido de `source` con una referencia más (lo crea si es nuevo). Debe ir en una transacción."""
+    Blob, _ = _models()
+    digest = file_digest(source)
+    blob, _ = Blob.objects.select_for_update().get_or_create(
+        digest=digest, defaults={'extension': extension, 'size': source.stat().st_size}
+    )
+    path = blob_path(blob.digest, blob.extension)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _link(source, path)
+    Blob.objects.filter(digest=digest).update(ref_count=F('ref_count') + 1)
+    return blob
+
+
+def _release_blob(digest: str) -> None:
+    """Quita una referencia a un blob y lo borra (fila y archivo) si era la última. Debe ir en una transacción."""
+    Blob, _ = _models()
+    Blob.objects.filter(digest=digest, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    blob = Blob.objects.select_for_update().filter(digest=digest, ref_count=0).first()
+    if blob is not None:
+        path = blob_path(blob.digest, blob.extension)
+        blob.delete()
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
+
+
+# --- Altas ---
+
+def free_name(jid: str, stem: str, extension: str = 'webp') -> str:
+    """Primer nombre libre '<stem>.<ext>', '<stem>_1.<ext>'... según el índice (una consulta)."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+    _, Ref = _models()
+
+    jid = str(jid)
+    taken = set(CaosGalleryImageORM.objects.filter(jid=jid, filename__startswith=stem).values_list('filename', flat=True))
+    taken.update(Ref.objects.filter(jid=jid, state='LIVE', filename__startswith=stem).values_list('filename', flat=True))
+    filename, counter = f"{stem}.{extension}", 1
+    while filename in taken:
+        filename = f"{stem}_{counter}.{extension}"
+        counter += 1
+    return filename
+
+
+def ingest(jid: str, folder: str, filename: str, source: Path):
+    """
+    Guarda `source` en el almacén y enlaza el nombre visible '<carpeta>/<nombre>' a su blob.
+    Si el nombre ya tenía una referencia viva, pasa a apuntar al nuevo contenido.
+    `source` se consume (salvo que sea el propio nombre visible: adopción de un archivo existente).
+    Retorna la referencia. El llamador registra el nombre en el índice de galerías.
+    """
+    _, Ref = _models()
+    jid, source = str(jid), Path(source)
+    target = _named_path(folder, filename)
+    with transaction.atomic():
+        blob = _acquire_blob(source, _extension(filename))
+        ref = Ref.objects.select_for_update().filter(jid=jid, filename=filename, state='LIVE').first()
+        if ref is None:
+            ref = Ref.objects.create(jid=jid, folder=folder, filename=filename, blob=blob)
+        elif ref.blob_id != blob.digest:
+            previous = ref.blob_id
+            ref.blob, ref.folder = blob, folder
+            ref.save(update_fields=['blob', 'folder'])
+            _release_blob(previous)
+        else:
+            _release_blob(blob.digest)  # Mismo nombre y mismo contenido: no es una referencia nueva
+        _link(blob_path(blob.digest, blob.extension), target)
+    if source.resolve() != target.resolve():
+        source.unlink(missing_ok=True)
+    return ref
+
+
+def add_image(jid: str, folder: str, stem: str, source: Path, extension: str = 'webp') -> str:
+    """
+    Ingiere `source` con el primer nombre libre a partir de `stem`. La restricción única
+    de referencias vivas resuelve las carreras entre subidas simultáneas. Retorna el nombre.
+    """
+    for _ in range(NAME_ATTEMPTS):
+        filename = free_name(jid, stem, extension)
+        try:
+            ingest_new(jid, folder, filename, source)
+            return filename
+        except IntegrityError:
+            continue
+    raise IntegrityError(f"No se encontró un nombre libre para '{stem}' en {jid}")
+
+
+def ingest_new(jid: str, folder: str, filename: str, source: Path):
+    """Como ingest(), pero falla (IntegrityError) si el nombre ya tiene una referencia viva."""
+    _, Ref = _models()
+    jid, source = str(jid), Path(source)
+    with transaction.atomic():
+        blob = _acquire_blob(source, _extension(filename))
+        ref = Ref.objects.create(jid=jid, folder=folder, filename=filename, blob=blob)
+        _link(blob_path(blob.digest, blob.extension), _named_path(folder, filename))
+    source.unlink(missing_ok=True)
+    return ref
+
+
+# --- Papelera ---
+
+def _live_ref(jid: str, filename: str):
+    """Referencia viva de un nombre; adopta el archivo si es anterior al almacén."""
+    _, Ref = _models()
+    ref = Ref.objects.filter(jid=jid, filename=filename, state='LIVE').first()
+    if ref is None:
+        folder = gallery_index.gallery_folder(jid)
+        if _named_path(folder, filename).is_file():
+            ref = ingest(jid, folder, filename, _named_path(folder, filename))
+    return ref
+
+
+def trash(jid: str, filename: str) -> bool:
+    """Manda una imagen a la papelera: la referencia cambia de estado y el nombre deja de servirse."""
+    jid = str(jid)
+    ref = _live_ref(jid, filename)
+    if ref is None:
+        return False
+    ref.state, ref.trashed_at = 'TRASHED', timezone.now()
+    ref.save(update_fields=['state', 'trashed_at'])
+    _named_path(ref.folder, filename).unlink(missing_ok=True)
+    gallery_index.unregister_image(jid, filename)
+    return True
+
+
+def restore(jid: str, filename: str) -> bool:
+    """Devuelve a la galería la última versión en papelera de un nombre (sustituye a la viva si la hay)."""
+    _, Ref = _models()
+    jid = str(jid)
+    with transaction.atomic():
+        ref = Ref.objects.select_for_update().filter(jid=jid, filename=filename, state='TRASHED') \
+            .order_by('-trashed_at', '-id').first()
+        if ref is None:
+            return _restore_legacy(jid, filename)
+        current = Ref.objects.select_for_update().filter(jid=jid, filename=filename, state='LIVE').first()
+        if current is not None:
+            current.delete()
+            _release_blob(current.blob_id)
+        ref.state, ref.trashed_at = 'LIVE', None
+        ref.save(update_fields=['state', 'trashed_at'])
+        blob = ref.blob
+        _link(blob_path(blob.digest, blob.extension), _named_path(ref.folder, filename))
+    gallery_index.register_image(jid, filename, folder=ref.folder)
+    return True
+
+
+def _restore_legacy(jid: str, filename: str) -> bool:
+    """Restaura una imagen borrada antes del almacén (movida a '<carpeta>/.trash/')."""
+    folder = gallery_index.gallery_folder(jid)
+    legacy = gallery_index.get_img_root() / folder / '.trash' / filename
+    if not legacy.is_file():
+        return False
+    ingest(jid, folder, filename, legacy)
+    gallery_index.register_image(jid, filename, folder=folder)
+    return True
+
+
+def purge(jid: str, filename: str) -> int:
+    """
+    Borra definitivamente las versiones en papelera de un nombre; los blobs que se quedan
+    sin referencias se eliminan del disco. Retorna las referencias borradas.
+    """
+    _, Ref = _models()
+    jid = str(jid)
+    with transaction.atomic():
+        refs = list(Ref.objects.select_for_update().filter(jid=jid, filename=filename, state='TRASHED'))
+        for ref in refs:
+            ref.delete()
+            _release_blob(ref.blob_id)
+    # Papelera anterior al almacén
+    folder = gallery_index.gallery_folder(jid)
+    (gallery_index.get_img_root() / folder / '.trash' / filename).unlink(missing_ok=True)
+    return len(refs)
+
+
+# --- Adopción de galerías existentes ---
+
+def adopt_galleries(jid: Optional[str] = None) -> dict:
+    """
+    Mete en el almacén las imágenes indexadas que aún no tienen referencia y las de las
+    papeleras legacy ('.trash/'). Retorna {'adopted', 'trashed', 'saved_bytes'}.
+    """
+    from django.db.models import Sum
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+    Blob, Ref = _models()
+
+    def stored_bytes():
+        return Blob.objects.aggregate(total=Sum('size'))['total'] or 0
+
+    stats = {'adopted': 0, 'trashed': 0, 'saved_bytes': 0}
+    stored_before, adopted_bytes = stored_bytes(), 0
+    rows = CaosGalleryImageORM.objects.all()
+    if jid:
+        rows = rows.filter(jid=str(jid))
+    known = set(Ref.objects.filter(state='LIVE').values_list('jid', 'filename'))
+    folders = {}
+    for row in rows.iterator():
+        folders.setdefault(row.jid, row.folder)
+        if (row.jid, row.filename) in known:
+            continue
+        path = _named_path(row.folder, row.filename)
+        if not path.is_file():
+            continue
+        adopted_bytes += path.stat().st_size
+        ingest(row.jid, row.folder, row.filename, path)
+        stats['adopted'] += 1
+
+    for g_jid, folder in folders.items():
+        trash_dir = gallery_index.get_img_root() / folder / '.trash'
+        if not trash_dir.is_dir():
+            continue
+        for path in sorted(trash_dir.iterdir()):
+            if not path.is_file() or not path.name.lower().endswith(gallery_index.IMAGE_EXTENSIONS):
+                continue
+            with transaction.atomic():
+                blob = _acquire_blob(path, _extension(path.name))
+                Ref.objects.create(jid=g_jid, folder=folder, filename=path.name, blob=blob,
+                                   state='TRASHED', trashed_at=timezone.now())
+            adopted_bytes += path.stat().st_size
+            path.unlink()
+            stats['trashed'] += 1
+    # Lo adoptado que ya estaba en el almacén (duplicados) deja de ocupar disco
+    stats['saved_bytes'] = adopted_bytes - (stored_bytes() - stored_before)
+    return stats
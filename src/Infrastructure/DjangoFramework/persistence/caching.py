@@ -0,0 +1,82 @@
+"""
+Utilidades de caché compartidas (sobre el backend configurado en settings.CACHES).
+
+La invalidación se hace por 'generaciones': cada espacio de nombres guarda un
+contador en la caché y todas sus claves lo incluyen. Incrementar el contador
+invalida de golpe todas las entradas del espacio sin tener que enumerarlas.
+"""
+import logging
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 60 * 60
+
+# Espacios de nombres compartidos
+WORLD_TREE_NAMESPACE = 'world_tree'
+WORLD_CHILDREN_NAMESPACE = 'world_children'
+HOME_INDEX_NAMESPACE = 'home_index'
+PROPOSALS_NAMESPACE = 'proposals'
+SEARCH_INDEX_NAMESPACE = 'search_index'
+COMMENT_THREADS_NAMESPACE = 'comment_threads'  # Uno por hilo: 'comment_threads:<entity_key_norm>'
+
+
+def _generation_key(namespace: str) -> str:
+    return f"gen:{namespace}"
+
+
+def get_generation(namespace: str) -> int:
+    """Generación vigente de un espacio de nombres (se crea a 1 si no existe)."""
+    gen = cache.get(_generation_key(namespace))
+    if gen is None:
+        cache.add(_generation_key(namespace), 1, timeout=None)
+        gen = cache.get(_generation_key(namespace), 1)
+    return gen
+
+
+def bump_generation(namespace: str) -> None:
+    """Invalida todas las entradas del espacio de nombres."""
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        cache.set(_generation_key(namespace), 2, timeout=None)
+    except Exception as e:
+        logger.error(f"Error invalidando caché '{namespace}': {e}")
+
+
+class GenerationalCache:
+    """
+    Vista de la caché limitada a un espacio de nombres con invalidación por generación.
+    Implementa el puerto mínimo get/set que usan los casos de uso de Aplicación.
+    """
+
+    def __init__(self, namespace: str, timeout: Optional[int] = DEFAULT_TIMEOUT):
+        self.namespace = namespace
+        self.timeout = timeout
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{get_generation(self.namespace)}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return cache.get(self._key(key), default)
+        except Exception as e:
+            logger.error(f"Error leyendo caché '{self.namespace}': {e}")
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            cache.set(self._key(key), value, timeout=self.timeout)
+        except Exception as e:
+            logger.error(f"Error escribiendo caché '{self.namespace}': {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            cache.delete(self._key(key))
+        except Exception as e:
+            logger.error(f"Error borrando caché '{self.namespace}': {e}")
+
+    def invalidate(self) -> None:
+        bump_generation(self.namespace)
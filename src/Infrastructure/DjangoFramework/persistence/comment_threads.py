@@ -0,0 +1,183 @@
+"""
+Hilos de comentarios paginados para la API de comentarios (social_views.get_comments).
+
+Antes se cargaban todos los comentarios de la entidad y, por cada uno, se consultaban
+sus respuestas, se resolvía el avatar y se calculaba el rango de autor y lector para
+`can_delete`: cientos de consultas por llamada AJAX en las imágenes populares.
+
+Ahora:
+- Los comentarios de primer nivel se paginan por cursor (created_at, id), con autores,
+  perfiles y respuestas precargados (select_related/prefetch_related): tres consultas
+  por página sea cual sea su tamaño.
+- El rango de moderación y el avatar se calculan una vez por autor distinto.
+- La página serializada no depende del lector: `is_me` y `can_delete` se añaden al
+  responder (for_viewer) a partir del autor y su rango guardados en la página.
+- La primera página se cachea por hilo. Las señales de CaosComment incrementan la
+  generación del hilo (invalidate_thread), así que la caché dura hasta que cambie.
+  Los cambios de avatar o rango del autor se reflejan al caducar (FIRST_PAGE_TIMEOUT).
+"""
+import base64
+import binascii
+import logging
+from datetime import datetime
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.utils.timezone import localtime
+
+from src.Infrastructure.DjangoFramework.persistence.caching import (
+    bump_generation, get_generation, COMMENT_THREADS_NAMESPACE
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+FIRST_PAGE_TIMEOUT = 15 * 60
+DELETED_USER = "Usuario eliminado"
+
+
+def _namespace(entity_key_norm: str) -> str:
+    return f"{COMMENT_THREADS_NAMESPACE}:{entity_key_norm}"
+
+
+def invalidate_thread(entity_key_norm: str) -> None:
+    """Invalida la primera página cacheada del hilo (lo llaman las señales de CaosComment)."""
+    if entity_key_norm:
+        bump_generation(_namespace(entity_key_norm))
+
+
+# --- Cursor ---
+
+def encode_cursor(comment) -> str:
+    raw = f"{comment.created_at.isoformat()}|{comment.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) del último comentario de la página anterior. ValueError si no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, comment_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(comment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Cursor no válido: {cursor!r}") from e
+
+
+# --- Página (independiente del lector) ---
+
+def _date(comment) -> str:
+    return localtime(comment.created_at).strftime("%d/%m/%Y %H:%M") if comment.created_at else "---"
+
+
+def _serialize(comment, avatars: dict) -> dict:
+    username = comment.user.username if comment.user else DELETED_USER
+    return {
+        'id': comment.id,
+        'author_id': comment.user_id,
+        'username': username,
+        'user': username,  # Backward compatibility
+        'content': comment.content,
+        'date': _date(comment),
+        'avatar_url': avatars.get(comment.user_id, ""),
+    }
+
+
+def _build_page(entity_key_norm: str, cursor: Optional[str], limit: int) -> dict:
+    from src.Infrastructure.DjangoFramework.persistence.engagement_counters import read_counters
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosComment
+    from src.Infrastructure.DjangoFramework.persistence.policies import get_rank_weight
+    from src.Infrastructure.DjangoFramework.persistence.utils import get_user_avatars
+
+    comments = CaosComment.objects.filter(
+        entity_key_norm=entity_key_norm, parent_comment__isnull=True
+    ).select_related('user__profile').prefetch_related(
+        Prefetch('replies', queryset=CaosComment.objects.select_related('user__profile').order_by('created_at', 'id'))
+    ).order_by('created_at', 'id')
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor)
+        comments = comments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=comment_id))
+
+    comments = list(comments[:limit + 1])
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+
+    authors = {}
+    for c in comments:
+        authors[c.user_id] = c.user
+        for reply in c.replies.all():
+            authors[reply.user_id] = reply.user
+    avatars = get_user_avatars(authors.values())
+
+    data = []
+    for c in comments:
+        item = _serialize(c, avatars)
+        item['pic'] = item['avatar_url']  # Backward compatibility
+        item['reply_count'] = c.reply_count
+        item['replies'] = []
+        for reply in c.replies.all():
+            reply_item = _serialize(reply, avatars)
+            reply_item['profile_url'] = f"/staff/user/{reply_item['username']}/" if reply.user else "#"
+            item['replies'].append(reply_item)
+        data.append(item)
+
+    return {
+        'comments': data,
+        'author_ranks': {uid: get_rank_weight(user) for uid, user in authors.items()},
+        'next_cursor': encode_cursor(comments[-1]) if has_more else None,
+        'total': read_counters([entity_key_norm]).get(entity_key_norm, (0, 0))[1],
+    }
+
+
+def get_thread_page(entity_key: str, cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> dict:
+    """
+    Página de comentarios de primer nivel de una entidad, con sus respuestas.
+    Sin cursor y con el tamaño por defecto se sirve desde la caché del hilo.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import normalize_entity_key
+
+    entity_key_norm = normalize_entity_key(entity_key)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor or limit != PAGE_SIZE:
+        return _build_page(entity_key_norm, cursor, limit)
+
+    # Generación leída antes de construir: un comentario nuevo durante la consulta invalida lo guardado
+    namespace = _namespace(entity_key_norm)
+    key = f"{namespace}:{get_generation(namespace)}:first_page"
+    try:
+        page = cache.get(key)
+    except Exception as e:
+        logger.error(f"Error leyendo caché '{namespace}': {e}")
+        page = None
+    if page is None:
+        page = _build_page(entity_key_norm, None, limit)
+        try:
+            cache.set(key, page, timeout=FIRST_PAGE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error escribiendo caché '{namespace}': {e}")
+    return page
+
+
+# --- Vista del lector ---
+
+def for_viewer(page: dict, user) -> list:
+    """Comentarios de la página con `is_me` y `can_delete` para el lector (sin consultas)."""
+    from src.Infrastructure.DjangoFramework.persistence.policies import can_user_moderate_author, get_rank_weight
+
+    viewer_rank = get_rank_weight(user)
+    ranks = page['author_ranks']
+
+    def personalize(item):
+        item = dict(item)
+        author_id = item.pop('author_id')
+        item['is_me'] = user.is_authenticated and user.pk == author_id
+        item['can_delete'] = can_user_moderate_author(user, author_id, ranks.get(author_id, 0), viewer_rank)
+        return item
+
+    comments = []
+    for c in page['comments']:
+        item = personalize(c)
+        item['replies'] = [personalize(reply) for reply in c['replies']]
+        comments.append(item)
+    return comments
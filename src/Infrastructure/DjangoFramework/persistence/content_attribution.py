@@ -0,0 +1,180 @@
+"""
+Índice de atribución de contenido (CaosContentAttributionORM).
+
+Sustituye el escaneo completo de SocialService.discover_user_content(), que cargaba los
+metadatos de todas las entidades activas y parseaba CaosEventLog.details en cada llamada.
+Las filas se derivan de los metadatos de una entidad al guardarla (ver signals.py) y de
+los logs de subida al crearse; `python manage.py rebuild_content_attributions` reconstruye todo.
+"""
+import logging
+from typing import Iterator, Optional
+
+from django.db import transaction
+from django.db.models import F, Q
+
+logger = logging.getLogger(__name__)
+
+HISTORICAL_ACTIONS = ('UPLOAD_PHOTO', 'PROPOSE_COVER', 'PROPOSE_AI_PHOTO', 'RETOUCH_PHOTO')
+HISTORICAL_EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg', '.gif')
+
+
+def _author_usernames(world) -> set:
+    """Usuarios a los que se atribuye el contenido sin uploader explícito (autor o autor actual)."""
+    names = set()
+    if world.author_id and world.author:
+        names.add(world.author.username.lower())
+    if world.current_author_name:
+        names.add(world.current_author_name.lower())
+    return names
+
+
+def iter_world_attributions(world) -> Iterator[dict]:
+    """
+    Deriva las atribuciones de imágenes de una entidad a partir de sus metadatos.
+    Replica las reglas de atribución históricas de discover_user_content().
+    """
+    meta = world.metadata if isinstance(world.metadata, dict) else None
+    if not meta:
+        return
+    authors = _author_usernames(world)
+    position = 0
+
+    def emit(usernames, kind, filename, title, entry=None):
+        nonlocal position
+        position += 1
+        for username in sorted(usernames):
+            yield {'username': username, 'kind': kind, 'filename': filename, 'title': title[:255],
+                   'meta': entry, 'position': position}
+
+    # A. Portada (atribuida al autor de la entidad)
+    cover = meta.get('cover_image')
+    if cover:
+        yield from emit(authors, 'cover', cover, f"Portada: {world.name}")
+
+    # B. Galería (uploader explícito o, en su defecto, el autor)
+    for filename, entry in (meta.get('gallery_log') or {}).items():
+        entry = entry if isinstance(entry, dict) else {}
+        uploader = (entry.get('uploader') or '').lower()
+        yield from emit({uploader} if uploader else authors, 'gallery', filename, entry.get('title', filename), entry)
+
+    # C. Períodos de la línea temporal (portada al autor; galería solo con uploader explícito)
+    for year, data in (meta.get('timeline') or {}).items():
+        if not isinstance(data, dict):
+            continue
+        p_cover = data.get('cover_image')
+        if p_cover:
+            yield from emit(authors, 'period_cover', p_cover, f"Portada Periodo {year}")
+        for p_filename, p_entry in (data.get('gallery_log') or {}).items():
+            p_entry = p_entry if isinstance(p_entry, dict) else {}
+            p_uploader = (p_entry.get('uploader') or '').lower()
+            if p_uploader:
+                yield from emit({p_uploader}, 'period_gallery', p_filename, p_entry.get('title', p_filename), p_entry)
+
+
+def parse_historical_filename(detail: str) -> Optional[str]:
+    """Extrae el archivo de un log ("Proposed cover: archivo", "File: archivo (..)")."""
+    parts = (detail or '').split(':')
+    if len(parts) > 1:
+        filename = parts[1].strip().split('(')[0].strip()
+        if filename.lower().endswith(HISTORICAL_EXTENSIONS):
+            return filename
+    return None
+
+
+def _attribution_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosContentAttributionORM
+    return CaosContentAttributionORM
+
+
+def sync_world_attributions(world) -> None:
+    """Sustituye las atribuciones de una entidad por las derivadas de sus metadatos actuales."""
+    Attribution = _attribution_model()
+    rows = [Attribution(world_id=world.pk, **row) for row in iter_world_attributions(world)]
+    try:
+        with transaction.atomic():
+            Attribution.objects.filter(world_id=world.pk).delete()
+            Attribution.objects.bulk_create(rows, batch_size=500)
+    except Exception as e:
+        logger.error(f"Error sincronizando atribuciones de {world.pk}: {e}")
+
+
+def record_event_attribution(event) -> None:
+    """Registra la imagen de un log de subida/propuesta como contenido histórico del usuario."""
+    if event.action not in HISTORICAL_ACTIONS or not event.user_id:
+        return
+    filename = parse_historical_filename(event.details)
+    if not filename:
+        return
+    Attribution = _attribution_model()
+    try:
+        username = event.user.username.lower()
+        if not Attribution.objects.filter(username=username, kind='historical', filename=filename).exists():
+            Attribution.objects.create(
+                username=username, kind='historical', filename=filename,
+                title=f"Histórico: {filename}"[:255], position=event.pk or 0
+            )
+    except Exception as e:
+        logger.error(f"Error registrando atribución histórica {filename}: {e}")
+
+
+def build_attribution_rows(world_model, event_log_model, attribution_model) -> list:
+    """
+    Construye (sin guardar) todas las filas del índice desde los metadatos y los logs.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    rows = []
+    for world in world_model.objects.select_related('author').iterator(chunk_size=200):
+        rows.extend(attribution_model(world_id=world.pk, **row) for row in iter_world_attributions(world))
+
+    seen = set()
+    logs = event_log_model.objects.filter(action__in=HISTORICAL_ACTIONS, user__isnull=False) \
+        .select_related('user').order_by('id')
+    for log in logs.iterator(chunk_size=500):
+        filename = parse_historical_filename(log.details)
+        key = (log.user.username.lower(), filename)
+        if filename and key not in seen:
+            seen.add(key)
+            rows.append(attribution_model(username=key[0], kind='historical', filename=filename,
+                                          title=f"Histórico: {filename}"[:255], position=log.pk))
+    return rows
+
+
+def rebuild_content_attributions() -> int:
+    """Reconstruye el índice completo desde los metadatos y los logs. Retorna el nº de filas."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosEventLog
+
+    Attribution = _attribution_model()
+    rows = build_attribution_rows(CaosWorldORM, CaosEventLog, Attribution)
+    with transaction.atomic():
+        Attribution.objects.all().delete()
+        Attribution.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def get_user_images(target_user) -> list:
+    """
+    Imágenes atribuidas a un usuario, con el mismo formato que discover_user_content():
+    dicts con filename, title, world, type (y meta en las entradas de galería).
+    Los históricos solo se incluyen si el archivo no aparece ya en una entidad.
+    """
+    Attribution = _attribution_model()
+    rows = Attribution.objects.filter(
+        Q(world__isnull=True) | Q(world__is_active=True),
+        username=target_user.username.lower()
+    ).select_related('world', 'world__author').order_by(F('world_id').asc(nulls_last=True), 'position')
+
+    images = []
+    existing_files = set()
+    for r in rows:
+        if r.kind == 'historical':
+            if r.filename.lower() in existing_files:
+                continue
+            images.append({'filename': r.filename, 'title': r.title, 'world': None, 'type': 'historical'})
+            existing_files.add(r.filename.lower())
+            continue
+        item = {'filename': r.filename, 'title': r.title, 'world': r.world, 'type': r.kind}
+        if r.kind in ('gallery', 'period_gallery'):
+            item['meta'] = r.meta or {}
+        images.append(item)
+        existing_files.add(r.filename.lower())
+    return images
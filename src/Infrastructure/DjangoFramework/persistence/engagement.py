@@ -0,0 +1,36 @@
+"""
+Agregación de interacciones (likes / comentarios) para los rankings del dashboard.
+
+ContentAnalyticsView y UserRankingView llamaban a SocialService.get_interactions_count()
+por cada imagen, narrativa, entidad, propuesta y período (dos COUNT por elemento).
+Aquí se resuelven todas las claves de una vez con las consultas agrupadas de
+SocialService.get_interactions_counts(), y los listados se paginan en el servidor.
+"""
+from django.core.paginator import Page, Paginator
+
+from src.Shared.Services.SocialService import SocialService
+
+
+def attach_engagement(items: list, key_field: str = 'entity_key') -> list:
+    """
+    Añade 'likes', 'comments' y 'engagement' a cada elemento (dict) a partir de su clave social.
+    Coste fijo: dos consultas agrupadas, independientemente del número de elementos.
+    """
+    stats = SocialService.get_interactions_counts(item[key_field] for item in items)
+    empty = {'likes': 0, 'comments': 0, 'engagement': 0}
+    for item in items:
+        item.update(stats.get(item[key_field], empty))
+    return items
+
+
+def summarize_engagement(items: list) -> dict:
+    """Totales de un listado ya agregado."""
+    likes = sum(i['likes'] for i in items)
+    comments = sum(i['comments'] for i in items)
+    return {'count': len(items), 'total_likes': likes, 'total_comments': comments}
+
+
+def paginate_ranking(items: list, page_number, per_page: int, sort_key: str = 'engagement') -> Page:
+    """Ordena el listado (descendente por `sort_key`) y devuelve la página pedida."""
+    ranked = sorted(items, key=lambda x: x[sort_key], reverse=True)
+    return Paginator(ranked, per_page).get_page(page_number)
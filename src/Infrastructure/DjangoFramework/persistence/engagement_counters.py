@@ -0,0 +1,134 @@
+"""
+Contadores de interacción desnormalizados (CaosEngagementCounterORM y CaosComment.reply_count).
+
+Cada alta/baja de CaosLike o CaosComment ajusta el contador de su entidad con un
+UPDATE atómico (F() + n) dentro de la misma transacción, de modo que las vistas
+leen likes/comentarios sin contar filas. Las escrituras que no emiten señales
+(bulk_create, .update() de entity_key) se corrigen con
+`python manage.py reconcile_engagement_counters`.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('like_count', 'comment_count')
+
+
+def _counter_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosEngagementCounterORM
+    return CaosEngagementCounterORM
+
+
+def adjust_counter(entity_key_norm: str, field: str, delta: int) -> None:
+    """Suma `delta` al contador `field` de una entidad (creándolo si no existe)."""
+    if not entity_key_norm or not delta:
+        return
+    Counter = _counter_model()
+    updated = Counter.objects.filter(entity_key_norm=entity_key_norm).update(
+        **{field: F(field) + delta}
+    )
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            Counter.objects.create(entity_key_norm=entity_key_norm, **{field: delta})
+    except IntegrityError:
+        # Otra petición creó la fila entre el UPDATE y el INSERT
+        Counter.objects.filter(entity_key_norm=entity_key_norm).update(**{field: F(field) + delta})
+
+
+def adjust_reply_count(comment_id, delta: int) -> None:
+    """Ajusta CaosComment.reply_count del comentario padre."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosComment
+
+    if comment_id:
+        CaosComment.objects.filter(id=comment_id).update(reply_count=F('reply_count') + delta)
+
+
+def read_counters(entity_key_norms) -> dict:
+    """{entity_key_norm: (like_count, comment_count)} en una consulta por clave primaria única."""
+    norms = set(entity_key_norms)
+    if not norms:
+        return {}
+    rows = _counter_model().objects.filter(entity_key_norm__in=norms).values_list(
+        'entity_key_norm', *COUNTER_FIELDS
+    )
+    return {norm: (likes, comments) for norm, likes, comments in rows}
+
+
+def compute_counters(like_model, comment_model) -> dict:
+    """
+    Recalcula los contadores desde las tablas de origen: {entity_key_norm: {campo: valor}}.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    counters = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    likes = like_model.objects.values('entity_key_norm').annotate(n=Count('id')).order_by()
+    for row in likes:
+        counters[row['entity_key_norm']]['like_count'] = row['n']
+    comments = (
+        comment_model.objects.filter(parent_comment__isnull=True)
+        .values('entity_key_norm').annotate(n=Count('id')).order_by()
+    )
+    for row in comments:
+        counters[row['entity_key_norm']]['comment_count'] = row['n']
+    counters.pop('', None)
+    return dict(counters)
+
+
+def compute_reply_counts(comment_model) -> dict:
+    """Respuestas reales por comentario padre: {comment_id: n}."""
+    return dict(
+        comment_model.objects.filter(parent_comment__isnull=False)
+        .values('parent_comment_id').annotate(n=Count('id')).order_by()
+        .values_list('parent_comment_id', 'n')
+    )
+
+
+def build_counter_rows(like_model, comment_model, counter_model) -> list:
+    """Filas (sin guardar) de la tabla de contadores calculadas desde cero."""
+    return [
+        counter_model(entity_key_norm=norm, **values)
+        for norm, values in compute_counters(like_model, comment_model).items()
+    ]
+
+
+def reconcile_counters(apply: bool = True) -> dict:
+    """
+    Compara los contadores con las tablas de origen y, si `apply`, corrige la deriva.
+    Retorna {'counters': [(clave, guardado, real)], 'replies': [(comment_id, guardado, real)]}.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosLike, CaosComment
+
+    Counter = _counter_model()
+    expected = compute_counters(CaosLike, CaosComment)
+    stored = {c.entity_key_norm: c for c in Counter.objects.all()}
+
+    counter_drift = []
+    for norm in set(expected) | set(stored):
+        real = expected.get(norm, dict.fromkeys(COUNTER_FIELDS, 0))
+        current = stored.get(norm)
+        saved = {f: getattr(current, f) for f in COUNTER_FIELDS} if current else dict.fromkeys(COUNTER_FIELDS, 0)
+        if saved != real:
+            counter_drift.append((norm, saved, real))
+
+    real_replies = compute_reply_counts(CaosComment)
+    reply_drift = [
+        (cid, saved, real_replies.get(cid, 0))
+        for cid, saved in CaosComment.objects.values_list('id', 'reply_count')
+        if saved != real_replies.get(cid, 0)
+    ]
+
+    if apply and (counter_drift or reply_drift):
+        with transaction.atomic():
+            for norm, _, real in counter_drift:
+                Counter.objects.update_or_create(entity_key_norm=norm, defaults=real)
+            for cid, _, real in reply_drift:
+                CaosComment.objects.filter(id=cid).update(reply_count=real)
+            # Las filas a cero no aportan nada: se eliminan
+            Counter.objects.filter(like_count=0, comment_count=0).delete()
+
+    return {'counters': counter_drift, 'replies': reply_drift}
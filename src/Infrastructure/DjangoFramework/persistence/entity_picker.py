@@ -0,0 +1,48 @@
+"""
+Selector de entidades con autocompletado (menciones/enlaces del editor de narrativas).
+
+Las vistas del editor cargaban `CaosWorldORM.objects.all()` en el contexto como
+`todas_entidades` en cada apertura. Aquí el cliente pide solo lo que escribe:
+coincidencias por prefijo de J-ID / public_id o por prefijo de palabra del nombre,
+filtradas por visibilidad y con un máximo de resultados pequeño, de modo que el
+coste no depende del tamaño del universo.
+"""
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length
+
+MAX_RESULTS = 15
+MIN_QUERY_LENGTH = 2
+
+
+def search_entities(query: str, user, limit: int = MAX_RESULTS) -> list:
+    """
+    Entidades activas visibles para `user` que casan con `query`, como dicts
+    {'id', 'name', 'public_id'}. Orden: identificador exacto, prefijo del nombre,
+    prefijo de una palabra del nombre, prefijo de J-ID; a igualdad, las menos profundas.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+    from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
+
+    query = (query or '').strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    limit = max(1, min(int(limit), MAX_RESULTS))
+
+    matches = (
+        Q(id=query) | Q(public_id=query)
+        | Q(name__istartswith=query) | Q(name__icontains=f' {query}')
+        | Q(id__startswith=query)
+    )
+    rows = (
+        CaosWorldORM.objects.filter(get_visibility_q_filter(user), matches, is_active=True)
+        .annotate(match_rank=Case(
+            When(Q(id=query) | Q(public_id=query), then=Value(0)),
+            When(name__istartswith=query, then=Value(1)),
+            When(name__icontains=f' {query}', then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        ))
+        .order_by('match_rank', Length('id'), 'name')
+        .values('id', 'name', 'public_id')
+    )
+    return list(rows[:limit])
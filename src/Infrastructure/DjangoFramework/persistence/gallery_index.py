@@ -0,0 +1,258 @@
+"""
+Índice persistente de galerías (CaosGalleryImageORM).
+
+Sustituye los recorridos del sistema de archivos (os.listdir / iterdir) que
+get_world_images() hacía en cada petición. El disco sigue siendo la fuente de
+verdad: el índice se actualiza en cada escritura (subida, papelera, purga) y
+puede reconstruirse por completo con `python manage.py rebuild_gallery_index`.
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from src.Infrastructure.DjangoFramework.persistence.caching import bump_generation, HOME_INDEX_NAMESPACE
+from src.Infrastructure.DjangoFramework.persistence import image_derivatives
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.webp', '.jpg', '.jpeg')
+
+# Pool de imágenes (rutas relativas a img/) para avatares de respaldo.
+# Se construye una vez por proceso y se invalida al añadir/quitar imágenes;
+# el TTL cubre las escrituras hechas desde otros procesos (workers).
+IMAGE_POOL_TTL = 600
+_image_pool = {'paths': None, 'built_at': 0.0}
+_image_pool_lock = threading.Lock()
+
+
+def get_img_root() -> Path:
+    """Carpeta raíz de las galerías: static/persistence/img."""
+    return Path(settings.BASE_DIR) / 'persistence' / 'static' / 'persistence' / 'img'
+
+
+def _mtime_of(path: Path) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.get_current_timezone())
+    except OSError:
+        return None
+
+
+def scan_gallery_folder(folder_path: Path) -> List[Tuple[str, Optional[datetime]]]:
+    """Lista (filename, mtime) de las imágenes de una carpeta, sin recursión (.trash excluida)."""
+    try:
+        names = sorted(os.listdir(str(folder_path)))
+    except OSError:
+        return []
+    return [
+        (f, _mtime_of(folder_path / f))
+        for f in names
+        if f.lower().endswith(IMAGE_EXTENSIONS) and (folder_path / f).is_file()
+    ]
+
+
+def iter_disk_galleries(base_dir: Optional[Path] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Recorre las carpetas de galería del disco y devuelve pares (jid, carpeta).
+    Las carpetas exactas (<jid>) tienen prioridad sobre las legacy (<jid>_Nombre),
+    replicando la resolución que hacía get_world_images().
+    """
+    base_dir = base_dir or get_img_root()
+    if not base_dir.exists():
+        return
+
+    folders = sorted(d.name for d in base_dir.iterdir() if d.is_dir() and not d.name.startswith('.'))
+    exact = set(folders)
+    seen = set()
+    for name in folders:
+        if '_' in name and name.split('_', 1)[0] not in exact:
+            jid = name.split('_', 1)[0]
+        else:
+            jid = name
+        if jid in seen:
+            continue
+        seen.add(jid)
+        yield jid, name
+
+
+def _resolve_folder(jid: str) -> Optional[str]:
+    """Resuelve la carpeta física de una entidad (exacta o legacy) en disco."""
+    base_dir = get_img_root()
+    if (base_dir / jid).is_dir():
+        return jid
+    try:
+        for d in base_dir.iterdir():
+            if d.is_dir() and d.name.startswith(f"{jid}_"):
+                return d.name
+    except OSError:
+        pass
+    return None
+
+
+def gallery_folder(jid: str) -> str:
+    """Carpeta de la galería de una entidad: la del índice, la que haya en disco o el propio J-ID."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    jid = str(jid)
+    folder = CaosGalleryImageORM.objects.filter(jid=jid).values_list('folder', flat=True).first()
+    return folder or _resolve_folder(jid) or jid
+
+
+def list_gallery(jid: str) -> Tuple[Optional[str], List[Tuple[str, Optional[datetime]]]]:
+    """
+    Devuelve (carpeta, [(filename, mtime), ...]) de una entidad con una única consulta indexada.
+    El orden es el mismo que producía sorted(os.listdir()).
+    """
+    return list_galleries([jid]).get(jid, (None, []))
+
+
+def list_galleries(jids, with_variants: bool = False) -> Dict[str, Tuple[str, List[tuple]]]:
+    """
+    Versión en bloque de list_gallery(): {jid: (carpeta, [(filename, mtime), ...])} en una consulta.
+    Con with_variants=True cada archivo es (filename, mtime, (content_hash, ancho)) para
+    construir las rutas de sus derivados (image_derivatives).
+    Las entidades sin imágenes indexadas no aparecen en el resultado.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    jids = {str(j) for j in jids if j}
+    if not jids:
+        return {}
+    rows = CaosGalleryImageORM.objects.filter(jid__in=jids).values_list(
+        'jid', 'folder', 'filename', 'file_mtime', 'content_hash', 'width'
+    )
+    galleries = {}
+    for jid, folder, filename, mtime, digest, width in sorted(rows, key=lambda r: (r[0], r[2])):
+        entry = (filename, mtime, (digest, width)) if with_variants else (filename, mtime)
+        galleries.setdefault(jid, (folder, []))[1].append(entry)
+    return galleries
+
+
+def get_image_pool() -> List[str]:
+    """
+    Devuelve la lista ordenada de imágenes indexadas ('carpeta/archivo').
+    Sustituye a los rglob recursivos sobre el árbol de imágenes.
+    """
+    paths = _image_pool['paths']
+    if paths is not None and time.monotonic() - _image_pool['built_at'] < IMAGE_POOL_TTL:
+        return paths
+
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    with _image_pool_lock:
+        paths = sorted(f"{folder}/{f}" for folder, f in CaosGalleryImageORM.objects.values_list('folder', 'filename'))
+        _image_pool['paths'] = paths
+        _image_pool['built_at'] = time.monotonic()
+    return paths
+
+
+def invalidate_image_pool() -> None:
+    """Fuerza la reconstrucción del pool en la próxima lectura (y de las portadas del Home)."""
+    _image_pool['paths'] = None
+    bump_generation(HOME_INDEX_NAMESPACE)
+
+
+def register_image(jid: str, filename: str, folder: Optional[str] = None,
+                   variants: Optional[Tuple[str, Optional[int]]] = None) -> None:
+    """
+    Añade (o refresca) una imagen en el índice tras escribirla en disco y genera sus derivados.
+    `variants` ((hash, ancho) ya generados, p.ej. en el pool de image_jobs) evita recalcularlos.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    jid = str(jid)
+    folder = folder or _resolve_folder(jid) or jid
+    folder_path = get_img_root() / folder
+    try:
+        digest, width = variants if variants and variants[0] else image_derivatives.generate_derivatives(folder_path, filename)
+        # Si el contenido cambió, los derivados de la versión anterior sobran
+        image_derivatives.remove_derivatives(folder_path, filename, keep=digest)
+        CaosGalleryImageORM.objects.update_or_create(
+            jid=jid, filename=filename,
+            defaults={'folder': folder, 'file_mtime': _mtime_of(folder_path / filename),
+                      'content_hash': digest, 'width': width}
+        )
+    except Exception as e:
+        logger.error(f"Error indexando imagen {jid}/{filename}: {e}")
+    invalidate_image_pool()
+
+
+def unregister_image(jid: str, filename: str) -> None:
+    """Elimina una imagen del índice (movida a la papelera o purgada)."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    try:
+        rows = CaosGalleryImageORM.objects.filter(jid=str(jid), filename=filename)
+        for folder in rows.values_list('folder', flat=True):
+            image_derivatives.remove_derivatives(get_img_root() / folder, filename)
+        rows.delete()
+    except Exception as e:
+        logger.error(f"Error desindexando imagen {jid}/{filename}: {e}")
+    invalidate_image_pool()
+
+
+def rebuild_gallery_index(jid: Optional[str] = None) -> int:
+    """
+    Reconstruye el índice desde el disco (todas las entidades o solo `jid`).
+    Retorna el número de imágenes indexadas.
+    """
+    from django.db import transaction
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    base_dir = get_img_root()
+    if jid:
+        folder = _resolve_folder(jid)
+        galleries = [(jid, folder)] if folder else []
+    else:
+        galleries = list(iter_disk_galleries(base_dir))
+
+    with transaction.atomic():
+        stale = CaosGalleryImageORM.objects.all()
+        if jid:
+            stale = stale.filter(jid=jid)
+        # Los derivados ya generados siguen valiendo si el archivo no ha cambiado
+        known = {
+            (g_jid, f, mtime): (digest, width)
+            for g_jid, f, mtime, digest, width in stale.values_list('jid', 'filename', 'file_mtime', 'content_hash', 'width')
+        }
+        rows = []
+        for g_jid, folder in galleries:
+            for f, mtime in scan_gallery_folder(base_dir / folder):
+                digest, width = known.get((g_jid, f, mtime), ('', None))
+                rows.append(CaosGalleryImageORM(jid=g_jid, folder=folder, filename=f, file_mtime=mtime,
+                                                content_hash=digest, width=width))
+        stale.delete()
+        CaosGalleryImageORM.objects.bulk_create(rows, batch_size=500)
+    invalidate_image_pool()
+    return len(rows)
+
+
+def build_derivatives(jid: Optional[str] = None, force: bool = False) -> int:
+    """
+    Genera los derivados (miniaturas) de las imágenes indexadas que aún no los tienen
+    (o de todas con force=True). Retorna el número de imágenes procesadas.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosGalleryImageORM
+
+    rows = CaosGalleryImageORM.objects.all()
+    if jid:
+        rows = rows.filter(jid=jid)
+    if not force:
+        rows = rows.filter(content_hash='')
+
+    processed = 0
+    for row in rows.iterator():
+        folder_path = get_img_root() / row.folder
+        digest, width = image_derivatives.generate_derivatives(folder_path, row.filename)
+        image_derivatives.remove_derivatives(folder_path, row.filename, keep=digest)
+        CaosGalleryImageORM.objects.filter(pk=row.pk).update(content_hash=digest, width=width)
+        processed += 1
+    if processed:
+        invalidate_image_pool()
+    return processed
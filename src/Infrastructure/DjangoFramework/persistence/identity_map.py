@@ -0,0 +1,148 @@
+"""
+Mapa de identidad por petición para las entidades (CaosWorldORM).
+
+Renderizar una ficha resolvía el mismo identificador varias veces: `ver_mundo`
+llamaba a `resolve_jid_orm` hasta tres veces, cada una probando public_id y J-ID en
+el repositorio y volviendo a leer la fila ORM; `GetWorldDetailsUseCase` repetía la
+cadena entera, y las políticas de acceso consultaban perfil y jefes en cada llamada.
+
+Durante una petición (IdentityMapMiddleware) cada identificador se resuelve una sola
+vez: la fila ORM (con autor y perfil), su entidad de dominio y los resultados
+memoizados (niveles de acceso) se comparten entre vistas, repositorio y políticas, y
+todos reciben la misma instancia. Fuera de una petición (comandos, workers) no hay
+mapa activo y todo consulta la base de datos directamente.
+
+Los guardados y borrados de CaosWorldORM olvidan la entidad (ver signals.py). Los
+`QuerySet.update()` no disparan señales: tras uno, llamar a `forget_world`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Q
+
+_current = ContextVar('caos_identity_map', default=None)
+
+
+class IdentityMap:
+    """Entidades y resultados memoizados de una petición."""
+
+    def __init__(self):
+        self.worlds = {}  # ('id', J-ID) / ('public_id', NanoID) -> CaosWorldORM o None (no existe)
+        self.domain = {}  # J-ID -> CaosWorld
+        self.memo = {}
+
+    def add_world(self, world):
+        """Registra una fila; si ya había una instancia para ese J-ID, devuelve la existente."""
+        existing = self.worlds.get(('id', world.id))
+        if existing is not None:
+            return existing
+        self.worlds[('id', world.id)] = world
+        if world.public_id:
+            self.worlds[('public_id', world.public_id)] = world
+        return world
+
+    def forget_world(self, world_id=None, public_id=None):
+        """Olvida una entidad (y sus derivados) tras modificarla."""
+        cached = self.worlds.pop(('id', world_id), None) if world_id else None
+        if cached is not None and cached.public_id:
+            self.worlds.pop(('public_id', cached.public_id), None)
+        if public_id:
+            self.worlds.pop(('public_id', public_id), None)
+        self.domain.pop(world_id, None)
+        # Los niveles de acceso dependen del autor, que puede haber cambiado
+        self.memo.clear()
+
+
+def current_identity_map():
+    return _current.get()
+
+
+@contextmanager
+def identity_map_scope():
+    """Abre un mapa de identidad nuevo para el bloque (una petición)."""
+    token = _current.set(IdentityMap())
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def _world_queryset():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+    return CaosWorldORM.objects.select_related('author', 'author__profile')
+
+
+def get_world(id=None, public_id=None):
+    """Fila CaosWorldORM por J-ID o por public_id (activa o no), o None."""
+    field, value = ('id', id) if id is not None else ('public_id', public_id)
+    if not value:
+        return None
+    imap = _current.get()
+    if imap is not None and (field, value) in imap.worlds:
+        return imap.worlds[(field, value)]
+
+    world = _world_queryset().filter(**{field: value}).first()
+    if imap is None:
+        return world
+    if world is None:
+        imap.worlds[(field, value)] = None
+        return None
+    return imap.add_world(world)
+
+
+def resolve_world(identifier):
+    """
+    Resuelve un identificador genérico (NanoID público o J-ID) con una sola consulta.
+    Prioridad: public_id activo, J-ID activo, public_id, J-ID (papelera).
+    """
+    if not identifier:
+        return None
+    identifier = str(identifier)
+    imap = _current.get()
+    keys = (('public_id', identifier), ('id', identifier))
+    if imap is not None and all(key in imap.worlds for key in keys):
+        by_public, by_id = (imap.worlds[key] for key in keys)
+    else:
+        by_public = by_id = None
+        for world in _world_queryset().filter(Q(public_id=identifier) | Q(id=identifier)):
+            if imap is not None:
+                world = imap.add_world(world)
+            if world.public_id == identifier:
+                by_public = world
+            if world.id == identifier:
+                by_id = world
+        if imap is not None:
+            imap.worlds.setdefault(keys[0], by_public)
+            imap.worlds.setdefault(keys[1], by_id)
+
+    for world in (by_public, by_id):
+        if world is not None and world.is_active:
+            return world
+    return by_public or by_id
+
+
+def domain_world(orm_world, build):
+    """Entidad de dominio de una fila, construida una vez por petición con `build(orm)`."""
+    imap = _current.get()
+    if imap is None:
+        return build(orm_world)
+    world = imap.domain.get(orm_world.id)
+    if world is None:
+        world = imap.domain[orm_world.id] = build(orm_world)
+    return world
+
+
+def memoize(key, compute):
+    """Resultado de `compute()` memoizado por `key` durante la petición."""
+    imap = _current.get()
+    if imap is None:
+        return compute()
+    if key not in imap.memo:
+        imap.memo[key] = compute()
+    return imap.memo[key]
+
+
+def forget_world(world_id=None, public_id=None):
+    imap = _current.get()
+    if imap is not None:
+        imap.forget_world(world_id, public_id)
@@ -0,0 +1,118 @@
+"""
+Derivados redimensionados de las imágenes de galería (miniaturas para srcset).
+
+Las tarjetas del Home, los hijos de la ficha, el ranking y la analítica pedían la
+imagen original (512×768 de Stable Diffusion o lo que el usuario subiera) para
+mostrarla en un recuadro de 48–400 px. Aquí cada imagen indexada tiene versiones
+WebP de THUMBNAIL_WIDTHS de ancho, generadas al registrarla (register_image) o con
+`python manage.py build_image_derivatives` para las existentes.
+
+Los derivados viven junto al original, en '<carpeta>/_thumbs/', con el hash del
+contenido en el nombre ('<archivo>.<hash>.<ancho>w.webp', con la extensión del
+original para que 'Cover.png' y 'Cover.webp' no compartan derivados): si el original
+se reemplaza, las URLs cambian y las viejas se pueden cachear como inmutables.
+El hash y el ancho del original se guardan en el índice de galerías, así que los
+srcset se construyen sin tocar el disco.
+"""
+import glob
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+CARD_WIDTH = 320  # Ancho por defecto de las tarjetas (src sin srcset)
+LIST_WIDTH = 160  # Miniaturas de listas y tablas (celdas de 40-64 px)
+DERIVATIVE_DIR = '_thumbs'
+DERIVATIVE_QUALITY = 80
+HASH_LENGTH = 16
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def derivative_name(filename: str, digest: str, width: int) -> str:
+    return f"{filename}.{digest}.{width}w.webp"
+
+
+def derivative_widths(original_width: Optional[int]) -> List[int]:
+    """Anchos a generar: nunca se amplía la imagen original."""
+    if not original_width:
+        return []
+    return [w for w in THUMBNAIL_WIDTHS if w < original_width]
+
+
+def generate_derivatives(folder_path: Path, filename: str) -> Tuple[str, Optional[int]]:
+    """
+    Genera (si faltan) los derivados de una imagen. Retorna (hash, ancho original);
+    ('', None) si el archivo no existe o no es una imagen legible.
+    """
+    source = Path(folder_path) / filename
+    try:
+        digest = content_hash(source)
+        with Image.open(source) as image:
+            original_width, original_height = image.size
+            widths = derivative_widths(original_width)
+            target_dir = Path(folder_path) / DERIVATIVE_DIR
+            pending = [w for w in widths if not (target_dir / derivative_name(filename, digest, w)).exists()]
+            if pending:
+                target_dir.mkdir(exist_ok=True)
+                image.load()
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+                for width in pending:
+                    height = max(1, round(original_height * width / original_width))
+                    image.resize((width, height), Image.LANCZOS).save(
+                        target_dir / derivative_name(filename, digest, width), 'WEBP', quality=DERIVATIVE_QUALITY
+                    )
+        return digest, original_width
+    except (OSError, ValueError) as e:
+        logger.warning(f"No se pudieron generar derivados de {source}: {e}")
+        return '', None
+
+
+def remove_derivatives(folder_path: Path, filename: str, keep: str = '') -> None:
+    """Borra los derivados de una imagen (de todas las versiones de su contenido salvo `keep`)."""
+    target_dir = Path(folder_path) / DERIVATIVE_DIR
+    if not target_dir.is_dir():
+        return
+    for path in target_dir.glob(f"{glob.escape(filename)}.*w.webp"):
+        original, digest, _, _ = path.name.rsplit('.', 3)
+        if original == filename and digest != keep:
+            path.unlink(missing_ok=True)
+
+
+def derivative_paths(folder: str, filename: str, digest: str, original_width: Optional[int]) -> List[Tuple[int, str]]:
+    """[(ancho, ruta relativa a img/)] de los derivados y del original, de menor a mayor."""
+    paths = [(w, f"{folder}/{DERIVATIVE_DIR}/{derivative_name(filename, digest, w)}")
+             for w in derivative_widths(original_width)] if digest else []
+    if original_width:
+        paths.append((original_width, f"{folder}/{filename}"))
+    return paths
+
+
+def thumbnail_path(folder: str, filename: str, digest: str, original_width: Optional[int], width: int = CARD_WIDTH) -> str:
+    """Ruta (relativa a img/) del derivado más pequeño que cubre `width`, o el original si no hay derivados."""
+    for w, path in derivative_paths(folder, filename, digest, original_width):
+        if w >= width:
+            return path
+    return f"{folder}/{filename}"
+
+
+def srcset(folder: str, filename: str, digest: str, original_width: Optional[int]) -> str:
+    """Atributo srcset ('url 160w, url 320w, ...') o '' si la imagen no tiene derivados."""
+    from django.templatetags.static import static
+
+    paths = derivative_paths(folder, filename, digest, original_width)
+    if len(paths) < 2:
+        return ''
+    return ', '.join(f"{static(f'persistence/img/{path}')} {w}w" for w, path in paths)
@@ -0,0 +1,309 @@
+"""
+Procesamiento de imágenes fuera de la petición: pool de procesos + cola de trabajos.
+
+Guardar una imagen (propuesta desde el generador de IA, publicación de una propuesta
+o imagen generada por un caso de uso) decodificaba, convertía, inyectaba EXIF y
+recodificaba a WebP dentro del hilo de la petición, y después reescribía el JSON
+`metadata` completo de la entidad solo para añadir una entrada al `gallery_log`.
+
+Ahora:
+- Las vistas guardan los bytes recibidos en IMAGE_SPOOL_DIR (o referencian el archivo
+  de la propuesta), encolan un trabajo del backend 'media' en la cola de ai_jobs y
+  responden al instante con su ID (mismo endpoint de estado que los trabajos de IA).
+- `python manage.py run_image_worker` ejecuta varios trabajos a la vez y manda la
+  parte de CPU (PIL: decodificar, convertir, codificar WebP y miniaturas) a un pool
+  de procesos, uno por núcleo, sin el GIL de por medio.
+- La entrada del `gallery_log` se añade con un parche JSON atómico en la base de
+  datos (patch_gallery_log): dos subidas simultáneas a la misma entidad no se pisan.
+
+Fuera del worker no hay pool: run_cpu() ejecuta la función en el propio proceso
+(casos de uso que guardan imágenes dentro de otro trabajo, tests, shell).
+"""
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+from src.Infrastructure.DjangoFramework.persistence import image_derivatives
+from src.Infrastructure.DjangoFramework.persistence.ai_jobs import JobError, enqueue_job, job_handler
+
+logger = logging.getLogger(__name__)
+
+MEDIA_BACKEND = 'media'
+SOFTWARE_TAG = "ECLAI World Builder v4.9"
+PROPOSAL_QUALITY = 80  # Propuestas desde el generador de IA (calidad por defecto de PIL)
+GENERATED_QUALITY = 85  # Imágenes de IA guardadas directamente en la galería
+UPLOAD_QUALITY = 90  # Publicación de propuestas (subidas manuales)
+PUBLISHING_STATUS = 'PUBLISHING'  # Propuesta con un trabajo publish_image en curso
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+# --- Pool de procesos ---
+
+def start_pool(processes: Optional[int] = None) -> ProcessPoolExecutor:
+    """Arranca el pool del proceso actual (lo hace run_image_worker). `processes` None = un proceso por núcleo."""
+    global _pool
+    if _pool is None:
+        import multiprocessing
+        # 'spawn': los procesos hijos no heredan conexiones a la base de datos ni los hilos del worker
+        _pool = ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                    mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def run_cpu(func, *args):
+    """Ejecuta `func(*args)` en el pool si está arrancado, o en el proceso actual si no."""
+    if _pool is None:
+        return func(*args)
+    return _pool.submit(func, *args).result()
+
+
+# --- Trabajo de CPU (se ejecuta en los procesos del pool: sin Django) ---
+
+def _exif(image, artist: Optional[str]):
+    """EXIF de autoría y software que se inyecta en las imágenes guardadas."""
+    exif = image.getexif()
+    if artist:
+        try:
+            exif[0x013b] = artist  # Artista
+            exif[0x0131] = SOFTWARE_TAG  # Software
+            exif[0x0132] = datetime.now().strftime("%d/%m/%Y")  # Timestamp
+        except Exception:
+            pass
+    return exif
+
+
+def encode_webp(source: Union[str, bytes], target: str, quality: int, artist: Optional[str] = None,
+                flatten: bool = False, derivatives: bool = False) -> Tuple[str, Optional[int]]:
+    """
+    Decodifica `source` (ruta o bytes), opcionalmente la aplana a RGB e inyecta EXIF,
+    y la escribe como WebP en `target` (de forma atómica: '.part' + rename).
+    Con `derivatives`, genera también sus miniaturas. Retorna (hash, ancho) de los
+    derivados, o ('', None) si no se pidieron.
+    """
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        image.load()
+        if flatten and image.mode in ("RGBA", "P"):
+            image = image.convert("RGB")
+        partial = f"{target}.part"
+        try:
+            image.save(partial, "WEBP", quality=quality, exif=_exif(image, artist))
+        except Exception:
+            Path(partial).unlink(missing_ok=True)
+            raise
+    os.replace(partial, target)
+    if not derivatives:
+        return '', None
+    target = Path(target)
+    return image_derivatives.generate_derivatives(target.parent, target.name)
+
+
+# --- Base de datos ---
+
+def patch_gallery_log(jid: str, filename: str, entry: dict) -> None:
+    """
+    Añade (o sustituye) `metadata['gallery_log'][filename]` sin reescribir el resto del JSON.
+    En PostgreSQL es un único UPDATE con jsonb; en otros motores, lectura y escritura
+    con la fila bloqueada. Después notifica post_save para que los índices derivados
+    (atribuciones, localizador, búsqueda, facetas y cachés) se actualicen como con save().
+    """
+    import json
+    from django.db import connection, transaction
+    from django.db.models.signals import post_save
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+    jid = str(jid)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {CaosWorldORM._meta.db_table} SET metadata = jsonb_set(
+                    CASE WHEN jsonb_typeof(metadata) = 'object' THEN metadata ELSE '{{}}'::jsonb END,
+                    '{{gallery_log}}',
+                    CASE WHEN jsonb_typeof(metadata->'gallery_log') = 'object'
+                         THEN metadata->'gallery_log' ELSE '{{}}'::jsonb END
+                    || jsonb_build_object(%s::text, %s::jsonb)
+                ) WHERE id = %s
+                """,
+                [filename, json.dumps(entry), jid],
+            )
+    else:
+        with transaction.atomic():
+            metadata = CaosWorldORM.objects.select_for_update().filter(id=jid).values_list('metadata', flat=True).first()
+            metadata = metadata if isinstance(metadata, dict) else {}
+            if not isinstance(metadata.get('gallery_log'), dict):
+                metadata['gallery_log'] = {}
+            metadata['gallery_log'][filename] = entry
+            CaosWorldORM.objects.filter(id=jid).update(metadata=metadata)
+
+    world = CaosWorldORM.objects.filter(id=jid).first()
+    if world is not None:
+        post_save.send(sender=CaosWorldORM, instance=world, created=False, update_fields=frozenset({'metadata'}),
+                       raw=False, using=world._state.db)
+
+
+def gallery_log_entry(uploader: str, origin: str, title: Optional[str] = None, period_slug: Optional[str] = None) -> dict:
+    return {
+        "uploader": uploader,
+        "date": datetime.now().strftime("%d/%m/%Y"),
+        "origin": origin,
+        "title": title or "Sin Título",
+        "period": period_slug,  # Nulo = ACTUAL
+    }
+
+
+# --- Encolado ---
+
+def spool_dir() -> Path:
+    from django.conf import settings
+    return Path(settings.IMAGE_SPOOL_DIR)
+
+
+def enqueue_image_proposal(world, image_bytes: bytes, title: str, period_slug: Optional[str], user):
+    """Guarda los bytes recibidos en el spool y encola su conversión a propuesta WebP."""
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    spool = directory / f"{uuid.uuid4().hex}.upload"
+    spool.write_bytes(image_bytes)
+    author = user if user is not None and user.is_authenticated else None
+    return enqueue_job('propose_image', {
+        'world_id': world.id, 'spool': spool.name, 'title': title, 'period': period_slug,
+        'author_id': author.pk if author else None,
+    }, user)
+
+
+def enqueue_image_publication(proposal, user):
+    """
+    Encola la publicación (conversión, galería y gallery_log) de una propuesta de imagen ADD.
+    Antes de encolar, la propuesta pasa a PUBLISHING con un UPDATE condicional: una segunda
+    aprobación mientras se publica no encola otro trabajo (retorna None). El trabajo la
+    archiva con `user` como reviewer al terminar, o le devuelve su estado anterior si falla.
+    """
+    from django.db import transaction
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosImageProposalORM
+
+    reviewer = user if user is not None and user.is_authenticated else None
+    with transaction.atomic():
+        claimed = CaosImageProposalORM.objects.filter(id=proposal.id).exclude(
+            status__in=[PUBLISHING_STATUS, 'ARCHIVED']
+        ).update(status=PUBLISHING_STATUS)
+        if not claimed:
+            return None
+        return enqueue_job('publish_image', {
+            'proposal_id': proposal.id, 'reviewer_id': reviewer.pk if reviewer else None,
+            'previous_status': proposal.status,
+        }, user)
+
+
+# --- Trabajos registrados ---
+
+@job_handler('propose_image', backend=MEDIA_BACKEND)
+def _propose_image(params, report):
+    from django.core.files import File
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosImageProposalORM, CaosWorldORM, TimelinePeriod
+
+    spool = spool_dir() / Path(params['spool']).name
+    converted = spool.with_suffix('.webp')
+    try:
+        world = CaosWorldORM.objects.filter(id=params['world_id']).first()
+        if world is None:
+            raise JobError('La entidad ya no existe.')
+        if not spool.exists():
+            raise JobError('La imagen recibida ya no está disponible.')
+
+        report(10, 'Convirtiendo a WebP...')
+        try:
+            run_cpu(encode_webp, str(spool), str(converted), PROPOSAL_QUALITY)
+        except OSError as e:
+            raise JobError(f'La imagen no es válida: {e}')
+
+        title = params.get('title')
+        with open(converted, 'rb') as f:
+            proposal = CaosImageProposalORM.objects.create(
+                world=world,
+                image=File(f, name=f"{title}.webp"),
+                title=title,
+                author_id=params.get('author_id'),
+                status='PENDING',
+                action='ADD',
+                timeline_period=TimelinePeriod.objects.filter(world=world, slug=params.get('period')).first(),
+            )
+        return {'proposal_id': proposal.id, 'message': 'Imagen enviada a revisión (WebP).'}
+    finally:
+        spool.unlink(missing_ok=True)
+        converted.unlink(missing_ok=True)
+
+
+def _notify_publication_failed(proposal, reviewer_id, error) -> None:
+    """Avisa al reviewer y al autor de que la propuesta sigue pendiente porque no se pudo publicar."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosNotification
+
+    for user_id in {reviewer_id, proposal.author_id} - {None}:
+        CaosNotification.objects.create(
+            user_id=user_id,
+            title="⚠️ Imagen no publicada",
+            message=f"No se pudo publicar la propuesta de imagen '{proposal.title}' para "
+                    f"'{proposal.world.name}': {error}. La propuesta sigue pendiente de revisión.",
+            url=f"/mundo/{proposal.world.public_id}/"
+        )
+
+
+@job_handler('publish_image', backend=MEDIA_BACKEND)
+def _publish_image(params, report):
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosImageProposalORM, CaosNotification
+    from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+    proposal = CaosImageProposalORM.objects.select_related('world', 'author', 'timeline_period').filter(
+        id=params['proposal_id']
+    ).first()
+    if proposal is None or not proposal.image:
+        raise JobError('La propuesta de imagen ya no existe.')
+    if proposal.status == 'ARCHIVED':
+        # Trabajo repetido (doble clic o reencolado tras caerse el worker)
+        return {'filename': None, 'message': 'La propuesta ya estaba publicada.'}
+
+    report(10, 'Procesando la imagen...')
+    reviewer_id = params.get('reviewer_id')
+    try:
+        filename = DjangoCaosRepository().save_manual_file(
+            str(proposal.world.id), proposal.image,
+            username=proposal.author.username if proposal.author else "Anónimo",
+            title=proposal.title,
+            period_slug=proposal.timeline_period.slug if proposal.timeline_period else None,
+        )
+        if not filename:
+            raise JobError('No se pudo procesar la imagen de la propuesta.')
+    except Exception as e:
+        # La propuesta no se archiva: vuelve a la cola de revisión para reintentarla
+        CaosImageProposalORM.objects.filter(id=proposal.id, status=PUBLISHING_STATUS).update(
+            status=params.get('previous_status') or 'PENDING'
+        )
+        _notify_publication_failed(proposal, reviewer_id, e)
+        raise
+
+    proposal.status = 'ARCHIVED'
+    proposal.reviewer_id = reviewer_id
+    proposal.save(update_fields=['status', 'reviewer'])
+
+    if proposal.author:
+        CaosNotification.objects.create(
+            user=proposal.author,
+            title="🚀 ¡Imagen Publicada!",
+            message=f"Tu propuesta de imagen para '{proposal.world.name}' ya está en vivo.",
+            url=f"/mundo/{proposal.world.public_id}/"
+        )
+    return {'filename': filename}
@@ -0,0 +1,135 @@
+"""
+Localizador de imágenes por nombre de archivo (CaosImageLocatorORM).
+
+Sustituye la resolución de claves 'img_' de SocialService, que consultaba
+`metadata__gallery_log__has_key` en todas las entidades y períodos y, como último
+recurso, `CaosEventLog.details__icontains` (escaneo completo del log).
+Prioridad al resolver: galería/portada de entidad > galería de período > log de eventos.
+"""
+import logging
+import re
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PRIORITY = {'world': 0, 'period': 1, 'event': 2}
+
+# Nombres de archivo de imagen mencionados en el texto libre de los logs
+_IMAGE_IN_TEXT = re.compile(r"[^\s:/\\'\"(),]+\.(?:webp|png|jpe?g|gif)", re.IGNORECASE)
+
+
+def _gallery_rows(metadata, **fk):
+    """Filas (archivo, título) de un gallery_log y su portada."""
+    meta = metadata if isinstance(metadata, dict) else {}
+    rows = {}
+    for filename, entry in (meta.get('gallery_log') or {}).items():
+        entry = entry if isinstance(entry, dict) else {}
+        rows[filename.lower()] = dict(fk, filename=filename.lower(), title=str(entry.get('title', filename))[:255])
+    cover = meta.get('cover_image')
+    if cover and cover.lower() not in rows and 'world_id' in fk:
+        rows[cover.lower()] = dict(fk, filename=cover.lower(), title=cover[:255])
+    return list(rows.values())
+
+
+def _locator_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosImageLocatorORM
+    return CaosImageLocatorORM
+
+
+def _replace(filter_kwargs, rows):
+    Locator = _locator_model()
+    try:
+        with transaction.atomic():
+            Locator.objects.filter(**filter_kwargs).delete()
+            Locator.objects.bulk_create([Locator(**row) for row in rows], batch_size=500)
+    except Exception as e:
+        logger.error(f"Error sincronizando localizador de imágenes {filter_kwargs}: {e}")
+
+
+def sync_world_locators(world) -> None:
+    """Reindexa la galería y la portada de una entidad."""
+    _replace({'world_id': world.pk, 'source': 'world'},
+             [dict(r, source='world') for r in _gallery_rows(world.metadata, world_id=world.pk)])
+
+
+def sync_period_locators(period) -> None:
+    """Reindexa la galería de un período de la línea temporal."""
+    _replace({'period_id': period.pk, 'source': 'period'},
+             [dict(r, source='period') for r in _gallery_rows(period.metadata, world_id=period.world_id, period_id=period.pk)])
+
+
+def extract_image_filenames(text: str) -> set:
+    """Archivos de imagen mencionados en un texto libre (en minúsculas)."""
+    return {m.lower() for m in _IMAGE_IN_TEXT.findall(text or '')}
+
+
+def record_event_locators(event) -> None:
+    """El log más reciente que menciona un archivo define su entidad de respaldo."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+    filenames = extract_image_filenames(event.details)
+    if not filenames or not event.target_id:
+        return
+    if not CaosWorldORM.objects.filter(id=event.target_id).exists():
+        return
+    Locator = _locator_model()
+    try:
+        for filename in filenames:
+            Locator.objects.update_or_create(
+                filename=filename[:255], source='event',
+                defaults={'world_id': event.target_id, 'title': filename[:255]}
+            )
+    except Exception as e:
+        logger.error(f"Error registrando localizador desde log {event.pk}: {e}")
+
+
+def build_locator_rows(world_model, period_model, event_log_model, locator_model) -> list:
+    """
+    Construye (sin guardar) todas las filas del localizador.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    rows = []
+    for world in world_model.objects.only('id', 'metadata').iterator(chunk_size=200):
+        rows.extend(locator_model(source='world', **r) for r in _gallery_rows(world.metadata, world_id=world.pk))
+    for period in period_model.objects.only('id', 'world_id', 'metadata').iterator(chunk_size=200):
+        rows.extend(locator_model(source='period', **r)
+                    for r in _gallery_rows(period.metadata, world_id=period.world_id, period_id=period.pk))
+
+    world_ids = set(world_model.objects.values_list('id', flat=True))
+    latest = {}
+    logs = event_log_model.objects.filter(target_id__in=world_ids).only('target_id', 'details').order_by('timestamp', 'id')
+    for log in logs.iterator(chunk_size=1000):
+        for filename in extract_image_filenames(log.details):
+            latest[filename] = log.target_id
+    rows.extend(locator_model(source='event', filename=f[:255], world_id=w, title=f[:255]) for f, w in latest.items())
+    return rows
+
+
+def rebuild_image_locators() -> int:
+    """Reconstruye el localizador completo. Retorna el número de filas."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, TimelinePeriod, CaosEventLog
+
+    Locator = _locator_model()
+    rows = build_locator_rows(CaosWorldORM, TimelinePeriod, CaosEventLog, Locator)
+    with transaction.atomic():
+        Locator.objects.all().delete()
+        Locator.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def locate_images(filenames) -> dict:
+    """
+    Resuelve muchos archivos en una consulta: {filename (minúsculas): {'world', 'title'}}.
+    Los archivos desconocidos no aparecen en el resultado.
+    """
+    wanted = {f.lower() for f in filenames if f}
+    if not wanted:
+        return {}
+    best = {}
+    rows = _locator_model().objects.filter(filename__in=wanted).select_related('world').order_by('world_id', 'id')
+    for row in rows:
+        current = best.get(row.filename)
+        if current is None or SOURCE_PRIORITY[row.source] < SOURCE_PRIORITY[current.source]:
+            best[row.filename] = row
+    return {f: {'world': r.world, 'title': r.title or f} for f, r in best.items()}
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.blob_store import adopt_galleries
+
+
+class Command(BaseCommand):
+    help = ('Mete en el almacén de blobs (direccionado por contenido) las imágenes de galería y de las '
+            'papeleras .trash anteriores a él, deduplicando las copias.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jid', help='Procesar solo la galería de esta entidad (J-ID).')
+
+    def handle(self, *args, **options):
+        jid = options.get('jid')
+        scope = f"la entidad {jid}" if jid else "todas las galerías"
+        self.stdout.write(self.style.NOTICE(f'🔍 Adoptando las imágenes de {scope} en el almacén de blobs...'))
+
+        stats = adopt_galleries(jid=jid)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imágenes adoptadas: {stats['adopted']} en galería, {stats['trashed']} en papelera. "
+            f"Espacio liberado por duplicados: {stats['saved_bytes'] / 1024 / 1024:.1f} MB."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.gallery_index import build_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas (derivados para srcset) de las imágenes del índice de galerías.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jid', help='Procesar solo la galería de esta entidad (J-ID).')
+        parser.add_argument('--force', action='store_true', help='Regenerar también las imágenes que ya tienen derivados.')
+
+    def handle(self, *args, **options):
+        jid = options.get('jid')
+        scope = f"la entidad {jid}" if jid else "todas las galerías"
+        self.stdout.write(self.style.NOTICE(f'🔍 Generando miniaturas de {scope}...'))
+
+        total = build_derivatives(jid=jid, force=options['force'])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Miniaturas generadas: {total} imágenes procesadas.'))
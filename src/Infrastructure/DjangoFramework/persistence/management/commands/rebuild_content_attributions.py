@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.content_attribution import rebuild_content_attributions
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de atribución de contenido (CaosContentAttributionORM) desde metadatos y logs.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('🔍 Reindexando atribuciones de contenido...'))
+
+        total = rebuild_content_attributions()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Índice de atribución actualizado: {total} entradas.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.gallery_index import rebuild_gallery_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de galerías (CaosGalleryImageORM) escaneando static/persistence/img.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jid', help='Reindexar solo la galería de esta entidad (J-ID).')
+
+    def handle(self, *args, **options):
+        jid = options.get('jid')
+        scope = f"la entidad {jid}" if jid else "todas las galerías"
+        self.stdout.write(self.style.NOTICE(f'🔍 Reindexando {scope}...'))
+
+        total = rebuild_gallery_index(jid=jid)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Índice de galerías actualizado: {total} imágenes indexadas.'))
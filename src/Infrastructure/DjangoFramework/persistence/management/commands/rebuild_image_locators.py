@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.image_locator import rebuild_image_locators
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el localizador de imágenes (CaosImageLocatorORM) desde metadatos, períodos y logs.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('🔍 Reindexando localizador de imágenes...'))
+
+        total = rebuild_image_locators()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Localizador de imágenes actualizado: {total} entradas.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.metadata_facets import rebuild_metadata_facets
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye las facetas tipadas de metadata (CaosMetadataFacetORM) de todas las entidades.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('🔍 Extrayendo facetas de metadata...'))
+
+        total = rebuild_metadata_facets()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Facetas de metadata actualizadas: {total} filas.'))
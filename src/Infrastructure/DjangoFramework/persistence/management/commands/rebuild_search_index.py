@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.search_index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda global (CaosSearchDocumentORM) desde entidades y narrativas.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('🔍 Reindexando búsqueda global...'))
+
+        total = rebuild_search_index()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Índice de búsqueda actualizado: {total} documentos.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from src.Infrastructure.DjangoFramework.persistence.engagement_counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de likes/comentarios (y reply_count) desde CaosLike/CaosComment e informa de la deriva.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa de la deriva, sin corregirla.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write(self.style.NOTICE('🔍 Reconciliando contadores de interacción...'))
+
+        drift = reconcile_counters(apply=not dry_run)
+
+        for key, saved, real in drift['counters']:
+            self.stdout.write(
+                f"  {key}: likes {saved['like_count']} → {real['like_count']}, "
+                f"comentarios {saved['comment_count']} → {real['comment_count']}"
+            )
+        for comment_id, saved, real in drift['replies']:
+            self.stdout.write(f"  Comentario {comment_id}: respuestas {saved} → {real}")
+
+        total = len(drift['counters']) + len(drift['replies'])
+        if not total:
+            self.stdout.write(self.style.SUCCESS('✅ Sin deriva: los contadores coinciden con las tablas de origen.'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f'⚠️ Deriva detectada en {total} contadores (sin corregir: --dry-run).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Corregida la deriva de {total} contadores.'))
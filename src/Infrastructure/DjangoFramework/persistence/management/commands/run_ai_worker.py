@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from src.Infrastructure.DjangoFramework.persistence.ai_jobs import (
+    BACKENDS, purge_finished_jobs, requeue_stale_jobs, run_next_job, worker_name
+)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos de IA encolados (CaosAIJobORM). Lanza un worker por backend para serializar cada servidor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=BACKENDS + ('all',), default='all',
+                            help="Backend de IA que atiende este worker (por defecto, todos).")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Segundos de espera con la cola vacía.')
+        parser.add_argument('--stale-after', type=int, default=900,
+                            help='Segundos tras los que un trabajo en curso se considera huérfano y se reencola.')
+        parser.add_argument('--purge-days', type=int, default=7, help='Días que se conservan los trabajos terminados.')
+        parser.add_argument('--once', action='store_true', help='Procesa la cola pendiente y termina.')
+
+    def handle(self, *args, **options):
+        backends = BACKENDS if options['backend'] == 'all' else (options['backend'],)
+        worker = worker_name()
+        self.stdout.write(self.style.NOTICE(f"🔍 Worker de IA {worker} atendiendo: {', '.join(backends)}"))
+
+        purged = purge_finished_jobs(options['purge_days'])
+        if purged:
+            self.stdout.write(f"  Purgados {purged} trabajos antiguos.")
+
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                requeued = requeue_stale_jobs(options['stale_after'], backends)
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"⚠️ Reencolados {requeued} trabajos huérfanos."))
+
+                job = run_next_job(backends, worker)
+                if job is not None:
+                    processed += 1
+                    style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+                    self.stdout.write(style(f"  {job.kind} {job.id}: {job.status}"))
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Trabajos procesados: {processed}.'))
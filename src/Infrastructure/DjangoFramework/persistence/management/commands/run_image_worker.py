@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from src.Infrastructure.DjangoFramework.persistence.ai_jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+from src.Infrastructure.DjangoFramework.persistence.image_jobs import MEDIA_BACKEND, shutdown_pool, start_pool
+
+
+def _run_in_thread(job):
+    try:
+        run_job(job)
+    finally:
+        connections.close_all()  # Conexiones de este hilo
+
+
+class Command(BaseCommand):
+    help = ('Procesa las imágenes encoladas (subidas, propuestas y publicaciones) con un pool de procesos: '
+            'varios trabajos a la vez y la codificación en todos los núcleos.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.IMAGE_WORKER_PROCESSES,
+                            help='Procesos del pool y trabajos simultáneos (0 = uno por núcleo).')
+        parser.add_argument('--inline', action='store_true',
+                            help='Sin pool ni hilos: procesa los trabajos de uno en uno en este proceso.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Segundos de espera con la cola vacía.')
+        parser.add_argument('--stale-after', type=int, default=300,
+                            help='Segundos tras los que un trabajo en curso se considera huérfano y se reencola.')
+        parser.add_argument('--once', action='store_true', help='Procesa la cola pendiente y termina.')
+
+    def _report(self, job):
+        job.refresh_from_db()
+        style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+        self.stdout.write(style(f"  {job.kind} {job.id}: {job.status}"))
+
+    def handle(self, *args, **options):
+        backends = (MEDIA_BACKEND,)
+        worker = worker_name()
+        slots = 1 if options['inline'] else options['processes'] or os.cpu_count()
+        mode = 'en este proceso' if options['inline'] else f'{slots} procesos'
+        self.stdout.write(self.style.NOTICE(f"🔍 Worker de imágenes {worker} ({mode})"))
+
+        threads = None
+        if not options['inline']:
+            start_pool(slots)
+            threads = ThreadPoolExecutor(max_workers=slots, thread_name_prefix='image-job')
+
+        processed = 0
+        inflight = {}
+        try:
+            while True:
+                close_old_connections()
+                requeued = requeue_stale_jobs(options['stale_after'], backends)
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"⚠️ Reencolados {requeued} trabajos huérfanos."))
+
+                # Llenar los huecos libres con trabajos pendientes
+                while len(inflight) < slots:
+                    job = claim_next_job(backends, worker)
+                    if job is None:
+                        break
+                    if threads is None:
+                        run_job(job)
+                        processed += 1
+                        self._report(job)
+                    else:
+                        inflight[threads.submit(_run_in_thread, job)] = job
+
+                if not inflight:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(inflight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    processed += 1
+                    self._report(inflight.pop(future))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if threads is not None:
+                threads.shutdown(wait=True)
+            shutdown_pool()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Imágenes procesadas: {processed}.'))
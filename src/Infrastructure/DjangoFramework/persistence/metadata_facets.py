@@ -0,0 +1,207 @@
+"""
+Facetas tipadas de metadata (CaosMetadataFacetORM).
+
+StructuralSearchUseCase traducía cada filtro a un lookup `metadata__<clave>__<op>`
+sobre el JSON, sin índice que lo respalde y sin poder comparar rangos: las
+propiedades de `datos_nucleo` / `properties` se guardan como texto ("9,8 m/s²").
+Aquí la metadata de cada entidad se aplana en filas (clave, valor numérico, valor
+textual) al guardarla, y los filtros se resuelven con índices (clave, valor) más
+el prefijo de J-ID del contenedor.
+
+Reconstrucción completa: `python manage.py rebuild_metadata_facets`.
+"""
+import logging
+import re
+
+from django.db import transaction
+
+from src.Infrastructure.DjangoFramework.persistence.search_index import fold_text
+
+logger = logging.getLogger(__name__)
+
+# Secciones de metadata que no describen propiedades de la entidad
+NON_FACET_KEYS = frozenset({
+    'cover_image', 'images', 'gallery_log', 'timeline', 'analysis_trace', 'year_range',
+})
+# Secciones cuyo contenido son propiedades (formato V2.0)
+NESTED_SECTIONS = ('datos_nucleo', 'datos_extendidos', 'static_metadata')
+
+NUMERIC_LOOKUPS = ('gt', 'gte', 'lt', 'lte', 'range')
+TEXT_LOOKUPS = ('contains', 'icontains', 'startswith', 'istartswith')
+LOOKUPS = ('exact', 'iexact', 'in') + NUMERIC_LOOKUPS + TEXT_LOOKUPS
+
+_LEADING_NUMBER = re.compile(r'^\s*([-+]?\d+(?:[.,]\d+)*)')
+
+
+def facet_key(key) -> str:
+    """Normaliza una clave: 'Gravedad Media' -> 'gravedad_media'."""
+    return re.sub(r'\W+', '_', fold_text(key)).strip('_')[:100]
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_number(value):
+    """
+    Interpreta un valor como número, tolerando unidades y formato español:
+    '9,8 m/s²' -> 9.8, '1.500 habitantes' -> 1500.0, '1.5' -> 1.5, 'Alta' -> None.
+    Un único punto seguido de exactamente tres dígitos se lee como separador de miles.
+    """
+    if _is_number(value):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _LEADING_NUMBER.match(value)
+    if not match:
+        return None
+    raw = match.group(1)
+    separators = [c for c in raw if c in '.,']
+    if not separators:
+        return float(raw)
+    if len(set(separators)) == 2:
+        # El último separador es el decimal; el otro, de miles
+        decimal = separators[-1]
+        thousands = ',' if decimal == '.' else '.'
+        raw = raw.replace(thousands, '').replace(decimal, '.')
+    elif len(separators) > 1:
+        raw = raw.replace(separators[0], '')
+    elif separators[0] == ',':
+        raw = raw.replace(',', '.')
+    elif re.fullmatch(r'[-+]?\d{1,3}\.\d{3}', raw):
+        raw = raw.replace('.', '')
+    return float(raw)
+
+
+def _properties(metadata: dict):
+    """Pares (clave, valor) de todas las variantes de formato (V1 plano, V2.0 y V2.1)."""
+    for key, value in metadata.items():
+        if key in NON_FACET_KEYS:
+            continue
+        if key == 'properties' and isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and item.get('key'):
+                    yield item['key'], item.get('value')
+        elif key in NESTED_SECTIONS and isinstance(value, dict):
+            yield from value.items()
+        else:
+            yield key, value
+
+
+def extract_facets(metadata) -> list:
+    """Lista de (clave, valor numérico, valor textual) a partir de la metadata de una entidad."""
+    if not isinstance(metadata, dict):
+        return []
+    facets = {}
+    for key, value in _properties(metadata):
+        if isinstance(value, (dict, list)) or value is None or value == '':
+            continue
+        normalized = facet_key(key)
+        if not normalized:
+            continue
+        text = '' if _is_number(value) else fold_text(value).strip()
+        facets[normalized] = (normalized, parse_number(value), text[:255])
+    return list(facets.values())
+
+
+def _facet_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosMetadataFacetORM
+    return CaosMetadataFacetORM
+
+
+def sync_world_facets(world) -> None:
+    """Regenera las facetas de una entidad a partir de su metadata actual."""
+    Facet = _facet_model()
+    rows = [
+        Facet(world_id=world.pk, key=k, numeric_value=n, text_value=t)
+        for k, n, t in extract_facets(world.metadata)
+    ]
+    try:
+        with transaction.atomic():
+            Facet.objects.filter(world_id=world.pk).delete()
+            Facet.objects.bulk_create(rows)
+    except Exception as e:
+        logger.error(f"Error sincronizando facetas de {world.pk}: {e}")
+
+
+def build_facet_rows(world_model, facet_model) -> list:
+    """
+    Construye (sin guardar) todas las facetas.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    return [
+        facet_model(world_id=w.pk, key=k, numeric_value=n, text_value=t)
+        for w in world_model.objects.only('id', 'metadata').iterator(chunk_size=200)
+        for k, n, t in extract_facets(w.metadata)
+    ]
+
+
+def rebuild_metadata_facets() -> int:
+    """Reconstruye todas las facetas. Retorna el número de filas."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+    Facet = _facet_model()
+    rows = build_facet_rows(CaosWorldORM, Facet)
+    with transaction.atomic():
+        Facet.objects.all().delete()
+        Facet.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# --- Consulta ---
+
+def parse_filter(name: str):
+    """
+    'gravedad__gte' -> ('gravedad', 'gte'); 'datos_nucleo__clima' -> ('clima', 'exact').
+    Los prefijos de sección (rutas JSON del formato anterior) se ignoran: la faceta es la hoja.
+    """
+    parts = name.split('__')
+    lookup = parts.pop() if len(parts) > 1 and parts[-1] in LOOKUPS else 'exact'
+    return facet_key(parts[-1]), lookup
+
+
+def _require_number(value) -> float:
+    number = parse_number(value)
+    if number is None:
+        raise ValueError(f"Valor no numérico para un filtro de rango: {value!r}")
+    return number
+
+
+def facet_condition(lookup: str, value) -> dict:
+    """Condición ORM sobre numeric_value / text_value para un lookup de filtro."""
+    if lookup not in LOOKUPS:
+        raise ValueError(f"Operador de faceta no soportado: '{lookup}'")
+    if lookup == 'range':
+        low, high = value
+        return {'numeric_value__range': (_require_number(low), _require_number(high))}
+    if lookup in NUMERIC_LOOKUPS:
+        return {f'numeric_value__{lookup}': _require_number(value)}
+    if lookup in TEXT_LOOKUPS:
+        # El texto ya está normalizado: las variantes 'i' equivalen a las exactas
+        return {f"text_value__{lookup.lstrip('i')}": fold_text(value)}
+    if lookup == 'in':
+        if all(_is_number(v) for v in value):
+            return {'numeric_value__in': [float(v) for v in value]}
+        return {'text_value__in': [fold_text(v) for v in value]}
+    # exact / iexact: los números se comparan como número; el texto, normalizado
+    if _is_number(value):
+        return {'numeric_value': float(value)}
+    return {'text_value': fold_text(value)}
+
+
+def filter_world_ids(container_jid: str, filters: dict):
+    """
+    Subconsulta con los J-ID descendientes de `container_jid` que cumplen todos los filtros.
+    Cada filtro es un semi-join sobre el índice (clave, valor) limitado al subárbol.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+    worlds = CaosWorldORM.objects.filter(id__startswith=container_jid).exclude(id=container_jid)
+    Facet = _facet_model()
+    for name, value in filters.items():
+        key, lookup = parse_filter(name)
+        matching = Facet.objects.filter(
+            world__id__startswith=container_jid, key=key, **facet_condition(lookup, value)
+        ).values('world_id')
+        worlds = worlds.filter(id__in=matching)
+    return worlds.values('id')
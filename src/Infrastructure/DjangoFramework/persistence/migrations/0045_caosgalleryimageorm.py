@@ -0,0 +1,68 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:14
+
+from django.db import migrations, models
+
+
+def backfill_gallery_index(apps, schema_editor):
+    """Indexa las galerías existentes en disco (equivale a `manage.py rebuild_gallery_index`)."""
+    from src.Infrastructure.DjangoFramework.persistence.gallery_index import (
+        get_img_root,
+        iter_disk_galleries,
+        scan_gallery_folder,
+    )
+
+    CaosGalleryImageORM = apps.get_model("persistence", "CaosGalleryImageORM")
+    base_dir = get_img_root()
+    rows = [
+        CaosGalleryImageORM(jid=jid, folder=folder, filename=f, file_mtime=mtime)
+        for jid, folder in iter_disk_galleries(base_dir)
+        for f, mtime in scan_gallery_folder(base_dir / folder)
+    ]
+    CaosGalleryImageORM.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0044_caoscomment_rating_alter_caoscomment_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosGalleryImageORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "jid",
+                    models.CharField(
+                        db_index=True, help_text="J-ID de la entidad propietaria", max_length=100
+                    ),
+                ),
+                (
+                    "folder",
+                    models.CharField(
+                        help_text="Carpeta física (J-ID o legacy '<jid>_Nombre')", max_length=255
+                    ),
+                ),
+                ("filename", models.CharField(db_index=True, max_length=255)),
+                (
+                    "file_mtime",
+                    models.DateTimeField(
+                        blank=True, help_text="Fecha de modificación del archivo", null=True
+                    ),
+                ),
+                ("indexed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "caos_gallery_images",
+                "ordering": ["jid", "filename"],
+                "unique_together": {("jid", "filename")},
+            },
+        ),
+        migrations.RunPython(backfill_gallery_index, migrations.RunPython.noop),
+    ]
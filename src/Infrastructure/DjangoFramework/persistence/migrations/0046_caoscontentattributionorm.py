@@ -0,0 +1,88 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_content_attributions(apps, schema_editor):
+    """Indexa el contenido existente (equivale a `manage.py rebuild_content_attributions`)."""
+    from src.Infrastructure.DjangoFramework.persistence.content_attribution import (
+        build_attribution_rows,
+    )
+
+    Attribution = apps.get_model("persistence", "CaosContentAttributionORM")
+    rows = build_attribution_rows(
+        apps.get_model("persistence", "CaosWorldORM"),
+        apps.get_model("persistence", "CaosEventLog"),
+        Attribution,
+    )
+    Attribution.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0045_caosgalleryimageorm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosContentAttributionORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "username",
+                    models.CharField(
+                        db_index=True, help_text="Usuario atribuido (en minúsculas)", max_length=150
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("cover", "Portada"),
+                            ("gallery", "Galería"),
+                            ("period_cover", "Portada de Período"),
+                            ("period_gallery", "Galería de Período"),
+                            ("historical", "Histórico"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                ("title", models.CharField(blank=True, max_length=255)),
+                (
+                    "meta",
+                    models.JSONField(
+                        blank=True, help_text="Entrada del gallery_log (si aplica)", null=True
+                    ),
+                ),
+                (
+                    "position",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Orden dentro de los metadatos de la entidad"
+                    ),
+                ),
+                (
+                    "world",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attributions",
+                        to="persistence.caosworldorm",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_content_attributions",
+                "ordering": ["world_id", "position"],
+            },
+        ),
+        migrations.RunPython(backfill_content_attributions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:33
+
+from django.db import migrations, models
+
+
+def backfill_entity_key_norm(apps, schema_editor):
+    """Calcula la clave normalizada de los likes y comentarios existentes."""
+    from src.Infrastructure.DjangoFramework.persistence.models import normalize_entity_key
+
+    for model_name in ("CaosLike", "CaosComment"):
+        model = apps.get_model("persistence", model_name)
+        batch = []
+        for obj in model.objects.only("id", "entity_key").iterator(chunk_size=1000):
+            obj.entity_key_norm = normalize_entity_key(obj.entity_key)
+            batch.append(obj)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, ["entity_key_norm"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["entity_key_norm"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0046_caoscontentattributionorm"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="caoscomment",
+            name="entity_key_norm",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="Clave normalizada (ver normalize_entity_key)",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="caoslike",
+            name="entity_key_norm",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                help_text="Clave normalizada (ver normalize_entity_key)",
+                max_length=255,
+            ),
+        ),
+        migrations.RunPython(backfill_entity_key_norm, migrations.RunPython.noop),
+    ]
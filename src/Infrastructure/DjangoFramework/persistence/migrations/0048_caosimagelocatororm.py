@@ -0,0 +1,82 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_image_locators(apps, schema_editor):
+    """Indexa las imágenes existentes (equivale a `manage.py rebuild_image_locators`)."""
+    from src.Infrastructure.DjangoFramework.persistence.image_locator import build_locator_rows
+
+    Locator = apps.get_model("persistence", "CaosImageLocatorORM")
+    rows = build_locator_rows(
+        apps.get_model("persistence", "CaosWorldORM"),
+        apps.get_model("persistence", "TimelinePeriod"),
+        apps.get_model("persistence", "CaosEventLog"),
+        Locator,
+    )
+    Locator.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0047_entity_key_norm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosImageLocatorORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        db_index=True, help_text="Nombre de archivo en minúsculas", max_length=255
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("world", "Entidad"),
+                            ("period", "Período"),
+                            ("event", "Log de Eventos"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("title", models.CharField(blank=True, max_length=255)),
+                (
+                    "period",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_locators",
+                        to="persistence.timelineperiod",
+                    ),
+                ),
+                (
+                    "world",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="image_locators",
+                        to="persistence.caosworldorm",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_image_locators",
+                "ordering": ["filename"],
+            },
+        ),
+        migrations.RunPython(backfill_image_locators, migrations.RunPython.noop),
+    ]
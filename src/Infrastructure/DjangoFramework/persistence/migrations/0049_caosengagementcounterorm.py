@@ -0,0 +1,63 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:44
+
+from django.db import migrations, models
+
+
+def backfill_engagement_counters(apps, schema_editor):
+    """Calcula los contadores y reply_count (equivale a `manage.py reconcile_engagement_counters`)."""
+    from src.Infrastructure.DjangoFramework.persistence.engagement_counters import (
+        build_counter_rows,
+        compute_reply_counts,
+    )
+
+    CaosLike = apps.get_model("persistence", "CaosLike")
+    CaosComment = apps.get_model("persistence", "CaosComment")
+    Counter = apps.get_model("persistence", "CaosEngagementCounterORM")
+    Counter.objects.bulk_create(build_counter_rows(CaosLike, CaosComment, Counter), batch_size=500)
+
+    replies = compute_reply_counts(CaosComment)
+    for comment in CaosComment.objects.only("id", "reply_count").iterator(chunk_size=500):
+        real = replies.get(comment.id, 0)
+        if comment.reply_count != real:
+            CaosComment.objects.filter(id=comment.id).update(reply_count=real)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0048_caosimagelocatororm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosEngagementCounterORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "entity_key_norm",
+                    models.CharField(
+                        help_text="Clave normalizada (ver normalize_entity_key)",
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                ("like_count", models.IntegerField(default=0)),
+                (
+                    "comment_count",
+                    models.IntegerField(
+                        default=0, help_text="Comentarios de primer nivel (sin respuestas)"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "caos_engagement_counters",
+            },
+        ),
+        migrations.RunPython(backfill_engagement_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:48
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Indexa entidades y narrativas existentes (equivale a `manage.py rebuild_search_index`)."""
+    from src.Infrastructure.DjangoFramework.persistence.search_index import (
+        build_document_rows,
+        refresh_search_vectors,
+    )
+
+    Document = apps.get_model("persistence", "CaosSearchDocumentORM")
+    rows = build_document_rows(
+        apps.get_model("persistence", "CaosWorldORM"),
+        apps.get_model("persistence", "CaosNarrativeORM"),
+        Document,
+    )
+    Document.objects.bulk_create(rows, batch_size=500)
+    refresh_search_vectors(Document.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0049_caosengagementcounterorm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosSearchDocumentORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("world", "Entidad"), ("narrative", "Narrativa")], max_length=20
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.CharField(
+                        help_text="J-ID de la entidad o NID de la narrativa", max_length=50
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("title", models.CharField(max_length=255)),
+                (
+                    "body",
+                    models.TextField(
+                        blank=True,
+                        help_text="Descripción de la entidad o contenido de la narrativa",
+                    ),
+                ),
+                (
+                    "metadata_text",
+                    models.TextField(blank=True, help_text="Valores de metadata aplanados"),
+                ),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "world",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="persistence.caosworldorm",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_search_documents",
+                "unique_together": {("kind", "object_id")},
+            },
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        # Índice GIN sobre el tsvector (diccionario 'spanish'), ver search_index.py
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX IF NOT EXISTS idx_search_documents_vector
+                ON caos_search_documents USING GIN (search_vector);
+            """,
+            reverse_sql="DROP INDEX IF EXISTS idx_search_documents_vector;",
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_metadata_facets(apps, schema_editor):
+    """Extrae las facetas existentes (equivale a `manage.py rebuild_metadata_facets`)."""
+    from src.Infrastructure.DjangoFramework.persistence.metadata_facets import build_facet_rows
+
+    Facet = apps.get_model("persistence", "CaosMetadataFacetORM")
+    rows = build_facet_rows(apps.get_model("persistence", "CaosWorldORM"), Facet)
+    Facet.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0050_caossearchdocumentorm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosMetadataFacetORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Clave normalizada (minúsculas, sin acentos, '_' como separador)",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "numeric_value",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Valor numérico si la propiedad es interpretable como número",
+                        null=True,
+                    ),
+                ),
+                (
+                    "text_value",
+                    models.CharField(
+                        blank=True,
+                        help_text="Valor textual normalizado (minúsculas, sin acentos)",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "world",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metadata_facets",
+                        to="persistence.caosworldorm",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_metadata_facets",
+                "indexes": [
+                    models.Index(fields=["key", "numeric_value"], name="idx_facet_key_numeric"),
+                    models.Index(fields=["key", "text_value"], name="idx_facet_key_text"),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_metadata_facets, migrations.RunPython.noop),
+    ]
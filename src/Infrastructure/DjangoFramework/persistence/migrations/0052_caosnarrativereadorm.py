@@ -0,0 +1,59 @@
+# Generated by Django 5.2.9 on 2026-10-17 18:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_narrative_reads(apps, schema_editor):
+    """Lecturas iniciales a partir de los eventos VIEW_NARRATIVE ya registrados."""
+    from src.Infrastructure.DjangoFramework.persistence.narrative_reads import build_read_rows
+
+    CaosEventLog = apps.get_model("persistence", "CaosEventLog")
+    CaosNarrativeORM = apps.get_model("persistence", "CaosNarrativeORM")
+    Read = apps.get_model("persistence", "CaosNarrativeReadORM")
+    Read.objects.bulk_create(build_read_rows(CaosEventLog, CaosNarrativeORM, Read), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0051_caosmetadatafacetorm"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosNarrativeReadORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("last_seen", models.DateTimeField()),
+                (
+                    "narrative",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reads",
+                        to="persistence.caosnarrativeorm",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="narrative_reads",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_narrative_reads",
+                "unique_together": {("user", "narrative")},
+            },
+        ),
+        migrations.RunPython(backfill_narrative_reads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:07
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0052_caosnarrativereadorm"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosAIJobORM",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        help_text="Tipo de trabajo registrado en ai_jobs.JOB_HANDLERS",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "backend",
+                    models.CharField(
+                        help_text="Servidor de IA que usa: 'text' o 'image'", max_length=20
+                    ),
+                ),
+                ("params", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pendiente"),
+                            ("RUNNING", "En curso"),
+                            ("DONE", "Completado"),
+                            ("FAILED", "Fallido"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("progress", models.PositiveSmallIntegerField(default=0, help_text="0-100")),
+                ("progress_message", models.CharField(blank=True, max_length=255)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "worker",
+                    models.CharField(
+                        blank=True, help_text="Worker que lo reclamó (host:pid)", max_length=100
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ai_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_ai_jobs",
+                "indexes": [
+                    models.Index(
+                        fields=["backend", "status", "created_at"], name="idx_ai_job_queue"
+                    )
+                ],
+            },
+        ),
+    ]
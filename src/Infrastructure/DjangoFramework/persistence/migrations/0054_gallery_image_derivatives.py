@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0053_caosaijoborm"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="caosgalleryimageorm",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash del contenido (nombra los derivados en _thumbs/)",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="caosgalleryimageorm",
+            name="width",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Ancho en píxeles del original", null=True
+            ),
+        ),
+    ]
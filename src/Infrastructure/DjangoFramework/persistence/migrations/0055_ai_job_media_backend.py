@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0054_gallery_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="caosaijoborm",
+            name="backend",
+            field=models.CharField(
+                help_text="Servidor que lo atiende: 'text' o 'image' (IA) o 'media' (run_image_worker)",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.9 on 2026-10-17 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("persistence", "0055_ai_job_media_backend"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaosImageBlobORM",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(
+                        help_text="SHA-256 del contenido",
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("extension", models.CharField(default="webp", max_length=10)),
+                ("size", models.PositiveBigIntegerField(default=0, help_text="Bytes")),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Referencias vivas o en papelera"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "caos_image_blobs",
+            },
+        ),
+        migrations.CreateModel(
+            name="CaosImageRefORM",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "jid",
+                    models.CharField(
+                        db_index=True, help_text="J-ID de la entidad propietaria", max_length=100
+                    ),
+                ),
+                (
+                    "folder",
+                    models.CharField(
+                        help_text="Carpeta física del nombre (J-ID o legacy '<jid>_Nombre')",
+                        max_length=255,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[("LIVE", "En galería"), ("TRASHED", "En papelera")],
+                        default="LIVE",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("trashed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "blob",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="refs",
+                        to="persistence.caosimagebloborm",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "caos_image_refs",
+                "indexes": [
+                    models.Index(fields=["jid", "filename", "state"], name="idx_image_ref_name")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("state", "LIVE")),
+                        fields=("jid", "filename"),
+                        name="uniq_live_image_ref",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from datetime import datetime
+import uuid
 import nanoid
 
 # --- FUNCIONES DE UTILIDAD ---
@@ -322,6 +324,123 @@ class CaosImageProposalORM(models.Model):
 
     class Meta: db_table = 'caos_image_proposals'; ordering = ['-created_at']
 
+class CaosGalleryImageORM(models.Model):
+    """
+    Índice persistente de los archivos de galería de cada entidad.
+    Refleja el contenido de 'static/persistence/img/<jid>/' para que las galerías
+    se listen con una consulta indexada en lugar de recorrer el disco en cada petición.
+    Se mantiene desde el repositorio (subidas) y los flujos de papelera.
+    """
+    jid = models.CharField(max_length=100, db_index=True, help_text="J-ID de la entidad propietaria")
+    folder = models.CharField(max_length=255, help_text="Carpeta física (J-ID o legacy '<jid>_Nombre')")
+    filename = models.CharField(max_length=255, db_index=True)
+    file_mtime = models.DateTimeField(null=True, blank=True, help_text="Fecha de modificación del archivo")
+    content_hash = models.CharField(max_length=16, blank=True, default='', help_text="Hash del contenido (nombra los derivados en _thumbs/)")
+    width = models.PositiveIntegerField(null=True, blank=True, help_text="Ancho en píxeles del original")
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'caos_gallery_images'
+        unique_together = ('jid', 'filename')
+        ordering = ['jid', 'filename']
+
+    def __str__(self):
+        return f"{self.folder}/{self.filename}"
+
+class CaosImageBlobORM(models.Model):
+    """
+    Contenido de imagen deduplicado (almacén direccionado por contenido, ver blob_store.py).
+    El archivo vive en 'static/persistence/img/.blobs/<aa>/<bb>/<sha256>.<ext>' una sola vez,
+    aunque varias entidades lo usen; se borra cuando ninguna referencia (viva o en papelera) lo usa.
+    """
+    digest = models.CharField(max_length=64, primary_key=True, help_text="SHA-256 del contenido")
+    extension = models.CharField(max_length=10, default='webp')
+    size = models.PositiveBigIntegerField(default=0, help_text="Bytes")
+    ref_count = models.PositiveIntegerField(default=0, help_text="Referencias vivas o en papelera")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'caos_image_blobs'
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} refs)"
+
+class CaosImageRefORM(models.Model):
+    """
+    Nombre visible de una imagen en la galería de una entidad, apuntando a su blob.
+    Mandar a la papelera, restaurar o mover es cambiar esta fila (y el enlace del nombre).
+    """
+    STATE_CHOICES = [('LIVE', 'En galería'), ('TRASHED', 'En papelera')]
+
+    jid = models.CharField(max_length=100, db_index=True, help_text="J-ID de la entidad propietaria")
+    folder = models.CharField(max_length=255, help_text="Carpeta física del nombre (J-ID o legacy '<jid>_Nombre')")
+    filename = models.CharField(max_length=255)
+    blob = models.ForeignKey(CaosImageBlobORM, on_delete=models.PROTECT, related_name='refs')
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='LIVE')
+    created_at = models.DateTimeField(auto_now_add=True)
+    trashed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'caos_image_refs'
+        constraints = [
+            models.UniqueConstraint(fields=['jid', 'filename'], condition=models.Q(state='LIVE'), name='uniq_live_image_ref'),
+        ]
+        indexes = [
+            models.Index(fields=['jid', 'filename', 'state'], name='idx_image_ref_name'),
+        ]
+
+    def __str__(self):
+        return f"{self.folder}/{self.filename} [{self.state}] -> {self.blob_id[:12]}"
+
+class CaosContentAttributionORM(models.Model):
+    """
+    Índice desnormalizado usuario → imagen atribuida (galerías, portadas, períodos e históricos).
+    Se deriva de los metadatos de cada entidad al guardarla y de los logs de subida,
+    para que 'el contenido de X' se resuelva sin recorrer todos los metadatos.
+    Reconstruible con `python manage.py rebuild_content_attributions`.
+    """
+    KIND_CHOICES = [
+        ('cover', 'Portada'), ('gallery', 'Galería'),
+        ('period_cover', 'Portada de Período'), ('period_gallery', 'Galería de Período'),
+        ('historical', 'Histórico'),
+    ]
+
+    username = models.CharField(max_length=150, db_index=True, help_text="Usuario atribuido (en minúsculas)")
+    world = models.ForeignKey(CaosWorldORM, on_delete=models.CASCADE, null=True, blank=True, related_name='attributions')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    title = models.CharField(max_length=255, blank=True)
+    meta = models.JSONField(null=True, blank=True, help_text="Entrada del gallery_log (si aplica)")
+    position = models.PositiveIntegerField(default=0, help_text="Orden dentro de los metadatos de la entidad")
+
+    class Meta:
+        db_table = 'caos_content_attributions'
+        ordering = ['world_id', 'position']
+
+    def __str__(self):
+        return f"{self.username} → {self.filename} ({self.kind})"
+
+class CaosImageLocatorORM(models.Model):
+    """
+    Índice archivo → (entidad, período, título) para resolver claves 'img_' sin recorrer
+    los metadatos de todas las entidades ni el log de eventos.
+    Se sincroniza al guardar entidades y períodos y al registrar eventos (ver image_locator.py).
+    """
+    SOURCE_CHOICES = [('world', 'Entidad'), ('period', 'Período'), ('event', 'Log de Eventos')]
+
+    filename = models.CharField(max_length=255, db_index=True, help_text="Nombre de archivo en minúsculas")
+    world = models.ForeignKey(CaosWorldORM, on_delete=models.CASCADE, null=True, blank=True, related_name='image_locators')
+    period = models.ForeignKey('TimelinePeriod', on_delete=models.CASCADE, null=True, blank=True, related_name='image_locators')
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    title = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        db_table = 'caos_image_locators'
+        ordering = ['filename']
+
+    def __str__(self):
+        return f"{self.filename} → {self.world_id} ({self.source})"
+
 class MetadataTemplate(models.Model):
     entity_type = models.CharField(max_length=50, unique=True)
     schema_definition = models.JSONField(default=dict)
@@ -361,6 +480,16 @@ def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
         instance.profile.save()
 
+def normalize_entity_key(entity_key):
+    """
+    Clave canónica de una entidad social: minúsculas, sin espacios y con los guiones
+    escapados ('\\u002D') normalizados. Se guarda en `entity_key_norm` al escribir.
+    """
+    if not entity_key:
+        return ""
+    key = str(entity_key).lower().strip()
+    return key.replace('\\u002d', '-')
+
 class CaosLike(models.Model):
     """
     Sistema de 'Likes' simple para cualquier entidad (identificada por string).
@@ -368,6 +497,7 @@ class CaosLike(models.Model):
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='likes')
     entity_key = models.CharField(max_length=255, db_index=True, help_text="ID único de la entidad (ej: 'IMG_filename.jpg')")
+    entity_key_norm = models.CharField(max_length=255, db_index=True, default='', editable=False, help_text="Clave normalizada (ver normalize_entity_key)")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -376,6 +506,10 @@ class CaosLike(models.Model):
             models.Index(fields=['entity_key']),
         ]
 
+    def save(self, *args, **kwargs):
+        self.entity_key_norm = normalize_entity_key(self.entity_key)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username} likes {self.entity_key}"
 
@@ -386,6 +520,7 @@ class CaosComment(models.Model):
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     entity_key = models.CharField(max_length=255, db_index=True)
+    entity_key_norm = models.CharField(max_length=255, db_index=True, default='', editable=False, help_text="Clave normalizada (ver normalize_entity_key)")
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -414,9 +549,129 @@ class CaosComment(models.Model):
     class Meta:
         ordering = ['created_at'] # Cronológico
 
+    def save(self, *args, **kwargs):
+        self.entity_key_norm = normalize_entity_key(self.entity_key)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username}: {self.content[:20]}..."
 
+class CaosEngagementCounterORM(models.Model):
+    """
+    Contadores desnormalizados de interacción por entidad (clave social normalizada).
+    Se mantienen en la misma transacción que crea/borra CaosLike y CaosComment
+    (ver engagement_counters.py) y se reconcilian con `manage.py reconcile_engagement_counters`.
+    """
+    entity_key_norm = models.CharField(max_length=255, unique=True, help_text="Clave normalizada (ver normalize_entity_key)")
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0, help_text="Comentarios de primer nivel (sin respuestas)")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'caos_engagement_counters'
+
+    def __str__(self):
+        return f"{self.entity_key_norm}: {self.like_count} likes, {self.comment_count} comentarios"
+
+class CaosSearchDocumentORM(models.Model):
+    """
+    Documento del índice de búsqueda global (una fila por entidad o narrativa).
+    `world` es la entidad cuya visibilidad gobierna el documento (la propia entidad o
+    la de la narrativa), de modo que el filtro de permisos va dentro de la consulta.
+    En PostgreSQL `search_vector` (GIN, diccionario 'spanish') se rellena al indexar;
+    en otros motores se usa el índice invertido en memoria de search_index.py.
+    """
+    KIND_CHOICES = [('world', 'Entidad'), ('narrative', 'Narrativa')]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=50, help_text="J-ID de la entidad o NID de la narrativa")
+    world = models.ForeignKey(CaosWorldORM, on_delete=models.CASCADE, related_name='search_documents')
+    is_active = models.BooleanField(default=True)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True, help_text="Descripción de la entidad o contenido de la narrativa")
+    metadata_text = models.TextField(blank=True, help_text="Valores de metadata aplanados")
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'caos_search_documents'
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} ({self.title})"
+
+class CaosMetadataFacetORM(models.Model):
+    """
+    Faceta tipada extraída de la metadata de una entidad (una fila por propiedad).
+    Permite filtros estructurales por rango/igualdad con índices B-tree en lugar de
+    lookups sobre el JSON (ver metadata_facets.py). Se regenera al guardar la entidad.
+    """
+    world = models.ForeignKey(CaosWorldORM, on_delete=models.CASCADE, related_name='metadata_facets')
+    key = models.CharField(max_length=100, help_text="Clave normalizada (minúsculas, sin acentos, '_' como separador)")
+    numeric_value = models.FloatField(null=True, blank=True, help_text="Valor numérico si la propiedad es interpretable como número")
+    text_value = models.CharField(max_length=255, blank=True, help_text="Valor textual normalizado (minúsculas, sin acentos)")
+
+    class Meta:
+        db_table = 'caos_metadata_facets'
+        indexes = [
+            models.Index(fields=['key', 'numeric_value'], name='idx_facet_key_numeric'),
+            models.Index(fields=['key', 'text_value'], name='idx_facet_key_text'),
+        ]
+
+    def __str__(self):
+        return f"{self.world_id}.{self.key} = {self.numeric_value if self.numeric_value is not None else self.text_value}"
+
+class CaosNarrativeReadORM(models.Model):
+    """
+    Registro de lectura (usuario, narrativa, última visita) con semántica de upsert.
+    Alimenta la insignia 'nuevo' del índice de narrativas consultando solo las narrativas
+    mostradas, en lugar de recorrer el historial de CaosEventLog (ver narrative_reads.py).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='narrative_reads')
+    narrative = models.ForeignKey(CaosNarrativeORM, on_delete=models.CASCADE, related_name='reads')
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        db_table = 'caos_narrative_reads'
+        unique_together = ('user', 'narrative')
+
+    def __str__(self):
+        return f"{self.user_id} leyó {self.narrative_id} ({self.last_seen})"
+
+class CaosAIJobORM(models.Model):
+    """
+    Trabajo de IA en segundo plano (cola en base de datos, sin broker externo).
+    Las vistas lo encolan y responden al instante; `manage.py run_ai_worker` lo ejecuta
+    y el cliente consulta su estado (ver ai_jobs.py). Un worker por backend serializa
+    el uso de cada servidor de IA.
+    """
+    STATUS_CHOICES = [('PENDING', 'Pendiente'), ('RUNNING', 'En curso'), ('DONE', 'Completado'), ('FAILED', 'Fallido')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50, help_text="Tipo de trabajo registrado en ai_jobs.JOB_HANDLERS")
+    backend = models.CharField(max_length=20, help_text="Servidor que lo atiende: 'text' o 'image' (IA) o 'media' (run_image_worker)")
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='ai_jobs')
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.PositiveSmallIntegerField(default=0, help_text="0-100")
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, help_text="Worker que lo reclamó (host:pid)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'caos_ai_jobs'
+        indexes = [
+            models.Index(fields=['backend', 'status', 'created_at'], name='idx_ai_job_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} [{self.status}] {self.id}"
+
 class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
@@ -0,0 +1,86 @@
+"""
+Registro de lecturas de narrativas (CaosNarrativeReadORM).
+
+get_visited_narrative_ids() cargaba en memoria todos los eventos VIEW_NARRATIVE
+del usuario en cada render del índice de narrativas; el log crece sin límite,
+así que el coste crecía con el historial de lectura. Aquí cada par
+(usuario, narrativa) es una única fila que se actualiza en cada visita, y las
+consultas se limitan a las narrativas que se van a mostrar.
+
+CaosEventLog sigue registrando la visita como auditoría.
+"""
+import logging
+
+from django.db.models import Max
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _read_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosNarrativeReadORM
+    return CaosNarrativeReadORM
+
+
+def mark_narrative_read(user, nid: str, seen_at=None) -> None:
+    """Registra (o refresca) la lectura de una narrativa por un usuario autenticado."""
+    if not user or not user.is_authenticated or not nid:
+        return
+    Read = _read_model()
+    try:
+        Read.objects.bulk_create(
+            [Read(user_id=user.pk, narrative_id=nid, last_seen=seen_at or timezone.now())],
+            update_conflicts=True,
+            unique_fields=['user', 'narrative'],
+            update_fields=['last_seen'],
+        )
+    except Exception as e:
+        logger.error(f"Error registrando lectura de {nid}: {e}")
+
+
+def read_narrative_ids(user, nids) -> set:
+    """Subconjunto de `nids` que el usuario ya ha leído (una consulta acotada por len(nids))."""
+    nids = [n for n in nids if n]
+    if not user or not user.is_authenticated or not nids:
+        return set()
+    return set(
+        _read_model().objects.filter(user_id=user.pk, narrative_id__in=nids).values_list('narrative_id', flat=True)
+    )
+
+
+def build_read_rows(event_model, narrative_model, read_model) -> list:
+    """
+    Construye (sin guardar) las lecturas a partir de los eventos VIEW_NARRATIVE históricos.
+    El evento guarda el identificador de la URL (NID o public_id), que se resuelve al NID.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    visits = (
+        event_model.objects.filter(action='VIEW_NARRATIVE', user__isnull=False, target_id__isnull=False)
+        .order_by()
+        .values('user_id', 'target_id')
+        .annotate(last_seen=Max('timestamp'))
+    )
+    latest = {}
+    for row in visits.iterator(chunk_size=1000):
+        latest.setdefault(row['target_id'], []).append((row['user_id'], row['last_seen']))
+    if not latest:
+        return []
+
+    to_nid = {}
+    for nid, public_id in narrative_model.objects.values_list('nid', 'public_id').iterator(chunk_size=1000):
+        to_nid[nid] = nid
+        to_nid[public_id] = nid
+
+    reads = {}
+    for target, seen in latest.items():
+        nid = to_nid.get(target)
+        if not nid:
+            continue
+        for user_id, last_seen in seen:
+            key = (user_id, nid)
+            if key not in reads or reads[key] < last_seen:
+                reads[key] = last_seen
+    return [
+        read_model(user_id=user_id, narrative_id=nid, last_seen=last_seen)
+        for (user_id, nid), last_seen in reads.items()
+    ]
@@ -1,6 +1,7 @@
 import logging
 from django.db.models import Q
 from .models import CaosWorldORM
+from .identity_map import memoize
 
 # Security logger
 security_logger = logging.getLogger('security')
@@ -39,14 +40,31 @@ def get_visibility_q_filter(user):
 
     return Q(status='LIVE', visible_publico=True)
 
+def get_visibility_class(user):
+    """
+    Retorna la 'clase de visibilidad' de un usuario: usuarios de la misma clase ven exactamente
+    los mismos mundos, por lo que pueden compartir resultados cacheados.
+    """
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_superuser:
+        return 'super'
+    # Admins y Subadmins dependen de sus jefes/colaboradores: clase propia por usuario
+    if hasattr(user, 'profile') and user.profile.rank in ('ADMIN', 'SUBADMIN'):
+        return f"user:{user.pk}"
+    return 'public'
+
 def get_user_access_level(user, world):
     """
     Retorna el nivel de acceso del usuario sobre un mundo específico.
+    Solo depende del autor: se memoiza por (usuario, autor) durante la petición.
     """
     if not user.is_authenticated: return 'NONE'
     if user.is_superuser: return 'SUPERUSER'
-    if world.author == user: return 'OWNER'
-    
+    if world.author_id == user.pk: return 'OWNER'
+    return memoize(('access_level', user.pk, world.author_id), lambda: _collaborator_level(user, world))
+
+def _collaborator_level(user, world):
     if hasattr(user, 'profile') and hasattr(world.author, 'profile'):
         # Minion -> Boss (Covers SubAdmin -> Admin and Admin -> Admin collab)
         if user.profile.bosses.filter(user=world.author).exists(): return 'COLLABORATOR'
@@ -139,12 +157,22 @@ def can_user_moderate_comment(user, comment):
     if user == comment.user:
         return True
         
-    u_rank = get_rank_weight(user)
-    a_rank = get_rank_weight(comment.user)
+    return can_user_moderate_author(user, comment.user_id, get_rank_weight(comment.user))
+
+def can_user_moderate_author(user, author_id, author_rank, user_rank=None):
+    """
+    Igual que can_user_moderate_comment, con el rango del autor (y opcionalmente el del
+    usuario) ya calculado con get_rank_weight. Lo usan los hilos de comentarios, que
+    calculan el rango una vez por autor distinto.
+    """
+    if not user.is_authenticated: return False
+    if user.pk == author_id: return True
+
+    u_rank = get_rank_weight(user) if user_rank is None else user_rank
     
     # Solo moderadores (Subadmin+) pueden moderar a otros
     if u_rank < 2:
         return False
         
     # No puede moderar a un superior (u_rank debe ser >= a_rank)
-    return u_rank >= a_rank
+    return u_rank >= author_rank
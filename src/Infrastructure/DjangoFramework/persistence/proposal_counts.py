@@ -0,0 +1,57 @@
+"""
+Contadores de propuestas pendientes (buzones del Dashboard y barra de administración).
+
+Sustituye los tres COUNT por usuario (mundos, narrativas, imágenes) por una única
+agregación agrupada por autor. El resultado se cachea brevemente y se invalida cuando
+una propuesta cambia de estado (ver signals.py); las actualizaciones masivas con
+.update() no disparan señales y deben llamar a invalidate_proposal_counts().
+"""
+from django.db.models import Count
+
+from src.Infrastructure.DjangoFramework.persistence.caching import (
+    GenerationalCache, bump_generation, PROPOSALS_NAMESPACE
+)
+
+PENDING_COUNTS_TIMEOUT = 60
+
+_counts_cache = GenerationalCache(PROPOSALS_NAMESPACE, timeout=PENDING_COUNTS_TIMEOUT)
+
+
+def get_pending_counts_by_author():
+    """
+    Retorna {author_id: nº de propuestas PENDING} sumando mundos, narrativas e imágenes.
+    Se resuelve en una sola consulta (UNION ALL de los tres GROUP BY).
+    """
+    counts = _counts_cache.get('by_author')
+    if counts is not None:
+        return counts
+
+    from src.Infrastructure.DjangoFramework.persistence.models import (
+        CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM
+    )
+
+    grouped = [
+        model.objects.filter(status='PENDING', author__isnull=False)
+        .values('author_id').annotate(n=Count('id')).order_by()
+        for model in (CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM)
+    ]
+
+    counts = {}
+    for row in grouped[0].union(*grouped[1:], all=True):
+        counts[row['author_id']] = counts.get(row['author_id'], 0) + row['n']
+
+    _counts_cache.set('by_author', counts)
+    return counts
+
+
+def annotate_pending_counts(authors):
+    """Añade `pending_count` a cada usuario de la lista sin consultas adicionales."""
+    counts = get_pending_counts_by_author()
+    for author in authors:
+        author.pending_count = counts.get(author.id, 0)
+    return authors
+
+
+def invalidate_proposal_counts():
+    """Invalida los contadores cacheados tras un cambio de estado de propuestas."""
+    bump_generation(PROPOSALS_NAMESPACE)
@@ -0,0 +1,295 @@
+"""
+Índice de búsqueda global de entidades y narrativas (CaosSearchDocumentORM).
+
+Sustituye los `icontains` de global_search (incluido el cast a texto de todo el
+JSON de metadata) por un índice de texto completo:
+
+- PostgreSQL: columna tsvector con diccionario 'spanish' (título > descripción/contenido
+  > metadata), índice GIN y ranking con ts_rank. Las consultas usan prefijos
+  (`termino:*`) para que la búsqueda mientras se escribe funcione.
+- Otros motores (tests con SQLite): índice invertido en memoria por proceso, con
+  plegado de acentos y prefijos, reconstruido cuando cambia la generación del índice.
+
+En ambos casos el filtro de visibilidad va en la misma consulta que el índice.
+Los documentos se actualizan al guardar entidades y narrativas (señales) y pueden
+reconstruirse con `python manage.py rebuild_search_index`.
+"""
+import bisect
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from src.Infrastructure.DjangoFramework.persistence.caching import (
+    bump_generation, get_generation, SEARCH_INDEX_NAMESPACE
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'spanish'
+MAX_RESULTS = 20
+
+# Palabras vacías para el índice en memoria (PostgreSQL usa las del diccionario 'spanish')
+STOPWORDS = frozenset(
+    'a al con de del el en es la las lo los o para por que se su sus un una uno y'.split()
+)
+
+# Peso de cada campo en el índice en memoria (equivalente a los pesos A/B/C de tsvector)
+FIELD_WEIGHTS = (('title', 1.0), ('body', 0.4), ('metadata_text', 0.2))
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _document_model():
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosSearchDocumentORM
+    return CaosSearchDocumentORM
+
+
+def uses_postgres_search() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+# --- Extracción de texto ---
+
+def fold_text(text: str) -> str:
+    """Minúsculas y sin acentos ('Canción' -> 'cancion')."""
+    decomposed = unicodedata.normalize('NFKD', str(text or '').lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list:
+    """Términos indexables de un texto (plegados, sin palabras vacías)."""
+    return [t for t in _WORD.findall(fold_text(text)) if t not in STOPWORDS]
+
+
+def flatten_metadata(metadata) -> str:
+    """Concatena los valores (no las claves) de un JSON de metadata, recorriendo listas y dicts."""
+    values = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, (list, tuple)):
+            for value in node:
+                walk(value)
+        elif isinstance(node, (str, int, float)) and not isinstance(node, bool):
+            text = str(node).strip()
+            if text:
+                values.append(text)
+
+    walk(metadata or {})
+    return ' '.join(dict.fromkeys(values))
+
+
+def world_document_fields(world) -> dict:
+    return {
+        'world_id': world.pk,
+        'is_active': world.is_active,
+        'title': (world.name or '')[:255],
+        'body': world.description or '',
+        'metadata_text': flatten_metadata(world.metadata),
+    }
+
+
+def narrative_document_fields(narrative) -> dict:
+    return {
+        'world_id': narrative.world_id,
+        'is_active': narrative.is_active,
+        'title': (narrative.titulo or '')[:255],
+        'body': narrative.contenido or '',
+        'metadata_text': '',
+    }
+
+
+# --- Escritura ---
+
+def refresh_search_vectors(queryset) -> None:
+    """Recalcula la columna tsvector de los documentos (solo PostgreSQL)."""
+    if not uses_postgres_search():
+        return
+    from django.contrib.postgres.search import SearchVector
+
+    queryset.update(search_vector=(
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('body', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('metadata_text', weight='C', config=SEARCH_CONFIG)
+    ))
+
+
+def invalidate_search_index() -> None:
+    """Fuerza la reconstrucción del índice en memoria en la próxima búsqueda."""
+    bump_generation(SEARCH_INDEX_NAMESPACE)
+
+
+def _index(kind: str, object_id: str, fields: dict) -> None:
+    Document = _document_model()
+    try:
+        Document.objects.update_or_create(kind=kind, object_id=object_id, defaults=fields)
+        refresh_search_vectors(Document.objects.filter(kind=kind, object_id=object_id))
+    except Exception as e:
+        logger.error(f"Error indexando {kind}:{object_id} para búsqueda: {e}")
+    invalidate_search_index()
+
+
+def index_world(world) -> None:
+    _index('world', world.pk, world_document_fields(world))
+
+
+def index_narrative(narrative) -> None:
+    if narrative.world_id:
+        _index('narrative', narrative.pk, narrative_document_fields(narrative))
+
+
+def remove_narrative(nid: str) -> None:
+    _document_model().objects.filter(kind='narrative', object_id=nid).delete()
+    invalidate_search_index()
+
+
+def build_document_rows(world_model, narrative_model, document_model) -> list:
+    """
+    Construye (sin guardar) todos los documentos del índice.
+    Recibe los modelos para poder usarse también desde migraciones (modelos históricos).
+    """
+    rows = [
+        document_model(kind='world', object_id=w.pk, **world_document_fields(w))
+        for w in world_model.objects.only('id', 'name', 'description', 'metadata', 'is_active').iterator(chunk_size=200)
+    ]
+    narratives = narrative_model.objects.filter(world__isnull=False).only(
+        'nid', 'world_id', 'titulo', 'contenido', 'is_active'
+    )
+    rows.extend(
+        document_model(kind='narrative', object_id=n.pk, **narrative_document_fields(n))
+        for n in narratives.iterator(chunk_size=200)
+    )
+    return rows
+
+
+def rebuild_search_index() -> int:
+    """Reconstruye el índice completo. Retorna el número de documentos."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosNarrativeORM
+
+    Document = _document_model()
+    rows = build_document_rows(CaosWorldORM, CaosNarrativeORM, Document)
+    with transaction.atomic():
+        Document.objects.all().delete()
+        Document.objects.bulk_create(rows, batch_size=500)
+        refresh_search_vectors(Document.objects.all())
+    invalidate_search_index()
+    return len(rows)
+
+
+# --- Índice invertido en memoria (motores sin búsqueda de texto completo) ---
+
+class InvertedIndex:
+    """Índice término -> {documento: peso} con búsqueda por prefijo (todos los términos deben aparecer)."""
+
+    def __init__(self, documents):
+        postings = defaultdict(lambda: defaultdict(float))
+        for doc in documents:
+            for field, weight in FIELD_WEIGHTS:
+                for term in tokenize(doc[field]):
+                    postings[term][doc['id']] += weight
+        self.postings = {term: dict(docs) for term, docs in postings.items()}
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, prefix: str) -> dict:
+        matches = defaultdict(float)
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            for doc_id, weight in self.postings[term].items():
+                matches[doc_id] += weight
+        return matches
+
+    def search(self, query: str) -> dict:
+        """{doc_id: puntuación} de los documentos que contienen todos los términos (como prefijo)."""
+        terms = tokenize(query) or _WORD.findall(fold_text(query))
+        if not terms:
+            return {}
+        scores = None
+        for term in terms:
+            matches = self._expand(term)
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {d: s + matches[d] for d, s in scores.items() if d in matches}
+            if not scores:
+                return {}
+        return scores
+
+
+_memory_index = {'generation': None, 'index': None}
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index() -> InvertedIndex:
+    generation = get_generation(SEARCH_INDEX_NAMESPACE)
+    if _memory_index['generation'] == generation:
+        return _memory_index['index']
+    with _memory_index_lock:
+        if _memory_index['generation'] != generation:
+            documents = _document_model().objects.values('id', *(f for f, _ in FIELD_WEIGHTS))
+            _memory_index['index'] = InvertedIndex(documents)
+            _memory_index['generation'] = generation
+    return _memory_index['index']
+
+
+# --- Consulta ---
+
+def _visible_documents(user):
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+    from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
+
+    documents = _document_model().objects.filter(is_active=True).select_related('world')
+    if user.is_superuser:
+        return documents
+    return documents.filter(world__in=CaosWorldORM.objects.filter(get_visibility_q_filter(user)))
+
+
+def _prefix_tsquery(query: str):
+    from django.contrib.postgres.search import SearchQuery
+
+    terms = _WORD.findall(query)
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f"{t}:*" for t in terms), config=SEARCH_CONFIG, search_type='raw')
+
+
+def search_documents(query: str, user, kind: str, limit: int = MAX_RESULTS) -> list:
+    """
+    Documentos de un tipo ('world' / 'narrative') visibles para `user` que casan con `query`,
+    ordenados por relevancia.
+    """
+    documents = _visible_documents(user).filter(kind=kind)
+
+    if uses_postgres_search():
+        from django.contrib.postgres.search import SearchRank
+
+        tsquery = _prefix_tsquery(query)
+        if tsquery is None:
+            return []
+        return list(
+            documents.filter(search_vector=tsquery)
+            .annotate(rank=SearchRank(F('search_vector'), tsquery))
+            .order_by('-rank', 'title')[:limit]
+        )
+
+    scores = get_memory_index().search(query)
+    if not scores:
+        return []
+    candidates = list(documents.filter(id__in=list(scores)))
+    candidates.sort(key=lambda d: (-scores[d.id], d.title))
+    return candidates[:limit]
+
+
+def matched_in_metadata(query: str, document) -> bool:
+    """True si la búsqueda no se explica por el título/descripción (la coincidencia está en metadata)."""
+    visible_terms = set(tokenize(f"{document.title} {document.body}"))
+    terms = tokenize(query)
+    return bool(terms) and not all(any(v.startswith(t) for v in visible_terms) for t in terms)
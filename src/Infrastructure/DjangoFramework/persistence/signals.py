@@ -1,7 +1,28 @@
-from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosVersionORM, CaosNarrativeVersionORM, CaosImageProposalORM, TimelinePeriodVersion,
+    CaosNotification, Message, CaosEventLog, TimelinePeriod, CaosLike, CaosComment, CaosNarrativeORM
+)
+from src.Infrastructure.DjangoFramework.persistence.caching import (
+    bump_generation, WORLD_TREE_NAMESPACE, WORLD_CHILDREN_NAMESPACE, HOME_INDEX_NAMESPACE, PROPOSALS_NAMESPACE
+)
+from src.Infrastructure.DjangoFramework.persistence.badges import invalidate_user_badges
+from src.Infrastructure.DjangoFramework.persistence.content_attribution import (
+    sync_world_attributions, record_event_attribution
+)
+from src.Infrastructure.DjangoFramework.persistence.image_locator import (
+    sync_world_locators, sync_period_locators, record_event_locators
+)
+from src.Infrastructure.DjangoFramework.persistence.engagement_counters import adjust_counter, adjust_reply_count
+from src.Infrastructure.DjangoFramework.persistence.comment_threads import invalidate_thread
+from src.Infrastructure.DjangoFramework.persistence.metadata_facets import sync_world_facets
+from src.Infrastructure.DjangoFramework.persistence.identity_map import forget_world
+from src.Infrastructure.DjangoFramework.persistence.search_index import (
+    index_world, index_narrative, remove_narrative, invalidate_search_index
+)
 
 @receiver(pre_delete, sender=User)
 def prevent_critical_user_deletion(sender, instance, **kwargs):
@@ -19,3 +40,149 @@ def prevent_critical_user_deletion(sender, instance, **kwargs):
         raise PermissionDenied(
             f"⛔ ERROR CRÍTICO: El usuario '{instance.username}' está PROTEGIDO por el núcleo del sistema y su eliminación está prohibida."
         )
+
+
+@receiver(post_save, sender=CaosWorldORM)
+@receiver(post_delete, sender=CaosWorldORM)
+def invalidate_world_structure_caches(sender, instance, **kwargs):
+    """
+    Invalida las estructuras materializadas de la jerarquía (Mapa del Árbol, hijos visibles e
+    índice del Home) cuando una entidad se crea, mueve, borra o cambia de estado/visibilidad/portada.
+    """
+    bump_generation(WORLD_TREE_NAMESPACE)
+    bump_generation(WORLD_CHILDREN_NAMESPACE)
+    bump_generation(HOME_INDEX_NAMESPACE)
+    # Lecturas posteriores de la misma petición ven la fila nueva
+    forget_world(instance.id, instance.public_id)
+
+
+@receiver(post_save, sender=CaosVersionORM)
+@receiver(post_save, sender=CaosNarrativeVersionORM)
+@receiver(post_save, sender=CaosImageProposalORM)
+@receiver(post_save, sender=TimelinePeriodVersion)
+@receiver(post_delete, sender=CaosVersionORM)
+@receiver(post_delete, sender=CaosNarrativeVersionORM)
+@receiver(post_delete, sender=CaosImageProposalORM)
+@receiver(post_delete, sender=TimelinePeriodVersion)
+def invalidate_proposal_caches(sender, instance, **kwargs):
+    """
+    Invalida los contadores de propuestas pendientes (buzones y badges)
+    cuando una propuesta se crea, cambia de estado o se borra.
+    """
+    bump_generation(PROPOSALS_NAMESPACE)
+
+
+@receiver(post_save, sender=CaosNotification)
+@receiver(post_delete, sender=CaosNotification)
+def invalidate_notification_badges(sender, instance, **kwargs):
+    """Refresca el badge de notificaciones del destinatario."""
+    invalidate_user_badges(instance.user_id)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_message_badges(sender, instance, **kwargs):
+    """Refresca el contador de mensajes sin leer del destinatario."""
+    invalidate_user_badges(instance.recipient_id)
+
+
+@receiver(post_save, sender=CaosWorldORM)
+def sync_world_content_attributions(sender, instance, raw=False, **kwargs):
+    """Mantiene los índices de atribución y de localización de imágenes de la entidad."""
+    if not raw:
+        sync_world_attributions(instance)
+        sync_world_locators(instance)
+
+
+@receiver(post_save, sender=TimelinePeriod)
+def sync_period_image_locators(sender, instance, raw=False, **kwargs):
+    """Mantiene el localizador de imágenes al cambiar la galería de un período."""
+    if not raw:
+        sync_period_locators(instance)
+
+
+@receiver(post_save, sender=CaosEventLog)
+def record_historical_attribution(sender, instance, created, raw=False, **kwargs):
+    """Registra las imágenes de los logs (contenido histórico y entidad de respaldo)."""
+    if created and not raw:
+        record_event_attribution(instance)
+        record_event_locators(instance)
+
+
+@receiver(post_save, sender=CaosLike)
+def increment_like_counter(sender, instance, created, raw=False, **kwargs):
+    """Mantiene CaosEngagementCounterORM.like_count al dar like."""
+    if created and not raw:
+        adjust_counter(instance.entity_key_norm, 'like_count', 1)
+
+
+@receiver(post_delete, sender=CaosLike)
+def decrement_like_counter(sender, instance, **kwargs):
+    """Mantiene CaosEngagementCounterORM.like_count al quitar un like."""
+    adjust_counter(instance.entity_key_norm, 'like_count', -1)
+
+
+def _adjust_comment_counters(comment, delta):
+    # Las respuestas cuentan en el padre (reply_count); el resto en la entidad (comment_count)
+    if comment.parent_comment_id:
+        adjust_reply_count(comment.parent_comment_id, delta)
+    else:
+        adjust_counter(comment.entity_key_norm, 'comment_count', delta)
+
+
+@receiver(post_save, sender=CaosComment)
+def increment_comment_counters(sender, instance, created, raw=False, **kwargs):
+    """Mantiene comment_count de la entidad y reply_count del padre al comentar."""
+    if created and not raw:
+        _adjust_comment_counters(instance, 1)
+
+
+@receiver(post_delete, sender=CaosComment)
+def decrement_comment_counters(sender, instance, **kwargs):
+    """Mantiene comment_count de la entidad y reply_count del padre al borrar un comentario."""
+    _adjust_comment_counters(instance, -1)
+
+
+@receiver(post_save, sender=CaosComment)
+def invalidate_comment_thread_on_save(sender, instance, raw=False, **kwargs):
+    """Invalida la primera página cacheada del hilo (comentario nuevo, editado o respuesta)."""
+    if not raw:
+        invalidate_thread(instance.entity_key_norm)
+
+
+@receiver(post_delete, sender=CaosComment)
+def invalidate_comment_thread_on_delete(sender, instance, **kwargs):
+    """Invalida la primera página cacheada del hilo al borrar un comentario."""
+    invalidate_thread(instance.entity_key_norm)
+
+
+@receiver(post_save, sender=CaosWorldORM)
+def index_world_for_search(sender, instance, raw=False, **kwargs):
+    """Mantiene el documento de búsqueda de la entidad (nombre, descripción, metadata)."""
+    if not raw:
+        index_world(instance)
+
+
+@receiver(post_save, sender=CaosWorldORM)
+def sync_world_metadata_facets(sender, instance, raw=False, **kwargs):
+    """Regenera las facetas tipadas de metadata (búsqueda estructural)."""
+    if not raw:
+        sync_world_facets(instance)
+
+
+@receiver(post_delete, sender=CaosWorldORM)
+def unindex_world_for_search(sender, instance, **kwargs):
+    """Los documentos se borran en cascada; el índice en memoria debe reconstruirse."""
+    invalidate_search_index()
+
+
+@receiver(post_save, sender=CaosNarrativeORM)
+def index_narrative_for_search(sender, instance, raw=False, **kwargs):
+    """Mantiene el documento de búsqueda de la narrativa (se publica vía save())."""
+    if not raw:
+        index_narrative(instance)
+
+
+@receiver(post_delete, sender=CaosNarrativeORM)
+def unindex_narrative_for_search(sender, instance, **kwargs):
+    remove_narrative(instance.pk)
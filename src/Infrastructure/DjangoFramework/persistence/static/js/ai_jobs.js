@@ -0,0 +1,49 @@
+/**
+ * AI Jobs - Cliente de la cola de trabajos de IA
+ * Las peticiones de generación responden al instante con un job (202 + status_url);
+ * este módulo consulta el estado hasta que el trabajo termina.
+ */
+
+const CaosAIJobs = {
+    /**
+     * Espera a que termine un trabajo encolado.
+     * @param {object} accepted - Respuesta del endpoint que encoló el trabajo ({status_url, ...})
+     * @param {function} onProgress - Opcional: recibe el estado en cada consulta
+     * @returns {Promise<object>} resultado del trabajo (p. ej. {image}, {lore}, {metadata})
+     */
+    async wait(accepted, onProgress = null, { interval = 1500, timeout = 15 * 60 * 1000 } = {}) {
+        if (!accepted || !accepted.status_url) {
+            throw new Error((accepted && (accepted.error || accepted.message)) || 'No se pudo encolar la petición de IA');
+        }
+        const deadline = Date.now() + timeout;
+        while (Date.now() < deadline) {
+            const response = await fetch(accepted.status_url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+            const data = await response.json();
+            if (onProgress) onProgress(data);
+
+            if (data.status === 'DONE') return data.result;
+            if (data.status === 'FAILED' || !response.ok) {
+                throw new Error(data.error || 'El trabajo de IA falló');
+            }
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+        throw new Error('La IA está tardando demasiado. Inténtalo de nuevo más tarde.');
+    },
+
+    /**
+     * Envía una petición que encola un trabajo y espera su resultado.
+     */
+    async run(url, options = {}, onProgress = null) {
+        const response = await fetch(url, options);
+        return this.wait(await response.json(), onProgress);
+    },
+
+    /** Texto breve del estado para mostrar en la interfaz. */
+    describe(data) {
+        if (data.status === 'PENDING') return `⏳ En cola (posición ${data.queue_position || 1})`;
+        if (data.status === 'RUNNING') return `🤖 ${data.message || 'Generando...'} ${data.progress || 0}%`;
+        return '';
+    }
+};
+
+window.CaosAIJobs = CaosAIJobs;
@@ -263,9 +263,9 @@ class SocialModule {
      }
 
     /**
-     * Carga comentarios de un contenido
+     * Carga comentarios de un contenido (paginados: con cursor añade la página siguiente)
      */
-    async loadComments(entityKey, customContainerId = null) {
+    async loadComments(entityKey, customContainerId = null, cursor = null) {
         const slug = entityKey.replace(/[^a-z0-9_]/gi, '-').toLowerCase();
         const listEl = customContainerId ? document.getElementById(customContainerId) : document.getElementById(`comments-list-${slug}`);
         
@@ -275,21 +275,37 @@ class SocialModule {
         }
 
         try {
-            const response = await fetch(`/api/comments/get/?entity_key=${encodeURIComponent(entityKey)}`);
+            let url = `/api/comments/get/?entity_key=${encodeURIComponent(entityKey)}`;
+            if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+            const response = await fetch(url);
             const data = await response.json();
 
             // Handle UI for anonymous users
             this.updateCommentInputVisibility(entityKey, data.authenticated);
 
-            if (data.comments && data.comments.length > 0) {
-                const validComments = data.comments.filter(c => c !== null);
-                listEl.innerHTML = validComments.map(c => this.renderComment(c, entityKey, customContainerId, data.authenticated)).join('');
+            const validComments = (data.comments || []).filter(c => c !== null);
+            const html = validComments.map(c => this.renderComment(c, entityKey, customContainerId, data.authenticated)).join('');
+            if (cursor) {
+                listEl.querySelector('.comments-load-more')?.remove();
+                listEl.insertAdjacentHTML('beforeend', html);
+            } else if (validComments.length > 0) {
+                listEl.innerHTML = html;
             } else {
                 listEl.innerHTML = '<p class="text-gray-500 text-center py-4">No hay comentarios aún. ¡Sé el primero!</p>';
             }
 
+            if (data.next_cursor) {
+                listEl.insertAdjacentHTML('beforeend', `
+                    <button onclick="socialModule.loadComments('${entityKey}', ${customContainerId ? `'${customContainerId}'` : 'null'}, '${data.next_cursor}')"
+                            class="comments-load-more w-full py-2 text-xs text-gray-500 hover:text-white transition">
+                        Ver más comentarios
+                    </button>
+                `);
+            }
+
             // Actualizar contador
-            this.updateCommentCount(entityKey, data.comments.length);
+            this.updateCommentCount(entityKey, data.total ?? validComments.length);
+            return data;
         } catch (error) {
             console.error('Error loading comments:', error);
             const errorText = error.message.includes('Unexpected token') ? 'Error de servidor (Respuesta no válida)' : error.message;
@@ -523,7 +539,7 @@ class SocialModule {
         try {
             const response = await fetch(`/api/comments/get/?entity_key=${encodeURIComponent(entityKey)}`);
             const data = await response.json();
-            this.updateCommentCount(entityKey, data.comments?.length || 0);
+            this.updateCommentCount(entityKey, data.total ?? data.comments?.length ?? 0);
         } catch (error) {
             console.error('Error loading comment count:', error);
         }
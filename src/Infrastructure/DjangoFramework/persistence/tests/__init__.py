@@ -4,6 +4,29 @@ Tests para el proyecto FantasyWorld.
 Organización:
 - test_permissions.py: Tests de permisos (mundos, propuestas, equipos)
 - test_cover_detection.py: Tests de detección de portadas
+- test_gallery_index.py: Tests del índice persistente de galerías
+- test_image_derivatives.py: Tests de las miniaturas (derivados srcset) de las galerías
+- test_image_jobs.py: Tests del procesamiento de imágenes fuera de la petición (pool y cola)
+- test_blob_store.py: Tests del almacén de imágenes direccionado por contenido (deduplicación y papelera)
+- test_world_tree.py: Tests del Mapa del Árbol materializado en caché
+- test_world_details.py: Tests de la resolución de hijos visibles de la ficha
+- test_identity_map.py: Tests del mapa de identidad por petición (resolución de entidades y accesos)
+- test_home_index.py: Tests del índice del Home cacheado por clase de visibilidad
+- test_proposal_counts.py: Tests de los contadores de propuestas pendientes y badges por usuario
+- test_content_attribution.py: Tests del índice de atribución de contenido por usuario
+- test_social_keys.py: Tests de la clave normalizada de likes/comentarios y contadores en bloque
+- test_comment_threads.py: Tests de los hilos de comentarios paginados, cacheados y precargados
+- test_image_locator.py: Tests del localizador de imágenes y la resolución de claves en bloque
+- test_engagement.py: Tests de la agregación de interacciones en estadísticas y rankings
+- test_engagement_counters.py: Tests de los contadores de interacción desnormalizados y su reconciliación
+- test_search_index.py: Tests del índice de búsqueda global
+- test_metadata_facets.py: Tests de las facetas tipadas de metadata y la búsqueda estructural
+- test_narrative_reads.py: Tests del registro de lecturas de narrativas (insignia 'nuevo')
+- test_entity_picker.py: Tests del selector de entidades con autocompletado del editor
+- test_ai_transport.py: Tests del transporte compartido de IA (reintentos, breaker, concurrencia)
+- test_ai_cache.py: Tests de la caché de respuestas deterministas del modelo de texto
+- test_ai_streaming.py: Tests de la edición de narrativas con IA en streaming (SSE)
+- test_ai_jobs.py: Tests de la cola de trabajos de IA y su worker
 - test_proposals.py: Tests del sistema de propuestas ECLAI
 - test_period_workflow.py: Tests del workflow de períodos
 
@@ -0,0 +1,163 @@
+"""
+Tests para la caché de respuestas del modelo de texto.
+Valida la clave de contenido, el LRU con TTL, el nivel de disco y la política de Llama3Service.
+"""
+import json
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_cache import LLMResponseCache, cache_key, reset_llm_cache
+from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
+from src.WorldManagement.Caos.Application.generate_contextual_metadata import GenerateContextualMetadataUseCase
+
+
+def _completion(text):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = ('{"choices": [{"text": "%s", "message": {"content": "%s"}}]}' % (text, text)).encode()
+    response._content_consumed = True
+    return response
+
+
+class LLMResponseCacheTestCase(SimpleTestCase):
+    """Tests de LLMResponseCache."""
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _cache(self, **kwargs):
+        return LLMResponseCache(disk_dir=self.tmp.name, clock=lambda: self.now[0], **kwargs)
+
+    def test_key_ignores_seed_but_not_parameters(self):
+        """Test: La clave ignora la semilla pero cambia con cualquier parámetro de generación o la URL"""
+        base = {'prompt': 'hola', 'temperature': 0.3, 'max_tokens': 150, 'seed': -1}
+        self.assertEqual(cache_key('u', base), cache_key('u', {**base, 'seed': 42}))
+        self.assertNotEqual(cache_key('u', base), cache_key('u', {**base, 'max_tokens': 151}))
+        self.assertNotEqual(cache_key('u', base), cache_key('u', {**base, 'temperature': 0.2}))
+        self.assertNotEqual(cache_key('u', base), cache_key('otro', base))
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test: Al llenarse, el LRU descarta la entrada usada hace más tiempo"""
+        cache = LLMResponseCache(max_entries=2)
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        cache.get('a')
+        cache.set('c', 'C')
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertIsNone(cache.get('b'))
+
+    def test_entries_expire_after_ttl(self):
+        """Test: Las entradas caducan tras el TTL en memoria y en disco"""
+        cache = self._cache(ttl=60)
+        cache.set('k', 'valor')
+        self.now[0] += 61
+        self.assertIsNone(cache.get('k'))
+        self.assertIsNone(self._cache(ttl=60).get('k'))
+
+    def test_disk_tier_survives_new_process(self):
+        """Test: El nivel de disco sirve las respuestas a una caché nueva (otro proceso)"""
+        self._cache().set('k', {'properties': []})
+        self.assertEqual(self._cache().get('k'), {'properties': []})
+
+    def test_empty_values_are_not_stored(self):
+        """Test: Las respuestas vacías no se guardan"""
+        cache = self._cache()
+        cache.set('k', '')
+        self.assertIsNone(cache.get('k'))
+
+
+class LlamaCacheMixin:
+    """Caché activa en un directorio temporal y un Llama3Service nuevo por test."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(AI_CACHE_ENABLED=True, AI_CACHE_DIR=self.tmp.name, AI_CACHE_MAX_TEMPERATURE=0.3)
+        override.enable()
+        self.addCleanup(override.disable)
+        reset_llm_cache()
+        self.addCleanup(reset_llm_cache)
+        self.service = Llama3Service()
+
+    def _post(self, text):
+        return mock.patch.object(self.service.transport, 'post_json', return_value=_completion(text))
+
+
+class LlamaServiceCacheTestCase(LlamaCacheMixin, SimpleTestCase):
+    """Tests de la política de caché de Llama3Service."""
+
+    def test_low_temperature_calls_hit_cache(self):
+        """Test: Las llamadas deterministas (temperatura baja) se sirven de la caché"""
+        with self._post('castle, 8k') as post:
+            first = self.service._call_api('prompt', temperature=0.3)
+            second = self.service._call_api('prompt', temperature=0.3)
+        self.assertEqual(first, second)
+        self.assertEqual(post.call_count, 1)
+
+    def test_creative_calls_bypass_cache_unless_requested(self):
+        """Test: Las llamadas creativas no se cachean salvo que se pida con cache=True"""
+        with self._post('texto') as post:
+            self.service._call_api('prompt', temperature=0.7)
+            self.service._call_api('prompt', temperature=0.7)
+            self.assertEqual(post.call_count, 2)
+            self.service._call_api('prompt', temperature=0.7, cache=True)
+            self.service._call_api('prompt', temperature=0.7, cache=True)
+            self.assertEqual(post.call_count, 3)
+
+    def test_classifier_edit_text_hits_cache(self):
+        """Test: edit_text a temperatura baja (clasificador) no repite la llamada al modelo"""
+        with self._post('GALAXIA') as post:
+            first = self.service.edit_text('Clasificador', 'texto', temperature=0.1, max_tokens=10)
+            second = self.service.edit_text('Clasificador', 'texto', temperature=0.1, max_tokens=10)
+            self.assertEqual((first, second), ('GALAXIA', 'GALAXIA'))
+            self.assertEqual(post.call_count, 1)
+            self.service.edit_text('Editor', 'texto', temperature=0.7)
+            self.service.edit_text('Editor', 'texto', temperature=0.7)
+            self.assertEqual(post.call_count, 3)
+
+
+class ContextualMetadataCacheTestCase(LlamaCacheMixin, SimpleTestCase):
+    """Tests de la caché en GenerateContextualMetadataUseCase (clasificación y extracción)."""
+
+    def _use_case(self):
+        world = SimpleNamespace(name='Aethel', metadata={}, description='Un reino',
+                                lore_description='El reino de Aethel fue fundado por el Rey Thror en el año 200.')
+        repo = mock.Mock(find_by_id=mock.Mock(return_value=world))
+        return GenerateContextualMetadataUseCase(repo, self.service)
+
+    def _model(self):
+        """Servidor simulado: el clasificador responde un tipo y la extracción un JSON."""
+        def answer(url, payload, timeout=None):
+            content = 'GALAXIA' if payload['max_tokens'] == 10 else json.dumps({'nombre': 'Aethel'})
+            response = requests.Response()
+            response.status_code = 200
+            response._content = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+            return response
+        return mock.patch.object(self.service.transport, 'post_json', side_effect=answer)
+
+    def test_repeated_extraction_does_not_call_model(self):
+        """Test: Extraer la ficha de un lore ya analizado no vuelve a llamar al modelo"""
+        use_case = self._use_case()
+        with self._model() as post:
+            first = use_case.execute('0101')
+            second = use_case.execute('0101')
+        self.assertEqual(first['datos_nucleo'], {'nombre': 'Aethel'})
+        self.assertEqual(second['datos_nucleo'], first['datos_nucleo'])
+        self.assertEqual(post.call_count, 1)
+
+    def test_repeated_classification_does_not_call_model(self):
+        """Test: Sin esquema jerárquico, clasificación y extracción repetidas salen de la caché"""
+        use_case = self._use_case()
+        with mock.patch('src.WorldManagement.Caos.Application.generate_contextual_metadata.get_schema_for_hierarchy',
+                        return_value=None), self._model() as post:
+            first = use_case.execute('0101')
+            self.assertEqual(post.call_count, 2)
+            second = use_case.execute('0101')
+        self.assertEqual(first['tipo_entidad'], 'GALAXIA')
+        self.assertEqual(second['tipo_entidad'], 'GALAXIA')
+        self.assertEqual(post.call_count, 2)
@@ -0,0 +1,102 @@
+"""
+Tests para la cola de trabajos de IA en base de datos.
+Valida que las vistas encolan y responden al instante, el worker, la consulta de estado y la recuperación.
+"""
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from src.Infrastructure.DjangoFramework.persistence import ai_jobs
+from src.Infrastructure.DjangoFramework.persistence.models import CaosAIJobORM, CaosWorldORM
+
+
+class AIJobsTestCase(TestCase):
+    """Tests de CaosAIJobORM, ai_jobs y run_ai_worker."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('creador', 'creador@test.com', 'x')
+        self.other = User.objects.create_user('curioso', 'curioso@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(id='01', name='Arcadia', description='Desc', status='LIVE',
+                                                 visible_publico=True, author=self.user)
+
+    def _status(self, job, user=None):
+        self.client.force_login(user or self.user)
+        return self.client.get(reverse('ai_job_status', args=[job.id]))
+
+    def test_preview_is_queued_without_calling_ai(self):
+        """Test: La vista de vista previa encola el trabajo y no llama a la IA dentro de la petición"""
+        self.client.force_login(self.user)
+        with mock.patch('src.WorldManagement.Caos.Application.generate_map.GenerateWorldMapUseCase.generate_preview') as generate:
+            response = self.client.get(reverse('api_preview_foto', args=[self.world.public_id]))
+        generate.assert_not_called()
+
+        self.assertEqual(response.status_code, 202)
+        job = CaosAIJobORM.objects.get(id=response.json()['job_id'])
+        self.assertEqual((job.kind, job.backend, job.params, job.user), ('preview_image', 'image', {'world_id': '01'}, self.user))
+        self.assertEqual(response.json()['status_url'], reverse('ai_job_status', args=[job.id]))
+        self.assertEqual(self._status(job).json()['status'], 'PENDING')
+
+    def test_worker_runs_job_and_stores_result(self):
+        """Test: El worker ejecuta el trabajo y la consulta devuelve el resultado"""
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('api_generate_lore'), json.dumps({'world_id': '01', 'current_description': 'Un valle'}),
+                                    content_type='application/json')
+        job = CaosAIJobORM.objects.get(id=response.json()['job_id'])
+
+        with mock.patch('src.FantasyWorld.AI_Generation.Infrastructure.llama_service.Llama3Service.generate_description',
+                        return_value='Un valle eterno.') as generate:
+            out = StringIO()
+            call_command('run_ai_worker', '--once', '--backend', 'text', stdout=out)
+        self.assertIn('Un valle', generate.call_args.args[0])
+        self.assertIn('Trabajos procesados: 1', out.getvalue())
+
+        data = self._status(job).json()
+        self.assertEqual((data['status'], data['progress'], data['result']), ('DONE', 100, {'lore': 'Un valle eterno.'}))
+
+    def test_failures_are_reported(self):
+        """Test: Un fallo de la IA queda registrado y se devuelve como error"""
+        job = ai_jobs.enqueue_job('preview_image', {'world_id': '01'}, self.user)
+        with mock.patch('src.WorldManagement.Caos.Application.generate_map.GenerateWorldMapUseCase.generate_preview',
+                        return_value=None):
+            ai_jobs.run_next_job(('image',))
+
+        data = self._status(job).json()
+        self.assertFalse(data['success'])
+        self.assertEqual(data['status'], 'FAILED')
+        self.assertIn('Stable Diffusion', data['error'])
+
+    def test_claims_are_exclusive_and_per_backend(self):
+        """Test: Cada trabajo lo reclama un único worker y solo el de su backend"""
+        image_job = ai_jobs.enqueue_job('preview_image', {'world_id': '01'})
+        text_job = ai_jobs.enqueue_job('world_lore', {'world_id': '01'})
+
+        self.assertEqual(ai_jobs.claim_next_job(('text',), 'w1').id, text_job.id)
+        self.assertIsNone(ai_jobs.claim_next_job(('text',), 'w2'))
+        self.assertEqual(ai_jobs.claim_next_job(('image',), 'w2').id, image_job.id)
+        self.assertEqual(CaosAIJobORM.objects.get(id=text_job.id).worker, 'w1')
+
+    def test_stale_jobs_are_requeued(self):
+        """Test: Los trabajos de un worker caído vuelven a la cola hasta agotar los intentos"""
+        job = ai_jobs.enqueue_job('world_lore', {'world_id': '01'})
+        ai_jobs.claim_next_job(('text',), 'w1')
+        CaosAIJobORM.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(ai_jobs.requeue_stale_jobs(900), 1)
+        self.assertEqual(CaosAIJobORM.objects.get(id=job.id).status, 'PENDING')
+
+        CaosAIJobORM.objects.filter(id=job.id).update(status='RUNNING', attempts=ai_jobs.MAX_ATTEMPTS,
+                                                      started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(ai_jobs.requeue_stale_jobs(900), 0)
+        self.assertEqual(CaosAIJobORM.objects.get(id=job.id).status, 'FAILED')
+
+    def test_status_is_private_to_owner(self):
+        """Test: Solo el dueño consulta un trabajo con dueño"""
+        job = ai_jobs.enqueue_job('world_lore', {'world_id': '01'}, self.user)
+        self.assertEqual(self._status(job, self.other).status_code, 404)
+        self.assertEqual(self._status(job).status_code, 200)
@@ -0,0 +1,98 @@
+"""
+Tests para la edición de narrativas con IA en streaming.
+Valida el transporte en streaming, el parseo SSE de Llama3Service y el endpoint text/event-stream.
+"""
+import json
+from unittest import mock
+
+import requests
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_transport import AIBackendBusy, AITransport
+from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
+
+
+def _stream_response(lines, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = ''.join(f"{line}\n" for line in lines).encode()
+    response._content_consumed = True
+    return response
+
+
+def _sse_chunk(text):
+    return 'data: ' + json.dumps({'choices': [{'delta': {'content': text}}]})
+
+
+class StreamingTransportTestCase(SimpleTestCase):
+    """Tests de AITransport.stream_lines y Llama3Service.stream_edit_text."""
+
+    def setUp(self):
+        self.transport = AITransport('test', 'http://ia.local', max_concurrency=1, queue_timeout=0.05)
+
+    def test_slot_is_held_until_stream_is_consumed(self):
+        """Test: El hueco de concurrencia sigue ocupado mientras el generador no termina"""
+        lines = ['data: a', 'data: b']
+        with mock.patch.object(self.transport.session, 'post', return_value=_stream_response(lines)) as post:
+            stream = self.transport.stream_lines('/x', {})
+            self.assertEqual(next(stream), 'data: a')
+            with self.assertRaises(AIBackendBusy):
+                self.transport.post_json('/x', {})
+            self.assertEqual(list(stream), ['data: b'])
+        self.assertTrue(post.call_args.kwargs['stream'])
+        self.assertTrue(self.transport._slots.acquire(blocking=False))
+
+    def test_service_yields_deltas_until_done(self):
+        """Test: stream_edit_text devuelve los fragmentos del SSE y se detiene en [DONE]"""
+        service = Llama3Service()
+        service.transport = self.transport
+        lines = [_sse_chunk('Había '), ': keep-alive', _sse_chunk('una vez'), 'data: [DONE]', _sse_chunk('basura')]
+        with mock.patch.object(self.transport.session, 'post', return_value=_stream_response(lines)) as post:
+            chunks = list(service.stream_edit_text('sistema', 'texto'))
+        self.assertEqual(chunks, ['Había ', 'una vez'])
+        self.assertTrue(post.call_args.kwargs['json']['stream'])
+
+    def test_service_reports_server_errors(self):
+        """Test: Un error HTTP del servidor se traduce en una excepción legible"""
+        service = Llama3Service()
+        service.transport = self.transport
+        with mock.patch.object(self.transport.session, 'post', return_value=_stream_response([], status=500)):
+            with self.assertRaises(Exception):
+                list(service.stream_edit_text('sistema', 'texto'))
+
+
+class EditNarrativeStreamViewTestCase(TestCase):
+    """Tests del endpoint edit_narrative_stream_api."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('escritor', 'escritor@test.com', 'x')
+        self.client.force_login(self.user)
+
+    def _post(self, body):
+        response = self.client.post(reverse('edit_narrative_stream_api'), json.dumps(body), content_type='application/json')
+        content = b''.join(response.streaming_content).decode() if response.streaming else response.content.decode()
+        return response, content
+
+    @mock.patch.object(Llama3Service, 'stream_edit_text', return_value=iter(['Hola ', 'mundo']))
+    def test_streams_deltas_and_done_event(self, stream):
+        """Test: La vista reenvía cada fragmento como evento SSE y termina con el evento done"""
+        response, content = self._post({'text': 'hola mundo', 'mode': 'fix'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('data: {"delta": "Hola "}', content)
+        self.assertIn('data: {"delta": "mundo"}', content)
+        self.assertTrue(content.rstrip().endswith('data: {"success": true}'))
+        self.assertIn('event: done', content)
+
+    @mock.patch.object(Llama3Service, 'stream_edit_text', side_effect=Exception('sin conexión'))
+    def test_errors_are_sent_as_events(self, stream):
+        """Test: Un error durante la generación llega al cliente como evento error"""
+        response, content = self._post({'text': 'hola', 'mode': 'fix'})
+        self.assertIn('event: error', content)
+        self.assertIn('sin conexión', content)
+
+    def test_long_texts_are_rejected_before_streaming(self):
+        """Test: Los textos demasiado largos se rechazan con JSON, sin abrir el stream"""
+        response, content = self._post({'text': 'palabra ' * 4001})
+        self.assertFalse(response.streaming)
+        self.assertFalse(json.loads(content)['success'])
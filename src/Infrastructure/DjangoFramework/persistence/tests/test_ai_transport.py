@@ -0,0 +1,140 @@
+"""
+Tests para el transporte compartido de los servicios de IA.
+Valida reintentos, circuit breaker, límite de concurrencia y la API asyncio (sin servidor real).
+"""
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+from src.FantasyWorld.AI_Generation.Infrastructure.ai_transport import (
+    AIBackendBusy, AIBackendUnavailable, AITransport, get_transport, reset_transports
+)
+from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
+from src.FantasyWorld.AI_Generation.Infrastructure.sd_service import StableDiffusionService
+
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{}'
+    response._content_consumed = True
+    return response
+
+
+class AITransportTestCase(SimpleTestCase):
+    """Tests de AITransport y CircuitBreaker."""
+
+    def setUp(self):
+        self.transport = AITransport('test', 'http://ia.local', max_concurrency=2, max_retries=2,
+                                     queue_timeout=0.05, breaker_threshold=2, breaker_cooldown=60)
+        patcher = mock.patch.object(self.transport, '_backoff', return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, *outcomes):
+        """Simula las respuestas sucesivas del servidor (excepciones o códigos HTTP)."""
+        effects = [o if isinstance(o, Exception) else _response(o) for o in outcomes]
+        return mock.patch.object(self.transport.session, 'post', side_effect=effects)
+
+    def test_transient_errors_are_retried(self):
+        """Test: Conexión rechazada y 503 se reintentan; el éxito final se devuelve"""
+        with self._post(requests.exceptions.ConnectionError(), 503, 200) as post:
+            response = self.transport.post_json('/v1/chat/completions', {'x': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(post.call_args.args[0], 'http://ia.local/v1/chat/completions')
+
+    def test_read_timeout_is_not_retried(self):
+        """Test: Un timeout de lectura no se reintenta (la generación ya consumió su presupuesto)"""
+        with self._post(requests.exceptions.ReadTimeout()) as post:
+            with self.assertRaises(requests.exceptions.Timeout):
+                self.transport.post_json('/v1/completions', {})
+        self.assertEqual(post.call_count, 1)
+
+    def test_circuit_breaker_fails_fast_and_recovers(self):
+        """Test: Tras varios fallos el breaker se abre; tras el enfriamiento una prueba lo cierra"""
+        down = [requests.exceptions.ConnectionError()] * 3
+        for _ in range(2):
+            with self._post(*down):
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    self.transport.post_json('/v1/completions', {})
+        self.assertEqual(self.transport.breaker.state, 'open')
+
+        with self._post(200) as post:
+            with self.assertRaises(AIBackendUnavailable):
+                self.transport.post_json('/v1/completions', {})
+        post.assert_not_called()
+
+        self.transport.breaker.opened_at -= 61
+        with self._post(200):
+            self.assertEqual(self.transport.post_json('/v1/completions', {}).status_code, 200)
+        self.assertEqual(self.transport.breaker.state, 'closed')
+
+    def test_half_open_probe_failing_with_other_errors_reopens(self):
+        """Test: Una prueba que falla con un error que no es de conexión reabre el breaker sin bloquearlo para siempre"""
+        self.transport.breaker.opened_at = time.monotonic() - 61
+        with self._post(requests.exceptions.ChunkedEncodingError()):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.transport.post_json('/v1/completions', {})
+        self.assertEqual(self.transport.breaker.state, 'open')
+
+        self.transport.breaker.opened_at -= 61
+        with self._post(TypeError('payload no serializable')):
+            with self.assertRaises(TypeError):
+                self.transport.post_json('/v1/completions', {})
+        self.assertEqual(self.transport.breaker.state, 'half_open')
+
+        with self._post(200):
+            self.assertEqual(self.transport.post_json('/v1/completions', {}).status_code, 200)
+        self.assertEqual(self.transport.breaker.state, 'closed')
+
+    def test_concurrency_is_bounded(self):
+        """Test: Si todos los huecos están ocupados la llamada responde 'ocupado' en vez de encolarse"""
+        release = threading.Event()
+
+        def slow_post(*args, **kwargs):
+            release.wait(2)
+            return _response(200)
+
+        with mock.patch.object(self.transport.session, 'post', side_effect=slow_post):
+            workers = [threading.Thread(target=self.transport.post_json, args=('/x', {})) for _ in range(2)]
+            for w in workers:
+                w.start()
+            time.sleep(0.05)
+            with self.assertRaises(AIBackendBusy):
+                self.transport.post_json('/x', {})
+            release.set()
+            for w in workers:
+                w.join()
+
+    def test_async_fan_out_respects_limit(self):
+        """Test: asyncio.gather de varias llamadas usa como mucho max_concurrency hilos a la vez"""
+        state = {'active': 0, 'peak': 0}
+        lock = threading.Lock()
+
+        def generate(n):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return n * 2
+
+        async def fan_out():
+            return await asyncio.gather(*(self.transport.arun(generate, n) for n in range(6)))
+
+        self.assertEqual(asyncio.run(fan_out()), [0, 2, 4, 6, 8, 10])
+        self.assertEqual(state['peak'], 2)
+
+    def test_services_share_transport(self):
+        """Test: Los servicios reutilizan una sesión por backend en lugar de conexiones nuevas"""
+        reset_transports()
+        self.addCleanup(reset_transports)
+        self.assertIs(Llama3Service().transport, Llama3Service().transport)
+        self.assertIs(Llama3Service().transport, get_transport('text'))
+        self.assertIs(StableDiffusionService().transport, get_transport('image'))
+        self.assertIsNot(get_transport('text'), get_transport('image'))
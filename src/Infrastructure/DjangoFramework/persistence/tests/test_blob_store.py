@@ -0,0 +1,124 @@
+"""
+Tests para el almacén de imágenes direccionado por contenido.
+Valida la deduplicación entre entidades, la elección de nombres sin sondear el disco,
+papelera/restauración sin mover contenido, el recuento de referencias y la adopción
+de galerías existentes.
+"""
+import io
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from src.Infrastructure.DjangoFramework.persistence import blob_store, gallery_index
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosGalleryImageORM, CaosImageBlobORM, CaosImageRefORM, CaosWorldORM
+)
+from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+
+def _png(color='teal'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='subida.png')
+
+
+class BlobStoreTestCase(TestCase):
+    """Tests de blob_store y su integración con el repositorio."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.override = override_settings(BASE_DIR=self.tmp)
+        self.override.enable()
+        self.img = gallery_index.get_img_root()
+        for jid in ('01', '02'):
+            CaosWorldORM.objects.create(id=jid, name=f'Mundo {jid}', description='', status='LIVE')
+        self.repo = DjangoCaosRepository()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _blob_file(self, ref):
+        return blob_store.blob_path(ref.blob.digest, ref.blob.extension)
+
+    def test_same_picture_in_two_worlds_is_stored_once(self):
+        """Test: La misma imagen en dos entidades comparte blob; los nombres son enlaces al mismo contenido"""
+        self.assertEqual(self.repo.save_manual_file('01', _png(), username='ana', title='Mapa'), 'Mapa.webp')
+        self.assertEqual(self.repo.save_manual_file('02', _png(), username='ana', title='Mapa'), 'Mapa.webp')
+
+        blob = CaosImageBlobORM.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        inodes = {(self.img / jid / 'Mapa.webp').stat().st_ino for jid in ('01', '02')}
+        self.assertEqual(inodes, {blob_store.blob_path(blob.digest, 'webp').stat().st_ino})
+        self.assertEqual(CaosGalleryImageORM.objects.filter(filename='Mapa.webp').count(), 2)
+        self.assertEqual(list((blob_store.blob_root() / blob_store.STAGING_DIR).iterdir()), [])
+
+    def test_free_name_comes_from_the_index(self):
+        """Test: Los nombres ocupados salen del índice, sin sondear el disco"""
+        CaosGalleryImageORM.objects.create(jid='01', folder='01', filename='Mapa.webp')
+        CaosGalleryImageORM.objects.create(jid='01', folder='01', filename='Mapa_1.webp')
+        with self.assertNumQueries(2):
+            self.assertEqual(blob_store.free_name('01', 'Mapa'), 'Mapa_2.webp')
+        self.assertEqual(self.repo.save_manual_file('01', _png(), username='ana', title='Mapa'), 'Mapa_2.webp')
+
+    def test_trash_and_restore_do_not_move_content(self):
+        """Test: Papelera y restauración solo cambian la referencia; el blob no se mueve ni se copia"""
+        self.repo.save_manual_file('01', _png(), username='ana', title='Mapa')
+        ref = CaosImageRefORM.objects.get()
+        blob_file = self._blob_file(ref)
+
+        self.assertTrue(blob_store.trash('01', 'Mapa.webp'))
+        self.assertFalse((self.img / '01' / 'Mapa.webp').exists())
+        self.assertTrue(blob_file.exists())
+        self.assertEqual(CaosImageRefORM.objects.get().state, 'TRASHED')
+        self.assertFalse(CaosGalleryImageORM.objects.exists())
+
+        self.assertTrue(blob_store.restore('01', 'Mapa.webp'))
+        self.assertEqual((self.img / '01' / 'Mapa.webp').stat().st_ino, blob_file.stat().st_ino)
+        self.assertEqual(CaosImageRefORM.objects.get().state, 'LIVE')
+        self.assertTrue(CaosGalleryImageORM.objects.filter(jid='01', filename='Mapa.webp').exists())
+
+    def test_purge_deletes_blob_with_last_reference(self):
+        """Test: Purgar una referencia solo borra el blob cuando nadie más lo usa"""
+        self.repo.save_manual_file('01', _png(), username='ana', title='Mapa')
+        self.repo.save_manual_file('02', _png(), username='ana', title='Mapa')
+        blob_file = self._blob_file(CaosImageRefORM.objects.first())
+
+        blob_store.trash('01', 'Mapa.webp')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(blob_store.purge('01', 'Mapa.webp'), 1)
+        self.assertEqual(CaosImageBlobORM.objects.get().ref_count, 1)
+        self.assertTrue(blob_file.exists())
+
+        blob_store.trash('02', 'Mapa.webp')
+        with self.captureOnCommitCallbacks(execute=True):
+            blob_store.purge('02', 'Mapa.webp')
+        self.assertFalse(CaosImageBlobORM.objects.exists())
+        self.assertFalse(blob_file.exists())
+
+    def test_existing_galleries_are_adopted_and_deduplicated(self):
+        """Test: build_image_blobs adopta galerías y papeleras legacy, y libera los duplicados"""
+        content = _png().read()
+        for jid in ('01', '02'):
+            (self.img / jid).mkdir(parents=True)
+            (self.img / jid / 'viejo.png').write_bytes(content)
+        (self.img / '01' / '.trash').mkdir()
+        (self.img / '01' / '.trash' / 'borrado.png').write_bytes(content)
+        gallery_index.rebuild_gallery_index()
+
+        out = StringIO()
+        call_command('build_image_blobs', stdout=out)
+        self.assertIn('2 en galería, 1 en papelera', out.getvalue())
+
+        blob = CaosImageBlobORM.objects.get()
+        self.assertEqual((blob.ref_count, blob.extension), (3, 'png'))
+        self.assertFalse((self.img / '01' / '.trash' / 'borrado.png').exists())
+        self.assertEqual((self.img / '01' / 'viejo.png').stat().st_ino, (self.img / '02' / 'viejo.png').stat().st_ino)
+
+        self.assertTrue(blob_store.restore('01', 'borrado.png'))
+        self.assertEqual((self.img / '01' / 'borrado.png').read_bytes(), content)
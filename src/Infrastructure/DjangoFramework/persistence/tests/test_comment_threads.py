@@ -0,0 +1,106 @@
+"""
+Tests para los hilos de comentarios paginados (API get_comments).
+Valida el número de consultas constante, la paginación por cursor, la caché de la primera
+página y su invalidación, y los permisos por lector sobre la página cacheada.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence import comment_threads
+from src.Infrastructure.DjangoFramework.persistence.models import CaosComment
+
+KEY = 'IMG_Mapa-Norte.webp'
+
+
+class CommentThreadsTestCase(TestCase):
+    """Tests de comment_threads y la vista get_comments."""
+
+    def setUp(self):
+        cache.clear()
+        self.explorer = User.objects.create_user('explorador', 'e@test.com', 'x')
+        self.moderator = User.objects.create_user('moderador', 'm@test.com', 'x')
+        self.admin = User.objects.create_user('jefe', 'j@test.com', 'x')
+        for user, rank in ((self.moderator, 'SUBADMIN'), (self.admin, 'ADMIN')):
+            user.profile.rank = rank
+            user.profile.save()
+
+    def _get(self, **params):
+        return self.client.get(reverse('get_comments'), {'entity_key': KEY, **params})
+
+    def _thread(self, count, replies=0):
+        authors = [self.explorer, self.moderator, self.admin]
+        for i in range(count):
+            parent = CaosComment.objects.create(user=authors[i % 3], entity_key=KEY, content=f'Comentario {i}')
+            for j in range(replies):
+                CaosComment.objects.create(user=authors[j % 3], entity_key=KEY, content=f'Respuesta {i}.{j}',
+                                           parent_comment=parent)
+
+    def test_queries_do_not_grow_with_thread(self):
+        """Test: Comentarios, respuestas, autores y contador en tres consultas; la segunda llamada sale de caché"""
+        self._thread(10, replies=3)
+
+        with self.assertNumQueries(3):
+            data = self._get().json()
+        self.assertEqual(len(data['comments']), 10)
+        self.assertEqual(data['total'], 10)
+        self.assertEqual([r['content'] for r in data['comments'][0]['replies']], ['Respuesta 0.0', 'Respuesta 0.1', 'Respuesta 0.2'])
+        self.assertEqual(data['comments'][0]['reply_count'], 3)
+        self.assertNotIn('author_id', data['comments'][0])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get().json(), data)
+
+    def test_cursor_pagination(self):
+        """Test: La primera página trae next_cursor; la siguiente continúa sin repetir ni saltar comentarios"""
+        self._thread(comment_threads.PAGE_SIZE + 5)
+
+        first = self._get().json()
+        self.assertEqual(len(first['comments']), comment_threads.PAGE_SIZE)
+        self.assertTrue(first['next_cursor'])
+
+        second = self._get(cursor=first['next_cursor']).json()
+        self.assertIsNone(second['next_cursor'])
+        contents = [c['content'] for c in first['comments'] + second['comments']]
+        self.assertEqual(contents, [f'Comentario {i}' for i in range(comment_threads.PAGE_SIZE + 5)])
+
+        self.assertEqual(len(self._get(limit=3).json()['comments']), 3)
+        self.assertEqual(self._get(cursor='no-es-un-cursor').status_code, 400)
+
+    def test_first_page_is_invalidated_when_thread_changes(self):
+        """Test: Comentar, responder o borrar invalida la página cacheada de ese hilo (y no la de otros)"""
+        self._thread(2)
+        other = CaosComment.objects.create(user=self.explorer, entity_key='IMG_otra.webp', content='Otra')
+        self._get()
+        self.client.get(reverse('get_comments'), {'entity_key': 'IMG_otra.webp'})
+
+        comment = CaosComment.objects.create(user=self.admin, entity_key='img_mapa-norte.webp', content='Nuevo')
+        self.assertEqual(self._get().json()['comments'][-1]['content'], 'Nuevo')
+
+        CaosComment.objects.create(user=self.explorer, entity_key=KEY, content='Réplica', parent_comment=comment)
+        self.assertEqual(self._get().json()['comments'][-1]['replies'][0]['content'], 'Réplica')
+
+        comment.delete()
+        self.assertEqual(self._get().json()['total'], 2)
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('get_comments'), {'entity_key': other.entity_key})
+
+    def test_permissions_are_applied_per_viewer(self):
+        """Test: La página cacheada no arrastra is_me/can_delete de otro lector"""
+        self._thread(3)
+        anonymous = self._get().json()
+        self.assertFalse(any(c['can_delete'] or c['is_me'] for c in anonymous['comments']))
+
+        self.client.force_login(self.moderator)
+        flags = {c['username']: (c['is_me'], c['can_delete']) for c in self._get().json()['comments']}
+        self.assertEqual(flags, {
+            'explorador': (False, True),
+            'moderador': (True, True),
+            'jefe': (False, False),  # No puede moderar a un rango superior
+        })
+
+        self.client.force_login(self.explorer)
+        flags = {c['username']: (c['is_me'], c['can_delete']) for c in self._get().json()['comments']}
+        self.assertEqual(flags['explorador'], (True, True))
+        self.assertEqual(flags['jefe'], (False, False))
@@ -0,0 +1,60 @@
+"""
+Tests para el índice de atribución de contenido.
+Valida la sincronización al guardar entidades, los históricos y discover_user_content().
+"""
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosEventLog, CaosContentAttributionORM
+)
+from src.Shared.Services.SocialService import SocialService
+
+
+class ContentAttributionTestCase(TestCase):
+    """Tests del índice usuario → imágenes."""
+
+    def setUp(self):
+        self.author = User.objects.create_user('Autora', 'autora@test.com', 'x')
+        self.guest = User.objects.create_user('invitado', 'inv@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(
+            id='01', name='Mundo', description='Desc', status='LIVE', author=self.author,
+            metadata={
+                'cover_image': 'portada.webp',
+                'gallery_log': {
+                    'propia.webp': {'title': 'Sin uploader'},
+                    'ajena.webp': {'uploader': 'Invitado', 'title': 'Del invitado'},
+                },
+            }
+        )
+
+    def _files(self, user):
+        return [(i['filename'], i['type']) for i in SocialService.discover_user_content(user)['images']]
+
+    def test_attribution_follows_uploader_and_author(self):
+        """Test: Las imágenes sin uploader (y las portadas) se atribuyen al autor"""
+        self.assertEqual(self._files(self.author), [('portada.webp', 'cover'), ('propia.webp', 'gallery')])
+        self.assertEqual(self._files(self.guest), [('ajena.webp', 'gallery')])
+
+    def test_world_save_resyncs_attributions(self):
+        """Test: Guardar la entidad mantiene el índice al día"""
+        del self.world.metadata['gallery_log']['ajena.webp']
+        self.world.save()
+        self.assertEqual(self._files(self.guest), [])
+
+        self.world.is_active = False
+        self.world.save()
+        self.assertEqual(self._files(self.author), [])
+
+    def test_historical_uploads_and_rebuild(self):
+        """Test: Los logs de subida se indexan una vez y el comando reconstruye lo mismo"""
+        CaosEventLog.objects.create(user=self.guest, action='UPLOAD_PHOTO', details='File: antigua.png (v1)')
+        CaosEventLog.objects.create(user=self.guest, action='PROPOSE_COVER', details='Proposed cover: ajena.webp')
+        expected = [('ajena.webp', 'gallery'), ('antigua.png', 'historical')]
+        self.assertEqual(self._files(self.guest), expected)
+
+        CaosContentAttributionORM.objects.all().delete()
+        call_command('rebuild_content_attributions', stdout=StringIO())
+        self.assertEqual(self._files(self.guest), expected)
@@ -0,0 +1,114 @@
+"""
+Tests para la agregación de interacciones de los rankings del dashboard.
+Valida ContentAnalyticsView / UserRankingView (consultas constantes, paginación) y get_thumbnail_urls().
+"""
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosNarrativeORM, CaosLike, CaosComment, CaosGalleryImageORM, TimelinePeriod
+)
+from src.Infrastructure.DjangoFramework.persistence.utils import get_thumbnail_url, get_thumbnail_urls
+from src.Infrastructure.DjangoFramework.persistence.views.dashboard.analytics import ContentAnalyticsView
+
+
+class EngagementViewsTestCase(TestCase):
+    """Tests de las vistas de estadísticas y ranking."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('stats_admin', 'a@test.com', 'x')
+        self.author = User.objects.create_user('autora', 'autora@test.com', 'x')
+        self.fan = User.objects.create_user('fan', 'fan@test.com', 'x')
+        self.world = self._world('01', 'Mundo')
+        CaosGalleryImageORM.objects.create(jid='01', folder='01_Mundo', filename='mapa.webp')
+        self.client.force_login(self.admin)
+
+    def _world(self, jid, name, **extra):
+        return CaosWorldORM.objects.create(
+            id=jid, name=name, description='Desc', status='LIVE', author=self.author,
+            metadata={'cover_image': 'mapa.webp', 'gallery_log': {'mapa.webp': {'title': 'Mapa', 'uploader': 'autora'}}},
+            **extra
+        )
+
+    def _category(self, response, cat_id):
+        return next(c for c in response.context['categories'] if c['id'] == cat_id)
+
+    def test_analytics_counts_interactions(self):
+        """Test: Likes y comentarios se agregan por clave (sin distinguir mayúsculas)"""
+        CaosLike.objects.create(user=self.fan, entity_key='img_MAPA.webp')
+        CaosLike.objects.create(user=self.admin, entity_key='IMG_mapa.webp')
+        CaosComment.objects.create(user=self.fan, entity_key=f'WORLD_{self.world.public_id}', content='Hola')
+
+        response = self.client.get(reverse('content_analytics'))
+
+        image = self._category(response, 'images')['items'][0]
+        self.assertEqual((image['likes'], image['comments'], image['engagement']), (2, 0, 2))
+        self.assertEqual(image['thumbnail'], '/static/persistence/img/01_Mundo/mapa.webp')
+        self.assertEqual(self._category(response, 'metadata')['total_comments'], 1)
+        self.assertEqual(response.context['total_engagement'], 3)
+
+    def test_analytics_query_count_is_constant(self):
+        """Test: El número de consultas no crece con el contenido"""
+        def measure():
+            self.client.get(reverse('content_analytics'))
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse('content_analytics'))
+            return len(ctx.captured_queries)
+
+        baseline = measure()
+        for i in range(2, 6):
+            world = self._world(f'0{i}', f'Mundo {i}')
+            CaosNarrativeORM.objects.create(
+                nid=f'0{i}01', titulo=f'Relato {i}', contenido='...', world=world, created_by=self.author
+            )
+            TimelinePeriod.objects.create(world=world, title='Inicios', slug='inicios')
+
+        self.assertEqual(measure(), baseline)
+
+    def test_analytics_paginates_each_category(self):
+        """Test: Cada categoría se pagina por separado, ordenada por interacción"""
+        for i in range(3):
+            TimelinePeriod.objects.create(world=self.world, title=f'Periodo {i}', slug=f'periodo-{i}')
+        top = TimelinePeriod.objects.get(title='Periodo 2')
+        CaosLike.objects.create(user=self.fan, entity_key=f'PERIOD_{top.id}')
+
+        with patch.object(ContentAnalyticsView, 'paginate_by', 2):
+            first = self._category(self.client.get(reverse('content_analytics')), 'periods')
+            second = self._category(self.client.get(reverse('content_analytics'), {'page_periods': 2}), 'periods')
+
+        self.assertEqual(first['count'], 3)
+        self.assertEqual([p['title'] for p in first['items']][0], 'Periodo 2')
+        self.assertEqual(len(second['items']), 1)
+
+    def test_ranking_uses_indexed_thumbnails(self):
+        """Test: El ranking resuelve portadas y rutas de imagen desde el índice"""
+        CaosNarrativeORM.objects.create(nid='0101', titulo='Relato', contenido='...', world=self.world, created_by=self.author)
+        CaosLike.objects.create(user=self.fan, entity_key='IMG_mapa.webp')
+
+        response = self.client.get(reverse('user_ranking', args=[self.author.id]))
+
+        self.assertEqual(response.context['worlds_rank'][0]['thumbnail'], '/static/persistence/img/01_Mundo/mapa.webp')
+        self.assertEqual(response.context['narratives_rank'][0]['thumbnail'], '/static/persistence/img/01_Mundo/mapa.webp')
+        image = response.context['images_rank'][0]
+        self.assertEqual((image['thumbnail'], image['likes']), ('/static/persistence/img/01_Mundo/mapa.webp', 1))
+
+    def test_batch_thumbnails_match_single_lookup(self):
+        """Test: get_thumbnail_urls() aplica el mismo fallback que get_thumbnail_url()"""
+        no_cover = CaosWorldORM.objects.create(
+            id='02', name='Sin portada', description='Desc', status='LIVE',
+            metadata={'gallery_log': {'b.webp': {'period': 'inicios'}}}
+        )
+        CaosGalleryImageORM.objects.create(jid='02', folder='02', filename='a.webp')
+        CaosGalleryImageORM.objects.create(jid='02', folder='02', filename='b.webp')
+        empty = CaosWorldORM.objects.create(id='03', name='Vacío', description='Desc', status='LIVE')
+
+        thumbs = get_thumbnail_urls([self.world, no_cover, empty])
+
+        for w in (self.world, no_cover, empty):
+            self.assertEqual(thumbs[w.id], get_thumbnail_url(w.id, (w.metadata or {}).get('cover_image')))
+        self.assertEqual(thumbs['02'], '/static/persistence/img/02/a.webp')
+        self.assertEqual(thumbs['03'], '/static/img/placeholder.png')
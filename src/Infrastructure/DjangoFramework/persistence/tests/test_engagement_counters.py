@@ -0,0 +1,101 @@
+"""
+Tests para los contadores de interacción desnormalizados.
+Valida el mantenimiento por señales, reply_count y la reconciliación desde las tablas de origen.
+"""
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence.engagement_counters import reconcile_counters
+from src.Infrastructure.DjangoFramework.persistence.models import CaosLike, CaosComment, CaosEngagementCounterORM
+
+
+class EngagementCountersTestCase(TestCase):
+    """Tests de CaosEngagementCounterORM y CaosComment.reply_count."""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'lector{i}', f'lector{i}@test.com', 'x') for i in range(2)]
+
+    def _counter(self, norm):
+        c = CaosEngagementCounterORM.objects.filter(entity_key_norm=norm).first()
+        return (c.like_count, c.comment_count) if c else (0, 0)
+
+    def test_like_toggle_updates_counter(self):
+        """Test: Dar y quitar like ajusta el contador y el endpoint lo devuelve"""
+        self.client.force_login(self.users[0])
+        CaosLike.objects.create(user=self.users[1], entity_key='IMG_Mapa.webp')
+
+        response = self.client.post(reverse('toggle_like'), json.dumps({'entity_key': 'img_mapa.webp'}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(self._counter('img_mapa.webp'), (2, 0))
+
+        response = self.client.post(reverse('toggle_like'), json.dumps({'entity_key': 'img_mapa.webp'}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(self._counter('img_mapa.webp'), (1, 0))
+
+    def test_replies_update_parent_not_entity(self):
+        """Test: Las respuestas incrementan reply_count del padre, no comment_count de la entidad"""
+        parent = CaosComment.objects.create(user=self.users[0], entity_key='WORLD_abc', content='Hola')
+        self.client.force_login(self.users[1])
+        self.client.post(reverse('post_comment'), json.dumps({
+            'entity_key': 'WORLD_abc', 'content': 'Respuesta', 'parent_comment_id': parent.id
+        }), content_type='application/json')
+
+        parent.refresh_from_db()
+        self.assertEqual((parent.reply_count, parent.status), (1, 'REPLIED'))
+        self.assertEqual(self._counter('world_abc'), (0, 1))
+
+        parent.replies.get().delete()
+        parent.refresh_from_db()
+        self.assertEqual(parent.reply_count, 0)
+
+    def test_deleting_thread_updates_counter(self):
+        """Test: Borrar un comentario con respuestas solo descuenta el comentario de primer nivel"""
+        parent = CaosComment.objects.create(user=self.users[0], entity_key='narr_x', content='Hola')
+        CaosComment.objects.create(user=self.users[1], entity_key='narr_x', content='Re', parent_comment=parent)
+        self.assertEqual(self._counter('narr_x'), (0, 1))
+
+        parent.delete()
+        self.assertEqual(self._counter('narr_x'), (0, 0))
+
+    def test_hub_moderation_writes_only_status(self):
+        """Test: Archivar o borrar desde el Social Hub solo escribe la columna status"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        comment = CaosComment.objects.create(user=self.users[1], entity_key='IMG_Mapa.webp', content='Hola')
+        self.client.force_login(self.users[0])
+        for name, status in (('archive_comment', 'ARCHIVED'), ('hub_delete_comment', 'DELETED')):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(name, args=[comment.id]))
+            updates = [q['sql'] for q in queries.captured_queries
+                       if q['sql'].startswith('UPDATE') and CaosComment._meta.db_table in q['sql']]
+            self.assertEqual(len(updates), 1)
+            self.assertIn('"status"', updates[0])
+            self.assertNotIn('"content"', updates[0])
+            self.assertEqual(CaosComment.objects.get(id=comment.id).status, status)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        """Test: La reconciliación detecta las escrituras sin señales y las corrige"""
+        CaosLike.objects.create(user=self.users[0], entity_key='IMG_a.webp')
+        # bulk_create no emite señales: el contador queda desfasado
+        CaosLike.objects.bulk_create([CaosLike(user=self.users[1], entity_key='IMG_a.webp', entity_key_norm='img_a.webp')])
+        parent = CaosComment.objects.create(user=self.users[0], entity_key='IMG_a.webp', content='Hola')
+        CaosComment.objects.filter(id=parent.id).update(reply_count=5)
+
+        out = StringIO()
+        call_command('reconcile_engagement_counters', '--dry-run', stdout=out)
+        self.assertIn('img_a.webp', out.getvalue())
+        self.assertEqual(self._counter('img_a.webp'), (1, 1))
+
+        drift = reconcile_counters()
+        self.assertEqual(drift['counters'], [('img_a.webp', {'like_count': 1, 'comment_count': 1},
+                                              {'like_count': 2, 'comment_count': 1})])
+        self.assertEqual(drift['replies'], [(parent.id, 5, 0)])
+        self.assertEqual(self._counter('img_a.webp'), (2, 1))
+        self.assertEqual(reconcile_counters(), {'counters': [], 'replies': []})
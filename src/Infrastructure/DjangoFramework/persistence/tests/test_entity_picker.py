@@ -0,0 +1,66 @@
+"""
+Tests para el selector de entidades con autocompletado del editor de narrativas.
+Valida el orden de coincidencias, la visibilidad y el límite de resultados.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence.entity_picker import search_entities, MAX_RESULTS
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+
+class EntityPickerTestCase(TestCase):
+    """Tests de search_entities y del endpoint entity_picker."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('escritor', 'escritor@test.com', 'x')
+        self._world('01', 'Reino de Arcadia')
+        self._world('0101', 'Arcadia')
+        self._world('010101', 'Bosque Arcano')
+        self._world('0102', 'Ciudad Oculta', visible_publico=False)
+        self._world('0103', 'Arcadia Olvidada', is_active=False)
+
+    def _world(self, jid, name, visible_publico=True, is_active=True):
+        return CaosWorldORM.objects.create(id=jid, name=name, description='Desc', status='LIVE',
+                                           visible_publico=visible_publico, is_active=is_active)
+
+    def _ids(self, query, **kwargs):
+        return [r['id'] for r in search_entities(query, self.user, **kwargs)]
+
+    def test_name_prefix_ranks_before_word_prefix(self):
+        """Test: El prefijo del nombre va antes que el prefijo de otra palabra; a igualdad, las menos profundas"""
+        self.assertEqual(self._ids('arca'), ['0101', '01', '010101'])
+        self.assertEqual(self._ids('ARCADIA'), ['0101', '01'])
+
+    def test_jid_and_public_id_matching(self):
+        """Test: Se puede buscar por prefijo de J-ID o por public_id exacto"""
+        self.assertEqual(self._ids('0101'), ['0101', '010101'])
+        bosque = CaosWorldORM.objects.get(id='010101')
+        self.assertEqual(self._ids(bosque.public_id), ['010101'])
+
+    def test_visibility_and_trash_are_respected(self):
+        """Test: Las entidades privadas o en la papelera no aparecen (salvo privadas para superusuario)"""
+        self.assertEqual(self._ids('ciudad'), [])
+        self.assertEqual(self._ids('olvidada'), [])
+        admin = User.objects.create_superuser('dios', 'dios@test.com', 'x')
+        self.assertEqual([r['id'] for r in search_entities('ciudad', admin)], ['0102'])
+
+    def test_results_are_capped(self):
+        """Test: El número de resultados está acotado y las consultas muy cortas no buscan"""
+        for i in range(MAX_RESULTS + 5):
+            self._world(f'02{i:02d}', f'Isla {i}')
+        self.assertEqual(len(self._ids('isla')), MAX_RESULTS)
+        self.assertEqual(len(self._ids('isla', limit=3)), 3)
+        self.assertEqual(self._ids('i'), [])
+
+    def test_endpoint(self):
+        """Test: El endpoint devuelve JSON con la URL de la ficha y exige sesión"""
+        url = reverse('entity_picker')
+        self.assertEqual(self.client.get(url, {'q': 'bosque'}).status_code, 302)
+
+        self.client.force_login(self.user)
+        data = self.client.get(url, {'q': 'bosque'}).json()
+        bosque = CaosWorldORM.objects.get(id='010101')
+        self.assertEqual(data['results'], [
+            {'id': '010101', 'name': 'Bosque Arcano', 'public_id': bosque.public_id, 'url': f'/mundo/{bosque.public_id}/'}
+        ])
@@ -0,0 +1,94 @@
+"""
+Tests para el índice persistente de galerías.
+Valida rebuild_gallery_index(), register/unregister_image() y su uso en get_world_images().
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from src.Infrastructure.DjangoFramework.persistence import gallery_index
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosGalleryImageORM
+from src.Infrastructure.DjangoFramework.persistence.utils import get_world_images
+
+
+class GalleryIndexTestCase(TestCase):
+    """Tests del índice de galerías sobre un árbol de imágenes temporal."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.override = override_settings(BASE_DIR=Path(self.tmp))
+        self.override.enable()
+        self.img_root = gallery_index.get_img_root()
+
+        self._touch('0101', 'b_image.webp')
+        self._touch('0101', 'a_image.png')
+        self._touch('0101', 'notes.txt')
+        self._touch('0101/.trash', 'deleted.webp')
+        self._touch('0102_Legacy', 'old.jpg')
+
+        self.world = CaosWorldORM.objects.create(id='0101', name='Mundo', description='Desc', status='LIVE')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _touch(self, folder, filename):
+        path = self.img_root / folder
+        path.mkdir(parents=True, exist_ok=True)
+        (path / filename).write_bytes(b'img')
+
+    def test_rebuild_indexes_images_only(self):
+        """Test: Solo se indexan imágenes de la carpeta (sin .trash ni otros archivos)"""
+        total = gallery_index.rebuild_gallery_index()
+
+        self.assertEqual(total, 3)
+        folder, files = gallery_index.list_gallery('0101')
+        self.assertEqual(folder, '0101')
+        self.assertEqual([f for f, _ in files], ['a_image.png', 'b_image.webp'])
+
+    def test_rebuild_resolves_legacy_folders(self):
+        """Test: Las carpetas legacy '<jid>_Nombre' se indexan bajo su J-ID"""
+        gallery_index.rebuild_gallery_index()
+
+        folder, files = gallery_index.list_gallery('0102')
+        self.assertEqual(folder, '0102_Legacy')
+        self.assertEqual([f for f, _ in files], ['old.jpg'])
+
+    def test_register_and_unregister(self):
+        """Test: Las escrituras mantienen el índice sincronizado"""
+        self._touch('0101', 'c_new.webp')
+        gallery_index.register_image('0101', 'c_new.webp')
+        self.assertTrue(CaosGalleryImageORM.objects.filter(jid='0101', filename='c_new.webp').exists())
+
+        gallery_index.unregister_image('0101', 'c_new.webp')
+        self.assertFalse(CaosGalleryImageORM.objects.filter(jid='0101', filename='c_new.webp').exists())
+
+    def test_get_world_images_reads_index(self):
+        """Test: get_world_images() lista desde el índice, no desde el disco"""
+        gallery_index.rebuild_gallery_index()
+        (self.img_root / '0101' / 'a_image.png').unlink()
+
+        imgs = get_world_images('0101', world_instance=self.world)
+
+        self.assertEqual([i['url'] for i in imgs], ['0101/a_image.png', '0101/b_image.webp'])
+
+    def test_avatar_pool_follows_index(self):
+        """Test: El pool de avatares se construye desde el índice y se refresca al escribir"""
+        gallery_index.rebuild_gallery_index()
+        self.assertEqual(gallery_index.get_image_pool(), ['0101/a_image.png', '0101/b_image.webp', '0102_Legacy/old.jpg'])
+
+        gallery_index.unregister_image('0102', 'old.jpg')
+        self.assertNotIn('0102_Legacy/old.jpg', gallery_index.get_image_pool())
+
+    def test_user_avatar_fallback_is_stable(self):
+        """Test: Sin avatar de perfil, el respaldo es estable por usuario y sale del pool"""
+        from django.contrib.auth.models import User
+        from src.Infrastructure.DjangoFramework.persistence.utils import get_user_avatar
+
+        gallery_index.rebuild_gallery_index()
+        user = User.objects.create_user(username='sin_avatar', password='x')
+
+        first = get_user_avatar(user)
+        self.assertEqual(first, get_user_avatar(user))
+        self.assertTrue(any(first.endswith(p) for p in gallery_index.get_image_pool()))
@@ -0,0 +1,58 @@
+"""
+Tests para el índice del Home cacheado por clase de visibilidad.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+
+
+class HomeIndexCacheTestCase(TestCase):
+    """Tests de la caché del índice del Home."""
+
+    def setUp(self):
+        cache.clear()
+        self.world = CaosWorldORM.objects.create(
+            id='0201', public_id='HomeTest01', name='Galaxia', description='Desc', status='LIVE', visible_publico=True
+        )
+        CaosWorldORM.objects.create(id='0301', name='Privado', description='Desc', status='LIVE', visible_publico=False)
+
+    def _names(self, response):
+        return [m['real_name'] for m in response.context['mundos']]
+
+    def test_anonymous_home_is_served_from_cache(self):
+        """Test: En régimen estable, el Home anónimo no consulta la base de datos"""
+        self.client.get(reverse('home'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_index_is_cached_per_visibility_class(self):
+        """Test: Anónimos y superusuarios no comparten el índice"""
+        self.assertNotIn('Privado', self._names(self.client.get(reverse('home'))))
+
+        admin = User.objects.create_superuser('home_admin', 'a@test.com', 'x')
+        self.client.force_login(admin)
+        self.assertIn('Privado', self._names(self.client.get(reverse('home'))))
+
+    def test_visibility_change_invalidates_index(self):
+        """Test: Ocultar un mundo lo retira del índice cacheado"""
+        self.assertIn('Galaxia', self._names(self.client.get(reverse('home'))))
+
+        self.world.visible_publico = False
+        self.world.save()
+
+        self.assertNotIn('Galaxia', self._names(self.client.get(reverse('home'))))
+
+    def test_owner_sees_status_toggle_on_cached_card(self):
+        """Test: El autor (no superusuario) ve el interruptor de estado en su tarjeta del Home cacheado"""
+        owner = User.objects.create_user('home_owner', 'o@test.com', 'x')
+        CaosWorldORM.objects.filter(id='0201').update(author=owner)
+        toggle_url = reverse('toggle_status', args=[self.world.public_id])
+
+        self.assertNotContains(self.client.get(reverse('home')), toggle_url)
+
+        self.client.force_login(owner)
+        self.assertContains(self.client.get(reverse('home')), toggle_url)
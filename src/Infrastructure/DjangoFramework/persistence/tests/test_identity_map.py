@@ -0,0 +1,83 @@
+"""
+Tests para el mapa de identidad por petición.
+Valida la resolución única de identificadores, la prioridad de entidades activas,
+la invalidación al guardar y la memoización de niveles de acceso.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.identity_map import (
+    get_world, identity_map_scope, resolve_world
+)
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+from src.Infrastructure.DjangoFramework.persistence.policies import get_user_access_level
+from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+
+class IdentityMapTestCase(TestCase):
+    """Tests de identity_map y su integración con repositorio y políticas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('creador', 'creador@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(id='01', name='Arcadia', description='Desc', status='LIVE',
+                                                 visible_publico=True, author=self.user)
+
+    def test_identifier_is_resolved_once_per_request(self):
+        """Test: Resolver por public_id y por J-ID en la misma petición cuesta una consulta y da la misma instancia"""
+        with identity_map_scope():
+            with self.assertNumQueries(1):
+                first = resolve_world(self.world.public_id)
+                again = resolve_world(self.world.public_id)
+                by_jid = get_world(id='01')
+                domain = DjangoCaosRepository().get_by_public_id(self.world.public_id)
+            self.assertIs(first, again)
+            self.assertIs(first, by_jid)
+            self.assertIs(domain, DjangoCaosRepository().find_by_id('01'))
+
+    def test_without_request_scope_nothing_is_cached(self):
+        """Test: Fuera de una petición cada resolución consulta la base de datos"""
+        with self.assertNumQueries(2):
+            resolve_world('01')
+            resolve_world('01')
+
+    def test_active_entity_wins_over_trash(self):
+        """Test: Ante un identificador repetido se resuelve la entidad activa, no la de la papelera"""
+        CaosWorldORM.objects.filter(id='01').update(is_active=False)
+        CaosWorldORM.objects.create(id='0101', public_id='01', name='Colisión', description='',
+                                    status='LIVE', author=self.user)
+        with identity_map_scope():
+            self.assertEqual(resolve_world('01').id, '0101')
+            self.assertIsNone(DjangoCaosRepository().find_by_id('01'))
+        self.assertEqual(resolve_world(self.world.public_id).id, '01')
+
+    def test_saving_forgets_the_entity(self):
+        """Test: Tras guardar, las lecturas posteriores de la petición ven la fila nueva"""
+        with identity_map_scope():
+            DjangoCaosRepository().find_by_id('01')
+            CaosWorldORM.objects.filter(id='01').update(name='Antigua')
+            self.world.name = 'Renombrada'
+            self.world.save()
+            self.assertEqual(DjangoCaosRepository().find_by_id('01').name, 'Renombrada')
+
+    def test_access_level_is_memoized_per_author(self):
+        """Test: El nivel de acceso se calcula una vez por autor dentro de la petición"""
+        viewer = User.objects.create_user('lector', 'lector@test.com', 'x')
+        other = CaosWorldORM.objects.create(id='02', name='Borea', description='', status='LIVE', author=self.user)
+        with identity_map_scope():
+            viewer = User.objects.select_related('profile').get(pk=viewer.pk)
+            worlds = [get_world(id='01'), get_world(id='02')]
+            with self.assertNumQueries(1):
+                levels = [get_user_access_level(viewer, w) for w in worlds + worlds]
+        self.assertEqual(levels, ['NONE'] * 4)
+        self.assertEqual(get_user_access_level(self.user, other), 'OWNER')
+
+    def test_world_detail_resolves_entity_once(self):
+        """Test: La ficha de un mundo solo consulta la fila de la entidad una vez"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/mundo/{self.world.public_id}/')
+        self.assertEqual(response.status_code, 200)
+        world_reads = [q['sql'] for q in queries.captured_queries
+                       if 'FROM "caos_worlds"' in q['sql'] and '"caos_worlds"."public_id" =' in q['sql']]
+        self.assertEqual(len(world_reads), 1)
@@ -0,0 +1,113 @@
+"""
+Tests para las miniaturas (derivados) de las imágenes de galería.
+Valida la generación al registrar, el srcset de get_world_images(), las URLs de
+tarjeta de get_thumbnail_urls() y la limpieza al desindexar o reemplazar.
+"""
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from PIL import Image
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from src.Infrastructure.DjangoFramework.persistence import gallery_index, image_derivatives
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosGalleryImageORM
+from src.Infrastructure.DjangoFramework.persistence.utils import get_thumbnail_urls, get_world_images
+
+
+class ImageDerivativesTestCase(TestCase):
+    """Tests de image_derivatives sobre un árbol de imágenes temporal."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.override = override_settings(BASE_DIR=Path(self.tmp))
+        self.override.enable()
+        self.folder = gallery_index.get_img_root() / '01'
+        self.folder.mkdir(parents=True)
+        self.world = CaosWorldORM.objects.create(id='01', name='Mundo', description='Desc', status='LIVE',
+                                                 metadata={'cover_image': 'mapa.webp'})
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _image(self, filename, size=(512, 768), color='purple'):
+        Image.new('RGB', size, color).save(self.folder / filename, 'WEBP')
+
+    def _thumbs(self):
+        thumbs_dir = self.folder / image_derivatives.DERIVATIVE_DIR
+        return sorted(p.name for p in thumbs_dir.iterdir()) if thumbs_dir.exists() else []
+
+    def test_register_generates_smaller_widths_only(self):
+        """Test: Se generan las anchuras menores que el original, con el hash del contenido en el nombre"""
+        self._image('mapa.webp')
+        gallery_index.register_image('01', 'mapa.webp')
+
+        row = CaosGalleryImageORM.objects.get(jid='01', filename='mapa.webp')
+        self.assertEqual(row.width, 512)
+        self.assertEqual(self._thumbs(), [f'mapa.webp.{row.content_hash}.160w.webp', f'mapa.webp.{row.content_hash}.320w.webp'])
+        with Image.open(self.folder / '_thumbs' / f'mapa.webp.{row.content_hash}.320w.webp') as thumb:
+            self.assertEqual(thumb.size, (320, 480))
+
+    def test_gallery_exposes_thumb_and_srcset(self):
+        """Test: La galería expone la miniatura de tarjeta y el srcset con todas las anchuras"""
+        self._image('mapa.webp')
+        gallery_index.register_image('01', 'mapa.webp')
+        digest = CaosGalleryImageORM.objects.get(filename='mapa.webp').content_hash
+
+        img = get_world_images('01', world_instance=self.world)[0]
+        self.assertEqual(img['url'], '01/mapa.webp')
+        self.assertEqual(img['thumb'], f'01/_thumbs/mapa.webp.{digest}.320w.webp')
+        self.assertEqual(img['srcset'].split(', '), [
+            f'/static/persistence/img/01/_thumbs/mapa.webp.{digest}.160w.webp 160w',
+            f'/static/persistence/img/01/_thumbs/mapa.webp.{digest}.320w.webp 320w',
+            '/static/persistence/img/01/mapa.webp 512w',
+        ])
+        self.assertEqual(get_thumbnail_urls([self.world])['01'], f'/static/persistence/img/{img["thumb"]}')
+
+    def test_images_without_derivatives_fall_back_to_original(self):
+        """Test: Las imágenes indexadas antes de los derivados siguen usando el original"""
+        CaosGalleryImageORM.objects.create(jid='01', folder='01', filename='mapa.webp')
+
+        img = get_world_images('01', world_instance=self.world)[0]
+        self.assertEqual((img['thumb'], img['srcset']), ('01/mapa.webp', ''))
+
+    def test_replacing_and_unregistering_clean_up(self):
+        """Test: Reemplazar o desindexar una imagen borra sus miniaturas antiguas"""
+        self._image('mapa.webp')
+        gallery_index.register_image('01', 'mapa.webp')
+        self._image('mapa.webp', color='gold')
+        gallery_index.register_image('01', 'mapa.webp')
+        digest = CaosGalleryImageORM.objects.get(filename='mapa.webp').content_hash
+        self.assertTrue(all(f'.{digest}.' in name for name in self._thumbs()))
+        self.assertEqual(len(self._thumbs()), 2)
+
+        gallery_index.unregister_image('01', 'mapa.webp')
+        self.assertEqual(self._thumbs(), [])
+
+    def test_same_stem_with_other_extension_keeps_own_thumbs(self):
+        """Test: 'mapa.png' y 'mapa.webp' tienen miniaturas distintas y desindexar una no borra las de la otra"""
+        self._image('mapa.webp')
+        self._image('mapa.png', color='gold')
+        gallery_index.register_image('01', 'mapa.webp')
+        gallery_index.register_image('01', 'mapa.png')
+        png_digest = CaosGalleryImageORM.objects.get(filename='mapa.png').content_hash
+        self.assertEqual(len(self._thumbs()), 4)
+
+        gallery_index.unregister_image('01', 'mapa.webp')
+        self.assertEqual(self._thumbs(), [f'mapa.png.{png_digest}.160w.webp', f'mapa.png.{png_digest}.320w.webp'])
+
+    def test_command_backfills_existing_images(self):
+        """Test: build_image_derivatives genera las miniaturas de las imágenes ya indexadas"""
+        self._image('mapa.webp')
+        gallery_index.rebuild_gallery_index()
+        self.assertEqual(CaosGalleryImageORM.objects.get(filename='mapa.webp').content_hash, '')
+
+        call_command('build_image_derivatives', stdout=StringIO())
+
+        self.assertEqual(len(self._thumbs()), 2)
+        self.assertNotEqual(CaosGalleryImageORM.objects.get(filename='mapa.webp').content_hash, '')
+        # Reindexar no pierde los derivados de archivos sin cambios
+        gallery_index.rebuild_gallery_index()
+        self.assertNotEqual(CaosGalleryImageORM.objects.get(filename='mapa.webp').content_hash, '')
@@ -0,0 +1,176 @@
+"""
+Tests para el procesamiento de imágenes fuera de la petición.
+Valida que las vistas encolan sin tocar PIL, el worker de imágenes, el pool de procesos
+y el parche atómico del gallery_log.
+"""
+import base64
+import io
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence import image_jobs
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosAIJobORM, CaosContentAttributionORM, CaosGalleryImageORM, CaosImageProposalORM, CaosNotification, CaosWorldORM
+)
+
+
+def _png_bytes(size=(400, 300)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, 'teal').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ImageJobsTestCase(TestCase):
+    """Tests de image_jobs y run_image_worker."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.override = override_settings(BASE_DIR=self.tmp, MEDIA_ROOT=self.tmp / 'media',
+                                          IMAGE_SPOOL_DIR=self.tmp / 'media' / 'image_spool')
+        self.override.enable()
+        self.user = User.objects.create_user('creador', 'creador@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(id='01', name='Arcadia', description='Desc', status='LIVE',
+                                                 author=self.user, metadata={'cover_image': 'mapa.webp'})
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _work(self):
+        out = StringIO()
+        call_command('run_image_worker', '--inline', '--once', stdout=out)
+        return out.getvalue()
+
+    def test_ai_photo_is_queued_and_converted_by_worker(self):
+        """Test: api_save_foto responde con el trabajo sin decodificar la imagen; el worker crea la propuesta WebP"""
+        body = {'image': 'data:image/png;base64,' + base64.b64encode(_png_bytes()).decode(), 'title': 'Amanecer'}
+        with mock.patch('PIL.Image.open') as pil_open:
+            response = self.client.post(reverse('api_save_foto', args=[self.world.public_id]), json.dumps(body),
+                                        content_type='application/json')
+        pil_open.assert_not_called()
+        self.assertEqual(response.status_code, 202)
+        job = CaosAIJobORM.objects.get(id=response.json()['job_id'])
+        self.assertEqual((job.kind, job.backend), ('propose_image', image_jobs.MEDIA_BACKEND))
+        self.assertFalse(CaosImageProposalORM.objects.exists())
+
+        self.assertIn('Imágenes procesadas: 1', self._work())
+
+        proposal = CaosImageProposalORM.objects.get()
+        self.assertEqual((proposal.title, proposal.author, proposal.status), ('Amanecer', self.user, 'PENDING'))
+        with Image.open(proposal.image.path) as image:
+            self.assertEqual(image.format, 'WEBP')
+        self.assertEqual(list(image_jobs.spool_dir().iterdir()), [])
+        self.assertEqual(CaosAIJobORM.objects.get(id=job.id).result['proposal_id'], proposal.id)
+
+    def test_invalid_upload_fails_the_job(self):
+        """Test: Una subida que no es una imagen marca el trabajo como fallido y limpia el spool"""
+        job = image_jobs.enqueue_image_proposal(self.world, b'no es una imagen', 'Roto', None, self.user)
+        self._work()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('no es válida', job.error)
+        self.assertEqual(list(image_jobs.spool_dir().iterdir()), [])
+
+    def test_publication_is_processed_by_worker(self):
+        """Test: Publicar encola el trabajo; el worker guarda el archivo, lo indexa, lo registra y notifica"""
+        proposal = CaosImageProposalORM.objects.create(world=self.world, title='Mapa', author=self.user,
+                                                       image=ContentFile(_png_bytes(), name='mapa.png'))
+        response = self.client.get(reverse('publicar_imagen', args=[proposal.id]))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(CaosGalleryImageORM.objects.exists())
+        self.assertFalse(CaosNotification.objects.exists())
+        self.assertEqual(CaosImageProposalORM.objects.get(id=proposal.id).status, image_jobs.PUBLISHING_STATUS)
+
+        self._work()
+
+        proposal.refresh_from_db()
+        self.assertEqual((proposal.status, proposal.reviewer), ('ARCHIVED', self.user))
+
+        row = CaosGalleryImageORM.objects.get(jid='01')
+        self.assertEqual((row.filename, row.width), ('Mapa.webp', 400))
+        self.assertTrue(row.content_hash)
+        with Image.open(self.tmp / 'persistence/static/persistence/img/01/Mapa.webp') as image:
+            self.assertEqual((image.format, image.mode), ('WEBP', 'RGB'))
+        entry = CaosWorldORM.objects.get(id='01').metadata['gallery_log']['Mapa.webp']
+        self.assertEqual((entry['uploader'], entry['origin'], entry['title']), ('creador', 'MANUAL_UPLOAD', 'Mapa'))
+        self.assertEqual(CaosNotification.objects.get().user, self.user)
+
+    def test_double_approval_publishes_once(self):
+        """Test: Aprobar dos veces mientras se publica encola un solo trabajo y una sola imagen"""
+        proposal = CaosImageProposalORM.objects.create(world=self.world, title='Mapa', author=self.user,
+                                                       image=ContentFile(_png_bytes(), name='mapa.png'))
+        self.client.get(reverse('publicar_imagen', args=[proposal.id]))
+        self.client.get(reverse('publicar_imagen', args=[proposal.id]))
+        self.assertEqual(CaosAIJobORM.objects.filter(kind='publish_image').count(), 1)
+
+        self._work()
+        self.client.get(reverse('publicar_imagen', args=[proposal.id]))
+
+        self.assertEqual(CaosAIJobORM.objects.filter(kind='publish_image').count(), 1)
+        self.assertEqual(list(CaosGalleryImageORM.objects.values_list('filename', flat=True)), ['Mapa.webp'])
+        self.assertEqual(list(CaosWorldORM.objects.get(id='01').metadata['gallery_log']), ['Mapa.webp'])
+
+    def test_failed_publication_keeps_proposal_pending(self):
+        """Test: Si la publicación falla, la propuesta no se archiva y se avisa al reviewer y al autor"""
+        author = User.objects.create_user('autora', 'autora@test.com', 'x')
+        proposal = CaosImageProposalORM.objects.create(world=self.world, title='Mapa', author=author,
+                                                       image=ContentFile(_png_bytes(), name='mapa.png'))
+        self.client.get(reverse('publicar_imagen', args=[proposal.id]))
+
+        with mock.patch('src.WorldManagement.Caos.Infrastructure.django_repository.DjangoCaosRepository.save_manual_file',
+                        return_value=None):
+            self._work()
+
+        self.assertEqual(CaosAIJobORM.objects.get(kind='publish_image').status, 'FAILED')
+        proposal.refresh_from_db()
+        self.assertEqual((proposal.status, proposal.reviewer), ('PENDING', None))
+        self.assertFalse(CaosGalleryImageORM.objects.exists())
+        self.assertEqual(set(CaosNotification.objects.values_list('user__username', 'title')),
+                         {('creador', '⚠️ Imagen no publicada'), ('autora', '⚠️ Imagen no publicada')})
+
+    def test_gallery_log_patch_keeps_other_keys(self):
+        """Test: El parche solo toca su entrada del gallery_log y mantiene los índices derivados"""
+        CaosWorldORM.objects.filter(id='01').update(metadata={'cover_image': 'mapa.webp',
+                                                              'gallery_log': {'a.webp': {'title': 'A'}}})
+        image_jobs.patch_gallery_log('01', 'b.webp', image_jobs.gallery_log_entry('lector', 'GENERATED', 'B'))
+
+        metadata = CaosWorldORM.objects.get(id='01').metadata
+        self.assertEqual(metadata['cover_image'], 'mapa.webp')
+        self.assertEqual(set(metadata['gallery_log']), {'a.webp', 'b.webp'})
+        self.assertTrue(CaosContentAttributionORM.objects.filter(world_id='01', filename='b.webp', username='lector').exists())
+
+        CaosWorldORM.objects.filter(id='01').update(metadata={'gallery_log': []})
+        image_jobs.patch_gallery_log('01', 'c.webp', {'title': 'C'})
+        self.assertEqual(CaosWorldORM.objects.get(id='01').metadata, {'gallery_log': {'c.webp': {'title': 'C'}}})
+
+    def test_batch_delete_creates_proposals_at_once(self):
+        """Test: El borrado por lotes crea todas las propuestas DELETE de una vez"""
+        response = self.client.post(reverse('borrar_fotos_batch', args=['01']),
+                                    json.dumps({'filenames': ['a.webp', 'b.webp'], 'reason': 'Duplicadas'}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['status'], 'ok')
+        self.assertEqual(sorted(CaosImageProposalORM.objects.values_list('target_filename', flat=True)), ['a.webp', 'b.webp'])
+
+    def test_process_pool_encodes_in_child_process(self):
+        """Test: El pool de procesos codifica el WebP con EXIF y genera sus miniaturas"""
+        target = self.tmp / 'pool.webp'
+        image_jobs.start_pool(1)
+        try:
+            variants = image_jobs.run_cpu(image_jobs.encode_webp, _png_bytes((800, 600)), str(target), 80, 'creador', True, True)
+        finally:
+            image_jobs.shutdown_pool()
+        self.assertEqual(variants[1], 800)
+        self.assertEqual(len(list((self.tmp / '_thumbs').iterdir())), 3)
+        with Image.open(target) as image:
+            self.assertEqual(image.getexif()[0x013b], 'creador')
@@ -0,0 +1,79 @@
+"""
+Tests para el localizador de imágenes por nombre de archivo.
+Valida la sincronización desde galerías, períodos y logs, y la resolución en bloque de claves 'img_'.
+"""
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from src.Infrastructure.DjangoFramework.persistence.image_locator import locate_images, rebuild_image_locators
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosEventLog, CaosNarrativeORM, CaosImageLocatorORM, TimelinePeriod
+)
+from src.Shared.Services.SocialService import SocialService
+
+
+class ImageLocatorTestCase(TestCase):
+    """Tests del índice archivo → entidad."""
+
+    def setUp(self):
+        self.world = CaosWorldORM.objects.create(
+            id='01', name='Mundo', description='Desc', status='LIVE',
+            metadata={'cover_image': 'Portada.webp', 'gallery_log': {'mapa.webp': {'title': 'Mapa antiguo'}}}
+        )
+        self.other = CaosWorldORM.objects.create(id='02', name='Otro', description='Desc', status='LIVE')
+
+    def test_gallery_and_cover_are_indexed_on_save(self):
+        """Test: Guardar una entidad indexa su galería y su portada (en minúsculas)"""
+        located = locate_images(['mapa.webp', 'PORTADA.webp'])
+
+        self.assertEqual(located['mapa.webp']['world'], self.world)
+        self.assertEqual(located['mapa.webp']['title'], 'Mapa antiguo')
+        self.assertEqual(located['portada.webp']['world'], self.world)
+
+        self.world.metadata = {}
+        self.world.save()
+        self.assertEqual(locate_images(['mapa.webp']), {})
+
+    def test_period_gallery_resolves_to_its_world(self):
+        """Test: Las imágenes de un período resuelven a la entidad del período"""
+        TimelinePeriod.objects.create(
+            world=self.other, title='Inicios', slug='inicios',
+            metadata={'gallery_log': {'ruinas.webp': {'title': 'Ruinas'}}}
+        )
+
+        self.assertEqual(locate_images(['ruinas.webp'])['ruinas.webp']['world'], self.other)
+
+    def test_event_log_is_last_resort(self):
+        """Test: El log solo se usa si la imagen no está en ninguna galería"""
+        CaosEventLog.objects.create(action='UPLOAD_PHOTO', target_id='02', details='Subida: suelta.webp')
+        CaosEventLog.objects.create(action='UPLOAD_PHOTO', target_id='02', details='Subida: mapa.webp')
+
+        located = locate_images(['suelta.webp', 'mapa.webp'])
+        self.assertEqual(located['suelta.webp']['world'], self.other)
+        self.assertEqual(located['mapa.webp']['world'], self.world)
+
+    def test_rebuild_matches_incremental_sync(self):
+        """Test: La reconstrucción completa produce las mismas filas que la sincronización incremental"""
+        CaosEventLog.objects.create(action='UPLOAD_PHOTO', target_id='02', details='Subida: suelta.webp')
+        before = set(CaosImageLocatorORM.objects.values_list('filename', 'world_id', 'source'))
+
+        rebuild_image_locators()
+
+        self.assertEqual(set(CaosImageLocatorORM.objects.values_list('filename', 'world_id', 'source')), before)
+
+    def test_batch_resolution_uses_constant_queries(self):
+        """Test: Resolver muchas claves cuesta una consulta por tipo de contenido"""
+        narrative = CaosNarrativeORM.objects.create(
+            nid='0101', public_id='cronica001', titulo='Crónica', contenido='...', world=self.world
+        )
+        keys = ['img_mapa.webp', 'IMG_Portada.webp', f'narr_{narrative.public_id}', 'world_02', 'img_desconocida.webp']
+
+        with CaptureQueriesContext(connection) as ctx:
+            resolved = SocialService.resolve_contents_by_keys(keys)
+
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(resolved['img_mapa.webp']['world'], self.world)
+        self.assertEqual(resolved['IMG_Portada.webp']['world'], self.world)
+        self.assertEqual(resolved[f'narr_{narrative.public_id}']['title'], 'Crónica')
+        self.assertEqual(resolved['world_02']['world'], self.other)
+        self.assertIsNone(resolved['img_desconocida.webp']['world'])
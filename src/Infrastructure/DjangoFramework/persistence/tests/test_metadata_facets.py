@@ -0,0 +1,75 @@
+"""
+Tests para las facetas tipadas de metadata y StructuralSearchUseCase.
+Valida la extracción (formatos V1/V2.0/V2.1), la lectura de números y los filtros por subárbol.
+"""
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.metadata_facets import (
+    extract_facets, parse_number, rebuild_metadata_facets
+)
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosMetadataFacetORM
+from src.WorldManagement.Caos.Application.search_api import StructuralSearchUseCase
+
+
+class MetadataFacetsTestCase(TestCase):
+    """Tests del índice de facetas."""
+
+    def setUp(self):
+        self._world('01', 'Galaxia', {})
+        self._world('0101', 'Arrakis', {'datos_nucleo': {'gravedad': '0,9 G', 'clima_global': 'Árido'}})
+        self._world('0102', 'Hoth', {'properties': [{'key': 'Gravedad', 'value': '1.1'}, {'key': 'Clima Global', 'value': 'Glacial'}]})
+        self._world('0103', 'Trantor', {'gravedad': 1.5, 'poblacion': '40.000 millones', 'clima_global': 'árido'})
+        self._world('02', 'Otra galaxia', {})
+        self._world('0201', 'Fuera', {'datos_nucleo': {'gravedad': '1,0', 'clima_global': 'Árido'}})
+
+    def _world(self, jid, name, metadata):
+        return CaosWorldORM.objects.create(id=jid, name=name, description='Desc', status='LIVE', metadata=metadata)
+
+    def _search(self, container, filters):
+        return sorted(r['id'] for r in StructuralSearchUseCase().execute(container, filters))
+
+    def test_number_parsing(self):
+        """Test: Los valores de texto con unidades y formato español se leen como número"""
+        self.assertEqual(parse_number('9,8 m/s²'), 9.8)
+        self.assertEqual(parse_number('1.500 habitantes'), 1500.0)
+        self.assertEqual(parse_number('1.5'), 1.5)
+        self.assertEqual(parse_number('1.234,5'), 1234.5)
+        self.assertIsNone(parse_number('Alta'))
+        self.assertIsNone(parse_number(True))
+
+    def test_extraction_covers_all_formats(self):
+        """Test: Se extraen facetas de datos_nucleo, properties y metadata plana"""
+        self.assertEqual(
+            sorted(extract_facets({'properties': [{'key': 'Clima Global', 'value': 'Glacial'}], 'cover_image': 'x.webp'})),
+            [('clima_global', None, 'glacial')]
+        )
+        self.assertIn(('gravedad', 0.9, '0,9 g'), CaosMetadataFacetORM.objects.filter(world_id='0101')
+                      .values_list('key', 'numeric_value', 'text_value'))
+
+    def test_range_filters_are_numeric(self):
+        """Test: Los filtros de rango comparan números aunque el JSON guarde texto"""
+        self.assertEqual(self._search('01', {'gravedad__gte': 1.0}), ['0102', '0103'])
+        self.assertEqual(self._search('01', {'gravedad__range': (0.5, 1.2)}), ['0101', '0102'])
+        self.assertEqual(self._search('01', {'poblacion__gt': 10_000}), ['0103'])
+
+    def test_equality_is_normalized_and_scoped_to_subtree(self):
+        """Test: La igualdad ignora mayúsculas/acentos y se limita al contenedor"""
+        self.assertEqual(self._search('01', {'clima_global': 'arido'}), ['0101', '0103'])
+        self.assertEqual(self._search('01', {'datos_nucleo__clima_global': 'ÁRIDO', 'gravedad__lt': 1}), ['0101'])
+        self.assertEqual(self._search('02', {'clima_global': 'arido'}), ['0201'])
+
+    def test_facets_follow_metadata_changes(self):
+        """Test: Guardar la entidad regenera sus facetas; la reconstrucción produce las mismas filas"""
+        hoth = CaosWorldORM.objects.get(id='0102')
+        hoth.metadata = {'properties': [{'key': 'Gravedad', 'value': '2'}]}
+        hoth.save()
+        self.assertEqual(self._search('01', {'gravedad__gte': 1.8}), ['0102'])
+
+        fields = ('world_id', 'key', 'numeric_value', 'text_value')
+        before = set(CaosMetadataFacetORM.objects.values_list(*fields))
+        rebuild_metadata_facets()
+        self.assertEqual(set(CaosMetadataFacetORM.objects.values_list(*fields)), before)
+
+    def test_unknown_operator_is_rejected(self):
+        """Test: Un operador desconocido no se convierte silenciosamente en igualdad"""
+        with self.assertRaises(ValueError):
+            self._search('01', {'gravedad__gte': 'mucha'})
@@ -0,0 +1,85 @@
+"""
+Tests para el registro de lecturas de narrativas (insignia 'nuevo' del índice).
+Valida el upsert por visita, el cálculo de is_new y que el coste no dependa del historial.
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosNarrativeORM, CaosEventLog, CaosNarrativeReadORM
+)
+from src.Infrastructure.DjangoFramework.persistence.narrative_reads import (
+    build_read_rows, mark_narrative_read, read_narrative_ids
+)
+from src.WorldManagement.Caos.Application.get_world_narratives import GetWorldNarrativesUseCase
+from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+
+class NarrativeReadsTestCase(TestCase):
+    """Tests de CaosNarrativeReadORM."""
+
+    def setUp(self):
+        self.reader = User.objects.create_user('lector', 'lector@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(id='01', name='Mundo', description='Desc', status='LIVE', visible_publico=True)
+        self.narratives = [
+            CaosNarrativeORM.objects.create(nid=f'01L{i:02d}', world=self.world, titulo=f'Lore {i}', contenido='...')
+            for i in range(1, 4)
+        ]
+
+    def _flags(self, user):
+        data = GetWorldNarrativesUseCase(DjangoCaosRepository()).execute('01', user)
+        return {d.nid: d.is_new for d in data['lores']}
+
+    def test_visits_are_upserted(self):
+        """Test: Varias visitas a la misma narrativa dejan una sola fila con la última fecha"""
+        first = timezone.now() - timedelta(days=1)
+        mark_narrative_read(self.reader, '01L01', seen_at=first)
+        mark_narrative_read(self.reader, '01L01')
+
+        reads = CaosNarrativeReadORM.objects.filter(user=self.reader)
+        self.assertEqual(reads.count(), 1)
+        self.assertGreater(reads.get().last_seen, first)
+        self.assertEqual(read_narrative_ids(self.reader, ['01L01', '01L02']), {'01L01'})
+
+    def test_reading_clears_new_badge(self):
+        """Test: Leer una narrativa (por public_id) quita su insignia; las antiguas nunca la llevan"""
+        CaosNarrativeORM.objects.filter(nid='01L03').update(updated_at=timezone.now() - timedelta(days=10))
+        self.assertEqual(self._flags(self.reader), {'01L01': True, '01L02': True, '01L03': False})
+
+        self.client.force_login(self.reader)
+        self.client.get(reverse('leer_narrativa', args=[self.narratives[0].public_id]))
+        self.assertEqual(self._flags(self.reader), {'01L01': False, '01L02': True, '01L03': False})
+
+    def test_cost_does_not_depend_on_history(self):
+        """Test: El número de consultas es el mismo con 1 o con muchas lecturas previas"""
+        mark_narrative_read(self.reader, '01L01')
+        with CaptureQueriesContext(connection) as small:
+            self._flags(self.reader)
+
+        others = [
+            CaosNarrativeORM.objects.create(nid=f'01L{i:02d}', world=self.world, titulo='Otro', contenido='...',
+                                            current_version_number=0)
+            for i in range(10, 40)
+        ]
+        for n in others:
+            mark_narrative_read(self.reader, n.nid)
+        with CaptureQueriesContext(connection) as large:
+            flags = self._flags(self.reader)
+
+        self.assertEqual(len(large), len(small))
+        self.assertFalse(flags['01L01'])
+
+    def test_backfill_from_event_log(self):
+        """Test: La migración inicial resuelve NID/public_id de los eventos y toma la última visita"""
+        CaosEventLog.objects.create(user=self.reader, action='VIEW_NARRATIVE', target_id='01L01')
+        CaosEventLog.objects.create(user=self.reader, action='VIEW_NARRATIVE', target_id=self.narratives[0].public_id)
+        CaosEventLog.objects.create(user=self.reader, action='VIEW_NARRATIVE', target_id='inexistente')
+        CaosEventLog.objects.create(user=self.reader, action='EDIT_WORLD', target_id='01L02')
+
+        rows = build_read_rows(CaosEventLog, CaosNarrativeORM, CaosNarrativeReadORM)
+        self.assertEqual([(r.user_id, r.narrative_id) for r in rows], [(self.reader.id, '01L01')])
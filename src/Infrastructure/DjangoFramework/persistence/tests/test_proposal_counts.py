@@ -0,0 +1,93 @@
+"""
+Tests para los contadores agregados de propuestas pendientes y badges por usuario.
+Valida get_pending_counts_by_author(), get_badge_summary(), su caché y su invalidación.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.badges import get_badge_summary
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosVersionORM, CaosImageProposalORM, CaosNotification, Message
+)
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import (
+    annotate_pending_counts, get_pending_counts_by_author, invalidate_proposal_counts
+)
+
+
+class PendingCountsTestCase(TestCase):
+    """Tests de la agregación de pendientes por autor."""
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@test.com', 'x')
+        self.bob = User.objects.create_user('bob', 'bob@test.com', 'x')
+        self.world = CaosWorldORM.objects.create(id='01', name='Mundo', description='Desc', status='LIVE')
+
+        self.version = self._version(self.alice, 1)
+        self._version(self.alice, 2, status='REJECTED')
+        CaosImageProposalORM.objects.create(world=self.world, title='Img', author=self.alice)
+        CaosImageProposalORM.objects.create(world=self.world, title='Img', author=self.bob)
+
+    def _version(self, author, number, status='PENDING'):
+        return CaosVersionORM.objects.create(
+            world=self.world, proposed_name='N', proposed_description='D',
+            status=status, version_number=number, author=author, change_log='T'
+        )
+
+    def test_counts_are_grouped_by_author(self):
+        """Test: Se suman las propuestas PENDING de todos los tipos por autor"""
+        self.assertEqual(get_pending_counts_by_author(), {self.alice.id: 2, self.bob.id: 1})
+
+    def test_counts_are_cached(self):
+        """Test: Los buzones no escalan con el número de usuarios (caché + una consulta)"""
+        with self.assertNumQueries(1):
+            get_pending_counts_by_author()
+        with self.assertNumQueries(0):
+            authors = annotate_pending_counts([self.alice, self.bob])
+        self.assertEqual([a.pending_count for a in authors], [2, 1])
+
+    def test_status_change_invalidates_counts(self):
+        """Test: Cambiar el estado de una propuesta refresca los contadores"""
+        get_pending_counts_by_author()
+
+        self.version.status = 'APPROVED'
+        self.version.save()
+        self.assertEqual(get_pending_counts_by_author()[self.alice.id], 1)
+
+        CaosImageProposalORM.objects.filter(author=self.bob).update(status='REJECTED')
+        invalidate_proposal_counts()
+        self.assertNotIn(self.bob.id, get_pending_counts_by_author())
+
+
+class BadgeSummaryTestCase(TestCase):
+    """Tests del resumen de badges por usuario."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user('owner', 'owner@test.com', 'x')
+        self.other = User.objects.create_user('other', 'other@test.com', 'x')
+        world = CaosWorldORM.objects.create(id='01', name='Mundo', description='Desc', status='LIVE', author=self.owner)
+        CaosVersionORM.objects.create(
+            world=world, proposed_name='N', proposed_description='D',
+            status='PENDING', version_number=1, author=self.other, change_log='T'
+        )
+        CaosImageProposalORM.objects.create(world=world, title='Img', author=self.owner)
+        CaosNotification.objects.create(user=self.owner, title='Hola', message='M')
+        Message.objects.create(sender=self.other, recipient=self.owner, subject='S', body='B')
+
+    def test_summary_in_one_query(self):
+        """Test: Propuestas (revisor o autor), notificaciones y mensajes en una sola consulta"""
+        with self.assertNumQueries(1):
+            badges = get_badge_summary(self.owner)
+
+        self.assertEqual(badges, {'pending_proposals': 2, 'unread_notifications': 1, 'unread_messages': 1})
+        self.assertEqual(get_badge_summary(self.other)['pending_proposals'], 1)
+
+    def test_summary_is_cached_and_invalidated(self):
+        """Test: En caliente no hay consultas; una notificación nueva refresca el badge"""
+        get_badge_summary(self.owner)
+        with self.assertNumQueries(0):
+            get_badge_summary(self.owner)
+
+        CaosNotification.objects.create(user=self.owner, title='Otra', message='M')
+        self.assertEqual(get_badge_summary(self.owner)['unread_notifications'], 2)
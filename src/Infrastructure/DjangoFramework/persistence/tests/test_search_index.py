@@ -0,0 +1,83 @@
+"""
+Tests para el índice de búsqueda global.
+Valida la indexación al guardar, el índice invertido (acentos, prefijos), la visibilidad y global_search.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from src.Infrastructure.DjangoFramework.persistence import search_index
+from src.Infrastructure.DjangoFramework.persistence.models import (
+    CaosWorldORM, CaosNarrativeORM, CaosSearchDocumentORM
+)
+
+
+class SearchIndexTestCase(TestCase):
+    """Tests del índice de búsqueda (motor en memoria)."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lectora', 'lectora@test.com', 'x')
+        self.public = CaosWorldORM.objects.create(
+            id='0201', name='Reino de Canción', description='Tierras de bardos', status='LIVE', visible_publico=True,
+            metadata={'datos_nucleo': [{'nombre': 'clima', 'valor': 'Glacial'}]}
+        )
+        self.hidden = CaosWorldORM.objects.create(
+            id='0301', name='Canción oculta', description='Secreto', status='DRAFT', visible_publico=False
+        )
+        CaosNarrativeORM.objects.create(nid='020101', titulo='Crónica', contenido='La canción del dragón', world=self.public)
+        CaosNarrativeORM.objects.create(nid='030101', titulo='Diario', contenido='Otra canción', world=self.hidden)
+        self.client.force_login(self.user)
+
+    def _search(self, q):
+        return self.client.get(reverse('global_search'), {'q': q, 'format': 'json'}).json()
+
+    def test_documents_follow_saves(self):
+        """Test: Guardar entidades y narrativas mantiene sus documentos"""
+        doc = CaosSearchDocumentORM.objects.get(kind='world', object_id='0201')
+        self.assertIn('Glacial', doc.metadata_text)
+
+        self.public.name = 'Reino Helado'
+        self.public.save()
+        self.assertEqual(CaosSearchDocumentORM.objects.get(kind='world', object_id='0201').title, 'Reino Helado')
+
+        CaosNarrativeORM.objects.get(nid='020101').delete()
+        self.assertFalse(CaosSearchDocumentORM.objects.filter(kind='narrative', object_id='020101').exists())
+
+    def test_accent_and_prefix_matching(self):
+        """Test: La búsqueda ignora acentos y admite prefijos (búsqueda mientras se escribe)"""
+        result = self._search('cancio')
+
+        self.assertEqual([w['id'] for w in result['worlds']], ['0201'])
+        self.assertEqual(result['worlds'][0]['match'], 'Nombre/Desc')
+        self.assertEqual([n['id'] for n in result['narratives']], ['020101'])
+
+    def test_metadata_values_are_searchable(self):
+        """Test: Los valores de metadata se indexan y la coincidencia se etiqueta"""
+        result = self._search('glacial')
+
+        self.assertEqual([(w['id'], w['match']) for w in result['worlds']], [('0201', 'Metadata')])
+
+    def test_visibility_is_applied_in_index_query(self):
+        """Test: Los documentos de mundos no visibles no aparecen (ni sus narrativas)"""
+        self.assertNotIn('0301', [w['id'] for w in self._search('oculta')['worlds']])
+
+        admin = User.objects.create_superuser('buscadora', 'b@test.com', 'x')
+        self.client.force_login(admin)
+        result = self._search('cancion')
+        self.assertEqual({w['id'] for w in result['worlds']}, {'0201', '0301'})
+        self.assertEqual({n['id'] for n in result['narratives']}, {'020101', '030101'})
+
+    def test_title_matches_rank_first(self):
+        """Test: Una coincidencia en el título pesa más que en el contenido"""
+        CaosNarrativeORM.objects.create(nid='020102', titulo='Canción de cuna', contenido='...', world=self.public)
+
+        self.assertEqual(self._search('cancion')['narratives'][0]['id'], '020102')
+
+    def test_rebuild_matches_incremental_index(self):
+        """Test: La reconstrucción completa produce los mismos documentos"""
+        fields = ('kind', 'object_id', 'world_id', 'title', 'body', 'metadata_text', 'is_active')
+        before = set(CaosSearchDocumentORM.objects.values_list(*fields))
+
+        self.assertEqual(search_index.rebuild_search_index(), 4)
+        self.assertEqual(set(CaosSearchDocumentORM.objects.values_list(*fields)), before)
@@ -0,0 +1,42 @@
+"""
+Tests para la clave normalizada de likes/comentarios y los contadores en bloque.
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.models import CaosLike, CaosComment
+from src.Shared.Services.SocialService import SocialService
+
+
+class EntityKeyNormTestCase(TestCase):
+    """Tests de entity_key_norm y get_interactions_counts()."""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'fan{i}', f'fan{i}@test.com', 'x') for i in range(3)]
+        CaosLike.objects.create(user=self.users[0], entity_key='IMG_Mapa-Norte.webp')
+        CaosLike.objects.create(user=self.users[1], entity_key='img_mapa\\u002Dnorte.webp')
+        parent = CaosComment.objects.create(user=self.users[2], entity_key='IMG_MAPA-NORTE.WEBP', content='Bonito')
+        CaosComment.objects.create(user=self.users[0], entity_key='IMG_Mapa-Norte.webp', content='Gracias', parent_comment=parent)
+        CaosLike.objects.create(user=self.users[2], entity_key='narr_AbC123')
+
+    def test_key_is_normalized_on_write(self):
+        """Test: Mayúsculas y guiones escapados comparten la misma clave normalizada"""
+        self.assertEqual(
+            set(CaosLike.objects.filter(entity_key__istartswith='img_').values_list('entity_key_norm', flat=True)),
+            {'img_mapa-norte.webp'}
+        )
+
+    def test_single_count_matches_variants(self):
+        """Test: get_interactions_count() encuentra todas las variantes de la clave"""
+        stats = SocialService.get_interactions_count('Img_Mapa\\u002DNorte.webp')
+        self.assertEqual(stats, {'likes': 2, 'comments': 1, 'engagement': 3})
+
+    def test_bulk_counts_in_one_query(self):
+        """Test: Cientos de claves se resuelven con una consulta a los contadores"""
+        keys = ['IMG_Mapa-Norte.webp', 'narr_abc123', 'WORLD_vacio'] + [f'IMG_extra_{i}.png' for i in range(200)]
+
+        with self.assertNumQueries(1):
+            counts = SocialService.get_interactions_counts(keys)
+
+        self.assertEqual(counts['IMG_Mapa-Norte.webp']['engagement'], 3)
+        self.assertEqual(counts['narr_abc123'], {'likes': 1, 'comments': 0, 'engagement': 1})
+        self.assertEqual(counts['WORLD_vacio']['engagement'], 0)
@@ -0,0 +1,51 @@
+"""
+Tests para la resolución de hijos visibles de GetWorldDetailsUseCase.
+Valida el Hoisting a través de fantasmas, el tronco compartido '00' y la caché por clase de visibilidad.
+"""
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import TestCase
+from src.Infrastructure.DjangoFramework.persistence.caching import GenerationalCache, WORLD_CHILDREN_NAMESPACE
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+from src.WorldManagement.Caos.Application.get_world_details import GetWorldDetailsUseCase
+from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+
+class VisibleChildrenTestCase(TestCase):
+    """Tests de la ventana de hijos directos y su caché."""
+
+    def setUp(self):
+        cache.clear()
+        self.superuser = User.objects.create_superuser('admin_test', 'a@test.com', 'x')
+        for jid, name, visible in [
+            ('01', 'Caos', True),
+            ('0101', 'Galaxia', True),
+            ('010101', 'Sistema', True),
+            ('01010101', 'Planeta', True),       # Nieto: no debe aparecer en la Galaxia
+            ('010100', 'Nexo', True),            # Fantasma estructural
+            ('010102', 'Sistema Oculto', False),
+            ('010001', 'Compartido', True),      # Tronco compartido de la raíz
+        ]:
+            CaosWorldORM.objects.create(id=jid, name=name, description='Desc', status='LIVE', visible_publico=visible)
+        self.use_case = GetWorldDetailsUseCase(DjangoCaosRepository(), cache=GenerationalCache(WORLD_CHILDREN_NAMESPACE))
+
+    def _children(self, jid, user):
+        return [h['id'] for h in self.use_case.execute(jid, user)['hijos']]
+
+    def test_direct_children_and_shared_cousins(self):
+        """Test: Solo hijos de nivel relativo 1, sin fantasmas y con los primos compartidos"""
+        self.assertEqual(self._children('0101', AnonymousUser()), ['010101', '010001'])
+
+    def test_children_depend_on_visibility_class(self):
+        """Test: Cada clase de visibilidad tiene su propia entrada cacheada"""
+        self.assertNotIn('010102', self._children('0101', AnonymousUser()))
+        self.assertIn('010102', self._children('0101', self.superuser))
+
+    def test_entity_changes_invalidate_children(self):
+        """Test: Cambiar la visibilidad de un hijo invalida la caché"""
+        self._children('0101', AnonymousUser())
+
+        CaosWorldORM.objects.filter(id='010102').update(visible_publico=True)
+        CaosWorldORM.objects.get(id='010102').save()
+
+        self.assertIn('010102', self._children('0101', AnonymousUser()))
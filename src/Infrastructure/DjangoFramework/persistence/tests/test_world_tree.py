@@ -0,0 +1,56 @@
+"""
+Tests para el Mapa del Árbol materializado en caché.
+Valida GetWorldTreeUseCase con GenerationalCache y su invalidación por señales.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from src.Infrastructure.DjangoFramework.persistence.caching import GenerationalCache, WORLD_TREE_NAMESPACE
+from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+from src.WorldManagement.Caos.Application.get_world_tree import GetWorldTreeUseCase
+from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
+
+
+class WorldTreeCacheTestCase(TestCase):
+    """Tests de la estructura de árbol cacheada por raíz."""
+
+    def setUp(self):
+        cache.clear()
+        CaosWorldORM.objects.create(id='01', name='Caos', description='Raíz', status='LIVE')
+        CaosWorldORM.objects.create(id='0101', name='Universo', description='Hijo', status='LIVE')
+        CaosWorldORM.objects.create(id='010001', name='Compartido', description='Saltado', status='LIVE')
+        self.use_case = GetWorldTreeUseCase(DjangoCaosRepository(), cache=GenerationalCache(WORLD_TREE_NAMESPACE))
+
+    def _ids(self, result):
+        return [n['public_id'] for n in result['tree']]
+
+    def test_tree_links_foster_parents(self):
+        """Test: Los nodos saltados ('00') cuelgan de su padre adoptivo ('01')"""
+        result = self.use_case.execute('01')
+
+        self.assertEqual(self._ids(result), ['01', '0101', '010001'])
+        jumped = result['tree'][-1]
+        self.assertTrue(jumped['is_jumped'])
+        self.assertEqual(jumped['logical_parent_id'], '0101')
+
+    def test_tree_is_served_from_cache(self):
+        """Test: La segunda llamada no recalcula la estructura"""
+        with CaptureQueriesContext(connection) as cold:
+            self.use_case.execute('01')
+        with CaptureQueriesContext(connection) as warm:
+            self.use_case.execute('01')
+
+        # En caliente solo se resuelve la raíz; no se cargan los descendientes
+        self.assertLess(len(warm), len(cold))
+        self.assertFalse(any('LIKE' in q['sql'] for q in warm.captured_queries))
+
+    def test_entity_changes_invalidate_tree(self):
+        """Test: Crear o borrar entidades invalida el árbol cacheado"""
+        self.use_case.execute('01')
+
+        CaosWorldORM.objects.create(id='0102', name='Plano', description='Nuevo', status='LIVE')
+        self.assertIn('0102', self._ids(self.use_case.execute('01')))
+
+        CaosWorldORM.objects.filter(id='0102').delete()
+        self.assertNotIn('0102', self._ids(self.use_case.execute('01')))
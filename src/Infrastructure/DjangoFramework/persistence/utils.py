@@ -1,6 +1,4 @@
-import os
 from typing import List, Dict, Optional, Any
-from django.conf import settings
 from django.contrib.auth.models import User
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
 
@@ -114,28 +112,18 @@ def _apply_truncation(breadcrumbs: list) -> list:
 
 def get_world_images(jid: str, world_instance: Optional[CaosWorldORM] = None, period_slug: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Localiza y cataloga las imágenes asociadas a una entidad en el sistema de archivos.
-    Cruza los archivos físicos con el 'gallery_log' almacenado en los metadatos de la DB
+    Localiza y cataloga las imágenes asociadas a una entidad usando el índice de galerías.
+    Cruza los archivos indexados con el 'gallery_log' almacenado en los metadatos de la DB
     para recuperar autores, fechas, títulos y su asociación con Períodos Temporales.
     """
-    from pathlib import Path
-    import datetime
-    
-    # Definición de ruta base para el almacenamiento estático
-    base_dir = Path(settings.BASE_DIR) / 'persistence' / 'static' / 'persistence' / 'img'
-    if not base_dir.exists(): return []
+    from django.utils import timezone
+    from src.Infrastructure.DjangoFramework.persistence.gallery_index import list_galleries
+    from src.Infrastructure.DjangoFramework.persistence import image_derivatives
+
+    # Listado indexado (CaosGalleryImageORM): sin recorrer el disco en cada petición.
+    # Se reconstruye con `manage.py rebuild_gallery_index`.
+    dname, files = list_galleries([jid], with_variants=True).get(str(jid), (None, []))
 
-    target = base_dir / jid
-    
-    # Fallback para estructuras de carpetas legacy (ID_Nombre)
-    if not target.exists():
-        try:
-            for d in base_dir.iterdir():
-                if d.is_dir() and d.name.startswith(f"{jid}_"): 
-                    target = d
-                    break
-        except: return []
-    
     # Recuperación de metadatos de galería (Evita N+1 usando la instancia si existe)
     gallery_log = {}
     cover_image = None
@@ -157,70 +145,70 @@ def get_world_images(jid: str, world_instance: Optional[CaosWorldORM] = None, pe
     except: pass
 
     imgs = []
-    if target.exists() and target.is_dir():
-        dname = target.name
+    if files:
         try:
-            for f in sorted(os.listdir(str(target))):
-                if f.lower().endswith(('.png', '.webp', '.jpg', '.jpeg')): 
-                    meta = gallery_log.get(f, {})
-                    
-                    # FILTRADO POR PERÍODO
-                    # Si estamos en vista de período, solo mostramos las de ese período.
-                    # Si estamos en vista ACTUAL, solo mostramos las que NO tengan período o sean explicitly actual.
-                    img_period = meta.get('period')
-                    
-                    if period_slug and period_slug != 'actual':
-                        # Vista de Período Histórico
-                        if img_period != period_slug:
-                            continue
-                    else:
-                        # Vista ACTUAL o por defecto
-                        if img_period and img_period != 'actual':
-                            continue
-
-                    # Lógica de Fecha: Metadata > Fecha modificación archivo > Hoy
-                    date_str = meta.get('date', '')
-                    if date_str and ' ' in str(date_str):
-                        # Limpiamos horas y minutos (cualquier cosa tras el espacio)
-                        date_str = str(date_str).split(' ')[0]
-                    
-                    # Normalización opcional: Convertir YYYY-MM-DD a DD/MM/YYYY si se desea total consistencia
-                    if date_str and '-' in date_str and len(date_str) == 10:
-                        parts = date_str.split('-')
-                        if len(parts[0]) == 4: # YYYY-MM-DD
-                            date_str = f"{parts[2]}/{parts[1]}/{parts[0]}"
-                    if not date_str:
-                        try:
-                            timestamp = os.path.getmtime(os.path.join(str(target), f))
-                            date_str = datetime.datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y')
-                        except: date_str = "??/??/????"
-
-                    author_str = meta.get('uploader')
-                    if not author_str or author_str in ["Sistema", "Anónimo", "Anonymous", "Unknown"]:
-                         if world_instance and world_instance.author:
-                             author_str = world_instance.author.username
-                         else: author_str = "Alone"
-                    
-                    # Obtener avatar del usuario
-                    avatar_url = ""
-                    try:
-                        from django.contrib.auth.models import User
-                        user_obj = User.objects.filter(username=author_str).first()
-                        avatar_url = get_user_avatar(user_obj)
-                    except Exception:
-                        pass
-                    
-                    imgs.append({
-                        'url': f'{dname}/{f}', 
-                        'filename': f.strip(),
-                        'author': author_str,
-                        'avatar_url': avatar_url,
-                        'date': date_str,
-                        'title': meta.get('title', ''),
-                        'is_cover': False # Post-process verification
-                    })
+            for f, mtime, (digest, width) in files:
+                meta = gallery_log.get(f, {})
+                
+                # FILTRADO POR PERÍODO
+                # Si estamos en vista de período, solo mostramos las de ese período.
+                # Si estamos en vista ACTUAL, solo mostramos las que NO tengan período o sean explicitly actual.
+                img_period = meta.get('period')
+                
+                if period_slug and period_slug != 'actual':
+                    # Vista de Período Histórico
+                    if img_period != period_slug:
+                        continue
+                else:
+                    # Vista ACTUAL o por defecto
+                    if img_period and img_period != 'actual':
+                        continue
+
+                # Lógica de Fecha: Metadata > Fecha modificación archivo > Hoy
+                date_str = meta.get('date', '')
+                if date_str and ' ' in str(date_str):
+                    # Limpiamos horas y minutos (cualquier cosa tras el espacio)
+                    date_str = str(date_str).split(' ')[0]
+                
+                # Normalización opcional: Convertir YYYY-MM-DD a DD/MM/YYYY si se desea total consistencia
+                if date_str and '-' in date_str and len(date_str) == 10:
+                    parts = date_str.split('-')
+                    if len(parts[0]) == 4: # YYYY-MM-DD
+                        date_str = f"{parts[2]}/{parts[1]}/{parts[0]}"
+                if not date_str:
+                    date_str = timezone.localtime(mtime).strftime('%d/%m/%Y') if mtime else "??/??/????"
+
+                author_str = meta.get('uploader')
+                if not author_str or author_str in ["Sistema", "Anónimo", "Anonymous", "Unknown"]:
+                     if world_instance and world_instance.author:
+                         author_str = world_instance.author.username
+                     else: author_str = "Alone"
+                
+                imgs.append({
+                    'url': f'{dname}/{f}', 
+                    # Miniatura para tarjetas y srcset responsive (image_derivatives)
+                    'thumb': image_derivatives.thumbnail_path(dname, f, digest, width),
+                    'srcset': image_derivatives.srcset(dname, f, digest, width),
+                    'filename': f.strip(),
+                    'author': author_str,
+                    'avatar_url': "",
+                    'date': date_str,
+                    'title': meta.get('title', ''),
+                    'is_cover': False # Post-process verification
+                })
         except Exception as e:
             print(f"Error procesando galería de {jid}: {e}")
+
+    # Avatares de autores: una única consulta para toda la galería
+    if imgs:
+        try:
+            authors = {i['author'] for i in imgs}
+            users = {u.username: u for u in User.objects.filter(username__in=authors).select_related('profile')}
+            avatars = {name: get_user_avatar(users.get(name)) for name in authors}
+            for i in imgs:
+                i['avatar_url'] = avatars[i['author']]
+        except Exception:
+            pass
     
     # --- SINGLE COVER ENFORCEMENT ---
     if cover_image and imgs:
@@ -318,7 +306,9 @@ def get_thumbnail_url(world_id: str, cover_filename: Optional[str] = None, use_f
                                       cuando no hay cover definida. Default: True
     
     Returns:
-        str: URL completa del thumbnail (ej: "/static/persistence/img/01/Cover.webp")
+        str: URL completa del thumbnail (ej: "/static/persistence/img/01/Cover.webp").
+             Si la imagen tiene derivados, la miniatura de tarjeta
+             (ej: "/static/persistence/img/01/_thumbs/Cover.webp.<hash>.320w.webp").
     
     Examples:
         >>> get_thumbnail_url('01', 'Cover.webp')
@@ -344,16 +334,61 @@ def get_thumbnail_url(world_id: str, cover_filename: Optional[str] = None, use_f
     if cover_filename:
         cover_img = find_cover_image(cover_filename, all_imgs)
         if cover_img:
-            return f"/static/persistence/img/{cover_img['url']}"
+            return f"/static/persistence/img/{cover_img['thumb']}"
     
     # 2. Fallback: first image
     if use_first_if_no_cover and all_imgs:
-        return f"/static/persistence/img/{all_imgs[0]['url']}"
+        return f"/static/persistence/img/{all_imgs[0]['thumb']}"
     
     # 3. Fallback: placeholder
     return "/static/img/placeholder.png"
 
 
+def get_thumbnails(worlds, use_first_if_no_cover: bool = True, width: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Versión en bloque de get_thumbnail_url() con datos responsive:
+    {world.id: {'url': miniatura de `width` px (por defecto la de tarjeta), 'srcset': derivados disponibles}}.
+
+    Lee todas las galerías del índice en una única consulta y aplica el mismo
+    fallback (portada > primera imagen del presente > placeholder), usando los
+    metadatos de las instancias recibidas en lugar de recargarlas.
+    """
+    from src.Infrastructure.DjangoFramework.persistence.gallery_index import list_galleries
+    from src.Infrastructure.DjangoFramework.persistence import image_derivatives
+
+    width = width or image_derivatives.CARD_WIDTH
+    worlds = [w for w in worlds if w is not None]
+    galleries = list_galleries((w.id for w in worlds), with_variants=True)
+
+    thumbs = {}
+    for w in worlds:
+        meta = w.metadata or {}
+        gallery_log = meta.get('gallery_log') or {}
+        folder, files = galleries.get(w.id, (None, []))
+        # Igual que get_world_images() en la vista ACTUAL: sin imágenes de otros períodos
+        imgs = []
+        for f, _, (digest, original_width) in files:
+            img_period = (gallery_log.get(f) or {}).get('period')
+            if not img_period or img_period == 'actual':
+                imgs.append({'filename': f.strip(), 'variants': (folder, f, digest, original_width)})
+        img = find_cover_image(meta.get('cover_image'), imgs)
+        if not img and use_first_if_no_cover and imgs:
+            img = imgs[0]
+        if img:
+            thumbs[w.id] = {
+                'url': f"/static/persistence/img/{image_derivatives.thumbnail_path(*img['variants'], width=width)}",
+                'srcset': image_derivatives.srcset(*img['variants']),
+            }
+        else:
+            thumbs[w.id] = {'url': "/static/img/placeholder.png", 'srcset': ''}
+    return thumbs
+
+
+def get_thumbnail_urls(worlds, use_first_if_no_cover: bool = True, width: Optional[int] = None) -> Dict[str, str]:
+    """Versión en bloque de get_thumbnail_url(): {world.id: url} (ver get_thumbnails)."""
+    return {jid: t['url'] for jid, t in get_thumbnails(worlds, use_first_if_no_cover, width).items()}
+
+
 
 def get_user_avatar(user: Optional[User], jid: Optional[str] = None) -> str:
     """
@@ -376,35 +411,32 @@ def get_user_avatar(user: Optional[User], jid: Optional[str] = None) -> str:
     except:
         pass
     
-    # Fallback: Usar imagen aleatoria de la carpeta static/persistence/img
+    # Fallback: Imagen "aleatoria" estable por usuario tomada del pool de galerías
+    # (construido una vez por proceso a partir del índice, sin rglob sobre el árbol).
     try:
         import random
-        from pathlib import Path
         from django.templatetags.static import static
-        
-        # Ruta a la carpeta de imágenes generadas/subidas
-        # BASE_DIR es src/Infrastructure/DjangoFramework/
-        img_dir = Path(settings.BASE_DIR) / 'persistence' / 'static' / 'persistence' / 'img'
-        
-        if img_dir.exists():
-            # Buscar archivos de imagen recursivamente en todas las subcarpetas
-            image_files = []
-            for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
-                image_files.extend(img_dir.rglob(f'*{ext}'))  # rglob busca recursivamente
-                image_files.extend(img_dir.rglob(f'*{ext.upper()}'))
-            
-            if image_files:
-                image_files.sort() # Ensure stable order across restarts
-                # Deterministic Randomness based on User ID to ensure stability
-                if user and hasattr(user, 'id'):
-                    random.seed(user.id)
-                    
-                random_image = random.choice(image_files)
-                # Obtener ruta relativa desde img_dir
-                relative_path = random_image.relative_to(img_dir)
-                # Retornar URL estática
-                return static(f'persistence/img/{relative_path.as_posix()}')
+        from src.Infrastructure.DjangoFramework.persistence.gallery_index import get_image_pool
+
+        image_files = get_image_pool()
+        if image_files:
+            # Aleatoriedad determinista basada en el ID del usuario (sin re-sembrar el random global)
+            rng = random.Random(user.id) if hasattr(user, 'id') else random.Random()
+            return static(f'persistence/img/{rng.choice(image_files)}')
     except Exception as e:
         print(f"Error getting fallback avatar: {e}")
     
     return f"https://ui-avatars.com/api/?name={user.username if user and hasattr(user, 'username') else 'User'}&background=random&color=fff"
+
+
+def get_user_avatars(users) -> Dict[int, str]:
+    """
+    Versión en bloque de get_user_avatar(): {user.id: url}, una vez por usuario distinto.
+    Para no consultar perfiles uno a uno, los usuarios deben venir con
+    select_related('profile').
+    """
+    avatars = {}
+    for user in users:
+        if user is not None and user.id not in avatars:
+            avatars[user.id] = get_user_avatar(user)
+    return avatars
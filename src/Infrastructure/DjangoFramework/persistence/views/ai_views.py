@@ -1,14 +1,36 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
 import json
 from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, MetadataTemplate, CaosNarrativeORM
-from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
 from src.FantasyWorld.Domain.Services.NarrativeService import NarrativeService
+from src.Infrastructure.DjangoFramework.persistence.ai_jobs import enqueue_job, job_payload, user_can_see_job
 from .view_utils import resolve_jid_orm
 
+
+def ai_job_accepted(job):
+    """Respuesta 202 de una petición de IA encolada: el cliente consulta `status_url` hasta que termina."""
+    return JsonResponse({
+        'success': True,
+        'status': 'queued',
+        'job_id': str(job.id),
+        'status_url': reverse('ai_job_status', args=[job.id]),
+    }, status=202)
+
+
+@require_GET
+def api_ai_job_status(request, job_id):
+    """Estado de un trabajo de IA: PENDING (con posición en cola), RUNNING (progreso), DONE (resultado) o FAILED."""
+    from src.Infrastructure.DjangoFramework.persistence.models import CaosAIJobORM
+
+    job = CaosAIJobORM.objects.filter(id=job_id).first()
+    if job is None or not user_can_see_job(request.user, job):
+        return JsonResponse({'success': False, 'error': 'Trabajo no encontrado'}, status=404)
+    return JsonResponse(job_payload(job))
+
 @login_required
 @require_POST
 def analyze_metadata_api(request):
@@ -74,66 +96,65 @@ def analyze_metadata_api(request):
              
 
         
-        # Call AI
-        # Call AI via Use Case (V2 Logic - Schemas + Cold Start)
-        service = Llama3Service()
-        repo = DjangoCaosRepository()
-        
-        # Local import to avoid circular dependency
-        from src.WorldManagement.Caos.Application.generate_contextual_metadata import GenerateContextualMetadataUseCase
-        
-        use_case = GenerateContextualMetadataUseCase(repo, service)
+        # Call AI via Use Case (V2 Logic - Schemas + Cold Start), en el worker de IA.
         # FIX: Pasa el texto extraído (Lore) al caso de uso para que no dependa solo de world.description
-        extracted_data = use_case.execute(w_orm.id, external_context=texto_final)
-        if extracted_data is None:
-            return JsonResponse({
-                'success': False, 
-                'error': 'AI returned empty data. Check server console for "LlamaService" logs.',
-                'debug_info': 'Connection to AI Service failed or JSON parse error.'
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'metadata': extracted_data
-        })
+        job = enqueue_job('world_metadata', {'world_id': w_orm.id, 'context': texto_final}, request.user)
+        return ai_job_accepted(job)
 
     except Exception as e:
         print(f"AI API Error: {e}")
         return JsonResponse({'success': False, 'error': str(e)})
 
+def _narrative_edit_request(data):
+    """
+    (system_prompt, texto, error) para las peticiones de edición de narrativa con IA.
+    Compartido por la respuesta completa y la de streaming.
+    """
+    text = data.get('text', '')
+    mode = data.get('mode', 'fix')
+    world_id = data.get('world_id', None)  # NUEVO: Para contexto jerárquico
+
+    # Length Validation (approx 6-7 pages max to avoid timeout/context overflow)
+    if len(text.split()) > 4000:
+        return None, text, 'Texto demasiado largo (Máx ~4000 palabras). Por favor, edita por partes.'
+
+    # NUEVO: Build hierarchical context
+    from src.FantasyWorld.Domain.Services.ContextService import ContextBuilder
+    context_prompt = ""
+    if world_id:
+        context_prompt = ContextBuilder.build_hierarchy_context(world_id)
+
+    # Dynamic Prompts
+    prompts = {
+        'fix': "Eres un Editor Corrector. Corrige ortografía, gramática y puntuación del siguiente texto. NO cambies el estilo ni el contenido. Devuelve SOLO el texto corregido, sin introducciones.",
+        'enrich': "Eres un Novelista Experto. Enriquece el vocabulario y las descripciones del siguiente texto para hacerlo más inmersivo y literario. Mantén la trama original. Devuelve SOLO el texto mejorado, sin introducciones.",
+        'format': "Eres un Maquetador. Aplica formato Markdown al siguiente texto: Usa '##' para títulos de capítulos, '**' para énfasis y '-' para listas si hay enumeraciones. Arregla los saltos de línea para que los párrafos se vean bien. Devuelve SOLO el texto formateado."
+    }
+
+    system_prompt = prompts.get(mode, prompts['fix'])
+
+    # NUEVO: Inject context if available
+    if context_prompt:
+        system_prompt += f"\n{context_prompt}\nRESPETA las reglas y el contexto de la jerarquía al editar."
+    return system_prompt, text, None
+
+
+def _sse(payload, event=None):
+    """Un evento Server-Sent Events con datos JSON."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
 @csrf_exempt
 @login_required
 @require_POST
 def edit_narrative_api(request):
     try:
         data = json.loads(request.body)
-        text = data.get('text', '')
-        mode = data.get('mode', 'fix')
-        world_id = data.get('world_id', None)  # NUEVO: Para contexto jerárquico
-
-        # Length Validation (approx 6-7 pages max to avoid timeout/context overflow)
-        if len(text.split()) > 4000:
-            return JsonResponse({'success': False, 'error': 'Texto demasiado largo (Máx ~4000 palabras). Por favor, edita por partes.'})
-
-        # NUEVO: Build hierarchical context
-        from src.FantasyWorld.Domain.Services.ContextService import ContextBuilder
-        context_prompt = ""
-        if world_id:
-            context_prompt = ContextBuilder.build_hierarchy_context(world_id)
-
-        # Dynamic Prompts
-        prompts = {
-            'fix': "Eres un Editor Corrector. Corrige ortografía, gramática y puntuación del siguiente texto. NO cambies el estilo ni el contenido. Devuelve SOLO el texto corregido, sin introducciones.",
-            'enrich': "Eres un Novelista Experto. Enriquece el vocabulario y las descripciones del siguiente texto para hacerlo más inmersivo y literario. Mantén la trama original. Devuelve SOLO el texto mejorado, sin introducciones.",
-            'format': "Eres un Maquetador. Aplica formato Markdown al siguiente texto: Usa '##' para títulos de capítulos, '**' para énfasis y '-' para listas si hay enumeraciones. Arregla los saltos de línea para que los párrafos se vean bien. Devuelve SOLO el texto formateado."
-        }
-        
-        system_prompt = prompts.get(mode, prompts['fix'])
-        
-        # NUEVO: Inject context if available
-        if context_prompt:
-            system_prompt += f"\n{context_prompt}\nRESPETA las reglas y el contexto de la jerarquía al editar."
-        
+        system_prompt, text, error = _narrative_edit_request(data)
+        if error:
+            return JsonResponse({'success': False, 'error': error})
+
         service = Llama3Service()
         result_text = service.edit_text(system_prompt, text)
         
@@ -146,6 +167,44 @@ def edit_narrative_api(request):
         print(f"❌ ERROR API IA: {str(e)}")
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+
+@csrf_exempt
+@login_required
+@require_POST
+def edit_narrative_stream_api(request):
+    """
+    Edición de narrativa con IA en streaming (text/event-stream): un evento por
+    fragmento {"delta": "..."} y al final `event: done` o `event: error`.
+    El primer texto llega en cuanto el modelo empieza a escribir.
+    """
+    try:
+        data = json.loads(request.body)
+        system_prompt, text, error = _narrative_edit_request(data)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    if error:
+        return JsonResponse({'success': False, 'error': error})
+
+    def events():
+        received = False
+        try:
+            for delta in Llama3Service().stream_edit_text(system_prompt, text):
+                received = True
+                yield _sse({'delta': delta})
+        except Exception as e:
+            print(f"❌ ERROR API IA (stream): {str(e)}")
+            yield _sse({'error': str(e)}, event='error')
+            return
+        if not received:
+            yield _sse({'error': 'La IA no devolvió respuesta. Intenta con un texto más corto.'}, event='error')
+            return
+        yield _sse({'success': True}, event='done')
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: no acumular la respuesta
+    return response
+
 @csrf_exempt
 @login_required
 @require_POST
@@ -175,19 +234,9 @@ def api_generate_lore(request):
         if not world_id:
             return JsonResponse({'success': False, 'error': 'Missing world_id'})
 
-        repo = DjangoCaosRepository()
-        service = Llama3Service()
-        
-        from src.WorldManagement.Caos.Application.generate_lore import GenerateWorldLoreUseCase
-        use_case = GenerateWorldLoreUseCase(repo, service)
-        
-        # Execute with Context and Preview Mode (Do NOT save to DB yet)
-        lore_text = use_case.execute(world_id, current_context=current_description, preview_mode=True)
-        
-        if lore_text:
-            return JsonResponse({'success': True, 'lore': lore_text})
-        else:
-            return JsonResponse({'success': False, 'error': 'La IA no pudo generar el lore.'})
+        # Execute with Context and Preview Mode (Do NOT save to DB yet), en el worker de IA
+        job = enqueue_job('world_lore', {'world_id': world_id, 'current_description': current_description}, request.user)
+        return ai_job_accepted(job)
 
     except Exception as e:
         print(f"❌ ERROR LORE GEN: {str(e)}")
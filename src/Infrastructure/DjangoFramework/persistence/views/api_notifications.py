@@ -3,6 +3,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from src.Infrastructure.DjangoFramework.persistence.models import CaosNotification
+from src.Infrastructure.DjangoFramework.persistence.badges import invalidate_user_badges
 
 @login_required
 def mark_notification_read(request, notification_id):
@@ -20,4 +21,5 @@ def mark_all_notifications_read(request):
     Marca todas las notificaciones del usuario como leídas.
     """
     CaosNotification.objects.filter(user=request.user, read_at__isnull=True).update(read_at=timezone.now())
+    invalidate_user_badges(request.user.pk)  # .update() no dispara señales
     return JsonResponse({'status': 'ok', 'message': 'All notifications marked as read'})
@@ -1,10 +1,13 @@
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import UserPassesTestMixin, LoginRequiredMixin
-from django.db.models import Count, Q
 from src.Infrastructure.DjangoFramework.persistence.models import (
-    CaosWorldORM, CaosNarrativeORM, CaosComment, CaosLike, TimelinePeriod, CaosVersionORM
+    CaosWorldORM, CaosNarrativeORM, TimelinePeriod, CaosVersionORM
 )
-from src.Shared.Services.SocialService import SocialService
+from src.Infrastructure.DjangoFramework.persistence.engagement import (
+    attach_engagement, summarize_engagement, paginate_ranking
+)
+from src.Infrastructure.DjangoFramework.persistence.gallery_index import list_galleries
+from src.Infrastructure.DjangoFramework.persistence import image_derivatives
 
 
 class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
@@ -21,6 +24,8 @@ class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
             self.request.user.profile.rank in ['ADMIN', 'SUPERADMIN']
         )
     
+    paginate_by = 50
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
@@ -31,47 +36,45 @@ class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         periods_list = []
         
         # 1. IMAGES (from all worlds)
-        all_worlds = CaosWorldORM.objects.filter(is_active=True).select_related('author')
+        all_worlds = list(CaosWorldORM.objects.filter(is_active=True).select_related('author'))
+        # Carpetas físicas y derivados desde el índice de galerías (una consulta; cubre carpetas legacy '<jid>_Nombre')
+        galleries = list_galleries((w.id for w in all_worlds), with_variants=True)
+        folders = {jid: folder for jid, (folder, _) in galleries.items()}
+        variants = {
+            (jid, f): (folder, f, digest, width)
+            for jid, (folder, files) in galleries.items() for f, _, (digest, width) in files
+        }
         for world in all_worlds:
             if world.metadata and 'gallery_log' in world.metadata:
                 gallery_log = world.metadata['gallery_log']
+                folder = folders.get(world.id, world.id)
                 for filename, meta in gallery_log.items():
-                    # Handle possible double escaping in DB or different formats
-                    entity_key = f"IMG_{filename}"
-                    stats = SocialService.get_interactions_count(entity_key)
-                    likes = stats['likes']
-                    comments = stats['comments']
-                    
+                    if (world.id, filename) in variants:
+                        thumb = image_derivatives.thumbnail_path(*variants[(world.id, filename)], width=image_derivatives.LIST_WIDTH)
+                    else:
+                        thumb = f"{folder}/{filename}"
                     images_list.append({
                         'type': 'image',
+                        'entity_key': f"IMG_{filename}",
                         'title': meta.get('title', filename),
                         'author': meta.get('uploader', 'Unknown'),
                         'world': world.name,
-                        'likes': likes,
-                        'comments': comments,
-                        'engagement': likes + comments,
                         'date': meta.get('date', '-'),
-                        'thumbnail': f"/static/persistence/img/{world.public_id}/{filename}",
+                        'thumbnail': f"/static/persistence/img/{thumb}",
                         'url': f"/mundo/{world.public_id}#img-{filename}",  # Open lightbox with image
                     })
         
         # 2. NARRATIVES
-        all_narratives = CaosNarrativeORM.objects.filter(is_active=True).select_related('created_by', 'world')
+        all_narratives = CaosNarrativeORM.objects.filter(
+            is_active=True, created_by__isnull=False
+        ).select_related('created_by', 'world')
         for narrative in all_narratives:
-            if not narrative.created_by: continue
-            entity_key = f"NARR_{narrative.public_id}"
-            stats = SocialService.get_interactions_count(entity_key)
-            likes = stats['likes']
-            comments = stats['comments']
-            
             narratives_list.append({
                 'type': 'narrative',
+                'entity_key': f"NARR_{narrative.public_id}",
                 'title': narrative.titulo,
                 'author': narrative.created_by.username,
                 'world': narrative.world.name if narrative.world else '-',
-                'likes': likes,
-                'comments': comments,
-                'engagement': likes + comments,
                 'date': narrative.created_at.strftime("%d/%m/%Y"),
                 'url': f"/narrativa/{narrative.public_id}",
             })
@@ -80,19 +83,12 @@ class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         # Add active worlds as base metadata entities
         for world in all_worlds:
             if not world.author: continue
-            entity_key = f"WORLD_{world.public_id}"
-            stats = SocialService.get_interactions_count(entity_key)
-            likes = stats['likes']
-            comments = stats['comments']
-            
             metadata_list.append({
                 'type': 'world',
+                'entity_key': f"WORLD_{world.public_id}",
                 'title': world.name,
                 'author': world.author.username,
                 'world': world.name,
-                'likes': likes,
-                'comments': comments,
-                'engagement': likes + comments,
                 'date': world.created_at.strftime("%d/%m/%Y"),
                 'url': f"/mundo/{world.public_id}",
             })
@@ -100,19 +96,12 @@ class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         # Add metadata proposals (CaosVersionORM type METADATA)
         metadata_proposals = CaosVersionORM.objects.filter(change_type='METADATA').select_related('author', 'world')
         for prop in metadata_proposals:
-            entity_key = f"VERS_{prop.id}"
-            stats = SocialService.get_interactions_count(entity_key)
-            likes = stats['likes']
-            comments = stats['comments']
-            
             metadata_list.append({
                 'type': 'proposal',
+                'entity_key': f"VERS_{prop.id}",
                 'title': f"Propuesta: {prop.proposed_name or prop.change_log}",
                 'author': prop.author.username if prop.author else 'Anon',
                 'world': prop.world.name,
-                'likes': likes,
-                'comments': comments,
-                'engagement': likes + comments,
                 'date': prop.created_at.strftime("%d/%m/%Y"),
                 'url': f"/mundo/{prop.world.public_id}", # Deep link to proposal could be added
             })
@@ -120,71 +109,37 @@ class ContentAnalyticsView(LoginRequiredMixin, UserPassesTestMixin, TemplateView
         # 4. PERIODOS (TimelinePeriod)
         all_periods = TimelinePeriod.objects.all().select_related('world')
         for period in all_periods:
-            entity_key = f"PERIOD_{period.id}"
-            stats = SocialService.get_interactions_count(entity_key)
-            likes = stats['likes']
-            comments = stats['comments']
-            
             periods_list.append({
                 'type': 'period',
+                'entity_key': f"PERIOD_{period.id}",
                 'title': period.title,
                 'author': 'Sistema', # Timeline periods don't always have a direct author
                 'world': period.world.name,
-                'likes': likes,
-                'comments': comments,
-                'engagement': likes + comments,
                 'date': period.created_at.strftime("%d/%m/%Y"),
                 'url': f"/mundo/{period.world.public_id}#period-{period.id}",  # Go to timeline section
             })
 
-        # Group data for the accordion
-        context['categories'] = [
-            {
-                'id': 'narratives',
-                'title': 'NARRATIVAS',
-                'icon': '📖',
-                'items': sorted(narratives_list, key=lambda x: x['engagement'], reverse=True),
-                'count': len(narratives_list),
-                'total_likes': sum(n['likes'] for n in narratives_list),
-                'total_comments': sum(n['comments'] for n in narratives_list),
-                'color': 'purple'
-            },
-            {
-                'id': 'images',
-                'title': 'IMÁGENES',
-                'icon': '🖼️',
-                'items': sorted(images_list, key=lambda x: x['engagement'], reverse=True),
-                'count': len(images_list),
-                'total_likes': sum(i['likes'] for i in images_list),
-                'total_comments': sum(i['comments'] for i in images_list),
-                'color': 'blue'
-            },
-            {
-                'id': 'metadata',
-                'title': 'METADATOS',
-                'icon': '🧬',
-                'items': sorted(metadata_list, key=lambda x: x['engagement'], reverse=True),
-                'count': len(metadata_list),
-                'total_likes': sum(m['likes'] for m in metadata_list),
-                'total_comments': sum(m['comments'] for m in metadata_list),
-                'color': 'green'
-            },
-            {
-                'id': 'periods',
-                'title': 'PERIODOS',
-                'icon': '📜',
-                'items': sorted(periods_list, key=lambda x: x['engagement'], reverse=True),
-                'count': len(periods_list),
-                'total_likes': sum(p['likes'] for p in periods_list),
-                'total_comments': sum(p['comments'] for p in periods_list),
-                'color': 'yellow'
-            }
+        # Likes y comentarios de todas las categorías en dos consultas agrupadas
+        attach_engagement(narratives_list + images_list + metadata_list + periods_list)
+
+        # Group data for the accordion (cada categoría se pagina con ?page_<id>=N)
+        categories = [
+            {'id': 'narratives', 'title': 'NARRATIVAS', 'icon': '📖', 'items': narratives_list, 'color': 'purple'},
+            {'id': 'images', 'title': 'IMÁGENES', 'icon': '🖼️', 'items': images_list, 'color': 'blue'},
+            {'id': 'metadata', 'title': 'METADATOS', 'icon': '🧬', 'items': metadata_list, 'color': 'green'},
+            {'id': 'periods', 'title': 'PERIODOS', 'icon': '📜', 'items': periods_list, 'color': 'yellow'},
         ]
+        for cat in categories:
+            cat.update(summarize_engagement(cat['items']))
+            cat['page_param'] = f"page_{cat['id']}"
+            cat['page_obj'] = paginate_ranking(cat['items'], self.request.GET.get(cat['page_param']), self.paginate_by)
+            cat['items'] = cat['page_obj'].object_list
+        context['categories'] = categories
         
         # General stats
-        context['total_content'] = len(narratives_list) + len(images_list) + len(metadata_list) + len(periods_list)
-        context['total_likes'] = sum(cat['total_likes'] for cat in context['categories'])
-        context['total_comments'] = sum(cat['total_comments'] for cat in context['categories'])
+        context['total_content'] = sum(cat['count'] for cat in categories)
+        context['total_likes'] = sum(cat['total_likes'] for cat in categories)
+        context['total_comments'] = sum(cat['total_comments'] for cat in categories)
         context['total_engagement'] = context['total_likes'] + context['total_comments']
         
         return context
@@ -6,8 +6,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views import View
 from ..utils import log_event
 from src.Infrastructure.DjangoFramework.persistence.models import CaosImageProposalORM, CaosNotification
-from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
-import os
+from src.Infrastructure.DjangoFramework.persistence import blob_store
+from src.Infrastructure.DjangoFramework.persistence.image_jobs import enqueue_image_publication
 
 # --- IMAGE ACTIONS ---
 
@@ -112,7 +112,9 @@ def archivar_imagen(request, id):
 def publicar_imagen(request, id):
     """
     Ejecuta la publicación física de una imagen en el sistema de archivos (Live).
-    - Si es una ADD/EDIT: Guarda el archivo en la carpeta estática del mundo.
+    - Si es una ADD/EDIT: Encola el guardado del archivo en la carpeta estática del mundo (run_image_worker).
+      Mientras se publica queda en PUBLISHING (aprobar dos veces no duplica la imagen). El trabajo
+      la archiva al terminar; si falla, vuelve a su estado anterior y se avisa al reviewer.
     - Si es una DELETE: Elimina físicamente el archivo del disco.
     Tras el éxito, la propuesta pasa a ARCHIVED con el usuario como reviewer.
     """
@@ -122,27 +124,10 @@ def publicar_imagen(request, id):
         return redirect('dashboard')
     try:
         prop = get_object_or_404(CaosImageProposalORM, id=id)
-        repo = DjangoCaosRepository()
 
         if prop.action == 'DELETE':
-            # SOFT DELETE: Move to .trash folder
-            base_dir = os.path.join(settings.BASE_DIR, 'persistence/static/persistence/img')
-            world_dir = str(prop.world.id)
-            img_filename = prop.target_filename
-            
-            src_path = os.path.join(base_dir, world_dir, img_filename)
-            trash_dir = os.path.join(base_dir, world_dir, '.trash')
-            
-            # Ensure trash dir exists
-            if not os.path.exists(trash_dir):
-                os.makedirs(trash_dir)
-                
-            trash_path = os.path.join(trash_dir, img_filename)
-            
-            if os.path.exists(src_path):
-                import shutil
-                shutil.move(src_path, trash_path)
-                
+            # SOFT DELETE: la referencia pasa a la papelera (el contenido se queda en el almacén de blobs)
+            if blob_store.trash(prop.world.id, prop.target_filename):
                 # Metadata Cleanup: If this WAS the cover image, clear it
                 if prop.world.metadata and prop.world.metadata.get('cover_image') == prop.target_filename:
                     prop.world.metadata['cover_image'] = None
@@ -150,23 +135,25 @@ def publicar_imagen(request, id):
                     messages.info(request, "ℹ️ La portada del mundo ha sido reseteada porque la imagen fue borrada.")
                 
                 messages.success(request, f"🗑️ Imagen '{prop.target_filename}' movida a la Papelera.")
-                log_event(request.user, "SOFT_DELETE_IMAGE", prop.world.id, details=f"Archivo movido a .trash: {prop.target_filename}")
+                log_event(request.user, "SOFT_DELETE_IMAGE", prop.world.id, details=f"Archivo enviado a la papelera: {prop.target_filename}")
             else:
                 messages.warning(request, f"⚠️ El archivo '{prop.target_filename}' no existía en LIVE, pero la propuesta se ha archivado.")
         else:
-            # NORMAL PUBLISH (ADD)
-            user_name = prop.author.username if prop.author else "Anónimo"
-            period_slug = prop.timeline_period.slug if prop.timeline_period else None
-            repo.save_manual_file(str(prop.world.id), prop.image, username=user_name, title=prop.title, period_slug=period_slug)
-            messages.success(request, "🚀 Imagen Publicada y Archivada.")
-            log_event(request.user, "PUBLISH_IMAGE", id)
+            # NORMAL PUBLISH (ADD): conversión, galería, gallery_log, archivado y aviso al autor
+            # en run_image_worker (ver image_jobs.py)
+            if enqueue_image_publication(prop, request.user) is None:
+                messages.warning(request, "⏳ Esta imagen ya se está publicando o ya está publicada.")
+            else:
+                messages.success(request, "🚀 Publicación en curso. La imagen aparecerá en la galería en unos instantes.")
+                log_event(request.user, "PUBLISH_IMAGE", id)
         
-        prop.status = 'ARCHIVED'
-        prop.reviewer = request.user
-        prop.save()
+        # Las publicaciones ADD se archivan y notifican desde el trabajo, al terminar
+        if prop.action == 'DELETE':
+            prop.status = 'ARCHIVED'
+            prop.reviewer = request.user
+            prop.save()
 
-        # Create Notification
-        if prop.author:
+        if prop.author and prop.action == 'DELETE':
             CaosNotification.objects.create(
                 user=prop.author,
                 title="🚀 ¡Imagen Publicada!",
@@ -221,30 +208,20 @@ def restaurar_imagen_papelera(request, id):
         
         # LOGIC FOR RESTORING A SOFT-DELETED IMAGE
         if prop.action == 'DELETE' and prop.status == 'ARCHIVED':
-            # It was a successful delete, so file is in .trash
-            base_dir = os.path.join(settings.BASE_DIR, 'persistence/static/persistence/img')
-            world_dir = str(prop.world.id)
+            # It was a successful delete, so the reference is in the trash (metadata-only restore)
             img_filename = prop.target_filename
             
-            trash_path = os.path.join(base_dir, world_dir, '.trash', img_filename)
-            live_path = os.path.join(base_dir, world_dir, img_filename)
-            
-            if os.path.exists(trash_path):
-                import shutil
-                # Create live dir if somehow missing
-                os.makedirs(os.path.dirname(live_path), exist_ok=True)
-                shutil.move(trash_path, live_path)
-                
+            if blob_store.restore(prop.world.id, img_filename):
                 # We mark the DELETION proposal as REJECTED (meaning "Deletion Reversed")
                 prop.status = 'REJECTED' 
                 prop.admin_feedback = "Restaurado desde Papelera (Deshacer Borrado)"
                 prop.save()
                 
                 messages.success(request, f"♻️ Imagen '{img_filename}' restaurada correctamente al mundo.")
-                log_event(request.user, "UNDELETE_IMAGE", prop.world.id, details=f"Archivo recuperado de .trash: {img_filename}")
+                log_event(request.user, "UNDELETE_IMAGE", prop.world.id, details=f"Archivo recuperado de la papelera: {img_filename}")
                 return redirect('ver_papelera')
             else:
-                messages.warning(request, "⚠️ No se encontró el archivo en la papelera (.trash). No se puede restaurar.")
+                messages.warning(request, "⚠️ No se encontró el archivo en la papelera. No se puede restaurar.")
                 return redirect('ver_papelera')
 
         # STANDARD RESTORE (For Drafts/Rejected additions)
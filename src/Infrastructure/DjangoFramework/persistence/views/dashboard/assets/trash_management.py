@@ -8,8 +8,9 @@ from src.Infrastructure.DjangoFramework.persistence.models import (
     CaosImageProposalORM, CaosWorldORM, CaosNarrativeORM,
     CaosEventLog, CaosVersionORM, CaosNarrativeVersionORM
 )
+from src.Infrastructure.DjangoFramework.persistence import blob_store
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import invalidate_proposal_counts
 from django.contrib.auth.models import User
-import os
 import urllib.parse
 
 # --- TRASH MANAGEMENT ---
@@ -349,9 +350,9 @@ def manage_trash_bulk(request):
                             img = CaosImageProposalORM.objects.filter(id=obj_id).first()
                             if img:
                                 try:
-                                    file_path = f"persistence/static/persistence/img/{img.world.id}/{img.target_filename}"
-                                    if os.path.exists(os.path.join(settings.BASE_DIR, file_path)):
-                                        os.remove(os.path.join(settings.BASE_DIR, file_path))
+                                    if img.target_filename:
+                                        # Borrado definitivo de lo que está en la papelera (y de los blobs sin más usos)
+                                        blob_store.purge(img.world.id, img.target_filename)
                                 except: pass
                                 img.delete(); stats['deleted'] += 1
                         else: stats['kept'] += 1
@@ -359,6 +360,7 @@ def manage_trash_bulk(request):
                 except Exception as e:
                     print(f"Error processing {key}: {e}")
 
+            invalidate_proposal_counts()  # Las restauraciones usan .update() (sin señales)
             messages.success(request, f"✅ Procesado: ♻️ {stats['restored']} Restaurados | 🔥 {stats['deleted']} Eliminados | 📂 {stats['kept']} Mantenidos")
             return redirect('ver_papelera')
 
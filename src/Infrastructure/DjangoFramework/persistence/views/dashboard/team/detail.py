@@ -70,6 +70,13 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         # Social Stats - Unified using SocialService
         content = SocialService.discover_user_content(target_user)
         
+        # Likes/comentarios de todo el contenido del usuario en una consulta (contadores desnormalizados)
+        content_stats = SocialService.get_interactions_counts(
+            [f"IMG_{img['filename']}" for img in content['images']]
+            + [f"WORLD_{w.public_id}" for w in content['worlds']]
+            + [f"VER_{p.id}" for p in content.get('proposals', [])]
+        )
+        
         comments_received = 0
         favorite_reviews = 0
         image_stats = []
@@ -97,7 +104,7 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             world = img['world']
             entity_key = f"IMG_{filename}"
             
-            stats = SocialService.get_interactions_count(entity_key)
+            stats = content_stats[entity_key]
             comments_received += stats['comments']
             favorite_reviews += stats['likes']
             
@@ -139,12 +146,14 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         # 3. Process Activity (All comments where user is author OR recipient of a reply)
         # This covers cases where the user doesn't OWN the content (like Roberto)
         activity = SocialService.get_user_activity(target_user)
-        for comment in activity['comments']:
+        activity_comments = list(activity['comments'])
+        activity_info = SocialService.resolve_contents_by_keys({c.entity_key for c in activity_comments})
+        for comment in activity_comments:
             # Skip if already in received_comments (to avoid duplicates from owned content)
             if any(rc['id'] == comment.id for rc in received_comments):
                 continue
                 
-            info = SocialService.resolve_content_by_key(comment.entity_key)
+            info = activity_info.get(comment.entity_key)
             if info:
                 world = info.get('world')
                 cover_thumb = get_cached_cover(world)
@@ -190,7 +199,7 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         # 4. Process Worlds (Metadata/Description Comments & Likes)
         for world in content['worlds']:
             entity_key = f"WORLD_{world.public_id}"
-            stats = SocialService.get_interactions_count(entity_key)
+            stats = content_stats[entity_key]
             favorite_reviews += stats['likes']
             comments_received += stats['comments']
 
@@ -219,7 +228,7 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
             try:
                 # Proposals can have comments via Version ID
                 entity_key = f"VER_{prop.id}"
-                stats = SocialService.get_interactions_count(entity_key)
+                stats = content_stats[entity_key]
                 comments_received += stats['comments']
                 
                 # Use current world cover
@@ -271,12 +280,14 @@ class UserDetailView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
         total_stars = 0
         review_count = raw_reviews.count()
         
+        raw_reviews = list(raw_reviews.select_related('user'))
+        review_info = SocialService.resolve_contents_by_keys({r.entity_key for r in raw_reviews})
         for r in raw_reviews:
             total_stars += r.rating
             etype = r.entity_type or guess_type(r.entity_key)
             
             # Resolve Context
-            info = SocialService.resolve_content_by_key(r.entity_key)
+            info = review_info.get(r.entity_key)
             world = info.get('world') if info else None
             cover = get_cached_cover(world) if world else default_thumb
             
@@ -12,8 +12,11 @@ from django.urls import reverse
 from django.utils import timezone
 
 from src.Infrastructure.DjangoFramework.persistence.utils import (
-    generate_breadcrumbs, get_world_images, get_thumbnail_url
+    generate_breadcrumbs, get_world_images, get_thumbnail_urls
 )
+from src.Infrastructure.DjangoFramework.persistence.engagement import attach_engagement, paginate_ranking
+from src.Infrastructure.DjangoFramework.persistence.gallery_index import list_galleries
+from src.Infrastructure.DjangoFramework.persistence import image_derivatives
 from src.Infrastructure.DjangoFramework.persistence.models import (
     CaosWorldORM, CaosNarrativeORM, CaosEpochORM, CaosComment, CaosLike
 )
@@ -24,6 +27,7 @@ from ..utils import is_superuser, is_admin_or_staff
 
 class UserRankingView(LoginRequiredMixin, TemplateView):
     template_name = "staff/user_ranking.html"
+    paginate_by = 30
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -32,51 +36,48 @@ class UserRankingView(LoginRequiredMixin, TemplateView):
         context['target_user'] = target_user
         
         # Discover Content
-        content = SocialService.discover_user_content(target_user)
+        content = SocialService.discover_user_content(target_user, include_proposals=False)
+        now = timezone.now()
+        
+        # Portadas de todas las entidades implicadas desde el índice de galerías (una consulta)
+        # Miniaturas de 160 px: las celdas del ranking miden 64 px
+        thumbs = get_thumbnail_urls(content['worlds'] + [n.world for n in content['narratives']], width=image_derivatives.LIST_WIDTH)
+        # Carpetas físicas y derivados de las imágenes (cubre carpetas legacy '<jid>_Nombre')
+        image_worlds = {img['world'].id for img in content['images'] if img.get('world')}
+        galleries = list_galleries(image_worlds, with_variants=True)
+        folders = {jid: folder for jid, (folder, _) in galleries.items()}
+        variants = {
+            (jid, f): (folder, f, digest, width)
+            for jid, (folder, files) in galleries.items() for f, _, (digest, width) in files
+        }
         
         ranked_items = []
         
         # Process Worlds (Tarjetas)
         for w in content['worlds']:
-            key = f"WORLD_{w.public_id}"
-            stats = SocialService.get_interactions_count(key)
-            
-            # Cover - Use centralized thumbnail helper
-            cover_filename = w.metadata.get('cover_image') if w.metadata else None
-            thumb = get_thumbnail_url(w.id, cover_filename, use_first_if_no_cover=True)
-            
             ranked_items.append({
                 'type': 'world',
+                'entity_key': f"WORLD_{w.public_id}",
                 'title': w.name,
                 'author': w.author.username if w.author else w.current_author_name,
                 'date': w.created_at,
-                'likes': stats['likes'],
-                'comments': stats['comments'],
-                'thumbnail': thumb,
+                'thumbnail': thumbs[w.id],
                 'link': f"/mundo/{w.public_id}",
-                'days_active': (timezone.now() - w.created_at).days
+                'days_active': (now - w.created_at).days
             })
             
         # Process Narratives
         for n in content['narratives']:
-            key = f"narr_{n.public_id}"
-            stats = SocialService.get_interactions_count(key)
             w = n.world
-            
-            # Cover - Use centralized thumbnail helper
-            cover_filename = w.metadata.get('cover_image') if w and w.metadata else None
-            thumb = get_thumbnail_url(w.id, cover_filename, use_first_if_no_cover=True) if w else "/static/img/placeholder.png"
-            
             ranked_items.append({
                 'type': 'narrative',
+                'entity_key': f"narr_{n.public_id}",
                 'title': n.titulo,
-                'author': n.created_by.username,
+                'author': target_user.username,  # discover_user_content filtra por created_by
                 'date': n.created_at,
-                'likes': stats['likes'],
-                'comments': stats['comments'],
-                'thumbnail': thumb,
+                'thumbnail': thumbs[w.id] if w else "/static/img/placeholder.png",
                 'link': f"/narrativa/{n.public_id}/" if n.public_id else "#",
-                'days_active': (timezone.now() - n.created_at).days
+                'days_active': (now - n.created_at).days
             })
 
 
@@ -87,9 +88,6 @@ class UserRankingView(LoginRequiredMixin, TemplateView):
             if fname in processed_images: continue
             processed_images.add(fname)
             
-            key = f"IMG_{fname}"
-            stats = SocialService.get_interactions_count(key)
-            
             w = img.get('world')
             
             # Robust Image Path Resolution: All Project Images are in Static Gallery
@@ -102,28 +100,35 @@ class UserRankingView(LoginRequiredMixin, TemplateView):
                 # Default: Everything is in persistence/static/persistence/img/{JID}
                 # even "Covers" and "Uploads".
                 jid = w.id if w else "00" # Fallback if world is missing (shouldnt happen for images)
-                path = f"/static/persistence/img/{jid}/{fname}"
+                if (jid, fname) in variants:
+                    path = f"/static/persistence/img/{image_derivatives.thumbnail_path(*variants[(jid, fname)], width=image_derivatives.LIST_WIDTH)}"
+                else:
+                    path = f"/static/persistence/img/{folders.get(jid, jid)}/{fname}"
             
             ranked_items.append({
                 'type': 'image',
+                'entity_key': f"IMG_{fname}",
                 'title': img.get('title', fname),
                 'author': target_user.username,
-                'date': w.created_at if w else timezone.now(),
-                'likes': stats['likes'],
-                'comments': stats['comments'],
+                'date': w.created_at if w else now,
                 'thumbnail': path,
                 'link': f"/mundo/{w.public_id}?open_image={fname}" if w else "#",
-                'days_active': (timezone.now() - w.created_at).days if w else 0
+                'days_active': (now - w.created_at).days if w else 0
             })
 
-        # Separate Lists & Sort
-        # Filter logic in template or separate here? Let's separate here for easier sorting
-        worlds_rank = sorted([x for x in ranked_items if x['type'] == 'world'], key=lambda x: x['likes'], reverse=True)
-        narratives_rank = sorted([x for x in ranked_items if x['type'] == 'narrative'], key=lambda x: x['likes'], reverse=True)
-        images_rank = sorted([x for x in ranked_items if x['type'] == 'image'], key=lambda x: x['likes'], reverse=True)
-        
-        context['worlds_rank'] = worlds_rank
-        context['narratives_rank'] = narratives_rank
-        context['images_rank'] = images_rank
+        # Likes y comentarios de todos los elementos en dos consultas agrupadas
+        attach_engagement(ranked_items)
+
+        # Separate Lists, Sort & Paginate (?page_worlds=N, ?page_narratives=N, ?page_images=N)
+        for kind, name in (('world', 'worlds'), ('narrative', 'narratives'), ('image', 'images')):
+            page = paginate_ranking(
+                [x for x in ranked_items if x['type'] == kind],
+                self.request.GET.get(f'page_{name}'), self.paginate_by, sort_key='likes'
+            )
+            context[f'{name}_page'] = page
+            context[f'{name}_rank'] = page.object_list
+        context['active_tab'] = next(
+            (name for name in ('narratives', 'images') if f'page_{name}' in self.request.GET), 'worlds'
+        )
         
         return context
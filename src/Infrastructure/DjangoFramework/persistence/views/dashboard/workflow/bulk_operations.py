@@ -31,6 +31,7 @@ from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaos
 # Modules
 from ..utils import log_event, is_admin_or_staff, has_authority_over_proposal, execute_use_case_action, execute_orm_status_change
 from ..metrics import group_items_by_author, calculate_kpis
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import invalidate_proposal_counts
 from src.Infrastructure.DjangoFramework.persistence.rbac import restrict_explorer, admin_only, requires_role
 
 
@@ -83,6 +84,9 @@ def borrar_propuestas_masivo(request):
             for id in n_ids: execute_use_case_action(request, RejectNarrativeVersionUseCase, id, "", "")
             CaosImageProposalORM.objects.filter(id__in=i_ids).update(status='REJECTED')
             messages.success(request, f"✕ {count} Elementos rechazados.")
+
+        # Los .update() masivos no disparan señales: invalidar contadores explícitamente
+        invalidate_proposal_counts()
  
     next_url = request.GET.get('next') or request.POST.get('next')
     return redirect(next_url) if next_url else redirect('dashboard')
@@ -31,6 +31,7 @@ from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaos
 # Modules
 from ..utils import log_event, is_admin_or_staff, has_authority_over_proposal
 from ..metrics import group_items_by_author, calculate_kpis
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import annotate_pending_counts
 from src.Infrastructure.DjangoFramework.persistence.rbac import restrict_explorer, admin_only, requires_role
 
 
@@ -304,11 +305,7 @@ def dashboard(request):
     
     # --- ENHANCE AVAILABLE AUTHORS WITH COUNTS ---
     # We do this for the dropdown to show who has pending stuff.
-    for author in allowed_authors:
-        w_p = CaosVersionORM.objects.filter(author_id=author.id, status='PENDING').count()
-        n_p = CaosNarrativeVersionORM.objects.filter(author_id=author.id, status='PENDING').count()
-        i_p = CaosImageProposalORM.objects.filter(author_id=author.id, status='PENDING').count()
-        author.pending_count = w_p + n_p + i_p
+    annotate_pending_counts(allowed_authors)
 
     kpis = calculate_kpis(pending, logs_base)
 
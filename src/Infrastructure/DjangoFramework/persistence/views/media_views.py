@@ -1,23 +1,22 @@
 import os
 import json
 import base64
-import io
 import logging
-from PIL import Image
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-from django.core.files.base import ContentFile
 
 logger = logging.getLogger(__name__)
 
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosEventLog, CaosImageProposalORM, CaosVersionORM
 from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
-from src.WorldManagement.Caos.Application.generate_map import GenerateWorldMapUseCase
-from src.FantasyWorld.AI_Generation.Infrastructure.sd_service import StableDiffusionService
+from src.Infrastructure.DjangoFramework.persistence.ai_jobs import enqueue_job
+from src.Infrastructure.DjangoFramework.persistence.image_jobs import enqueue_image_proposal
+from src.Infrastructure.DjangoFramework.persistence.caching import bump_generation, PROPOSALS_NAMESPACE
 from .view_utils import resolve_jid_orm
+from .ai_views import ai_job_accepted
 
 # Removed local resolve_jid, using resolve_jid_orm instead
 
@@ -29,35 +28,35 @@ def log_event(user, action, target_id, details=""):
 
 @csrf_exempt
 def api_preview_foto(request, jid):
+    """
+    Encola la generación de una vista previa (Llama + Stable Diffusion) y responde al instante.
+    El cliente consulta el estado en `status_url` (ver persistence/ai_jobs.py).
+    """
     if request.method != 'GET': return JsonResponse({'success': False})
     try:
         w = resolve_jid_orm(jid); real_jid = w.id if w else jid
         
-        logger.info(f"🎨 Iniciando generación de imagen para mundo: {w.name if w else jid}")
-        b64 = GenerateWorldMapUseCase(DjangoCaosRepository(), StableDiffusionService()).generate_preview(real_jid)
-        
-        if b64 is None:
-            logger.error("❌ generate_preview devolvió None - Revisa los logs de los servicios de IA")
-            return JsonResponse({
-                'status': 'error', 
-                'success': False,
-                'message': 'Error al generar la imagen. Verifica que los servidores de IA estén corriendo correctamente (Qwen en puerto 5000 y Stable Diffusion en puerto 7861).'
-            })
-        
-        logger.info(f"✅ Imagen generada correctamente ({len(b64)} chars)")
-        return JsonResponse({'status': 'ok', 'success': True, 'image': b64})
+        logger.info(f"🎨 Encolando generación de imagen para mundo: {w.name if w else jid}")
+        job = enqueue_job('preview_image', {'world_id': real_jid}, request.user)
+        return ai_job_accepted(job)
     except Exception as e:
         logger.error(f"❌ Exception en api_preview_foto: {e}", exc_info=True)
         return JsonResponse({'status': 'error', 'success': False, 'message': str(e)})
 
 @csrf_exempt
 def api_save_foto(request, jid):
+    """
+    Recibe una imagen del generador de IA (base64) y encola su conversión a propuesta WebP.
+    La decodificación y la codificación las hace run_image_worker (ver persistence/image_jobs.py);
+    el cliente recibe el trabajo y puede consultar su estado en `status_url`.
+    """
     logger.debug(f"api_save_foto called for jid={jid}")
     try:
         w = resolve_jid_orm(jid); real_jid = w.id if w else jid
+        if not w:
+            return JsonResponse({'status': 'error', 'message': 'Mundo no encontrado'})
         
         data = json.loads(request.body)
-        user = request.user if request.user.is_authenticated else None
         
         # Robust base64 decoding
         img_str = data.get('image')
@@ -69,38 +68,13 @@ def api_save_foto(request, jid):
         else:
             imgstr = img_str
 
-        # Convert to WebP
-        image = Image.open(io.BytesIO(base64.b64decode(imgstr)))
-        
-        output = io.BytesIO()
-        image.save(output, format='WEBP')
-        
-        file_name = f"{data.get('title')}.webp"
-        image_data = ContentFile(output.getvalue(), name=file_name)
-
-        # Determine period
-        from src.Infrastructure.DjangoFramework.persistence.models import TimelinePeriod
-        period_slug = data.get('period')
-        period = TimelinePeriod.objects.filter(world=w, slug=period_slug).first()
-
-        # Create Proposal
-        CaosImageProposalORM.objects.create(
-            world=w,
-            image=image_data,
-            title=data.get('title'),
-            author=user,
-            status='PENDING',
-            action='ADD',
-            timeline_period=period
-        )
+        job = enqueue_image_proposal(w, base64.b64decode(imgstr), data.get('title'), data.get('period'), request.user)
         
         log_event(request.user, "PROPOSE_AI_PHOTO", real_jid, f"Title: {data.get('title')}")
         
-        return JsonResponse({'status': 'ok', 'success': True, 'message': 'Imagen enviada a revisión (WebP).'})
+        return ai_job_accepted(job)
     except Exception as e:
         logger.error(f"Exception in api_save_foto: {e}", exc_info=True)
-        import traceback
-        traceback.print_exc()
         return JsonResponse({'status': 'error', 'message': str(e)})
 
 @csrf_exempt
@@ -279,19 +253,21 @@ def borrar_fotos_batch(request, jid):
         period_slug = data.get('period')
         period = TimelinePeriod.objects.filter(world=w, slug=period_slug).first()
 
-        count = 0
-        for fn in filenames:
-             CaosImageProposalORM.objects.create(
-                 world=w,
-                 title=f"Borrar: {fn}", 
-                 reason=reason,
-                 target_filename=fn,
-                 action='DELETE',
-                 status='PENDING',
-                 author=request.user,
-                 timeline_period=period
-             )
-             count += 1
+        # Un único INSERT para todo el lote (bulk_create no emite post_save: se invalidan los contadores a mano)
+        count = len(CaosImageProposalORM.objects.bulk_create([
+            CaosImageProposalORM(
+                world=w,
+                title=f"Borrar: {fn}", 
+                reason=reason,
+                target_filename=fn,
+                action='DELETE',
+                status='PENDING',
+                author=request.user,
+                timeline_period=period
+            )
+            for fn in filenames
+        ]))
+        bump_generation(PROPOSALS_NAMESPACE)
         
         messages.info(request, f"🗑️ Solicitado el borrado de {count} imágenes. Pendiente de aprobación.")
         return JsonResponse({'status':'ok'})
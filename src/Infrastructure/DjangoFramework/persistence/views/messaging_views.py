@@ -77,5 +77,5 @@ def mark_as_read(request, message_id):
 @login_required
 def unread_count(request):
     """API para obtener el número de mensajes no leídos."""
-    count = Message.objects.filter(recipient=request.user, read_at__isnull=True).count()
-    return JsonResponse({'unread_count': count})
+    from src.Infrastructure.DjangoFramework.persistence.badges import get_badge_summary
+    return JsonResponse({'unread_count': get_badge_summary(request.user)['unread_messages']})
@@ -14,6 +14,7 @@ from src.FantasyWorld.Domain.Services.NarrativeService import NarrativeService
 from src.FantasyWorld.Domain.Services.NarrativeService import NarrativeService
 from .view_utils import resolve_jid_orm, check_world_access, get_admin_status, log_event
 from src.Infrastructure.DjangoFramework.persistence.policies import can_user_propose_on
+from src.Infrastructure.DjangoFramework.persistence.narrative_reads import mark_narrative_read
 
 @csrf_exempt
 @require_POST
@@ -137,6 +138,8 @@ def leer_narrativa(request, nid):
 
         if request.user.is_authenticated:
              log_event(request.user, "VIEW_NARRATIVE", nid)
+             if n_orm:
+                 mark_narrative_read(request.user, n_orm.nid)
 
         return render(request, 'visor_narrativa.html', context)
     except Exception as e:
@@ -310,11 +313,8 @@ def pre_crear_root(request, jid, tipo_codigo):
             timeline_period=period
         )
         
-        todas = CaosWorldORM.objects.all().order_by('id')
-        
         return render(request, 'visor_narrativa.html', {
             'narr': mock,
-            'todas_entidades': todas,
             'published_chapters': [],
             'is_creation_mode': True,
             'target_jid': jid,      # For Form Action
@@ -353,11 +353,8 @@ def pre_crear_child(request, parent_nid, tipo_codigo):
             timeline_period=p.timeline_period # Inherit parent period
         )
         
-        todas = CaosWorldORM.objects.all().order_by('id')
-        
         return render(request, 'visor_narrativa.html', {
             'narr': mock,
-            'todas_entidades': todas,
             'published_chapters': [],
             'is_creation_mode': True,
             'is_child_mode': True,
@@ -389,14 +386,12 @@ def revisar_narrativa_version(request, version_id):
         narr_proxy.is_proposal = True
         
         # Reuse the same template
-        todas = CaosWorldORM.objects.all().order_by('id')
         hijos = CaosNarrativeORM.objects.filter(nid__startswith=narr_proxy.nid).exclude(nid=narr_proxy.nid).order_by('nid')
         published_chapters = hijos.filter(current_version_number__gt=0)
         
         messages.info(request, f"👁️ Visualizando PROPUESTA v{v.version_number}. Esto no es la versión live.")
         return render(request, 'visor_narrativa.html', {
             'narr': narr_proxy, 
-            'todas_entidades': todas, 
             'published_chapters': published_chapters, 
             'is_proposal': True
         })
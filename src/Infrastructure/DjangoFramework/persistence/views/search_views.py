@@ -1,8 +1,8 @@
 from django.shortcuts import render
-from django.db.models import Q
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
-from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosNarrativeORM
+from src.Infrastructure.DjangoFramework.persistence.search_index import search_documents, matched_in_metadata
+from src.Infrastructure.DjangoFramework.persistence.entity_picker import search_entities, MAX_RESULTS
 
 @login_required
 def global_search(request):
@@ -11,51 +11,23 @@ def global_search(request):
     results_narratives = []
     
     if query:
-        from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
-        vis_q = get_visibility_q_filter(request.user)
-        
-        # 1. Search in Worlds (including JSONB metadata)
-        worlds = CaosWorldORM.objects.filter(vis_q).filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(metadata__icontains=query) # Deep search in JSONB
-        ).filter(is_active=True).distinct()[:20]
-        
-        for w in worlds:
+        # Índice de texto completo (ver persistence/search_index.py): la visibilidad
+        # se aplica dentro de la misma consulta que la búsqueda.
+        for doc in search_documents(query, request.user, 'world'):
             results_worlds.append({
-                'id': w.id,
-                'name': w.name,
+                'id': doc.object_id,
+                'name': doc.title,
                 'type': 'Mundo',
-                'url': f"/mundo/{w.public_id}/", # Use public_id
-                'match': 'Metadata' if query.lower() in str(w.metadata).lower() else 'Nombre/Desc'
+                'url': f"/mundo/{doc.world.public_id}/", # Use public_id
+                'match': 'Metadata' if matched_in_metadata(query, doc) else 'Nombre/Desc'
             })
             
-        # 2. Search in Narratives (Filter by Parent World Visibility)
-        # Re-prefixing world visibility filter for narratives
-        # We need to ensure we can see the world 'n.world'
-        narratives_vis_q = Q()
-        if not request.user.is_superuser:
-            # We filter by the visibility of the related world
-            # Note: get_visibility_q_filter returns Q objects for CaosWorldORM.
-            # We can use it with 'world__' prefix.
-            from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
-            world_q = get_visibility_q_filter(request.user)
-            
-            # Reconstruct Q with world__ prefix
-            # This is a bit manual but safe.
-            narratives_vis_q = Q(world__in=CaosWorldORM.objects.filter(world_q))
-
-        narratives = CaosNarrativeORM.objects.filter(narratives_vis_q).filter(
-            Q(titulo__icontains=query) |
-            Q(contenido__icontains=query)
-        ).filter(is_active=True).distinct()[:20]
-        
-        for n in narratives:
+        for doc in search_documents(query, request.user, 'narrative'):
             results_narratives.append({
-                'id': n.nid,
-                'name': n.titulo,
+                'id': doc.object_id,
+                'name': doc.title,
                 'type': 'Narrativa',
-                'url': f"/narrativa/{n.nid}/" # Adjust slug/id logic
+                'url': f"/narrativa/{doc.object_id}/" # Adjust slug/id logic
             })
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.GET.get('format') == 'json':
@@ -69,3 +41,18 @@ def global_search(request):
         'worlds': results_worlds,
         'narratives': results_narratives
     })
+
+@login_required
+def entity_picker(request):
+    """Autocompletado de entidades para el editor de narrativas (ver persistence/entity_picker.py)."""
+    try:
+        limit = int(request.GET.get('limit', MAX_RESULTS))
+    except ValueError:
+        limit = MAX_RESULTS
+    results = search_entities(request.GET.get('q', ''), request.user, limit)
+    return JsonResponse({
+        'results': [
+            {'id': r['id'], 'name': r['name'], 'public_id': r['public_id'], 'url': f"/mundo/{r['public_id']}/"}
+            for r in results
+        ]
+    })
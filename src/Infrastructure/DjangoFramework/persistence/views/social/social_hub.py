@@ -43,20 +43,15 @@ def social_hub_view(request):
     for p in content['proposals']:
         my_entity_keys.add(f"VER_{p.id}")
         
-    # Expand keys to ensure case-insensitive matching (DB keys might be UPPER or mixed)
-    expanded_keys = set()
-    for k in my_entity_keys:
-        if k:
-            expanded_keys.add(k)
-            expanded_keys.add(k.upper())
-            expanded_keys.add(k.lower())
+    # Normalized keys ensure case-insensitive matching (DB keys might be UPPER or mixed)
+    normalized_keys = {SocialService.normalize_key(k) for k in my_entity_keys if k}
         
     # 2. Query Comments
     # Criteria: 
     #   (Comment is on MY entity) OR (Comment is a REPLY to MY comment)
     #   AND (Comment is NOT written by ME)
     
-    criterion_on_my_entity = Q(entity_key__in=list(expanded_keys))
+    criterion_on_my_entity = Q(entity_key_norm__in=list(normalized_keys))
     criterion_reply_to_me = Q(parent_comment__user=user)
     
     base_query = CaosComment.objects.filter(
@@ -83,12 +78,13 @@ def social_hub_view(request):
     # 5. Enrich Data for Template
     enriched_comments = []
     
-    # Cache for resolved info
-    resolved_info_cache = {}
+    # Resolve all entity keys in one batch
+    comments = list(comments.select_related('user'))
+    resolved_info = SocialService.resolve_contents_by_keys({c.entity_key for c in comments})
     
     for c in comments:
         # Use SocialService to resolve details if possible
-        info = SocialService.resolve_content_by_key(c.entity_key)
+        info = resolved_info.get(c.entity_key)
         
         entity_display = c.entity_name
         link = "#"
@@ -145,7 +141,7 @@ def archive_comment(request, comment_id):
     
     # Ideally:
     c.status = 'ARCHIVED'
-    c.save()
+    c.save(update_fields=['status'])
     
     return redirect('social_hub')
 
@@ -156,6 +152,6 @@ def delete_comment(request, comment_id):
     # Basically if it's in your hub, you can delete it.
     
     c.status = 'DELETED'
-    c.save()
+    c.save(update_fields=['status'])
     
     return redirect('social_hub')
@@ -3,10 +3,9 @@ from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
-from django.utils.timezone import localtime
 from src.Infrastructure.DjangoFramework.persistence.models import CaosLike, CaosComment, Message, CaosEventLog
 from src.Shared.Services.SocialService import SocialService
-from src.Infrastructure.DjangoFramework.persistence.utils import get_user_avatar
+from src.Infrastructure.DjangoFramework.persistence import comment_threads
 from src.Infrastructure.DjangoFramework.persistence.policies import can_user_moderate_comment
 
 # --- LIKES SYSTEM (Standardized) ---
@@ -68,51 +67,26 @@ def get_like_status(request):
 # --- COMMENTS SYSTEM (Standardized) ---
 
 def get_comments(request):
+    """
+    Comentarios de una entidad, paginados por cursor (ver comment_threads).
+    Parámetros: entity_key, cursor (next_cursor de la página anterior) y limit.
+    """
     try:
         entity_key = request.GET.get('entity_key')
         if not entity_key:
-            return JsonResponse({'comments': [], 'authenticated': request.user.is_authenticated})
-        
-        comments = SocialService.get_comments(entity_key)
-        
-        data = []
-        for c in comments:
-            profile_pic_url = get_user_avatar(c.user)
-            username = c.user.username if c.user else "Usuario eliminado"
-                
-            # Build replies list
-            replies = []
-            for reply in c.replies.all():
-                reply_pic_url = get_user_avatar(reply.user)
-                reply_username = reply.user.username if reply.user else "Usuario eliminado"
-                
-                replies.append({
-                    'id': reply.id,
-                    'username': reply_username,
-                    'user': reply_username,  # Backward compatibility
-                    'content': reply.content,
-                    'date': localtime(reply.created_at).strftime("%d/%m/%Y %H:%M") if reply.created_at else "---",
-                    'is_me': request.user.is_authenticated and reply.user and (request.user == reply.user),
-                    'can_delete': can_user_moderate_comment(request.user, reply),
-                    'avatar_url': reply_pic_url,
-                    'profile_url': f"/staff/user/{reply_username}/" if reply.user else "#"
-                })
+            return JsonResponse({'comments': [], 'total': 0, 'next_cursor': None,
+                                 'authenticated': request.user.is_authenticated})
+
+        try:
+            limit = int(request.GET.get('limit', comment_threads.PAGE_SIZE))
+            page = comment_threads.get_thread_page(entity_key, request.GET.get('cursor') or None, limit)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
-            data.append({
-                'id': c.id,
-                'username': username,
-                'user': username,  # Backward compatibility
-                'content': c.content,
-                'date': localtime(c.created_at).strftime("%d/%m/%Y %H:%M") if c.created_at else "---",
-                'is_me': request.user.is_authenticated and c.user and (request.user == c.user),
-                'can_delete': can_user_moderate_comment(request.user, c),
-                'avatar_url': profile_pic_url,
-                'pic': profile_pic_url,  # Backward compatibility
-                'reply_count': c.reply_count,
-                'replies': replies
-            })
         return JsonResponse({
-            'comments': data, 
+            'comments': comment_threads.for_viewer(page, request.user),
+            'total': page['total'],
+            'next_cursor': page['next_cursor'],
             'authenticated': request.user.is_authenticated
         })
     except Exception as e:
@@ -196,11 +170,10 @@ def post_comment(request):
                 comment.parent_comment = parent
                 comment.save()
                 
-                # Update parent reply count & Status
-                parent.reply_count += 1
+                # Update parent Status (reply_count lo mantiene la señal de CaosComment)
                 if parent.status != 'REPLIED':
                     parent.status = 'REPLIED'
-                parent.save()
+                    parent.save(update_fields=['status'])
                 
                 # Notify parent comment author
                 if parent.user != request.user:
@@ -291,7 +264,7 @@ def toggle_comment_like(request):
         if not created:
             # Unlike
             like.delete()
-            count = CaosLike.objects.filter(entity_key=entity_key).count()
+            count = SocialService.get_interactions_count(entity_key)['likes']
             return JsonResponse({
                 'status': 'unliked',
                 'count': count,
@@ -307,7 +280,7 @@ def toggle_comment_like(request):
                     body=f'"{comment.content[:100]}..."'
                 )
             
-            count = CaosLike.objects.filter(entity_key=entity_key).count()
+            count = SocialService.get_interactions_count(entity_key)['likes']
             return JsonResponse({
                 'status': 'liked',
                 'count': count,
@@ -1,8 +1,7 @@
 from django.shortcuts import render, get_object_or_404
 from django.core.exceptions import PermissionDenied
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosEventLog
-from src.WorldManagement.Caos.Infrastructure.django_repository import DjangoCaosRepository
-from src.WorldManagement.Caos.Application.common import resolve_world_id
+from src.Infrastructure.DjangoFramework.persistence.identity_map import resolve_world
 
 def log_event(user, action, target_id, details=""):
     """
@@ -18,27 +17,11 @@ def log_event(user, action, target_id, details=""):
 def resolve_jid_orm(identifier) -> CaosWorldORM:
     """
     Resuelve un J-ID o PublicID (NanoID) a una instancia de CaosWorldORM.
-    Devuelve None si no se encuentra.
+    Devuelve None si no se encuentra. Prioriza las entidades activas; las de la
+    papelera solo se devuelven si no hay otra coincidencia.
+    Dentro de una petición se resuelve una sola vez (identity_map).
     """
-    repo = DjangoCaosRepository()
-    w_domain = resolve_world_id(repo, identifier)
-    if w_domain:
-        try:
-            return CaosWorldORM.objects.get(id=w_domain.id.value)
-        except CaosWorldORM.DoesNotExist:
-            return None
-            
-    # Fallback: Intentar identificar como NanoID o ID directo
-    try:
-        # Intentar por public_id (NanoID)
-        return CaosWorldORM.objects.get(public_id=identifier)
-    except CaosWorldORM.DoesNotExist:
-        try:
-            # Intentar ID plano (Entero/Legacy)
-            return CaosWorldORM.objects.get(id=identifier)
-        except (CaosWorldORM.DoesNotExist, ValueError):
-            return None
-    return None
+    return resolve_world(identifier)
 
 def check_world_access(request, world_orm: CaosWorldORM):
     """
@@ -40,6 +40,7 @@ from src.Infrastructure.DjangoFramework.persistence.utils import generate_breadc
 from src.Infrastructure.DjangoFramework.persistence.permissions import check_ownership
 from src.FantasyWorld.Domain.Services.EntityService import EntityService
 from src.WorldManagement.Caos.Domain.hierarchy_utils import get_readable_hierarchy
+from src.Infrastructure.DjangoFramework.persistence.caching import GenerationalCache, WORLD_TREE_NAMESPACE, WORLD_CHILDREN_NAMESPACE
 from ..view_utils import resolve_jid_orm, check_world_access, get_admin_status, get_metadata_diff
 from .utils import log_event, get_current_user
 
@@ -159,7 +160,8 @@ def ver_mundo(request, public_id):
 
     # 2. Manejar GET (Visualización) mediante Caso de Uso
     # PASAMOS EL PERIOD_SLUG PARA FILTRAR IMÁGENES
-    context = GetWorldDetailsUseCase(repo).execute(public_id, request.user, period_slug=period_slug)
+    children_cache = GenerationalCache(WORLD_CHILDREN_NAMESPACE, timeout=300)
+    context = GetWorldDetailsUseCase(repo, cache=children_cache).execute(public_id, request.user, period_slug=period_slug)
     
     if not context:
         return render(request, '404.html', {"jid": public_id})
@@ -325,7 +327,7 @@ def mapa_arbol(request, public_id):
         if not can_access: 
              return render(request, 'private_access.html', status=403)
 
-        result = GetWorldTreeUseCase(repo).execute(public_id)
+        result = GetWorldTreeUseCase(repo, cache=GenerationalCache(WORLD_TREE_NAMESPACE, timeout=300)).execute(public_id)
         if not result: return redirect('home')
         return render(request, 'mapa_arbol.html', result)
     except Http404: raise
@@ -38,6 +38,7 @@ from src.FantasyWorld.AI_Generation.Infrastructure.sd_service import StableDiffu
 from src.FantasyWorld.AI_Generation.Infrastructure.llama_service import Llama3Service
 from src.Infrastructure.DjangoFramework.persistence.utils import generate_breadcrumbs, get_world_images
 from src.Infrastructure.DjangoFramework.persistence.permissions import check_ownership
+from src.Infrastructure.DjangoFramework.persistence.caching import GenerationalCache, HOME_INDEX_NAMESPACE
 from src.FantasyWorld.Domain.Services.EntityService import EntityService
 from src.WorldManagement.Caos.Domain.hierarchy_utils import get_readable_hierarchy
 from ..view_utils import resolve_jid_orm, check_world_access, get_admin_status, get_metadata_diff
@@ -71,6 +72,29 @@ def home(request):
             
         return redirect('dashboard')
     
+    # El índice calculado se comparte entre usuarios de la misma clase de visibilidad
+    # y se invalida al publicar, cambiar visibilidad o portada (ver signals.py).
+    from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_class
+
+    home_cache = GenerationalCache(HOME_INDEX_NAMESPACE)
+    cache_key = get_visibility_class(request.user)
+    index = home_cache.get(cache_key)
+    if index is None:
+        index = _build_home_index(request.user)
+        home_cache.set(cache_key, index)
+
+    import random
+    background_images = list(index['covers'])
+    random.shuffle(background_images)
+
+    return render(request, 'index.html', {'mundos': index['mundos'], 'background_images': background_images[:10]})
+
+
+def _build_home_index(user):
+    """
+    Calcula el índice del Home para un usuario: lista de mundos (dicts serializables)
+    y portadas disponibles para el fondo.
+    """
     # Mostrar mundos 'LIVE' (y 'DRAFTS' para el Autor/Superusuario)
     # 1. Base: Excluir borrados, inválidos y DRAFTS (Flujo Estricto)
     # 1. Base: Excluir solo lo que está en la papelera (soft-delete)
@@ -87,11 +111,11 @@ def home(request):
         .exclude(id__endswith='00', name__startswith='Ghost')
     
     # Regla Especial (01XX): Ocultar hijos directos de Caos Prime para no-Admins en el Home
-    is_privileged = request.user.is_superuser or (hasattr(request.user, 'profile') and request.user.profile.rank == 'ADMIN')
+    is_privileged = user.is_superuser or (hasattr(user, 'profile') and user.profile.rank == 'ADMIN')
     if not is_privileged:
         ms = ms.exclude(id__regex=r'^01[0-9]{2}$')
 
-    ms = ms.prefetch_related('versiones', 'narrativas') \
+    ms = ms.select_related('author') \
         .order_by(
             Case(
                 When(public_id='JhZCO1vxI7', then=Value(0)),
@@ -104,7 +128,7 @@ def home(request):
     # 2. Lógica de Visibilidad Centralizada
     from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
     
-    q_filter = get_visibility_q_filter(request.user)
+    q_filter = get_visibility_q_filter(user)
     ms = ms.filter(q_filter)
 
     # LÓGICA REPRESENTATIVA:
@@ -130,17 +154,19 @@ def home(request):
         imgs = get_world_images(m.id, world_instance=m)
         if imgs:
             imgs.sort(key=lambda x: x.get('is_cover', False), reverse=True)
-        cover = imgs[0]['url'] if imgs else None
+        cover_img = imgs[0] if imgs else None
         if m.metadata and 'cover_image' in m.metadata:
             target = m.metadata['cover_image']
             found = next((i for i in imgs if i['filename'] == target), None)
-            if found: cover = found['url']
+            if found: cover_img = found
+        cover = cover_img['thumb'] if cover_img else None
         
-        if cover:
-            background_images.append(cover)
+        if cover_img:
+            # El fondo a pantalla completa sí usa el original
+            background_images.append(cover_img['url'])
  
-        # Recolectar hasta 5 imágenes para el slideshow (Priorizando PORTADA)
-        entity_images = [i['url'] for i in imgs] if imgs else []
+        # Recolectar hasta 5 imágenes para el slideshow (Priorizando PORTADA), en tamaño tarjeta
+        entity_images = [i['thumb'] for i in imgs] if imgs else []
         if cover and cover in entity_images:
             entity_images.remove(cover)
             entity_images.insert(0, cover)
@@ -161,15 +187,14 @@ def home(request):
             'status': m.status, 
             'img_file': cover,
             'img': cover, # Fallback/Primary key
+            'img_srcset': cover_img['srcset'] if cover_img else '',
             'images': entity_images, 
             'has_img': bool(cover), 
             'visible': m.visible_publico,
             'is_locked': m.status == 'LOCKED',
-            'author': m.author,
+            'author': m.author.username if m.author else None,
+            'author_id': m.author_id,  # La plantilla lo compara con user.pk (el índice se comparte entre usuarios)
             'level': len(m.id)//2,
         })
     
-    import random
-    random.shuffle(background_images)
-    
-    return render(request, 'index.html', {'mundos': l, 'background_images': background_images[:10]})
+    return {'mundos': l, 'covers': background_images}
@@ -172,16 +172,21 @@ async function requestAIAnalysis() {
     loader.classList.remove('hidden');
     
     try {
-        const response = await fetch('/api/ai/analyze-metadata/', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-            },
-            body: JSON.stringify({ world_id: _currentWorldId })
-        });
-
-        const data = await response.json();
+        // El análisis se encola en el worker de IA; CaosAIJobs consulta hasta que termina
+        let data;
+        try {
+            const result = await CaosAIJobs.run('/api/ai/analyze-metadata/', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+                },
+                body: JSON.stringify({ world_id: _currentWorldId })
+            });
+            data = { success: true, metadata: result.metadata };
+        } catch (jobError) {
+            data = { success: false, error: jobError.message };
+        }
         
         if (data.success && data.metadata) {
             
@@ -1,6 +1,6 @@
 /**
  * Narrative Editor Logic
- * Handles File Import, AI Editing, and Title Generation.
+ * Handles File Import, AI Editing, Title Generation and Entity Mentions.
  */
 
 function toggleEdit() {
@@ -130,6 +130,83 @@ function updateWordCount(textarea) {
     }
 }
 
+// Entity Mention Picker (server-side typeahead, see /api/entidades/buscar/)
+let entitySearchTimer = null;
+let entitySearchSeq = 0;
+function searchEntityMentions(input) {
+    clearTimeout(entitySearchTimer);
+    const list = document.getElementById('entity-picker-results');
+    const query = input.value.trim();
+    if (query.length < 2) {
+        list.classList.add('hidden');
+        return;
+    }
+    entitySearchTimer = setTimeout(async () => {
+        const seq = ++entitySearchSeq;
+        try {
+            const response = await fetch(`/api/entidades/buscar/?q=${encodeURIComponent(query)}`);
+            const data = await response.json();
+            if (seq !== entitySearchSeq) return; // Respuesta obsoleta
+            list.innerHTML = '';
+            data.results.forEach(entity => {
+                const li = document.createElement('li');
+                li.className = 'p-[6px_10px] cursor-pointer text-white text-[0.85em] hover:bg-[#2a2a35]';
+                li.textContent = `${entity.name} (${entity.id})`;
+                li.onclick = () => insertEntityMention(entity);
+                list.appendChild(li);
+            });
+            list.classList.toggle('hidden', data.results.length === 0);
+        } catch (e) {
+            console.error('Entity picker error:', e);
+        }
+    }, 250);
+}
+
+function insertEntityMention(entity) {
+    const textarea = document.querySelector('textarea[name="content"]') || document.querySelector('textarea[name="contenido"]');
+    if (!textarea) return;
+    const link = `[${entity.name}](${entity.url})`;
+    const start = textarea.selectionStart ?? textarea.value.length;
+    const end = textarea.selectionEnd ?? start;
+    textarea.value = textarea.value.slice(0, start) + link + textarea.value.slice(end);
+    textarea.focus();
+    textarea.selectionStart = textarea.selectionEnd = start + link.length;
+    updateWordCount(textarea);
+
+    const input = document.getElementById('entity-picker');
+    if (input) input.value = '';
+    document.getElementById('entity-picker-results').classList.add('hidden');
+}
+
+// Lee una respuesta text/event-stream de la edición con IA.
+// Llama a onDelta por cada fragmento; devuelve el mensaje de error o null si terminó bien.
+async function readAIEditStream(response, onDelta) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = 'message', data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) continue;
+            const payload = JSON.parse(data);
+            if (event === 'error') return payload.error;
+            if (event === 'done') return null;
+            onDelta(payload.delta || '');
+        }
+    }
+    return 'La conexión con la IA se cortó antes de terminar.';
+}
+
 // AI Edit Logic
 async function requestAIEdit(mode) {
      const textarea = document.querySelector('textarea[name="content"]') || document.querySelector('textarea[name="contenido"]');
@@ -150,7 +227,8 @@ async function requestAIEdit(mode) {
          const paperDiv = document.querySelector('.paper');
          const worldId = paperDiv ? paperDiv.getAttribute('data-world-id') : null;
          
-         const response = await fetch('/api/ai/edit-narrative/', {
+         // Streaming (SSE): el texto aparece según la IA lo escribe
+         const response = await fetch('/api/ai/edit-narrative/stream/', {
              method: 'POST',
              headers: {
                  'Content-Type': 'application/json',
@@ -162,19 +240,34 @@ async function requestAIEdit(mode) {
                  world_id: worldId  // NUEVO: Para herencia de lore
              })
          });
-        
-        const data = await response.json();
-        
-        if (data.success) {
-            textarea.value = data.text;
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.startsWith('text/event-stream')) {
+            // Errores de validación llegan como JSON normal
+            const data = await response.json();
+            await CaosModal.alert("Error IA", data.error);
+            status.innerText = "❌ Error";
+            return;
+        }
+
+        textarea.value = "";
+        const error = await readAIEditStream(response, delta => {
+            textarea.value += delta;
+            textarea.scrollTop = textarea.scrollHeight;
+        });
+
+        if (!error) {
+            textarea.value = textarea.value.trim();
             updateWordCount(textarea);
             status.innerText = "✨ ¡Hecho!";
             setTimeout(() => status.innerText = "", 3000);
         } else {
-            await CaosModal.alert("Error IA", data.error);
+            textarea.value = originalText;
+            await CaosModal.alert("Error IA", error);
             status.innerText = "❌ Error";
         }
      } catch (e) {
+        textarea.value = originalText;
         await CaosModal.alert("Error de Conexión", "" + e);
         status.innerText = "❌ Error Red";
      } finally {
@@ -2,8 +2,12 @@ import logging
 from django.db.models import Q
 from django.contrib.auth.models import User
 from src.Infrastructure.DjangoFramework.persistence.models import (
-    CaosWorldORM, CaosNarrativeORM, CaosLike, CaosComment, TimelinePeriod, CaosVersionORM, CaosEventLog
+    CaosWorldORM, CaosNarrativeORM, CaosComment, CaosVersionORM,
+    normalize_entity_key
 )
+from src.Infrastructure.DjangoFramework.persistence.content_attribution import get_user_images
+from src.Infrastructure.DjangoFramework.persistence.image_locator import locate_images
+from src.Infrastructure.DjangoFramework.persistence.engagement_counters import read_counters
 
 logger = logging.getLogger(__name__)
 
@@ -17,33 +21,19 @@ class SocialService:
     def get_robust_query(entity_key: str) -> Q:
         """
         Creates a Q object that matches an entity_key robustly.
-        Handles:
-        - Case insensitivity (iexact).
+        Matches the normalized key stored at write time (entity_key_norm), which covers:
+        - Case insensitivity.
         - Dash encoding artifacts (e.g., '-' vs '\\u002D').
+        Uses the plain b-tree index on entity_key_norm.
         """
-        queries = Q(entity_key__iexact=entity_key)
-        
-        # Handle dash vs \u002D encoding
-        if '-' in entity_key:
-            alt_key = entity_key.replace('-', '\\u002D')
-            queries |= Q(entity_key__iexact=alt_key)
-        elif '\\u002D' in entity_key:
-            alt_key = entity_key.replace('\\u002D', '-')
-            queries |= Q(entity_key__iexact=alt_key)
-            
-        return queries
+        return Q(entity_key_norm=SocialService.normalize_key(entity_key))
 
     @staticmethod
     def normalize_key(entity_key: str) -> str:
         """
-        Normalizes an entity key for comparison.
+        Normalizes an entity key for comparison (same as the stored entity_key_norm).
         """
-        if not entity_key:
-            return ""
-        # Ensure string
-        key = str(entity_key).lower().strip()
-        # Normalze dashes
-        return key.replace('\\u002d', '-').replace('\\u002D', '-')
+        return normalize_entity_key(entity_key)
 
     @staticmethod
     def compare_keys(key1: str, key2: str) -> bool:
@@ -52,6 +42,22 @@ class SocialService:
         """
         return SocialService.normalize_key(key1) == SocialService.normalize_key(key2)
 
+    @staticmethod
+    def get_interactions_counts(entity_keys) -> dict:
+        """
+        Returns {entity_key: {'likes', 'comments', 'engagement'}} for many keys at once.
+        Reads the denormalized counters (CaosEngagementCounterORM) in a single query;
+        comments are top-level only.
+        """
+        norm_by_key = {k: SocialService.normalize_key(k) for k in entity_keys if k}
+        counters = read_counters(norm_by_key.values())
+
+        results = {}
+        for key, norm in norm_by_key.items():
+            l, c = counters.get(norm, (0, 0))
+            results[key] = {'likes': l, 'comments': c, 'engagement': l + c}
+        return results
+
     @staticmethod
     def get_interactions_count(entity_key: str) -> dict:
         """
@@ -59,16 +65,7 @@ class SocialService:
         """
         if not entity_key:
             return {'likes': 0, 'comments': 0, 'engagement': 0}
-            
-        query = SocialService.get_robust_query(entity_key)
-        likes = CaosLike.objects.filter(query).count()
-        comments = CaosComment.objects.filter(query, parent_comment__isnull=True).count()
-        
-        return {
-            'likes': likes,
-            'comments': comments,
-            'engagement': likes + comments
-        }
+        return SocialService.get_interactions_counts([entity_key])[entity_key]
 
     @staticmethod
     def get_comments(entity_key: str, parent_only=True):
@@ -84,16 +81,17 @@ class SocialService:
     @staticmethod
     def discover_user_content(target_user: User, include_proposals=True):
         """
-        Exhaustively scans the database to find all content attributed to a user.
-        Scans:
+        Finds all content attributed to a user.
+        Covers:
         - Worlds (as author).
         - Narratives (as creator).
         - Images in World Gallery (as uploader or world author fallback).
         - Images as World Covers.
         - Images in Timeline Periods (Gallery & Cover).
+        - Historical uploads/proposals (from event logs).
+        Images are read from the attribution index (see persistence/content_attribution.py).
         """
         username = target_user.username
-        username_lower = username.lower()
         
         results = {
             'images': [],
@@ -106,7 +104,7 @@ class SocialService:
         user_worlds = CaosWorldORM.objects.filter(
             Q(author=target_user) | Q(current_author_name__iexact=username),
             is_active=True
-        ).distinct()
+        ).select_related('author').distinct()
         
         for w in user_worlds:
             results['worlds'].append(w)
@@ -119,107 +117,9 @@ class SocialService:
         for n in user_narratives:
             results['narratives'].append(n)
 
-        # 3. IMAGES (The complex part)
-        # We need to scan ALL active worlds because a user might have uploaded to someone else's world
-        all_active_worlds = CaosWorldORM.objects.filter(is_active=True).select_related('author')
-        
-        for world in all_active_worlds:
-            world_author_matches = (
-                (world.author and world.author.username.lower() == username_lower) or 
-                (world.current_author_name and world.current_author_name.lower() == username_lower)
-            )
-            
-            if not world.metadata:
-                continue
-                
-            # A. Cover Image
-            cover = world.metadata.get('cover_image')
-            if cover and world_author_matches:
-                # Attribution: If it's a world cover, we attribute it to world author if no specific uploader
-                results['images'].append({
-                    'filename': cover,
-                    'title': f"Portada: {world.name}",
-                    'world': world,
-                    'type': 'cover'
-                })
-
-            # B. Gallery Log
-            gallery = world.metadata.get('gallery_log', {})
-            for filename, meta in gallery.items():
-                uploader = meta.get('uploader', '')
-                if uploader.lower() == username_lower:
-                    results['images'].append({
-                        'filename': filename,
-                        'title': meta.get('title', filename),
-                        'world': world,
-                        'meta': meta,
-                        'type': 'gallery'
-                    })
-                elif not uploader and world_author_matches:
-                    # Fallback to world author if no uploader
-                    results['images'].append({
-                        'filename': filename,
-                        'title': meta.get('title', filename),
-                        'world': world,
-                        'meta': meta,
-                        'type': 'gallery'
-                    })
-
-            # C. Timeline Periods
-            # We also check for images inside the timeline metadata
-            timeline = world.metadata.get('timeline', {})
-            for year, data in timeline.items():
-                # Period Cover
-                p_cover = data.get('cover_image')
-                if p_cover and world_author_matches:
-                    results['images'].append({
-                        'filename': p_cover,
-                        'title': f"Portada Periodo {year}",
-                        'world': world,
-                        'type': 'period_cover'
-                    })
-                
-                # Period Gallery
-                p_gallery = data.get('gallery_log', {})
-                for p_filename, p_meta in p_gallery.items():
-                    p_uploader = p_meta.get('uploader', '')
-                    if p_uploader.lower() == username_lower:
-                        results['images'].append({
-                            'filename': p_filename,
-                            'title': p_meta.get('title', p_filename),
-                            'world': world,
-                            'meta': p_meta,
-                            'type': 'period_gallery'
-                        })
-
-        # 4. HISTORICAL CONTENT (From Event Logs)
-        # Scan for any image the user has EVER uploaded or proposed
-        historical_logs = CaosEventLog.objects.filter(
-            user=target_user,
-            action__in=['UPLOAD_PHOTO', 'PROPOSE_COVER', 'PROPOSE_AI_PHOTO', 'RETOUCH_PHOTO']
-        ).values_list('details', flat=True)
-        
-        found_historical_files = set()
-        for detail in historical_logs:
-            # Extract filename from "Proposed cover: filename", "File: filename", "Title: filename"
-            # This is a bit heuristic but better than missing it
-            parts = detail.split(':')
-            if len(parts) > 1:
-                filename = parts[1].strip().split('(')[0].strip()
-                if filename.lower().endswith(('.webp', '.png', '.jpg', '.jpeg', '.gif')):
-                    found_historical_files.add(filename)
-        
-        # Add historical files to results if not already present
-        existing_files = {img['filename'].lower() for img in results['images']}
-        for h_file in found_historical_files:
-            if h_file.lower() not in existing_files:
-                # We don't have a world or meta for these, but they are Alone's content
-                results['images'].append({
-                    'filename': h_file,
-                    'title': f"Histórico: {h_file}",
-                    'world': None,
-                    'type': 'historical'
-                })
+        # 3. IMAGES (Galerías, portadas, períodos e históricos)
+        # Indexed attribution table instead of scanning every world's metadata and the event log
+        results['images'] = get_user_images(target_user)
 
         if include_proposals:
             user_proposals = CaosVersionORM.objects.filter(author=target_user)
@@ -249,59 +149,59 @@ class SocialService:
         """
         Attempts to find the world and name associated with an entity key.
         """
-        key = SocialService.normalize_key(entity_key)
-        
-        # 1. Image
-        if key.startswith('img_'):
-            filename = key[4:]
-            # Search in all worlds' gallery_log or cover_image
-            worlds = CaosWorldORM.objects.filter(
-                Q(metadata__gallery_log__has_key=filename) |
-                Q(metadata__cover_image=filename)
-            ).distinct()
-            
-            if worlds.exists():
-                w = worlds.first()
-                title = w.metadata.get('gallery_log', {}).get(filename, {}).get('title', filename)
-                return {'type': 'image', 'world': w, 'title': title, 'filename': filename}
-            
-            # Fallback search in TimelinePeriods
-            periods = TimelinePeriod.objects.filter(metadata__gallery_log__has_key=filename).distinct()
-            if periods.exists():
-                p = periods.first()
-                title = p.metadata.get('gallery_log', {}).get(filename, {}).get('title', filename)
-                return {'type': 'image', 'world': p.world, 'title': title, 'filename': filename}
-            
-            # Fallback search in CaosEventLog
-            from src.Infrastructure.DjangoFramework.persistence.models import CaosEventLog
-            log = CaosEventLog.objects.filter(details__icontains=filename).first()
-            if log and log.target_id:
-                # target_id usually contains the JID
-                world = CaosWorldORM.objects.filter(id=log.target_id).first()
-                return {'type': 'image', 'world': world, 'title': filename, 'filename': filename}
-            
-            return {'type': 'image', 'world': None, 'title': filename, 'filename': filename}
-
-        # 2. Narrative
-        if key.startswith('narr_'):
-            public_id = key[5:]
-            n = CaosNarrativeORM.objects.filter(public_id=public_id).first()
-            if n:
-                return {'type': 'narrative', 'world': n.world, 'title': n.titulo, 'id': public_id}
-
-        # 3. World
-        if key.startswith('world_'):
-            public_id = key[6:]
-            w = CaosWorldORM.objects.filter(public_id=public_id).first()
-            if not w: w = CaosWorldORM.objects.filter(id=public_id).first()
-            if w:
-                return {'type': 'world', 'world': w, 'title': w.name, 'id': w.public_id}
+        return SocialService.resolve_contents_by_keys([entity_key]).get(entity_key)
 
-        # 4. Proposal
-        if key.startswith('ver_'):
-            ver_id = key[4:]
-            v = CaosVersionORM.objects.filter(id=ver_id).first()
-            if v:
-                return {'type': 'proposal', 'world': v.entidad, 'title': f"Propuesta v{v.version_number}", 'id': ver_id}
+    @staticmethod
+    def resolve_contents_by_keys(entity_keys) -> dict:
+        """
+        Batch version of resolve_content_by_key: {entity_key: info or None}.
+        Resolves N keys with one query per content type (images use the image locator index).
+        """
+        keys = {k: SocialService.normalize_key(k) for k in entity_keys if k}
+        by_prefix = {'img_': {}, 'narr_': {}, 'world_': {}, 'ver_': {}}
+        for original, key in keys.items():
+            for prefix, bucket in by_prefix.items():
+                if key.startswith(prefix):
+                    bucket[original] = key[len(prefix):]
+                    break
+
+        results = {k: None for k in keys}
+
+        # 1. Images
+        if by_prefix['img_']:
+            located = locate_images(by_prefix['img_'].values())
+            for original, filename in by_prefix['img_'].items():
+                found = located.get(filename, {})
+                results[original] = {'type': 'image', 'world': found.get('world'),
+                                     'title': found.get('title', filename), 'filename': filename}
+
+        # 2. Narratives
+        if by_prefix['narr_']:
+            narratives = {n.public_id: n for n in CaosNarrativeORM.objects.filter(
+                public_id__in=set(by_prefix['narr_'].values())).select_related('world')}
+            for original, public_id in by_prefix['narr_'].items():
+                n = narratives.get(public_id)
+                if n:
+                    results[original] = {'type': 'narrative', 'world': n.world, 'title': n.titulo, 'id': public_id}
+
+        # 3. Worlds (public_id, with J-ID fallback)
+        if by_prefix['world_']:
+            ids = set(by_prefix['world_'].values())
+            worlds = list(CaosWorldORM.objects.filter(Q(public_id__in=ids) | Q(id__in=ids)))
+            by_public = {w.public_id: w for w in worlds}
+            by_jid = {w.id: w for w in worlds}
+            for original, public_id in by_prefix['world_'].items():
+                w = by_public.get(public_id) or by_jid.get(public_id)
+                if w:
+                    results[original] = {'type': 'world', 'world': w, 'title': w.name, 'id': w.public_id}
+
+        # 4. Proposals
+        if by_prefix['ver_']:
+            ver_ids = {v for v in by_prefix['ver_'].values() if v.isdigit()}
+            versions = {str(v.id): v for v in CaosVersionORM.objects.filter(id__in=ver_ids).select_related('world')}
+            for original, ver_id in by_prefix['ver_'].items():
+                v = versions.get(ver_id)
+                if v:
+                    results[original] = {'type': 'proposal', 'world': v.world, 'title': f"Propuesta v{v.version_number}", 'id': ver_id}
 
-        return None
+        return results
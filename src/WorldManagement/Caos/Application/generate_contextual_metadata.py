@@ -138,8 +138,8 @@ class GenerateContextualMetadataUseCase:
         Devuelve solo el TIPO en una sola palabra.
         """
         try:
-            # Respuesta determinista con temperatura baja
-            response = self.ai.edit_text("Eres un clasificador taxonómico estricto.", prompt, temperature=0.1, max_tokens=10)
+            # Respuesta determinista con temperatura baja (misma descripción -> mismo tipo: cacheada)
+            response = self.ai.edit_text("Eres un clasificador taxonómico estricto.", prompt, temperature=0.1, max_tokens=10, cache=True)
             clean_type = response.strip().upper().replace('"', '').replace("'", "").replace(".", "")
             
             # Limpieza básica de la respuesta
@@ -198,4 +198,5 @@ class GenerateContextualMetadataUseCase:
             Devuelve SOLO el JSON.
         """
         
-        return self.ai.generate_structure(system_prompt, user_prompt)
+        # Mismo lore y mismo esquema -> misma ficha: se cachea aunque la temperatura no sea baja
+        return self.ai.generate_structure(system_prompt, user_prompt, cache=True)
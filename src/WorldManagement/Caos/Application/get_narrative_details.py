@@ -1,5 +1,5 @@
 from src.WorldManagement.Caos.Domain.repositories import CaosRepository
-from src.Infrastructure.DjangoFramework.persistence.models import CaosNarrativeORM, CaosWorldORM
+from src.Infrastructure.DjangoFramework.persistence.models import CaosNarrativeORM
 
 class GetNarrativeDetailsUseCase:
     """
@@ -45,11 +45,7 @@ class GetNarrativeDetailsUseCase:
             print(f"❌ Error al recuperar detalles de la narrativa '{nid}': {e}")
             return None
 
-        # 2. Recopilación de Datos de Contexto
-        # Obtenemos solo los campos necesarios para menciones/enlaces (optimizado)
-        todas = CaosWorldORM.objects.only('id', 'name', 'public_id').order_by('id')
-        
-        # 3. Resolución de Capítulos (Hijos Jerárquicos)
+        # 2. Resolución de Capítulos (Hijos Jerárquicos)
         # Buscamos todas las narrativas cuyo NID empiece por el NID actual (Estructura de Carpeta)
         hijos = CaosNarrativeORM.objects.filter(nid__startswith=narr.nid).exclude(nid=narr.nid).order_by('nid')
         
@@ -58,6 +54,5 @@ class GetNarrativeDetailsUseCase:
         
         return {
             'narr': narr,
-            'todas_entidades': todas,
             'published_chapters': published_chapters
         }
@@ -2,14 +2,24 @@ from src.WorldManagement.Caos.Domain.repositories import CaosRepository
 from src.WorldManagement.Caos.Application.common import resolve_world_id
 import json
 
+
+def _is_conceptually_ghost(node):
+    """Identifica "Entidades Fantasma" (estructurales/vacías) que solo sirven de pegamento."""
+    name_lower = node.name.lower()
+    is_generic = "nexo" in name_lower or "ghost" in name_lower or "fantasma" in name_lower or node.name in ("Placeholder", "")
+    return node.id.endswith("00") and is_generic
+
+
 class GetWorldDetailsUseCase:
     """
     Caso de Uso para obtener los detalles completos de una entidad (Mundo/Nivel).
     Se encarga de resolver la jerarquía, gestionar la visibilidad de hijos (incluyendo saltos y compartidos),
     y preparar todos los datos necesarios para la vista de detalle.
     """
-    def __init__(self, repository: CaosRepository):
+    def __init__(self, repository: CaosRepository, cache=None):
         self.repository = repository
+        # Caché opcional (get/set) para la resolución de hijos visibles
+        self.cache = cache
 
     def execute(self, identifier: str, user=None, period_slug=None):
         # 1. Resolver el ID (puede ser J-ID o NanoID)
@@ -17,14 +27,11 @@ class GetWorldDetailsUseCase:
         if not w_domain:
             return None
 
-        from django.db.models import Q # Import needed for Federated Logic
-
         # 2. Obtener el objeto ORM (referencia directa para acceder a relaciones de base de datos)
         # Nota: Idealmente esto debería pasar por DTOs en el repositorio, pero se mantiene así por agilidad actual.
-        from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
-        try:
-            w = CaosWorldORM.objects.get(id=w_domain.id.value, is_active=True)
-        except CaosWorldORM.DoesNotExist:
+        from src.Infrastructure.DjangoFramework.persistence.identity_map import get_world
+        w = get_world(id=w_domain.id.value)
+        if w is None or not w.is_active:
             return None
 
         jid = w.id
@@ -39,92 +46,8 @@ class GetWorldDetailsUseCase:
         from src.Infrastructure.DjangoFramework.persistence.utils import get_world_images, generate_breadcrumbs
         
         # --- LÓGICA DE DESCENDIENTES (Saltos y Entidades Compartidas) ---
-        # 1. Recuperar todos los descendientes activos que empiecen por este J-ID
-        all_descendants = CaosWorldORM.objects.filter(id__startswith=jid, is_active=True).exclude(id=jid).order_by('id')
-        
-        # --- LÓGICA DE TRONCO COMPARTIDO '00' ---
-        # La rama '00' en la raíz (ej. 0100...) sirve como repositorio de entidades compartidas.
-        # Estas entidades deben ser visibles para todos los "primos" del mismo nivel.
-        if len(jid) >= 2:
-            root_id = jid[:2]
-            shared_trunk = root_id + "00"
-            
-            # Buscamos entidades en el tronco compartido
-            trunk_descendants = CaosWorldORM.objects.filter(id__startswith=shared_trunk, is_active=True)
-            
-            # Combinamos con los descendientes directos para procesar la visibilidad conjunta
-            all_descendants = all_descendants | trunk_descendants
-                
-        # Eliminar duplicados y ordenar por J-ID
-        all_descendants = all_descendants.distinct().order_by('id')
-
-        # Filtro Global: Los BORRADORES (DRAFT) no se ven en la vista Live (solo en el Dashboard)
-        all_descendants = all_descendants.exclude(status='DRAFT')
-
-        # 2. Filtrado Base
-        # Lógica CENTRALIZADA en policies.py (Misma que Home)
-        if user and user.is_authenticated:
-             from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter
-             
-             q_filter = get_visibility_q_filter(user)
-             all_descendants = all_descendants.filter(q_filter)
-        else:
-             # Anonimo
-             all_descendants = all_descendants.filter(visible_publico=True)
-
-        nodes_map = {d.id: d for d in all_descendants}
-
-        # --- DETERMINACIÓN DE VISIBILIDAD (Hoisting y Transparencia) ---
-        # Identificamos qué entidades son visibles directamente desde esta página.
-        sorted_desc = sorted(all_descendants, key=lambda x: len(x.id), reverse=True)
-        
-        # Función auxiliar para identificar "Entidades Fantasma" (estructurales/vacías)
-        def is_conceptually_ghost(node):
-            name_lower = node.name.lower()
-            is_generic = "nexo" in name_lower or "ghost" in name_lower or "fantasma" in name_lower or node.name in ("Placeholder", "")
-            return node.id.endswith("00") and is_generic
-
-        solid_ids = set() 
-        for d in sorted_desc:
-            is_ghost = is_conceptually_ghost(d)
-            if not is_ghost:
-                solid_ids.add(d.id)
-            if d.id in solid_ids:
-                if len(d.id) > len(jid):
-                    pid = d.id[:-2]
-                    solid_ids.add(pid) 
-
-        visible_children = []
-        for d in all_descendants:
-            # REGLA 1: Los fantasmas son siempre invisibles (solo sirven de pegamento estructural)
-            if is_conceptually_ghost(d):
-                continue
-
-            # REGLA 2: Transparencia (Si el camino hasta el hijo está compuesto solo por fantasmas, el hijo "sube")
-            is_shadowed = False
-            for l in range(len(jid) + 2, len(d.id), 2):
-                intermediate_id = d.id[:l]
-                ancestor = nodes_map.get(intermediate_id)
-                if ancestor and not is_conceptually_ghost(ancestor):
-                    is_shadowed = True # Un ancestro real bloquea la vista (el hijo pertenece a ese ancestro)
-                    break
-            
-            if not is_shadowed:
-                # Calculamos niveles para la interfaz (Badge y Posicionamiento)
-                d.visual_level = len(d.id) // 2
-                parent_level = len(jid) // 2
-                d.relative_level = d.visual_level - parent_level
-                
-                # REGLA 3: Los hijos compartidos ('00') no se ven en la vista de su padre directo
-                if d.id.startswith(jid + '00'):
-                    continue
-
-                # REGLA 4: Solo mostramos entidades que están exactamente 1 nivel por debajo (Jerarquía Estricta)
-                if d.relative_level != 1:
-                    continue
-                
-                visible_children.append(d)
-
+        # Hoisting y Transparencia, cacheado por (J-ID, clase de visibilidad)
+        visible_children = self._get_visible_children(jid, user)
 
         # --- PREPARACIÓN DE DATOS DE HIJOS ---
         hijos = []
@@ -133,9 +56,12 @@ class GetWorldDetailsUseCase:
             # Resolución de Imagen de Portada (Pass instance to avoid N+1 and get latest meta)
             imgs = get_world_images(h.id, world_instance=h)
             img_url = None
+            img_srcset = ''
             if imgs:
-                cover_img = next((img for img in imgs if img.get('is_cover')), None)
-                img_url = cover_img['url'] if cover_img else imgs[0]['url']
+                # Miniaturas de tarjeta (image_derivatives), no los originales
+                cover_img = next((img for img in imgs if img.get('is_cover')), None) or imgs[0]
+                img_url = cover_img['thumb']
+                img_srcset = cover_img['srcset']
             
             level = len(h.id) // 2
             parent_level = len(jid) // 2
@@ -157,7 +83,7 @@ class GetWorldDetailsUseCase:
                 is_jumped = True
 
             # Prepare images list with cover first
-            all_h_imgs = [i['url'] for i in imgs] if imgs else []
+            all_h_imgs = [i['thumb'] for i in imgs] if imgs else []
             if img_url and img_url in all_h_imgs:
                 all_h_imgs.remove(img_url)
                 all_h_imgs.insert(0, img_url)
@@ -168,6 +94,7 @@ class GetWorldDetailsUseCase:
                 'name': h.name, 
                 'short': h.id[len(jid):], 
                 'img': img_url,
+                'img_srcset': img_srcset,
                 'images': all_h_imgs[:5],
                 'level': level,
                 'relative_level': relative_level,
@@ -273,8 +200,6 @@ class GetWorldDetailsUseCase:
             if user.is_superuser: has_authority = True
             elif w.author == user: has_authority = True
 
-        # 9. Construcción del Diccionario de Resultado para el Template
-
         # 9. Construcción del Diccionario de Resultado para el Template
         return {
             'name': w.name, 
@@ -304,3 +229,71 @@ class GetWorldDetailsUseCase:
             'is_subadmin': is_subadmin, # Expose for UI logic (AI Button)
             'is_admin_role': user and (user.is_superuser or (hasattr(user, 'profile') and user.profile.rank in ['ADMIN', 'SUBADMIN']))
         }
+
+    def _get_visible_children(self, jid, user):
+        """
+        Determina qué entidades son visibles directamente desde la página de `jid`.
+
+        Solo se consulta la ventana de longitudes de J-ID que corresponde al nivel relativo 1
+        (hijos directos y primos del tronco compartido '00') y, después, la cadena mínima de
+        ancestros intermedios que podrían ocultarlos. El coste depende del número de hijos,
+        no del tamaño del subárbol.
+        """
+        from django.db.models import Q
+        from django.db.models.functions import Length
+        from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+        from src.Infrastructure.DjangoFramework.persistence.policies import get_visibility_q_filter, get_visibility_class
+
+        cache_key = f"{jid}:{get_visibility_class(user)}"
+        if self.cache is not None:
+            cached_ids = self.cache.get(cache_key)
+            if cached_ids is not None:
+                return list(CaosWorldORM.objects.filter(id__in=cached_ids, is_active=True).order_by('id'))
+
+        # Filtro Global: Los BORRADORES (DRAFT) no se ven en la vista Live (solo en el Dashboard)
+        base = CaosWorldORM.objects.filter(is_active=True).exclude(status='DRAFT')
+
+        # Filtrado Base: Lógica CENTRALIZADA en policies.py (Misma que Home)
+        if user and user.is_authenticated:
+            base = base.filter(get_visibility_q_filter(user))
+        else:
+            base = base.filter(visible_publico=True)  # Anonimo
+
+        # Descendientes de este J-ID + tronco compartido '00' de la raíz (ej. 0100...),
+        # cuyas entidades son visibles para todos los "primos" del mismo nivel.
+        scope = Q(id__startswith=jid)
+        if len(jid) >= 2:
+            scope |= Q(id__startswith=jid[:2] + "00")
+
+        # REGLA 4: Solo entidades exactamente 1 nivel por debajo (nivel visual = len // 2)
+        parent_level = len(jid) // 2
+        min_len = (parent_level + 1) * 2
+        candidates = list(
+            base.filter(scope)
+            .annotate(id_len=Length('id'))
+            .filter(id_len__gte=min_len, id_len__lte=min_len + 1)
+            .order_by('id')
+        )
+
+        # REGLA 2: Transparencia. Un ancestro intermedio real bloquea la vista (el hijo le pertenece);
+        # si el camino está compuesto solo por fantasmas, el hijo "sube".
+        chain_ids = {c.id[:l] for c in candidates for l in range(len(jid) + 2, len(c.id), 2)}
+        blockers = set()
+        if chain_ids:
+            blockers = {a.id for a in base.filter(id__in=chain_ids).only('id', 'name') if not _is_conceptually_ghost(a)}
+
+        visible_children = []
+        for d in candidates:
+            # REGLA 1: Los fantasmas son siempre invisibles (solo sirven de pegamento estructural)
+            if _is_conceptually_ghost(d):
+                continue
+            # REGLA 3: Los hijos compartidos ('00') no se ven en la vista de su padre directo
+            if d.id.startswith(jid + '00'):
+                continue
+            if any(d.id[:l] in blockers for l in range(len(jid) + 2, len(d.id), 2)):
+                continue
+            visible_children.append(d)
+
+        if self.cache is not None:
+            self.cache.set(cache_key, [d.id for d in visible_children])
+        return visible_children
@@ -49,21 +49,22 @@ class GetWorldNarrativesUseCase:
         from datetime import timedelta
         threshold = timezone.now() - timedelta(days=3)
         
-        visited_ids = set()
-        if user and user.is_authenticated:
-            # Clean Architecture: Use repository instead of direct ORM access
-            visited_ids = self.repository.get_visited_narrative_ids(user)
-
-        for d in docs:
-            # is_new only if recent AND NOT visited
-            is_recent = d.updated_at >= threshold
-            has_seen = (d.public_id in visited_ids) or (d.nid in visited_ids)
-            d.is_new = is_recent and not has_seen
-
         # Convertimos a lista y ordenamos por NID (Identificador Jerárquico)
         # El orden natural del NID asegura que los padres aparezcan antes que sus hijos.
         all_docs = list(docs)
         all_docs.sort(key=lambda x: x.nid)
+
+        # Solo las narrativas recientes pueden llevar la insignia: son las únicas
+        # que hay que cruzar con el registro de lecturas del usuario.
+        recent_nids = [d.nid for d in all_docs if d.updated_at >= threshold]
+        visited_ids = set()
+        if recent_nids and user and user.is_authenticated:
+            # Clean Architecture: Use repository instead of direct ORM access
+            visited_ids = self.repository.get_visited_narrative_ids(user, recent_nids)
+
+        for d in all_docs:
+            # is_new only if recent AND NOT visited
+            d.is_new = d.updated_at >= threshold and d.nid not in visited_ids
         
         # 3. Construcción del Bosque Jerárquico (Árboles anidados)
         # Procesamos linealmente usando una pila (stack) para gestionar la profundidad.
@@ -2,15 +2,25 @@ from typing import List, Dict, Any
 from src.WorldManagement.Caos.Domain.repositories import CaosRepository
 from src.WorldManagement.Caos.Application.common import resolve_world_id
 
+def _foster_map(id_val: str) -> str:
+    """Mapea los segmentos '00' a '01' (proxy hacia el hermano primogénito / padre adoptivo)."""
+    return "".join('01' if id_val[i:i+2] == '00' else id_val[i:i+2] for i in range(0, len(id_val), 2))
+
+
 class GetWorldTreeUseCase:
     """
     Caso de Uso responsable de construir la estructura jerárquica para el Mapa del Árbol.
     Gestiona la lógica de ordenación compleja, la detección de saltos jerárquicos
     y la re-vinculación de "padres adoptivos" para asegurar que los hijos compartidos
     o saltados aparezcan correctamente anidados en la vista interactiva.
+
+    La estructura calculada por raíz (padres adoptivos, profundidad, is_jumped) se
+    materializa en la caché opcional (puerto get/set); la Infraestructura la invalida
+    al crear, mover, borrar o cambiar el estado de cualquier entidad.
     """
-    def __init__(self, repository: CaosRepository):
+    def __init__(self, repository: CaosRepository, cache=None):
         self.repository = repository
+        self.cache = cache
 
     def execute(self, identifier: str) -> Dict[str, Any]:
         """
@@ -21,34 +31,37 @@ class GetWorldTreeUseCase:
         if not root:
             return None
 
+        root_id = root.id.value
+        if self.cache is not None:
+            cached = self.cache.get(root_id)
+            if cached is not None:
+                return cached
+
         # Recuperar todos los descendientes recursivamente
         descendants = self.repository.find_descendants(root.id)
-        
+        result = {'root_name': root.name, 'tree': self._build_tree(root_id, descendants)}
+
+        if self.cache is not None:
+            self.cache.set(root_id, result)
+        return result
+
+    def _build_tree(self, root_id: str, descendants: List) -> List[Dict[str, Any]]:
+        """Calcula la lista ordenada de nodos del árbol en una sola pasada."""
+        # Mapeo adoptivo precalculado una vez por nodo: como el mapeo es por segmentos,
+        # el de cualquier ancestro es un prefijo del mapeo del propio nodo.
+        foster = {d.id.value: _foster_map(d.id.value) for d in descendants}
+
         # --- LÓGICA DE ORDENACIÓN ESTRATÉGICA ---
         # El objetivo es agrupar las entidades compartidas ('00') junto a su "Primo Primogénito" ('01').
         # Ejemplo: Queremos que 'Mi House' (010013) aparezca justo tras los hijos directos de 'Universo' (0101).
-        def tree_sort_key(node):
-            original = node.id.value
-            segments = [original[i:i+2] for i in range(0, len(original), 2)]
-            
-            # Mapeamos los segmentos '00' a '01' para la comparación de orden
-            remapped_segments = []
-            for s in segments:
-                if s == '00':
-                    remapped_segments.append('01') # Proxy hacia el Primogénito
-                else:
-                    remapped_segments.append(s)
-            
-            return "".join(remapped_segments)
-
-        descendants.sort(key=tree_sort_key)
+        descendants.sort(key=lambda node: foster[node.id.value])
         
         tree_data = []
-        base_len = len(root.id.value)
+        base_len = len(root_id)
 
         # Pre-calculamos un conjunto de IDs para búsquedas rápidas de ancestros existentes
-        all_ids_set = {root.id.value}
-        for d in descendants: all_ids_set.add(d.id.value)
+        all_ids_set = {root_id}
+        all_ids_set.update(foster)
         
         for node in descendants:
             node_id_str = node.id.value
@@ -72,30 +85,18 @@ class GetWorldTreeUseCase:
             
             # --- DETECCIÓN DE SALTOS/COMPARTIDOS ---
             # Si el ID contiene un segmento '00' intermedio, es una entidad que ha "saltado" niveles.
-            is_jumped = False
-            for i in range(0, len(node_id_str)-2, 2):
-                if node_id_str[i:i+2] == '00':
-                    is_jumped = True
-                    break
+            node_foster = foster[node_id_str]
+            is_jumped = node_foster[:-2] != node_id_str[:-2]
             
             # --- RE-VINCULACIÓN DE PADRE LÓGICO (Padre Adoptivo) ---
             # Para que el árbol colapse correctamente, buscamos hacia arriba el ancestro más cercano
             # que REALMENTE exista en la base de datos, aplicando lógica de "Foster Parent".
-            def get_foster_mapped(id_val):
-                """Mapea segmentos '00' a '01' para buscar al hermano primogénito adoptivo."""
-                segments = [id_val[i:i+2] for i in range(0, len(id_val), 2)]
-                remapped = []
-                for s in segments:
-                    if s == '00': remapped.append('01') 
-                    else: remapped.append(s)
-                return "".join(remapped)
-
             logical_parent_id = ""
             curr_check = node_id_str[:-2] # Empezamos por el padre directo
             
-            while len(curr_check) >= len(root.id.value):
+            while len(curr_check) >= base_len:
                 # 1. Intentamos buscar por el mapa de "Padre Adoptivo" (01)
-                candidate = get_foster_mapped(curr_check) if curr_check.endswith('00') else curr_check
+                candidate = node_foster[:len(curr_check)] if curr_check.endswith('00') else curr_check
                 
                 # 2. Si el candidato existe, es nuestro vínculo para el árbol
                 if candidate in all_ids_set:
@@ -116,10 +117,10 @@ class GetWorldTreeUseCase:
                 'logical_parent_id': logical_parent_id, 
                 'id_display': f"..{node_id_str[-2:]}" if len(node_id_str) > 2 else node_id_str,
                 'indent_px': depth * 30,
-                'is_root': node_id_str == root.id.value,
+                'is_root': node_id_str == root_id,
                 'status': status_val,
                 'visible': node.is_public,
                 'is_jumped': is_jumped
             })
             
-        return {'root_name': root.name, 'tree': tree_data}
+        return tree_data
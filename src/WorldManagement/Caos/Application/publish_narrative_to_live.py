@@ -1,4 +1,5 @@
 from src.Infrastructure.DjangoFramework.persistence.models import CaosNarrativeORM, CaosNarrativeVersionORM, CaosNotification
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import invalidate_proposal_counts
 
 class PublishNarrativeToLiveUseCase:
     """
@@ -65,5 +66,6 @@ class PublishNarrativeToLiveUseCase:
             status__in=['PENDING', 'APPROVED']
         )
         obsoletas.update(status='ARCHIVED')
+        invalidate_proposal_counts()  # .update() no dispara señales
         
         print(f" 🚀 Lore Publicado exitosamente: v{version.version_number} de '{narrative.titulo}'.")
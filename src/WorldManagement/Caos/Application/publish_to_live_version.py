@@ -1,4 +1,5 @@
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM, CaosVersionORM, CaosEventLog, CaosNotification
+from src.Infrastructure.DjangoFramework.persistence.proposal_counts import invalidate_proposal_counts
 
 class PublishToLiveVersionUseCase:
     """
@@ -105,5 +106,6 @@ class PublishToLiveVersionUseCase:
             status__in=['PENDING', 'APPROVED']
         )
         obsoletas.update(status='ARCHIVED')
+        invalidate_proposal_counts()  # .update() no dispara señales
         
         print(f" 🚀 Publicación exitosa de v{version.version_number}. Entidad '{world.name}' operativa.")
@@ -1,16 +1,19 @@
-from django.db.models import Q
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+from src.Infrastructure.DjangoFramework.persistence.metadata_facets import filter_world_ids
 
 class StructuralSearchUseCase:
     """
     Caso de Uso para Búsqueda Semántica y Estructural.
-    Combina filtrado jerárquico (J-ID Prefix) con consultas profundas en JSONB (Index GIN).
+    Combina filtrado jerárquico (J-ID Prefix) con el índice de facetas tipadas de metadata
+    (CaosMetadataFacetORM, ver persistence/metadata_facets.py).
     """
 
     def execute(self, container_jid: str, filters: dict):
         """
         :param container_jid: J-ID del contenedor (ej: Galaxia '010304').
         :param filters: Diccionario de filtros flat (ej: {'gravedad__gte': 1.0, 'clima': 'arido'})
+                        Operadores: exact (por defecto), iexact, in, gt, gte, lt, lte, range,
+                        contains, icontains, startswith, istartswith.
         :return: QuerySet o Lista de resultados
         """
         
@@ -21,24 +24,12 @@ class StructuralSearchUseCase:
             is_active=True
         ).exclude(id=container_jid) # Excluir el propio contenedor
 
-        # 2. Filtrado Semántico JSONB
-        # Django soporta lookups de JSONField: metadata__key__operator
-        # Convertimos el diccionario 'filters' en kwargs de Django
-        # Ejemplo: filters={'gravedad__gte': 1.0} -> metadata__gravedad__gte=1.0
-        
-        json_filters = {}
-        for key, value in filters.items():
-            # Asumimos que las keys en 'filters' ya vienen con el operador si es necesario
-            # o son coincidencia exacta.
-            # Ej: 'gravedad' -> metadata__gravedad
-            # Ej: 'poblacion__gte' -> metadata__poblacion__gte
-            
-            # Map clean key to metadata path
-            meta_path = f"metadata__{key}"
-            json_filters[meta_path] = value
-
-        if json_filters:
-            query = query.filter(**json_filters)
+        # 2. Filtrado Estructural por facetas
+        # Cada filtro ('gravedad__gte': 1.0) se resuelve sobre los índices (clave, valor)
+        # de las facetas del subárbol; los valores de texto como "9,8 m/s²" se comparan
+        # como número en los operadores de rango.
+        if filters:
+            query = query.filter(id__in=filter_world_ids(container_jid, filters))
 
         # 3. Optimización Select
         # Solo traemos campos necesarios
@@ -55,6 +55,6 @@ class CaosRepository(ABC):
         pass
 
     @abstractmethod
-    def get_visited_narrative_ids(self, user) -> set:
-        """Recupera los IDs de narrativas visitadas por el usuario."""
+    def get_visited_narrative_ids(self, user, narrative_ids) -> set:
+        """Recupera cuáles de `narrative_ids` (NIDs) ha visitado ya el usuario."""
         pass
\ No newline at end of file
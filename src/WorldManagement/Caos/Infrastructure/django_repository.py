@@ -1,11 +1,6 @@
-import os
 import base64
-import io
 import time
 from typing import List, Optional
-from datetime import datetime
-from PIL import Image
-from django.conf import settings
 from django.db.models import Max
 from django.db.models.functions import Length
 
@@ -16,6 +11,9 @@ from src.Shared.Domain.value_objects import WorldID
 from src.Shared.Domain import id_utils
 
 from src.Infrastructure.DjangoFramework.persistence.models import CaosWorldORM
+from src.Infrastructure.DjangoFramework.persistence import (
+    blob_store, gallery_index, identity_map, image_derivatives, image_jobs
+)
 
 class DjangoCaosRepository(CaosRepository):
     """
@@ -65,21 +63,19 @@ class DjangoCaosRepository(CaosRepository):
         )
 
     def find_by_id(self, world_id) -> Optional[CaosWorld]:
-        """Recupera una entidad activa por su J-ID."""
+        """Recupera una entidad activa por su J-ID (una vez por petición, ver identity_map)."""
         val = world_id.value if hasattr(world_id, 'value') else world_id
-        try:
-            orm_obj = CaosWorldORM.objects.get(id=val, is_active=True)
-            return self._to_domain(orm_obj)
-        except CaosWorldORM.DoesNotExist:
+        orm_obj = identity_map.get_world(id=str(val))
+        if orm_obj is None or not orm_obj.is_active:
             return None
+        return identity_map.domain_world(orm_obj, self._to_domain)
 
     def get_by_public_id(self, public_id: str) -> Optional[CaosWorld]:
         """Recupera una entidad activa por su NanoID público."""
-        try:
-            orm_obj = CaosWorldORM.objects.get(public_id=public_id, is_active=True)
-            return self._to_domain(orm_obj)
-        except CaosWorldORM.DoesNotExist:
+        orm_obj = identity_map.get_world(public_id=public_id)
+        if orm_obj is None or not orm_obj.is_active:
             return None
+        return identity_map.domain_world(orm_obj, self._to_domain)
 
     def find_descendants(self, root_id: WorldID) -> List[CaosWorld]:
         """Recupera todos los descendientes lógicos de una rama jerárquica."""
@@ -117,88 +113,68 @@ class DjangoCaosRepository(CaosRepository):
 
     # --- Gestión de Archivos e Imágenes ---
 
-    def _inject_metadata(self, image, artist="ECLAI User"):
-        """Inyecta metadatos EXIF de autoría y software en la imagen generada."""
-        try:
-            exif = image.getexif()
-            exif[0x013b] = artist # Artista
-            exif[0x0131] = "ECLAI World Builder v4.9" # Software
-            exif[0x0132] = datetime.now().strftime("%d/%m/%Y") # Timestamp
-            return exif
-        except:
-            return image.getexif()
-
     def _audit_log(self, jid, filename, uploader, origin, title=None, period_slug=None):
-        """Registra el historial de subida de una imagen en los metadatos de la entidad."""
+        """Registra el historial de subida de una imagen en los metadatos de la entidad (parche atómico)."""
         try:
-            world = CaosWorldORM.objects.get(id=jid)
-            if not world.metadata: world.metadata = {}
-            if 'gallery_log' not in world.metadata: world.metadata['gallery_log'] = {}
-            
-            world.metadata['gallery_log'][filename] = {
-                "uploader": uploader,
-                "date": datetime.now().strftime("%d/%m/%Y"),
-                "origin": origin,
-                "title": title or "Sin Título",
-                "period": period_slug # Nulo = ACTUAL
-            }
-            world.save()
+            image_jobs.patch_gallery_log(jid, filename, image_jobs.gallery_log_entry(uploader, origin, title, period_slug))
         except Exception as e:
             print(f"⚠️ Error en auditoría de galería: {e}")
 
+    def _publish_to_gallery(self, jid, stem, staged):
+        """
+        Ingiere un archivo ya codificado en el almacén de blobs con el primer nombre libre de
+        la galería, genera sus miniaturas (en el pool de image_jobs, si lo hay) y lo indexa.
+        """
+        filename = blob_store.add_image(jid, jid, stem, staged)
+        variants = image_jobs.run_cpu(image_derivatives.generate_derivatives, gallery_index.get_img_root() / jid, filename)
+        gallery_index.register_image(jid, filename, folder=jid, variants=variants)
+        return filename
+
     def save_image(self, jid, base64_data, title=None, username="AI System", period_slug=None):
-        """Guarda una imagen generada por IA en el sistema de archivos y registra el log."""
+        """Guarda una imagen generada por IA en la galería (almacén de blobs) y registra el log."""
         if not base64_data: return None
-        base_dir = os.path.join(settings.BASE_DIR, 'persistence/static/persistence/img')
-        target_dir = os.path.join(base_dir, jid)
-        os.makedirs(target_dir, exist_ok=True)
-        
-        timestamp = int(time.time())
-        filename = f"{jid}_ia_{timestamp}.webp"
-        file_path = os.path.join(target_dir, filename)
+        staged = blob_store.staging_path()
 
         try:
             if "," in base64_data: base64_data = base64_data.split(",")[1]
-            image = Image.open(io.BytesIO(base64.b64decode(base64_data)))
-            exif = self._inject_metadata(image, artist=username)
-            # Guardamos en formato WEBP optimizado
-            image.save(file_path, "WEBP", quality=85, exif=exif)
+            # Decodificación y WebP optimizado en el pool de image_jobs (si lo hay)
+            image_jobs.run_cpu(image_jobs.encode_webp, base64.b64decode(base64_data), str(staged),
+                               image_jobs.GENERATED_QUALITY, username)
+            filename = self._publish_to_gallery(jid, f"{jid}_ia_{int(time.time())}", staged)
             self._audit_log(jid, filename, username, "GENERATED", title=title, period_slug=period_slug)
             return filename
         except Exception as e:
+            staged.unlink(missing_ok=True)
             print(f"⚠️ Error al guardar imagen de IA: {e}")
             return None
 
     def save_manual_file(self, jid, uploaded_file, username="Unknown", title=None, period_slug=None):
-        """Gestiona la subida manual de archivos de imagen por parte de un usuario."""
-        base_dir = os.path.join(settings.BASE_DIR, 'persistence/static/persistence/img')
-        target_dir = os.path.join(base_dir, jid)
-        os.makedirs(target_dir, exist_ok=True)
-
+        """
+        Gestiona la subida manual de archivos de imagen por parte de un usuario.
+        Retorna el nombre del archivo guardado en la galería, o None si falla.
+        """
         # Sanitización de nombre de archivo
         raw_name = title if title else f"{jid}_m_{int(time.time())}"
         safe_name = "".join([c for c in raw_name if c.isalnum() or c in (' ', '-', '_')]).strip().replace(' ', '_')
         if not safe_name: safe_name = "imagen"
 
-        filename = f"{safe_name}.webp"
-        counter = 1
-        while os.path.exists(os.path.join(target_dir, filename)):
-            filename = f"{safe_name}_{counter}.webp"
-            counter += 1
-            
-        file_path = os.path.join(target_dir, filename)
-
+        staged = blob_store.staging_path()
         try:
-            image = Image.open(uploaded_file)
-            if image.mode in ("RGBA", "P"): image = image.convert("RGB")
-            exif = self._inject_metadata(image, artist=username)
-            image.save(file_path, "WEBP", quality=90, exif=exif)
+            # Los procesos del pool leen el archivo del disco; si no está en disco, se le pasan los bytes
+            try:
+                source = uploaded_file.path
+            except (AttributeError, NotImplementedError, ValueError):
+                uploaded_file.seek(0)
+                source = uploaded_file.read()
+            image_jobs.run_cpu(image_jobs.encode_webp, source, str(staged), image_jobs.UPLOAD_QUALITY, username, True)
+            filename = self._publish_to_gallery(jid, safe_name, staged)
             self._audit_log(jid, filename, username, "MANUAL_UPLOAD", title=title, period_slug=period_slug)
             print(f" 📎 [Upload] Archivo '{filename}' subido y procesado.")
-            return True
+            return filename
         except Exception as e:
+            staged.unlink(missing_ok=True)
             print(f"⚠️ Error al guardar archivo manual: {e}")
-            return False
+            return None
 
     # --- Lógica Avanzada de Identificadores (J-ID) ---
 
@@ -256,13 +232,11 @@ class DjangoCaosRepository(CaosRepository):
         while next_num in used_nums: next_num += 1
         return f"{prefix}{next_num:02d}"
 
-    def get_visited_narrative_ids(self, user) -> set:
-        """Recupera los IDs de narrativas visitadas por el usuario."""
-        if not user or not user.is_authenticated:
-            return set()
-        
-        from src.Infrastructure.DjangoFramework.persistence.models import CaosEventLog
-        return set(CaosEventLog.objects.filter(
-            user=user, 
-            action='VIEW_NARRATIVE'
-        ).values_list('target_id', flat=True))
+    def get_visited_narrative_ids(self, user, narrative_ids) -> set:
+        """
+        Recupera cuáles de `narrative_ids` (NIDs) ha visitado ya el usuario.
+        Consulta el registro de lecturas solo para esas narrativas: el coste depende
+        de la página mostrada, no del historial del usuario.
+        """
+        from src.Infrastructure.DjangoFramework.persistence.narrative_reads import read_narrative_ids
+        return read_narrative_ids(user, narrative_ids)